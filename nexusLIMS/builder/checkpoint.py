@@ -0,0 +1,308 @@
+"""Checkpoints of partially built session records.
+
+When :ref:`NX_BUILD_CHECKPOINTS_ENABLED <config-build-checkpoints-enabled>` is
+set, :py:func:`~nexusLIMS.builder.record_builder.build_acq_activities` records
+its progress on each session in a SQLite database
+(``NX_DATA_PATH/build_checkpoints.sqlite``): the acquisition activity boundaries
+found by clustering, and then the extraction result of each file as soon as it
+has been added to an activity. If the build is interrupted (e.g. the process
+runs out of memory, crashes on a corrupt file, or is killed by a timeout), the
+next build of the same session skips clustering and the extraction (and preview
+generation) of every file that was already completed.
+
+A checkpoint is only resumed if its key matches the session's current key,
+which combines:
+
+* the path, size, and modification time of every file in the session
+* the NexusLIMS version
+* the session's instrument and the code and settings of that instrument's
+  :py:class:`~nexusLIMS.extractors.base.InstrumentProfile`
+* the preview options of the build
+* the file clustering settings (``NX_CLUSTERING_METHOD`` and
+  ``NX_CLUSTERING_SENSITIVITY``), which determine the activity boundaries
+
+Otherwise, the checkpoint is discarded and the session is built from scratch.
+A session's checkpoint is removed once its record has been validated.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import pickle
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Tuple
+
+from nexusLIMS.config import settings
+from nexusLIMS.extractors.cache import profile_fingerprint
+from nexusLIMS.extractors.profiles import get_profile_registry
+from nexusLIMS.version import __version__
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from nexusLIMS.db.models import Instrument
+    from nexusLIMS.utils.files import FileEntry
+
+_logger = logging.getLogger(__name__)
+
+__all__ = [
+    "SessionCheckpoint",
+    "get_session_checkpoint",
+    "session_checkpoint_key",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    bounds BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    session TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    result BLOB NOT NULL,
+    PRIMARY KEY (session, idx)
+);
+"""
+
+
+def session_checkpoint_key(
+    instrument: Instrument,
+    files: List[FileEntry],
+    *,
+    generate_previews: bool,
+    force_previews: bool,
+    defer_previews: bool,
+) -> str:
+    """
+    Compute the key a session's checkpoint must match to be resumed.
+
+    Parameters
+    ----------
+    instrument
+        The instrument of the session
+    files
+        The files of the session (as found for the build), in order
+    generate_previews
+        Whether the build generates preview images
+    force_previews
+        Whether the build regenerates preview images that are up to date
+    defer_previews
+        Whether the build defers generating preview images
+
+    Returns
+    -------
+    str
+        A hash of all the components the session's build depends on
+    """
+    digest = hashlib.sha256()
+    for f in files:
+        digest.update(f"{f.path}\0{f.size}\0{f.mtime!r}\n".encode())
+    components = {
+        "files": digest.hexdigest(),
+        "version": __version__,
+        "instrument": [instrument.name, str(instrument.timezone)],
+        "profile": profile_fingerprint(get_profile_registry().get_profile(instrument)),
+        "previews": [generate_previews, force_previews, defer_previews],
+        # the checkpointed activity boundaries depend on how files are clustered
+        "clustering": [
+            settings.NX_CLUSTERING_METHOD,
+            settings.NX_CLUSTERING_SENSITIVITY,
+        ],
+    }
+    return hashlib.sha256(json.dumps(components).encode()).hexdigest()
+
+
+class SessionCheckpoint:
+    """
+    The checkpoint of a single session's build.
+
+    Database errors are logged and disable checkpointing for the rest of the
+    build, so a broken checkpoint database never prevents a record from being
+    built.
+
+    Parameters
+    ----------
+    db_path
+        The path to the SQLite database file holding the checkpoints (created if
+        it does not exist)
+    session
+        An identifier of the session (see :py:func:`get_session_checkpoint`)
+    """
+
+    def __init__(self, db_path: Path, session: str):
+        self.db_path = Path(db_path)
+        self.session = session
+        self._conn: sqlite3.Connection | None = None
+        self._failed = False
+
+    def _connect(self) -> sqlite3.Connection | None:
+        if self._conn is None and not self._failed:
+            try:
+                conn = sqlite3.connect(self.db_path, timeout=60)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.executescript(_SCHEMA)
+            except sqlite3.Error as e:
+                self._disable(e)
+            else:
+                self._conn = conn
+        return self._conn
+
+    def _disable(self, error: Exception) -> None:
+        _logger.warning(
+            "Could not use build checkpoint %s, continuing without it: %s",
+            self.db_path,
+            error,
+        )
+        self._failed = True
+        self.close()
+
+    def load(self, key: str) -> Tuple[List[float], List[tuple]] | None:
+        """
+        Load the progress of an interrupted build of the session.
+
+        Parameters
+        ----------
+        key
+            The session's current key (see :py:func:`session_checkpoint_key`)
+
+        Returns
+        -------
+        tuple[list[float], list[tuple]] or None
+            The activity boundaries of the session (as returned by
+            :py:func:`~nexusLIMS.schemas.activity.cluster_filelist_mtimes`) and
+            the ``(meta_list, preview_fnames)`` extraction results of the
+            session's first files, or None if there is no checkpoint with a
+            matching key
+        """
+        conn = self._connect()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT key, bounds FROM sessions WHERE session = ?",
+                (self.session,),
+            ).fetchone()
+            if row is None or row[0] != key:
+                return None
+            rows = conn.execute(
+                "SELECT idx, result FROM files WHERE session = ? ORDER BY idx",
+                (self.session,),
+            ).fetchall()
+            # checkpoints are written only by NexusLIMS, in its own data directory
+            bounds = pickle.loads(row[1])  # noqa: S301
+            results = []
+            for idx, result in rows:
+                if idx != len(results):
+                    break
+                results.append(pickle.loads(result))  # noqa: S301
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self._disable(e)
+            return None
+        return bounds, results
+
+    def begin(self, key: str, bounds: List[float]) -> None:
+        """
+        Start a new checkpoint of the session, replacing any existing one.
+
+        Parameters
+        ----------
+        key
+            The session's current key (see :py:func:`session_checkpoint_key`)
+        bounds
+            The activity boundaries of the session
+        """
+        conn = self._connect()
+        if conn is None:
+            return
+        try:
+            with conn:
+                conn.execute("DELETE FROM files WHERE session = ?", (self.session,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+                    (
+                        self.session,
+                        key,
+                        pickle.dumps(bounds, pickle.HIGHEST_PROTOCOL),
+                    ),
+                )
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def add_file(self, idx: int, result: tuple) -> None:
+        """
+        Record that a file of the session has been added to its activity.
+
+        Parameters
+        ----------
+        idx
+            The index of the file in the session's files
+        result
+            The file's ``(meta_list, preview_fnames)`` extraction result
+        """
+        conn = self._connect()
+        if conn is None:
+            return
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                    (
+                        self.session,
+                        idx,
+                        pickle.dumps(result, pickle.HIGHEST_PROTOCOL),
+                    ),
+                )
+        except (sqlite3.Error, pickle.PicklingError, TypeError) as e:
+            self._disable(e)
+
+    def clear(self) -> None:
+        """Remove the checkpoint of the session."""
+        conn = self._connect()
+        if conn is None:
+            return
+        try:
+            with conn:
+                conn.execute("DELETE FROM files WHERE session = ?", (self.session,))
+                conn.execute("DELETE FROM sessions WHERE session = ?", (self.session,))
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def close(self) -> None:
+        """Close the connection to the checkpoint database."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def get_session_checkpoint(
+    instrument: Instrument, dt_from: datetime, dt_to: datetime
+) -> SessionCheckpoint | None:
+    """
+    Get the checkpoint of a session's build, if checkpoints are enabled.
+
+    Parameters
+    ----------
+    instrument
+        The instrument of the session
+    dt_from
+        The start of the session
+    dt_to
+        The end of the session
+
+    Returns
+    -------
+    SessionCheckpoint or None
+        The session's checkpoint, stored at
+        ``NX_DATA_PATH/build_checkpoints.sqlite``, or None if
+        :ref:`NX_BUILD_CHECKPOINTS_ENABLED <config-build-checkpoints-enabled>`
+        is not set
+    """
+    if not settings.NX_BUILD_CHECKPOINTS_ENABLED:
+        return None
+    session = f"{instrument.name}|{dt_from.isoformat()}|{dt_to.isoformat()}"
+    return SessionCheckpoint(settings.build_checkpoint_path, session)
@@ -0,0 +1,203 @@
+"""Admission control of extraction and preview jobs by their memory use.
+
+Extracting the metadata of a large file (e.g. a multi-GB spectrum image, a long
+Digital Micrograph image stack, or a Tofwerk HDF5 event list) and rendering its
+preview loads the whole dataset into memory, often several times over as it is
+converted for plotting. When files are processed by a pool of worker processes
+(see :ref:`NX_EXTRACTION_WORKERS <config-extraction-workers>` and
+:ref:`NX_PREVIEW_WORKERS <config-preview-workers>`), a few such files processed
+at the same time can run the host out of memory.
+
+If :ref:`NX_EXTRACTION_MEMORY_BUDGET <config-extraction-memory-budget>` is set,
+each job's memory use is estimated with :py:func:`estimate_memory` before it is
+submitted, and :py:class:`MemoryBudget` holds the job back until the jobs
+already running leave enough of the budget free. A job estimated to need more
+than the whole budget is only started once no other job is running.
+
+The budget is for the whole build: when sessions are built by several worker
+processes (see :ref:`NX_BUILD_WORKERS <config-build-workers>`), each of them,
+and the process running the preview pool, is given an equal share of it (see
+:py:func:`reset_memory_budget`).
+
+Whether or not a budget is set, the largest peak memory use of the worker
+processes (see :py:func:`worker_peak_rss`) is logged once their jobs are done,
+to help choose a budget.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict
+
+from nexusLIMS.config import settings
+from nexusLIMS.utils.stage_timing import peak_rss
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_logger = logging.getLogger(__name__)
+
+_MEMORY_FACTORS: Dict[str, float] = {
+    # loaded as a whole by HyperSpy, and converted to floating point for previews
+    ".dm3": 4.0,
+    ".dm4": 4.0,
+    ".ser": 4.0,
+    # event lists are binned into images and spectra for the preview
+    ".h5": 4.0,
+    ".tif": 2.0,
+    ".tiff": 2.0,
+}
+"""Estimated peak memory use per byte of a file, by file extension"""
+
+_DEFAULT_MEMORY_FACTOR = 1.0
+"""Estimated peak memory use per byte of a file with an extension not listed"""
+
+
+def estimate_memory(path: Path) -> int:
+    """
+    Estimate the peak memory needed to extract a file's metadata and preview.
+
+    The estimate is the file's size multiplied by a factor for its extension,
+    since the formats whose data is loaded as a whole need a multiple of their
+    size while it is processed.
+
+    Parameters
+    ----------
+    path
+        The file to be processed
+
+    Returns
+    -------
+    int
+        The estimated memory use, in bytes (0 if the file cannot be read, in
+        which case it will fail straight away)
+    """
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return 0
+    return int(size * _MEMORY_FACTORS.get(path.suffix.lower(), _DEFAULT_MEMORY_FACTOR))
+
+
+class MemoryBudget:
+    """
+    The memory available to the extraction and preview jobs of this process.
+
+    Jobs reserve their estimated memory use with :py:meth:`acquire` before they
+    are submitted, and return it with :py:meth:`release` once they are done
+    (which may happen in another thread, e.g. in a
+    :py:meth:`~concurrent.futures.Future.add_done_callback` callback).
+
+    Parameters
+    ----------
+    limit
+        The total memory the running jobs may use, in bytes
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, cost: int, name: str) -> None:
+        """
+        Wait until enough of the budget is free for a job, and reserve it.
+
+        Parameters
+        ----------
+        cost
+            The job's estimated memory use, in bytes (see :py:func:`estimate_memory`)
+        name
+            The name of the job (e.g. its file), for logging
+        """
+        with self._condition:
+            if not self._fits(cost):
+                _logger.info(
+                    "Waiting to process %s (estimated %s) until %s of the %s memory "
+                    "budget is free (%s in use)",
+                    name,
+                    format_bytes(cost),
+                    format_bytes(min(cost, self.limit)),
+                    format_bytes(self.limit),
+                    format_bytes(self.in_use),
+                )
+                self._condition.wait_for(lambda: self._fits(cost))
+            self.in_use += cost
+            _logger.debug(
+                "Processing %s (estimated %s); %s of the %s memory budget in use",
+                name,
+                format_bytes(cost),
+                format_bytes(self.in_use),
+                format_bytes(self.limit),
+            )
+
+    def release(self, cost: int) -> None:
+        """
+        Return the memory reserved for a job that is done.
+
+        Parameters
+        ----------
+        cost
+            The memory reserved by :py:meth:`acquire` for the job, in bytes
+        """
+        with self._condition:
+            self.in_use -= cost
+            self._condition.notify_all()
+
+    def _fits(self, cost: int) -> bool:
+        # a job larger than the whole budget can only run on its own
+        return self.in_use == 0 or self.in_use + cost <= self.limit
+
+
+_budget: list[MemoryBudget | None] = []
+_shares = [1]
+
+
+def get_memory_budget() -> MemoryBudget | None:
+    """
+    Get the memory budget of this process's extraction and preview jobs.
+
+    The budget is created from the ``NX_EXTRACTION_MEMORY_BUDGET`` setting (or
+    this process's share of it, see :py:func:`reset_memory_budget`) when first
+    used, and shared by all the worker pools of the process, so a session's
+    extraction pool waits for the preview jobs of earlier sessions (and vice
+    versa).
+
+    Returns
+    -------
+    MemoryBudget or None
+        The memory budget, or ``None`` if ``NX_EXTRACTION_MEMORY_BUDGET`` is not
+        set
+    """
+    if not _budget:
+        limit = settings.NX_EXTRACTION_MEMORY_BUDGET
+        _budget.append(
+            None if limit is None else MemoryBudget(int(limit) // _shares[0])
+        )
+    return _budget[0]
+
+
+def reset_memory_budget(shares: int = 1) -> None:
+    """
+    Drop the memory budget, so it is created again from the current settings.
+
+    Parameters
+    ----------
+    shares
+        The number of processes submitting jobs at the same time, which are
+        each given an equal share of the ``NX_EXTRACTION_MEMORY_BUDGET``
+        setting, so that together they stay within it
+    """
+    _budget.clear()
+    _shares[0] = shares
+
+
+def worker_peak_rss() -> int:
+    """Get the peak resident set size of this (worker) process, in bytes."""
+    return peak_rss() * 1024
+
+
+def format_bytes(n: int) -> str:
+    """Format a number of bytes in MiB, for logging."""
+    return f"{n / 2**20:.0f} MiB"
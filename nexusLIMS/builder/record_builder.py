@@ -6,21 +6,31 @@ Attributes
 ----------
 XSD_PATH
     A string containing the path to the Nexus Experiment schema file,
-    which is used to validate XML records built by this module
+    which is used to validate XML records built by this module (see
+    :py:mod:`nexusLIMS.builder.validation`)
+NX_NAMESPACE
+    The XML namespace of the Nexus Experiment schema
 """
 
 import argparse
 import logging
+import multiprocessing
 import shutil
+import sqlite3
 import sys
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from dataclasses import dataclass, field
 from datetime import datetime as dt
 from datetime import timedelta as td
 from importlib import import_module, util
 from io import BytesIO
+from itertools import groupby, repeat
+from operator import attrgetter
 from pathlib import Path
 from timeit import default_timer
-from typing import List
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List
 from uuid import uuid4
 
 from lxml import etree
@@ -28,31 +38,74 @@ from sqlmodel import Session as DBSession
 from sqlmodel import select
 
 from nexusLIMS import version
+from nexusLIMS.builder.checkpoint import (
+    SessionCheckpoint,
+    get_session_checkpoint,
+    session_checkpoint_key,
+)
+from nexusLIMS.builder.memory_budget import (
+    MemoryBudget,
+    estimate_memory,
+    format_bytes,
+    get_memory_budget,
+    reset_memory_budget,
+    worker_peak_rss,
+)
 from nexusLIMS.builder.preflight import PreflightError, run_preflight_checks
-from nexusLIMS.config import settings
+from nexusLIMS.builder.scheduler import BuildSchedule, order_sessions
+from nexusLIMS.builder.validation import (
+    NX_NAMESPACE,
+    XSD_PATH,  # noqa: F401 — used by callers as record_builder.XSD_PATH
+    ValidationResult,
+    get_record_validator,
+)
+from nexusLIMS.config import Settings, load_settings, settings
 from nexusLIMS.db.engine import get_engine
 from nexusLIMS.db.enums import RecordStatus
 from nexusLIMS.db.models import SessionLog
 from nexusLIMS.db.session_handler import Session, get_sessions_to_build
-from nexusLIMS.exporters import export_records, was_successfully_exported
-from nexusLIMS.extractors import get_registry
+from nexusLIMS.exporters import (
+    ExportResult,
+    export_records,
+    was_successfully_exported,
+)
+from nexusLIMS.extractors import PreviewJob, generate_deferred_preview, get_registry
+from nexusLIMS.extractors.base import ExtractionSession
+from nexusLIMS.extractors.plugins.fei_emi import clear_emi_cache
 from nexusLIMS.harvesters import nemo
 from nexusLIMS.harvesters.nemo import utils as nemo_utils
 from nexusLIMS.harvesters.reservation_event import ReservationEvent
 from nexusLIMS.schemas import activity
 from nexusLIMS.schemas.activity import AcquisitionActivity, cluster_filelist_mtimes
+from nexusLIMS.utils.build_metrics import (
+    format_build_metrics,
+    reset_build_metrics,
+    write_build_metrics,
+)
+from nexusLIMS.utils.file_index import FileIndex
 from nexusLIMS.utils.files import (
+    FileEntry,
     find_files_by_mtime,
     gnu_find_files_by_mtime,
+    select_files_by_mtime,
 )
 from nexusLIMS.utils.paths import join_instrument_filestore_path
+from nexusLIMS.utils.stage_timing import (
+    StageTiming,
+    add_timings,
+    drain_timings,
+    reset_timings,
+    save_stage_timings,
+    session_timing,
+    timed_stage,
+)
 from nexusLIMS.utils.time import (
     current_system_tz,
     has_delay_passed,
 )
 
 _logger = logging.getLogger(__name__)
-XSD_PATH: Path = Path(activity.__file__).parent / "nexus-experiment.xsd"
+_XSI_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
 
 
 @dataclass
@@ -62,23 +115,35 @@ class RecordBuildResult:
     Parameters
     ----------
     xml_text
-        The serialized XML record string
+        The serialized XML record string, if the record was built in memory
     activities
         The AcquisitionActivity objects built during record construction
     reservation_event
         The ReservationEvent used to populate the record header
+    xml_path
+        The file the record was written to, if it was written directly to disk
+        (see the ``output_path`` argument of :py:func:`build_record`)
+    timings
+        The stage timings of a record built in a worker process, to be merged
+        into the parent process's (see :py:mod:`nexusLIMS.utils.stage_timing`)
     """
 
-    xml_text: str
+    xml_text: str | None = None
     activities: List[AcquisitionActivity] = field(default_factory=list)
     reservation_event: ReservationEvent | None = None
+    xml_path: Path | None = None
+    timings: List[StageTiming] = field(default_factory=list, repr=False)
 
 
-def build_record(
+def build_record(  # noqa: PLR0913
     session: Session,
     sample_id: str | None = None,
     *,
     generate_previews: bool = True,
+    force_previews: bool = False,
+    defer_previews: bool = False,
+    files: List[FileEntry] | None = None,
+    output_path: Path | None = None,
 ) -> RecordBuildResult:
     """
     Build a NexusLIMS XML record of an Experiment.
@@ -101,22 +166,29 @@ def build_record(
         collected in this record. If None, a UUIDv4 will be generated
     generate_previews
         Whether to create the preview thumbnail images
+    force_previews
+        Whether to regenerate preview thumbnails even if they are up to date
+    defer_previews
+        Whether to leave the preview thumbnails to be generated later; they are
+        listed in the ``pending_previews`` of the returned activities
+    files
+        The session's files, if they have already been found (e.g. by
+        :py:func:`get_files_for_sessions`). If None, they are found with
+        :py:func:`get_files`
+    output_path
+        If given, the record is streamed to this file one acquisition activity
+        at a time (see :py:func:`write_record_xml`) rather than being returned
+        as a string, so the full XML document is never held in memory
 
     Returns
     -------
     result : RecordBuildResult
-        A :class:`RecordBuildResult` containing the XML string, activities,
-        and reservation event
+        A :class:`RecordBuildResult` containing the XML string (or the path of
+        the written file), activities, and reservation event
     """
     if sample_id is None:
         sample_id = str(uuid4())
 
-    # setup XML namespaces
-    nx_namespace = "https://data.nist.gov/od/dm/nexus/experiment/v1.0"
-    xsi_namespace = "http://www.w3.org/2001/XMLSchema-instance"
-    ns_map = {None: nx_namespace, "xsi": xsi_namespace, "nx": nx_namespace}
-    xml = etree.Element("Experiment", nsmap=ns_map)
-
     _logger.info(
         "Getting calendar events with instrument: %s, from %s to %s, "
         "user: %s; using harvester: %s",
@@ -127,12 +199,10 @@ def build_record(
         session.instrument.harvester,
     )
     # this returns a nexusLIMS.harvesters.reservation_event.ReservationEvent
-    res_event = get_reservation_event(session)
-
-    output = res_event.as_xml()
+    with timed_stage("reservation_lookup", session.session_identifier, items=1):
+        res_event = get_reservation_event(session)
 
-    for child in output:
-        xml.append(child)
+    header = res_event.as_xml()
 
     # Stamp each <sample> element with a unique id so that the <sampleID>
     # references written into acquisition activities resolve correctly per the
@@ -141,7 +211,7 @@ def build_record(
     # The first sample receives sample_id (the value threaded into activities);
     # any additional samples get fresh UUIDs so id values stay unique within
     # the document.
-    for idx, sample_el in enumerate(xml.findall("sample")):
+    for idx, sample_el in enumerate(header.findall("sample")):
         if not sample_el.get("id"):
             sample_el.set("id", sample_id if idx == 0 else str(uuid4()))
 
@@ -155,24 +225,76 @@ def build_record(
         session.dt_from,
         session.dt_to,
         generate_previews,
+        force_previews=force_previews,
+        defer_previews=defer_previews,
+        files=files,
     )
-    for i, this_activity in enumerate(activities):
-        a_xml = this_activity.as_xml(i, sample_id)
-        xml.append(a_xml)
-
-    xml_text = etree.tostring(
-        xml,
-        xml_declaration=True,
-        encoding="UTF-8",
-        pretty_print=True,
-    ).decode()
+
+    if output_path is None:
+        buffer = BytesIO()
+        with timed_stage("xml_build", session.session_identifier):
+            write_record_xml(buffer, header, activities, sample_id)
+        return RecordBuildResult(
+            xml_text=buffer.getvalue().decode(),
+            activities=activities,
+            reservation_event=res_event,
+        )
+
+    try:
+        with (
+            timed_stage("xml_build", session.session_identifier),
+            output_path.open(mode="wb") as f,
+        ):
+            write_record_xml(f, header, activities, sample_id)
+    except BaseException:
+        output_path.unlink(missing_ok=True)
+        raise
     return RecordBuildResult(
-        xml_text=xml_text,
         activities=activities,
         reservation_event=res_event,
+        xml_path=output_path,
     )
 
 
+def write_record_xml(
+    output: BinaryIO,
+    header: etree.Element,
+    activities: List[AcquisitionActivity],
+    sample_id: str,
+) -> None:
+    """
+    Write an XML record incrementally.
+
+    The ``Experiment`` document is written with :py:class:`lxml.etree.xmlfile`,
+    and the XML of each acquisition activity is generated just before it is
+    written and discarded right after, so at most one activity's element tree
+    is in memory at any time.
+
+    Parameters
+    ----------
+    output
+        The binary file (or file-like object) to write the record to
+    header
+        An element whose children (the title, summary, samples, etc.) make up
+        the record header, as returned by
+        :py:meth:`~nexusLIMS.harvesters.reservation_event.ReservationEvent.as_xml`
+    activities
+        The acquisition activities of the record
+    sample_id
+        The identifier of the sample the activities are referenced to
+    """
+    ns_map = {None: NX_NAMESPACE, "xsi": _XSI_NAMESPACE}
+    with etree.xmlfile(output, encoding="UTF-8") as xf:
+        xf.write_declaration()
+        with xf.element(f"{{{NX_NAMESPACE}}}Experiment", nsmap=ns_map):
+            xf.write("\n")
+            for child in header:
+                xf.write(child, pretty_print=True)
+            for i, this_activity in enumerate(activities):
+                xf.write(this_activity.as_xml(i, sample_id), pretty_print=True)
+    output.write(b"\n")
+
+
 def get_reservation_event(session: Session) -> ReservationEvent:
     """
     Get a ReservationEvent representation of a Session.
@@ -226,7 +348,16 @@ def get_reservation_event(session: Session) -> ReservationEvent:
     return harvester.res_event_from_session(session)
 
 
-def build_acq_activities(instrument, dt_from, dt_to, generate_previews):
+def build_acq_activities(  # noqa: PLR0913
+    instrument,
+    dt_from,
+    dt_to,
+    generate_previews,
+    *,
+    force_previews=False,
+    defer_previews=False,
+    files=None,
+):
     """
     Build an XML string representation of each AcquisitionActivity for a session.
 
@@ -249,6 +380,15 @@ def build_acq_activities(instrument, dt_from, dt_to, generate_previews):
         which files should be associated with this record
     generate_previews : bool
         Whether or not to create the preview thumbnail images
+    force_previews : bool
+        Whether to regenerate preview thumbnails even if they are up to date
+    defer_previews : bool
+        Whether to only record the preview thumbnails to be generated (in each
+        activity's ``pending_previews``) rather than generating them
+    files : typing.Optional[typing.List[~nexusLIMS.utils.files.FileEntry]]
+        The files to include in this record (sorted by modification time), if
+        they have already been found. If None, they are found with
+        :py:func:`get_files`
 
     Returns
     -------
@@ -261,66 +401,112 @@ def build_acq_activities(instrument, dt_from, dt_to, generate_previews):
         logging.WARNING,
     )
 
-    start_timer = default_timer()
-    path = join_instrument_filestore_path(instrument.filestore_path)
-    # find the files to be included (list of Paths)
-    files = get_files(path, dt_from, dt_to)
+    if files is None:
+        start_timer = default_timer()
+        path = join_instrument_filestore_path(instrument.filestore_path)
+        # find the files to be included (list of FileEntry)
+        with timed_stage("get_files") as timing:
+            files = get_files(path, dt_from, dt_to)
+            timing.items = len(files)
 
-    _logger.info(
-        "Found %i files in %.2f seconds",
-        len(files),
-        default_timer() - start_timer,
-    )
+        _logger.info(
+            "Found %i files in %.2f seconds",
+            len(files),
+            default_timer() - start_timer,
+        )
 
     # raise error if no file found were found
     if len(files) == 0:
         msg = "No files found in this time range"
         raise FileNotFoundError(msg)
 
-    # get the timestamp boundaries of acquisition activities
-    aa_bounds = cluster_filelist_mtimes(files)
-
-    # add the last file's modification time to the boundaries list to make
-    # the loop below easier to process
-    aa_bounds.append(files[-1].stat().st_mtime)
+    # resume an interrupted build of this session if it was checkpointed and
+    # its files are unchanged
+    checkpoint, aa_bounds, completed = _checkpointed_activity_bounds(
+        instrument,
+        dt_from,
+        dt_to,
+        files,
+        generate_previews=generate_previews,
+        force_previews=force_previews,
+        defer_previews=defer_previews,
+    )
 
     activities: List[AcquisitionActivity | None] = [None] * len(aa_bounds)
 
-    i = 0
-    aa_idx = 0
-    while i < len(files):
-        f = files[i]
-        mtime = f.stat().st_mtime
-
-        # check this file's mtime, if it is less than this iteration's value
-        # in the AA bounds, then it belongs to this iteration's AA
-        # if not, then we should move to the next activity
-        if mtime <= aa_bounds[aa_idx]:
-            # if current activity index is None, we need to start a new AA:
-            if activities[aa_idx] is None:
-                activities[aa_idx] = AcquisitionActivity(
-                    start=dt.fromtimestamp(mtime, tz=instrument.timezone),
-                )
-
-            # add this file to the AA
-            _logger.info(
-                "Adding file %i/%i %s to activity %i",
-                i,
-                len(files),
-                str(f).replace(str(settings.NX_INSTRUMENT_DATA_PATH), "").strip("/"),
-                aa_idx,
+    # extract metadata and generate previews ahead of time in a worker pool if
+    # configured; results are consumed below in the same (mtime) order as files
+    remaining = [f.path for f in files[len(completed) :]]
+    workers = min(settings.NX_EXTRACTION_WORKERS, len(remaining))
+    parsed_files = (
+        _parse_files_in_pool(
+            remaining,
+            generate_previews,
+            workers,
+            force_previews,
+            defer_previews,
+        )
+        if workers > 1
+        else (
+            _parse_file_in_worker(
+                fname, generate_previews, force_previews, defer_previews
             )
-            activities[aa_idx].add_file(fname=f, generate_preview=generate_previews)
-            # assume this file is the last one in the activity (this will be
-            # true on the last iteration where mtime is <= to the
-            # aa_bounds value)
-            activities[aa_idx].end = dt.fromtimestamp(mtime, tz=instrument.timezone)
-            i += 1
-        else:
-            # this file's mtime is after the boundary and is thus part of the
-            # next activity, so increment AA counter and reprocess file (do
-            # not increment i)
-            aa_idx += 1
+            for fname in remaining
+        )
+    )
+
+    try:
+        i = 0
+        aa_idx = 0
+        while i < len(files):
+            f = files[i]
+            mtime = f.mtime
+
+            # check this file's mtime, if it is less than this iteration's value
+            # in the AA bounds, then it belongs to this iteration's AA
+            # if not, then we should move to the next activity
+            if mtime <= aa_bounds[aa_idx]:
+                # if current activity index is None, we need to start a new AA:
+                if activities[aa_idx] is None:
+                    activities[aa_idx] = AcquisitionActivity(
+                        start=dt.fromtimestamp(mtime, tz=instrument.timezone),
+                    )
+
+                # add this file to the AA
+                _logger.info(
+                    "Adding file %i/%i %s to activity %i",
+                    i,
+                    len(files),
+                    str(f.path)
+                    .replace(str(settings.NX_INSTRUMENT_DATA_PATH), "")
+                    .strip("/"),
+                    aa_idx,
+                )
+                if i < len(completed):
+                    result = completed[i]
+                else:
+                    result = next(parsed_files)
+                    if checkpoint is not None:
+                        checkpoint.add_file(i, result)
+                activities[aa_idx].add_parsed_file(
+                    f.path, *result, previews_deferred=defer_previews, size=f.size
+                )
+                # assume this file is the last one in the activity (this will be
+                # true on the last iteration where mtime is <= to the
+                # aa_bounds value)
+                activities[aa_idx].end = dt.fromtimestamp(mtime, tz=instrument.timezone)
+                i += 1
+            else:
+                # this file's mtime is after the boundary and is thus part of the
+                # next activity, so increment AA counter and reprocess file (do
+                # not increment i)
+                aa_idx += 1
+    finally:
+        parsed_files.close()
+        if checkpoint is not None:
+            checkpoint.close()
+        # the .emi files of this session are not needed for the next one
+        clear_emi_cache()
 
     # Remove any "None" activities from list
     activities: List[AcquisitionActivity] = [a for a in activities if a is not None]
@@ -335,14 +521,230 @@ def build_acq_activities(instrument, dt_from, dt_to, generate_previews):
     return activities
 
 
+def _checkpointed_activity_bounds(  # noqa: PLR0913
+    instrument,
+    dt_from: dt,
+    dt_to: dt,
+    files: List[FileEntry],
+    *,
+    generate_previews: bool,
+    force_previews: bool,
+    defer_previews: bool,
+) -> tuple[SessionCheckpoint | None, List[float], List[tuple]]:
+    """
+    Get the activity boundaries of a session, resuming its build if possible.
+
+    If :ref:`NX_BUILD_CHECKPOINTS_ENABLED <config-build-checkpoints-enabled>` is
+    set and an interrupted build of the session with the same files and options
+    was checkpointed, its activity boundaries and completed extraction results
+    are returned. Otherwise, the files are clustered and (if checkpoints are
+    enabled) a new checkpoint of the session is started.
+
+    Returns
+    -------
+    tuple
+        The session's :py:class:`~nexusLIMS.builder.checkpoint.SessionCheckpoint`
+        (or None if checkpoints are disabled), the activity boundaries (ending
+        with the last file's modification time), and the
+        ``(meta_list, preview_fnames)`` results of the files that were already
+        completed
+    """
+    checkpoint = get_session_checkpoint(instrument, dt_from, dt_to)
+    if checkpoint is not None:
+        checkpoint_key = session_checkpoint_key(
+            instrument,
+            files,
+            generate_previews=generate_previews,
+            force_previews=force_previews,
+            defer_previews=defer_previews,
+        )
+        resumed = checkpoint.load(checkpoint_key)
+        if resumed is not None:
+            _logger.info(
+                "Resuming from checkpoint with %i of %i files completed",
+                len(resumed[1]),
+                len(files),
+            )
+            return checkpoint, *resumed
+
+    # get the timestamp boundaries of acquisition activities
+    with timed_stage("clustering", items=len(files)):
+        aa_bounds = cluster_filelist_mtimes(files)
+
+    # add the last file's modification time to the boundaries list to make
+    # the loop in build_acq_activities easier to process
+    aa_bounds.append(files[-1].mtime)
+    if checkpoint is not None:
+        checkpoint.begin(checkpoint_key, aa_bounds)
+    return checkpoint, aa_bounds, []
+
+
+def _parse_files_in_pool(
+    files: List[Path],
+    generate_previews: bool,  # noqa: FBT001
+    workers: int,
+    force_previews: bool = False,  # noqa: FBT001, FBT002
+    defer_previews: bool = False,  # noqa: FBT001, FBT002
+) -> Iterator[tuple]:
+    """
+    Parse metadata (and generate previews) for files using a process pool.
+
+    Files are distributed across ``workers`` processes, but results are yielded
+    in the same order as ``files`` so that they can be added to acquisition
+    activities exactly as in a serial build. Any exception raised while
+    parsing a file (e.g. :py:exc:`FileNotFoundError`) is re-raised when that
+    file's result is reached. Closing the generator cancels any work that has
+    not yet started. If the ``NX_EXTRACTION_MEMORY_BUDGET`` setting is set,
+    files are only handed to the workers as the memory budget allows (see
+    :py:mod:`nexusLIMS.builder.memory_budget`).
+
+    Parameters
+    ----------
+    files
+        The files to parse, sorted by modification time
+    generate_previews
+        Whether or not to create the preview thumbnail images
+    workers
+        The number of worker processes to use
+    force_previews
+        Whether to regenerate preview thumbnails even if they are up to date
+    defer_previews
+        Whether to only determine the paths of the preview thumbnails
+
+    Yields
+    ------
+    tuple
+        The ``(meta_list, preview_fnames)`` result for each file, suitable for
+        :py:meth:`~nexusLIMS.schemas.activity.AcquisitionActivity.add_parsed_file`
+    """
+    _logger.info("Parsing %i files using %i worker processes", len(files), workers)
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_get_mp_context(),
+        initializer=_init_worker_process,
+    )
+    budget = get_memory_budget()
+    peak_rss = 0
+    try:
+        if budget is None:
+            results = executor.map(
+                _parse_file_with_timings,
+                files,
+                repeat(generate_previews),
+                repeat(force_previews),
+                repeat(defer_previews),
+                chunksize=max(1, len(files) // (workers * 8)),
+            )
+        else:
+            results = _submit_within_budget(
+                executor,
+                budget,
+                files,
+                generate_previews,
+                force_previews,
+                defer_previews,
+            )
+        for result, timings, worker_rss in results:
+            add_timings(timings)
+            peak_rss = max(peak_rss, worker_rss)
+            yield result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if peak_rss:
+            _logger.info(
+                "Peak memory use of an extraction worker: %s", format_bytes(peak_rss)
+            )
+
+
+def _submit_within_budget(  # noqa: PLR0913
+    executor: ProcessPoolExecutor,
+    budget: MemoryBudget,
+    files: List[Path],
+    generate_previews: bool,  # noqa: FBT001
+    force_previews: bool,  # noqa: FBT001
+    defer_previews: bool,  # noqa: FBT001
+) -> Iterator[tuple]:
+    """
+    Parse files in a process pool, submitting each once the memory budget allows.
+
+    Results are yielded in the same order as ``files``, as by
+    :py:meth:`~concurrent.futures.Executor.map`. Each file's estimated memory use
+    (see :py:func:`~nexusLIMS.builder.memory_budget.estimate_memory`) is
+    reserved from ``budget`` before the file is submitted, which waits for
+    enough of the files already submitted to be done, and is returned as soon as
+    the file is done (or cancelled).
+    """
+    pending: deque[Future] = deque()
+    for fname in files:
+        cost = estimate_memory(fname)
+        budget.acquire(cost, str(fname))
+        future = executor.submit(
+            _parse_file_with_timings,
+            fname,
+            generate_previews,
+            force_previews,
+            defer_previews,
+        )
+        future.add_done_callback(lambda _, cost=cost: budget.release(cost))
+        pending.append(future)
+        while pending and pending[0].done():
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _parse_file_in_worker(
+    fname: Path,
+    generate_preview: bool,  # noqa: FBT001
+    force_preview: bool = False,  # noqa: FBT001, FBT002
+    defer_preview: bool = False,  # noqa: FBT001, FBT002
+) -> tuple:
+    """Parse a single file in a worker process (see :py:func:`_parse_files_in_pool`)."""
+    if not fname.exists():
+        msg = f"{fname} was not found"
+        raise FileNotFoundError(msg)
+    meta_list, preview_fnames = activity.parse_metadata(
+        fname,
+        generate_preview=generate_preview,
+        force_preview=force_preview,
+        defer_preview=defer_preview,
+    )
+    if meta_list is not None:
+        # only "nx_meta" is used by the activity, so avoid sending the (possibly
+        # large) original metadata back to the parent process
+        meta_list = [{"nx_meta": m["nx_meta"]} for m in meta_list]
+    return meta_list, preview_fnames
+
+
+def _parse_file_with_timings(
+    fname: Path,
+    generate_preview: bool,  # noqa: FBT001
+    force_preview: bool = False,  # noqa: FBT001, FBT002
+    defer_preview: bool = False,  # noqa: FBT001, FBT002
+) -> tuple[tuple, List[StageTiming], int]:
+    """
+    Parse a file in a pool worker.
+
+    Also returns the worker's stage timings, and its peak memory use in bytes.
+    """
+    result = _parse_file_in_worker(
+        fname, generate_preview, force_preview, defer_preview
+    )
+    return result, drain_timings(), worker_peak_rss()
+
+
 def get_files(
     path: Path,
     dt_from: dt,
     dt_to: dt,
-) -> List[Path]:
+) -> List[FileEntry]:
     """
     Get files under a path that were last modified between the two given timestamps.
 
+    If :ref:`NX_FILE_INDEX_ENABLED <config-file-index-enabled>` is set, the files
+    are looked up in the persistent :py:class:`~nexusLIMS.utils.file_index.FileIndex`
+    of the filestore, falling back to GNU ``find`` if the index cannot be used.
+
     Parameters
     ----------
     path
@@ -356,9 +758,10 @@ def get_files(
 
     Returns
     -------
-    files : List[pathlib.Path]
-        A list of the files that have modification times within the
-        time range provided (sorted by modification time)
+    files : List[~nexusLIMS.utils.files.FileEntry]
+        A list of the files (with their modification times and sizes) that have
+        modification times within the time range provided (sorted by
+        modification time)
     """
     _logger.info("Starting new file-finding in %s", path)
 
@@ -379,6 +782,17 @@ def get_files(
     supported_extensions = registry.get_supported_extensions(exclude_fallback=True)
     extension_arg = None if strategy == "inclusive" else supported_extensions
 
+    if settings.NX_FILE_INDEX_ENABLED:
+        try:
+            return FileIndex(settings.file_index_path).find_files_by_mtime(
+                path, dt_from, dt_to, extensions=extension_arg
+            )
+        except (OSError, sqlite3.Error) as exception:
+            _logger.warning(
+                "File index could not be used: %s\nFalling back to GNU find",
+                exception,
+            )
+
     try:
         files = gnu_find_files_by_mtime(path, dt_from, dt_to, extensions=extension_arg)
 
@@ -389,10 +803,74 @@ def get_files(
             "GNU find returned error: %s\nFalling back to pure Python implementation",
             exception,
         )
-        files = find_files_by_mtime(path, dt_from, dt_to)
+        files = [
+            FileEntry.from_path(f) for f in find_files_by_mtime(path, dt_from, dt_to)
+        ]
     return files
 
 
+def get_files_for_sessions(sessions: List[Session]) -> Dict[str, List[FileEntry]]:
+    """
+    Get the files of several sessions with one search per instrument filestore.
+
+    The sessions are grouped by their instrument's filestore path, and each
+    filestore is searched once with :py:func:`get_files`, from the earliest
+    session start to the latest session end. Each session's files are then
+    selected from those results with
+    :py:func:`~nexusLIMS.utils.files.select_files_by_mtime`, which uses the same
+    time bounds as the search itself, so every session gets exactly the files a
+    separate :py:func:`get_files` call would have found.
+
+    Parameters
+    ----------
+    sessions
+        The sessions for which to find files
+
+    Returns
+    -------
+    files : typing.Dict[str, typing.List[~nexusLIMS.utils.files.FileEntry]]
+        The files of each session (sorted by modification time), keyed by
+        session identifier. Sessions whose filestore could not be searched are
+        left out, so their files can be searched for (and any error reported)
+        when their record is built.
+    """
+    by_filestore: Dict[Path, List[Session]] = defaultdict(list)
+    for s in sessions:
+        path = join_instrument_filestore_path(s.instrument.filestore_path)
+        by_filestore[path].append(s)
+
+    session_files = {}
+    for path, filestore_sessions in by_filestore.items():
+        start_timer = default_timer()
+        try:
+            with timed_stage("get_files") as timing:
+                files = get_files(
+                    path,
+                    min(s.dt_from for s in filestore_sessions),
+                    max(s.dt_to for s in filestore_sessions),
+                )
+                timing.items = len(files)
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            _logger.warning(
+                "Could not search %s for the files of %i sessions: %s",
+                path,
+                len(filestore_sessions),
+                exception,
+            )
+            continue
+        _logger.info(
+            "Found %i files for %i sessions in %.2f seconds",
+            len(files),
+            len(filestore_sessions),
+            default_timer() - start_timer,
+        )
+        for s in filestore_sessions:
+            session_files[s.session_identifier] = select_files_by_mtime(
+                files, s.dt_from, s.dt_to
+            )
+    return session_files
+
+
 def dump_record(
     session: Session,
     filename: Path | None = None,
@@ -432,36 +910,42 @@ def dump_record(
             + ".xml",
         )
     filename.parent.mkdir(parents=True, exist_ok=True)
-    with filename.open(mode="w", encoding="utf-8") as f:
-        result = build_record(session=session, generate_previews=generate_previews)
-        f.write(result.xml_text)
+    build_record(
+        session=session, generate_previews=generate_previews, output_path=filename
+    )
     return filename
 
 
-def validate_record(xml_filename):
+def validate_record(xml_filename) -> ValidationResult:
     """
     Validate an .xml record against the Nexus schema.
 
+    The record is validated while it is parsed incrementally (see
+    :py:meth:`~nexusLIMS.builder.validation.RecordValidator.validate_file`),
+    using the schema compiled once per process by
+    :py:func:`~nexusLIMS.builder.validation.get_record_validator`.
+
     Parameters
     ----------
-    xml_filename : str or io.StringIO or io.BytesIO
+    xml_filename : str or pathlib.Path or io.StringIO or io.BytesIO
         The path to the xml file to be validated (can also be a file-like
         object like StringIO or BytesIO)
 
     Returns
     -------
-    validates : bool
-        Whether the record validates against the Nexus schema
+    validates : ~nexusLIMS.builder.validation.ValidationResult
+        The problems found in the record; truthy if the record validates
+        against the Nexus schema
     """
-    xsd_doc = etree.parse(XSD_PATH)
-    xml_schema = etree.XMLSchema(xsd_doc)
-    xml_doc = etree.parse(xml_filename)
-
-    return xml_schema.validate(xml_doc)
+    return get_record_validator().validate_file(xml_filename)
 
 
 def build_new_session_records(
     generate_previews: bool = True,  # noqa: FBT002, FBT001
+    *,
+    workers: int | None = None,
+    force_previews: bool = False,
+    deadline: float | None = None,
 ) -> tuple[
     List[Path],
     List[Session],
@@ -475,6 +959,33 @@ def build_new_session_records(
     those records using :py:func:`build_record` (saving to the NexusLIMS folder), and
     returns a list of resulting .xml files to be uploaded to CDCS.
 
+    Parameters
+    ----------
+    generate_previews
+        Whether or not to create the preview thumbnail images
+    workers
+        The number of worker processes to use for building sessions in parallel.
+        If ``None``, the value of the ``NX_BUILD_WORKERS`` setting is used. With a
+        value of 1, sessions are built serially in the current process. Database
+        updates, error handling, and record validation always happen in the
+        current process, in the order chosen by the ``NX_BUILD_SCHEDULING_POLICY``
+        setting (see :py:mod:`nexusLIMS.builder.scheduler`).
+        If the ``NX_BATCH_FILE_DISCOVERY`` setting is enabled, or the scheduling
+        policy is ``smallest_first``, the files of all sessions are found up front
+        with :py:func:`get_files_for_sessions`.
+        If the ``NX_PREVIEW_WORKERS`` setting is above 0, preview thumbnails are
+        not generated while records are built, but by a separate pool of that
+        many worker processes as each record is validated. This function only
+        returns once all of them have been generated.
+    force_previews
+        Whether to regenerate preview thumbnails even if they are up to date
+    deadline
+        The :py:func:`time.monotonic` time by which building should be finished.
+        Sessions that are not expected to be built by then are not started, and
+        are left ``TO_BE_BUILT`` for the next run (see
+        :py:class:`~nexusLIMS.builder.scheduler.BuildSchedule`). If ``None``, every
+        session is built.
+
     Returns
     -------
     xml_files : typing.List[pathlib.Path]
@@ -491,101 +1002,605 @@ def build_new_session_records(
     # usage events from any NEMO instances;
     # nexusLIMS.harvesters.nemo.add_all_usage_events_to_db() must be used
     # first to do so
-    sessions = get_sessions_to_build()
+    with timed_stage("get_sessions_to_build") as timing:
+        sessions = get_sessions_to_build()
+        timing.items = len(sessions)
     if not sessions:
         sys.exit("No 'TO_BE_BUILT' sessions were found. Exiting.")
+    if workers is None:
+        workers = settings.NX_BUILD_WORKERS
+    workers = max(1, min(workers, len(sessions)))
+    policy = settings.NX_BUILD_SCHEDULING_POLICY
+    session_files = (
+        get_files_for_sessions(sessions)
+        if settings.NX_BATCH_FILE_DISCOVERY or policy == "smallest_first"
+        else {}
+    )
+    schedule = BuildSchedule(
+        order_sessions(sessions, policy, session_files), deadline, session_files
+    )
+    preview_workers = settings.NX_PREVIEW_WORKERS if generate_previews else 0
+
     xml_files = []
     sessions_built = []
     activities_built = []
     res_events_built = []
-    # loop through the sessions
-    for s in sessions:
-        try:
-            db_row = s.insert_record_generation_event()
-            result = build_record(session=s, generate_previews=generate_previews)
-            record_text = result.xml_text
-        except (  # pylint: disable=broad-exception-caught
-            FileNotFoundError,
-            Exception,
-        ) as exception:
-            if isinstance(exception, FileNotFoundError):
-                # if no files were found for this session log, mark it as so in
-                # the database
-                path = join_instrument_filestore_path(s.instrument.filestore_path)
-                _logger.warning(
-                    "No files found in %s between %s and %s",
-                    path,
-                    s.dt_from.isoformat(),
-                    s.dt_to.isoformat(),
-                )
 
-                if has_delay_passed(s.dt_to):
-                    _logger.warning(
-                        'Marking %s as "NO_FILES_FOUND"',
-                        s.session_identifier,
-                    )
-                    s.update_session_status(RecordStatus.NO_FILES_FOUND)
-                else:
-                    # if the delay hasn't passed, log and delete the record
-                    # generation event we inserted previously
-                    _logger.warning(
-                        "Configured record building delay has not passed; "
-                        "Removing previously inserted RECORD_GENERATION row for %s",
-                        s.session_identifier,
-                    )
-                    # Delete the RECORD_GENERATION log using SQLModel
-                    with DBSession(get_engine()) as db_session:
-                        statement = select(SessionLog).where(
-                            SessionLog.id_session_log == db_row["id_session_log"]
-                        )
-                        log = db_session.exec(statement).first()
-                        if log:
-                            db_session.delete(log)
-                            db_session.commit()
-            elif isinstance(exception, nemo.exceptions.NoDataConsentError):
-                _logger.warning(
-                    "User requested this session not be harvested, "
-                    "so no record was built. %s",
-                    exception,
-                )
-                _logger.info('Marking %s as "NO_CONSENT"', s.session_identifier)
-                s.update_session_status(RecordStatus.NO_CONSENT)
-            elif isinstance(exception, nemo.exceptions.NoMatchingReservationError):
-                _logger.warning(
-                    "No matching reservation found for this session, "
-                    "so assuming no consent was given. %s",
-                    exception,
-                )
-                _logger.info('Marking %s as "NO_RESERVATION"', s.session_identifier)
-                s.update_session_status(RecordStatus.NO_RESERVATION)
-            else:
-                _logger.exception("Could not generate record text")
-                _logger.exception('Marking %s as "ERROR"', s.session_identifier)
-                s.update_session_status(RecordStatus.ERROR)
-        else:
+    if workers > 1:
+        _logger.info(
+            "Building %i sessions using %i worker processes", len(sessions), workers
+        )
+        # the build workers (and the preview pool, run from this process) submit
+        # their jobs at the same time, so each is given a share of the budget
+        budget_shares = workers + (preview_workers > 0)
+        reset_memory_budget(budget_shares)
+        outcomes = _build_sessions_in_pool(
+            schedule,
+            generate_previews,
+            workers,
+            session_files,
+            force_previews,
+            preview_workers > 0,
+            budget_shares=budget_shares,
+        )
+    else:
+        outcomes = _build_sessions_serially(
+            schedule,
+            generate_previews,
+            session_files,
+            force_previews,
+            preview_workers > 0,
+        )
+
+    preview_executor = (
+        ProcessPoolExecutor(
+            max_workers=preview_workers,
+            mp_context=_get_preview_mp_context(),
+            initializer=_init_preview_worker,
+            initargs=(_settings_values(),),
+        )
+        if preview_workers > 0
+        else None
+    )
+    preview_futures = []
+    try:
+        # loop through the build outcomes (always in the scheduled session order)
+        for s, db_row, result, exception in outcomes:
+            if exception is not None:
+                _handle_build_exception(s, db_row, exception)
+                continue
+            n_built = len(xml_files)
             xml_files, sessions_built, activities_built, res_events_built = (
                 _record_validation_flow(
-                    record_text,
+                    result,
                     s,
                     xml_files,
                     sessions_built,
-                    result.activities,
-                    result.reservation_event,
                     activities_built,
                     res_events_built,
                 )
             )
+            if preview_executor is not None and len(xml_files) > n_built:
+                # the previews of a file's signals are generated by one job, so
+                # the file is only loaded once
+                jobs = (job for a in result.activities for job in a.pending_previews)
+                preview_futures.extend(
+                    _submit_previews(
+                        preview_executor,
+                        list(file_jobs),
+                        s.session_identifier,
+                        force_previews,
+                    )
+                    for _, file_jobs in groupby(jobs, key=attrgetter("fname"))
+                )
+    finally:
+        if preview_executor is not None:
+            _wait_for_previews(preview_futures)
+            preview_executor.shutdown(wait=True, cancel_futures=True)
+        # the .emi files loaded for this build are not kept for the next one,
+        # and the next build starts with the whole memory budget
+        clear_emi_cache()
+        reset_memory_budget()
 
     return xml_files, sessions_built, activities_built, res_events_built
 
 
+def _wait_for_previews(futures: List[Future]) -> None:
+    """
+    Wait for the deferred preview generation jobs of a build to finish.
+
+    Parameters
+    ----------
+    futures
+        The futures returned when submitting :py:func:`_generate_previews_in_worker`
+        jobs (one per file)
+    """
+    if not futures:
+        return
+    start_timer = default_timer()
+    _logger.info("Waiting for the previews of %i files to be generated", len(futures))
+    n_failed = 0
+    peak_rss = 0
+    for future in futures:
+        try:
+            timings, worker_rss = future.result()
+        except Exception:  # pylint: disable=broad-exception-caught
+            n_failed += 1
+            _logger.exception("Could not generate preview")
+        else:
+            add_timings(timings)
+            peak_rss = max(peak_rss, worker_rss)
+    _logger.info(
+        "Finished generating the previews of %i files (%i failed) in %.2f "
+        "seconds; peak memory use of a preview worker: %s",
+        len(futures),
+        n_failed,
+        default_timer() - start_timer,
+        format_bytes(peak_rss),
+    )
+
+
+def _submit_previews(
+    executor: ProcessPoolExecutor,
+    jobs: List[PreviewJob],
+    session_identifier: str,
+    force: bool,  # noqa: FBT001
+) -> Future:
+    """
+    Submit the deferred previews of a file to the preview pool, as one job.
+
+    If the ``NX_EXTRACTION_MEMORY_BUDGET`` setting is set, this waits until the
+    memory budget allows the job to run (see
+    :py:mod:`nexusLIMS.builder.memory_budget`).
+    """
+    budget = get_memory_budget()
+    if budget is None:
+        return executor.submit(
+            _generate_previews_in_worker, jobs, session_identifier, force=force
+        )
+    cost = estimate_memory(jobs[0].fname)
+    budget.acquire(cost, str(jobs[0].fname))
+    future = executor.submit(
+        _generate_previews_in_worker, jobs, session_identifier, force=force
+    )
+    future.add_done_callback(lambda _: budget.release(cost))
+    return future
+
+
+def _generate_previews_in_worker(
+    jobs: List[PreviewJob], session_identifier: str, *, force: bool = False
+) -> tuple[List[StageTiming], int]:
+    """
+    Generate the deferred previews of a file in a worker process.
+
+    The previews share an :py:class:`~nexusLIMS.extractors.base.ExtractionSession`,
+    so the file is only loaded once for all of its signals.
+
+    Returns the worker's stage timings (see
+    :py:func:`~nexusLIMS.utils.stage_timing.drain_timings`), attributed to the
+    session the previews belong to, and the worker's peak memory use in bytes.
+    """
+    extraction_session = ExtractionSession(jobs[0].fname)
+    with session_timing(session_identifier):
+        for job in jobs:
+            generate_deferred_preview(job, force=force, session=extraction_session)
+    return drain_timings(), worker_peak_rss()
+
+
+_BuildOutcome = tuple[Session, dict | None, RecordBuildResult | None, Exception | None]
+"""A ``(session, record generation row, build result, exception)`` tuple"""
+
+
+def _build_sessions_serially(
+    schedule: BuildSchedule,
+    generate_previews: bool,  # noqa: FBT001
+    session_files: Dict[str, List[FileEntry]],
+    force_previews: bool = False,  # noqa: FBT001, FBT002
+    defer_previews: bool = False,  # noqa: FBT001, FBT002
+) -> Iterator[_BuildOutcome]:
+    """
+    Build the records for the sessions of a schedule one after another.
+
+    Parameters
+    ----------
+    schedule
+        The sessions to build, which stops handing out sessions when the build's
+        deadline is near
+    generate_previews
+        Whether or not to create the preview thumbnail images
+    session_files
+        Files already found for some of the sessions, keyed by session identifier
+    force_previews
+        Whether to regenerate preview thumbnails even if they are up to date
+    defer_previews
+        Whether to leave the preview thumbnails to be generated later
+
+    Yields
+    ------
+    outcome : _BuildOutcome
+        The session, its ``RECORD_GENERATION`` row, and either the build result
+        or the exception raised while building it
+    """
+    while (s := schedule.next_session()) is not None:
+        db_row = None
+        start_timer = default_timer()
+        try:
+            db_row = s.insert_record_generation_event()
+            with session_timing(s.session_identifier):
+                result = build_record(
+                    session=s,
+                    generate_previews=generate_previews,
+                    force_previews=force_previews,
+                    defer_previews=defer_previews,
+                    files=session_files.get(s.session_identifier),
+                    output_path=_partial_record_filename(s),
+                )
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            schedule.record(0, default_timer() - start_timer)
+            yield s, db_row, None, exception
+        else:
+            schedule.record(_record_file_count(result), default_timer() - start_timer)
+            yield s, db_row, result, None
+
+
+def _build_sessions_in_pool(  # noqa: PLR0913
+    schedule: BuildSchedule,
+    generate_previews: bool,  # noqa: FBT001
+    workers: int,
+    session_files: Dict[str, List[FileEntry]],
+    force_previews: bool = False,  # noqa: FBT001, FBT002
+    defer_previews: bool = False,  # noqa: FBT001, FBT002
+    *,
+    budget_shares: int = 1,
+) -> Iterator[_BuildOutcome]:
+    """
+    Build the records for the sessions of a schedule using a pool of worker processes.
+
+    The ``RECORD_GENERATION`` rows are inserted from the current process as each
+    session is submitted, and only the record building itself
+    (:py:func:`build_record`) runs in the workers. Sessions are only submitted
+    when a worker is free, so that the schedule can stop handing them out when
+    the build's deadline is near. Outcomes are yielded in the order the sessions
+    were submitted, so downstream handling is identical to
+    :py:func:`_build_sessions_serially`.
+
+    Parameters
+    ----------
+    schedule
+        The sessions to build, which stops handing out sessions when the build's
+        deadline is near
+    generate_previews
+        Whether or not to create the preview thumbnail images
+    workers
+        The maximum number of worker processes to use
+    session_files
+        Files already found for some of the sessions, keyed by session identifier
+    force_previews
+        Whether to regenerate preview thumbnails even if they are up to date
+    defer_previews
+        Whether to leave the preview thumbnails to be generated later
+    budget_shares
+        The number of processes the ``NX_EXTRACTION_MEMORY_BUDGET`` setting is
+        split between, each worker being given one share
+
+    Yields
+    ------
+    outcome : _BuildOutcome
+        The session, its ``RECORD_GENERATION`` row, and either the build result
+        or the exception raised while building it
+    """
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_get_mp_context(),
+        initializer=_init_worker_process,
+        initargs=(budget_shares,),
+    ) as executor:
+        submitted: deque = deque()
+        in_flight: set[Future] = set()
+        while True:
+            while len(in_flight) < workers:
+                s = schedule.next_session()
+                if s is None:
+                    break
+                try:
+                    db_row = s.insert_record_generation_event()
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    submitted.append((s, None, None, exc))
+                    continue
+                future = executor.submit(
+                    _build_record_in_worker,
+                    s,
+                    generate_previews,
+                    session_files.get(s.session_identifier),
+                    force_previews,
+                    defer_previews,
+                )
+                in_flight.add(future)
+                future.add_done_callback(
+                    _record_build_time(schedule, in_flight, default_timer())
+                )
+                submitted.append((s, db_row, future, None))
+            if not submitted:
+                return
+
+            s, db_row, future, exception = submitted[0]
+            if future is not None and not future.done():
+                # wait for any build, so a freed worker can be given a new session
+                wait(set(in_flight), return_when=FIRST_COMPLETED)
+                continue
+            submitted.popleft()
+            if future is None:
+                yield s, db_row, None, exception
+                continue
+            try:
+                result = future.result()
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                yield s, db_row, None, exc
+            else:
+                add_timings(result.timings)
+                yield s, db_row, result, None
+
+
+def _record_build_time(
+    schedule: BuildSchedule, in_flight: set[Future], start_timer: float
+) -> Callable[[Future], None]:
+    """
+    Get a callback recording the build time of a session built in a worker.
+
+    Parameters
+    ----------
+    schedule
+        The schedule the session's build time is recorded in
+    in_flight
+        The futures of the builds that are running, from which the session's
+        future is removed
+    start_timer
+        The :py:func:`timeit.default_timer` time the session was submitted at
+
+    Returns
+    -------
+    callback : typing.Callable
+        A callback for :py:meth:`concurrent.futures.Future.add_done_callback`
+    """
+
+    def callback(future: Future) -> None:
+        n_files = 0
+        if not future.cancelled() and future.exception() is None:
+            n_files = _record_file_count(future.result())
+        schedule.record(n_files, default_timer() - start_timer)
+        in_flight.discard(future)
+
+    return callback
+
+
+def _record_file_count(result: RecordBuildResult) -> int:
+    """Get the number of files in a built record."""
+    return sum(len(a.files) for a in result.activities)
+
+
+def _build_record_in_worker(
+    session: Session,
+    generate_previews: bool,  # noqa: FBT001
+    files: List[FileEntry] | None,
+    force_previews: bool = False,  # noqa: FBT001, FBT002
+    defer_previews: bool = False,  # noqa: FBT001, FBT002
+) -> RecordBuildResult:
+    """Build a record in a worker process (see :py:func:`_build_sessions_in_pool`)."""
+    with session_timing(session.session_identifier):
+        result = build_record(
+            session=session,
+            generate_previews=generate_previews,
+            force_previews=force_previews,
+            defer_previews=defer_previews,
+            files=files,
+            output_path=_partial_record_filename(session),
+        )
+    # the stage timings of the build are stored by the parent process
+    result.timings = drain_timings()
+    return result
+
+
+def _get_mp_context() -> multiprocessing.context.BaseContext:
+    """
+    Get the multiprocessing context used for builder worker pools.
+
+    On Linux, worker processes are forked so they inherit the already-loaded
+    configuration, extractor registry, and instrument profiles of the parent
+    process rather than re-importing them. Other platforms use their default
+    (``spawn``) start method, since forking is not safe there.
+
+    Returns
+    -------
+    multiprocessing.context.BaseContext
+        The context to pass as ``mp_context`` to a process pool
+    """
+    if sys.platform.startswith("linux"):
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()  # pragma: no cover
+
+
+_PREVIEW_WORKER_PRELOAD = ["nexusLIMS.builder.record_builder", "hyperspy.api"]
+
+
+def _get_preview_mp_context() -> multiprocessing.context.BaseContext:
+    """
+    Get the multiprocessing context used for the preview worker pool.
+
+    Preview workers are started while sessions are still being built, when the
+    session pool (or a session's extraction pool) and its management thread may
+    be running. Forking a process with other threads running can deadlock the
+    child on a lock one of those threads held at the time (e.g. a logging or
+    SQLite lock), so preview workers are started from a ``forkserver`` process
+    where available (or else with the platform's default start method), which
+    has the preview generators already imported. The workers do not inherit the
+    parent's state, so :py:func:`_init_preview_worker` gives
+    them the parent's settings.
+
+    Returns
+    -------
+    multiprocessing.context.BaseContext
+        The context to pass as ``mp_context`` to the preview pool
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # import the preview generators once in the fork server, rather than
+        # once in every worker (only takes effect before the server starts)
+        context.set_forkserver_preload(_PREVIEW_WORKER_PRELOAD)
+        return context
+    return multiprocessing.get_context()  # pragma: no cover
+
+
+def _settings_values() -> Dict[str, Any]:
+    """Get the current value of each setting, to pass on to a worker process."""
+    return {name: getattr(settings, name) for name in Settings.model_fields}
+
+
+def _init_preview_worker(settings_values: Dict[str, Any]):
+    """
+    Prepare a freshly started preview worker process.
+
+    The worker uses the settings of the process that started it (as returned by
+    :py:func:`_settings_values`), rather than reading them from the environment
+    again, so it matches the parent even after a configuration reload.
+    """
+    load_settings(settings_values)
+    _init_worker_process()
+
+
+def _init_worker_process(budget_shares: int = 1):
+    """
+    Prepare a freshly started builder worker process.
+
+    Forked workers inherit the parent's dask thread pool object, but not its
+    threads, so any dask computation (e.g. HyperSpy lazy signals used while
+    generating previews) would wait forever on the dead pool. Each worker is
+    already one unit of parallelism, so dask is switched to its synchronous
+    scheduler instead. The stage timings inherited from the parent are also
+    discarded, so that only the worker's own are sent back, as is the parent's
+    memory budget, so that a build worker's extraction pool starts with all of
+    its share of the budget free (``budget_shares`` being the number of
+    processes the budget is split between, see
+    :py:func:`~nexusLIMS.builder.memory_budget.reset_memory_budget`), and any
+    .emi file signals cached by the parent.
+    """
+    import dask  # noqa: PLC0415
+
+    dask.config.set(scheduler="synchronous")
+    reset_timings()
+    reset_memory_budget(budget_shares)
+    clear_emi_cache()
+
+
+def _handle_build_exception(
+    s: Session,
+    db_row: dict | None,
+    exception: Exception,
+) -> None:
+    """
+    Update the database to reflect an exception raised while building a session.
+
+    Parameters
+    ----------
+    s
+        The session whose record could not be built
+    db_row
+        The ``RECORD_GENERATION`` row inserted for this session (if any)
+    exception
+        The exception that was raised while building the record
+    """
+    if isinstance(exception, FileNotFoundError):
+        # if no files were found for this session log, mark it as so in
+        # the database
+        path = join_instrument_filestore_path(s.instrument.filestore_path)
+        _logger.warning(
+            "No files found in %s between %s and %s",
+            path,
+            s.dt_from.isoformat(),
+            s.dt_to.isoformat(),
+        )
+
+        if has_delay_passed(s.dt_to):
+            _logger.warning(
+                'Marking %s as "NO_FILES_FOUND"',
+                s.session_identifier,
+            )
+            s.update_session_status(RecordStatus.NO_FILES_FOUND)
+        elif db_row is None:
+            # the session failed before its RECORD_GENERATION row was
+            # inserted, so there is nothing to remove
+            _logger.warning(
+                "Configured record building delay has not passed for %s",
+                s.session_identifier,
+            )
+        else:
+            # if the delay hasn't passed, log and delete the record
+            # generation event we inserted previously
+            _logger.warning(
+                "Configured record building delay has not passed; "
+                "Removing previously inserted RECORD_GENERATION row for %s",
+                s.session_identifier,
+            )
+            # Delete the RECORD_GENERATION log using SQLModel
+            with DBSession(get_engine()) as db_session:
+                statement = select(SessionLog).where(
+                    SessionLog.id_session_log == db_row["id_session_log"]
+                )
+                log = db_session.exec(statement).first()
+                if log:
+                    db_session.delete(log)
+                    db_session.commit()
+    elif isinstance(exception, nemo.exceptions.NoDataConsentError):
+        _logger.warning(
+            "User requested this session not be harvested, so no record was built. %s",
+            exception,
+        )
+        _logger.info('Marking %s as "NO_CONSENT"', s.session_identifier)
+        s.update_session_status(RecordStatus.NO_CONSENT)
+    elif isinstance(exception, nemo.exceptions.NoMatchingReservationError):
+        _logger.warning(
+            "No matching reservation found for this session, "
+            "so assuming no consent was given. %s",
+            exception,
+        )
+        _logger.info('Marking %s as "NO_RESERVATION"', s.session_identifier)
+        s.update_session_status(RecordStatus.NO_RESERVATION)
+    else:
+        _logger.error("Could not generate record text", exc_info=exception)
+        _logger.error('Marking %s as "ERROR"', s.session_identifier, exc_info=exception)
+        s.update_session_status(RecordStatus.ERROR)
+
+
+def _record_filename(s: Session) -> Path:
+    """Get the path a session's record is saved to in ``records_dir_path``."""
+    if s.instrument.harvester == "nemo":
+        # for NEMO session_identifier is a URL of usage_event
+        unique_suffix = f"{nemo_utils.id_from_url(s.session_identifier)}"
+    else:  # pragma: no cover
+        # assume session_identifier is a UUID
+        unique_suffix = f"{s.session_identifier.split('-')[0]}"
+    basename = (
+        f"{s.dt_from.strftime('%Y-%m-%d')}_{s.instrument.name}_{unique_suffix}.xml"
+    )
+    return settings.records_dir_path / basename
+
+
+def _partial_record_filename(s: Session) -> Path:
+    """
+    Get the path a session's record is streamed to while it is being built.
+
+    The record is moved to :py:func:`_record_filename` once it has been
+    validated. The records directory is created if it does not exist yet.
+    """
+    filename = _record_filename(s)
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    return filename.with_name(f"{filename.name}.partial")
+
+
 def _record_validation_flow(  # noqa: PLR0913
-    record_text,
+    result,
     s,
     xml_files,
     sessions_built,
-    result_activities,
-    result_res_event,
     activities_built,
     res_events_built,
 ) -> tuple[
@@ -594,28 +1609,38 @@ def _record_validation_flow(  # noqa: PLR0913
     List[List[AcquisitionActivity]],
     List[ReservationEvent | None],
 ]:
-    if validate_record(BytesIO(bytes(record_text, "UTF-8"))):
+    # records built by build_new_session_records are streamed to a partial
+    # file and validated from disk; others are only held in memory
+    partial_filename = result.xml_path
+    with timed_stage("validation", s.session_identifier, items=1):
+        if partial_filename is None:
+            validation = validate_record(BytesIO(bytes(result.xml_text, "UTF-8")))
+        else:
+            validation = validate_record(partial_filename)
+
+    # the session's record has been built, so an interrupted build no longer
+    # needs to be resumed (whether or not the record is valid)
+    checkpoint = get_session_checkpoint(s.instrument, s.dt_from, s.dt_to)
+    if checkpoint is not None:
+        checkpoint.clear()
+        checkpoint.close()
+
+    if validation:
         _logger.info("Validated newly generated record")
         # generate filename for saved record and make sure path exists
-        if s.instrument.harvester == "nemo":
-            # for NEMO session_identifier is a URL of usage_event
-            unique_suffix = f"{nemo_utils.id_from_url(s.session_identifier)}"
-        else:  # pragma: no cover
-            # assume session_identifier is a UUID
-            unique_suffix = f"{s.session_identifier.split('-')[0]}"
-        basename = (
-            f"{s.dt_from.strftime('%Y-%m-%d')}_{s.instrument.name}_{unique_suffix}.xml"
-        )
-        filename = settings.records_dir_path / basename
+        filename = _record_filename(s)
         filename.parent.mkdir(parents=True, exist_ok=True)
         # write the record to disk and append to list of files generated
-        with filename.open(mode="w", encoding="utf-8") as f:
-            f.write(record_text)
+        if partial_filename is None:
+            with filename.open(mode="w", encoding="utf-8") as f:
+                f.write(result.xml_text)
+        else:
+            partial_filename.replace(filename)
         _logger.info("Wrote record to %s", filename)
         xml_files.append(Path(filename))
         sessions_built.append(s)
-        activities_built.append(result_activities)
-        res_events_built.append(result_res_event)
+        activities_built.append(result.activities)
+        res_events_built.append(result.reservation_event)
         # Note: Session status will be updated after export attempt
         _logger.info(
             "Built record for %s, will export to destinations", s.session_identifier
@@ -623,16 +1648,23 @@ def _record_validation_flow(  # noqa: PLR0913
     else:
         _logger.error('Marking %s as "ERROR"', s.session_identifier)
         _logger.error("Could not validate record, did not write to disk")
+        for error in validation.errors:
+            _logger.error("Schema validation error at %s", error)
+        if partial_filename is not None:
+            partial_filename.unlink(missing_ok=True)
         s.update_session_status(RecordStatus.ERROR)
 
     return xml_files, sessions_built, activities_built, res_events_built
 
 
-def process_new_records(  # noqa: PLR0912, PLR0915
+def process_new_records(  # noqa: PLR0913
     *,
     dry_run: bool = False,
     dt_from: dt | None = None,
     dt_to: dt | None = None,
+    workers: int | None = None,
+    force_previews: bool = False,
+    time_budget: float | None = None,
 ):
     """
     Process new records (this is the main entrypoint to the record builder).
@@ -655,8 +1687,31 @@ def process_new_records(  # noqa: PLR0912, PLR0915
         The point in time before which sessions will be fetched. If ``None``,
         no date filtering will be performed. This parameter currently only
         has an effect for the NEMO harvester.
+    workers
+        The number of worker processes to use when building records (see
+        :py:func:`build_new_session_records`). If ``None``, the
+        ``NX_BUILD_WORKERS`` setting is used. Has no effect for dry runs.
+    force_previews
+        Whether to regenerate preview thumbnails even if they are up to date
+        (by default, only previews whose source file or preview generator
+        changed are regenerated)
+    time_budget
+        The number of seconds the run should take at most. Sessions that are not
+        expected to be built in time are left ``TO_BE_BUILT`` for the next run
+        (see :py:func:`build_new_session_records`). The budget starts when this
+        function is called, so it includes harvesting and exporting, but a run
+        can still go over it if a session takes longer than expected. If
+        ``None``, every session is built. Has no effect for dry runs.
     """
-    results = run_preflight_checks(dry_run=dry_run)
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    # measurements left over from an earlier call in this process (e.g. a dry
+    # run, whose timings are not stored) are discarded
+    reset_timings()
+    reset_build_metrics()
+    reset_memory_budget()
+    run_id = str(uuid4())
+    with timed_stage("preflight"):
+        results = run_preflight_checks(dry_run=dry_run)
     for r in results:
         if r.passed:
             level = logging.DEBUG
@@ -704,54 +1759,124 @@ def process_new_records(  # noqa: PLR0912, PLR0915
                 continue
             dry_run_file_find(s)
     else:
-        nemo_utils.add_all_usage_events_to_db(dt_from=dt_from, dt_to=dt_to)
-        xml_files, sessions_built, activities_built, res_events_built = (
-            build_new_session_records()
-        )
-        if len(xml_files) == 0:
-            _logger.warning("No XML files built, so no files exported")
-        else:
-            # Export records to all configured destinations
-            export_results = export_records(
-                xml_files, sessions_built, activities_built, res_events_built
+        start_timer = default_timer()
+        activities_built, export_results = [], {}
+        try:
+            with timed_stage("nemo_harvest"):
+                nemo_utils.add_all_usage_events_to_db(dt_from=dt_from, dt_to=dt_to)
+            activities_built, export_results = _build_and_export_new_records(
+                workers=workers, force_previews=force_previews, deadline=deadline
             )
+        finally:
+            _store_run_measurements(
+                run_id, activities_built, export_results, default_timer() - start_timer
+            )
+    return
 
-            # Update session status based on export results
-            sessions_by_file = dict(zip(xml_files, sessions_built, strict=True))
-            for xml_file, session in sessions_by_file.items():
-                if was_successfully_exported(xml_file, export_results):
-                    session.update_session_status(RecordStatus.COMPLETED)
-                    _logger.info(
-                        'Marking %s as "COMPLETED"', session.session_identifier
-                    )
-                else:
-                    session.update_session_status(RecordStatus.BUILT_NOT_EXPORTED)
-                    _logger.error(
-                        'All exports failed for %s, marking as "BUILT_NOT_EXPORTED"',
-                        session.session_identifier,
-                    )
 
-            # Move successfully exported files to uploaded directory
-            files_exported = [
-                f for f in xml_files if was_successfully_exported(f, export_results)
-            ]
-            for f in files_exported:
-                uploaded_dir = settings.records_dir_path / "uploaded"
-                Path(uploaded_dir).mkdir(parents=True, exist_ok=True)
+def _build_and_export_new_records(
+    *,
+    workers: int | None,
+    force_previews: bool,
+    deadline: float | None = None,
+) -> tuple[List[List[AcquisitionActivity]], Dict[Path, List[ExportResult]]]:
+    """
+    Build and export the records of new sessions (see :py:func:`process_new_records`).
 
-                shutil.copy2(f, uploaded_dir)
-                Path(f).unlink()
+    Returns
+    -------
+    tuple
+        The activities of each record built, and the export results of each record
+    """
+    xml_files, sessions_built, activities_built, res_events_built = (
+        build_new_session_records(
+            workers=workers, force_previews=force_previews, deadline=deadline
+        )
+    )
+    export_results = {}
+    if len(xml_files) == 0:
+        _logger.warning("No XML files built, so no files exported")
+    else:
+        # Export records to all configured destinations
+        export_results = export_records(
+            xml_files, sessions_built, activities_built, res_events_built
+        )
 
-            files_not_exported = [f for f in xml_files if f not in files_exported]
-            if len(files_not_exported) > 0:
+        # Update session status based on export results
+        sessions_by_file = dict(zip(xml_files, sessions_built, strict=True))
+        for xml_file, session in sessions_by_file.items():
+            if was_successfully_exported(xml_file, export_results):
+                session.update_session_status(RecordStatus.COMPLETED)
+                _logger.info('Marking %s as "COMPLETED"', session.session_identifier)
+            else:
+                session.update_session_status(RecordStatus.BUILT_NOT_EXPORTED)
                 _logger.error(
-                    "Some record files were not exported: %s",
-                    files_not_exported,
+                    'All exports failed for %s, marking as "BUILT_NOT_EXPORTED"',
+                    session.session_identifier,
                 )
-    return
+
+        # Move successfully exported files to uploaded directory
+        files_exported = [
+            f for f in xml_files if was_successfully_exported(f, export_results)
+        ]
+        for f in files_exported:
+            uploaded_dir = settings.records_dir_path / "uploaded"
+            Path(uploaded_dir).mkdir(parents=True, exist_ok=True)
+
+            shutil.copy2(f, uploaded_dir)
+            Path(f).unlink()
+
+        files_not_exported = [f for f in xml_files if f not in files_exported]
+        if len(files_not_exported) > 0:
+            _logger.error(
+                "Some record files were not exported: %s",
+                files_not_exported,
+            )
+    return activities_built, export_results
+
+
+def _store_run_measurements(
+    run_id: str,
+    activities_built: List[List[AcquisitionActivity]],
+    export_results: Dict[Path, List[ExportResult]],
+    duration: float,
+) -> None:
+    """
+    Store the stage timings of a build, and write its metrics if configured.
+
+    Parameters
+    ----------
+    run_id
+        The identifier of the build
+    activities_built
+        The activities of each record built
+    export_results
+        The export results of each record
+    duration
+        The wall time of the build, in seconds
+    """
+    timings = drain_timings()
+    n_rows = save_stage_timings(run_id, timings)
+    _logger.debug("Stored %i build stage timings for run %s", n_rows, run_id)
+    if settings.NX_METRICS_FILE is None:
+        return
+    # the sizes of the files were found along with them, so are not read again
+    file_sizes = {
+        f: size
+        for activities in activities_built
+        for a in activities
+        for f, size in a.file_sizes.items()
+    }
+    bytes_read = sum(file_sizes.values())
+    write_build_metrics(
+        settings.NX_METRICS_FILE,
+        format_build_metrics(
+            timings, export_results, bytes_read=bytes_read, duration=duration
+        ),
+    )
 
 
-def dry_run_file_find(s: Session) -> List[Path]:
+def dry_run_file_find(s: Session) -> List[FileEntry]:
     """
     Get the files that *would* be included for a record built for the supplied session.
 
@@ -762,8 +1887,8 @@ def dry_run_file_find(s: Session) -> List[Path]:
 
     Returns
     -------
-    files : typing.List[pathlib.Path]
-        A list of Paths containing the files that would be included for the
+    files : typing.List[~nexusLIMS.utils.files.FileEntry]
+        A list of entries for the files that would be included for the
         record of this session (if it were not a dry run)
     """
     path = join_instrument_filestore_path(s.instrument.filestore_path)
@@ -783,10 +1908,10 @@ def dry_run_file_find(s: Session) -> List[Path]:
         _logger.info("Found %i files for this session", len(files))
     for f in files:
         mtime = dt.fromtimestamp(
-            f.stat().st_mtime,
+            f.mtime,
             tz=s.instrument.timezone,
         ).isoformat()
-        _logger.info("*mtime* %s - %s", mtime, f)
+        _logger.info("*mtime* %s - %s", mtime, f.path)
     return files
 
 
@@ -0,0 +1,179 @@
+"""Ordering and time budgets for the sessions of a record build.
+
+:py:func:`~nexusLIMS.builder.record_builder.build_new_session_records` builds
+the ``TO_BE_BUILT`` sessions in the order chosen by
+:ref:`NX_BUILD_SCHEDULING_POLICY <config-build-scheduling-policy>`:
+
+* ``database`` (default): the order the sessions were returned from the database
+* ``oldest_first``: by session start time
+* ``smallest_first``: by the number of files found for each session, so one
+  huge session does not hold up many small ones
+* ``instrument_fair``: taking the oldest remaining session of each instrument in
+  turn, so a backlog on one instrument does not hold up the others
+
+A build can also be given a deadline (e.g. with ``nexuslims build-records
+--time-budget``), so that it finishes before the next scheduled run starts. A
+:py:class:`BuildSchedule` then only starts a session if it is expected to be
+built before the deadline, estimating its build time from the sessions already
+built in the same run (per file, if the session's files are known). Sessions
+that are not started are left ``TO_BE_BUILT``, so they are built by the next run.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import defaultdict, deque
+from itertools import chain, zip_longest
+from typing import TYPE_CHECKING, Dict, List, Literal
+
+if TYPE_CHECKING:
+    from nexusLIMS.db.session_handler import Session
+    from nexusLIMS.utils.files import FileEntry
+
+_logger = logging.getLogger(__name__)
+
+SchedulingPolicy = Literal[
+    "database", "oldest_first", "smallest_first", "instrument_fair"
+]
+"""The ways the sessions of a build can be ordered (see :py:func:`order_sessions`)"""
+
+
+def order_sessions(
+    sessions: List[Session],
+    policy: SchedulingPolicy,
+    session_files: Dict[str, List[FileEntry]] | None = None,
+) -> List[Session]:
+    """
+    Order the sessions of a build according to a scheduling policy.
+
+    Parameters
+    ----------
+    sessions
+        The sessions to build, in the order they were returned from the database
+    policy
+        The scheduling policy (see the module documentation)
+    session_files
+        The files already found for the sessions, keyed by session identifier.
+        Used by the ``smallest_first`` policy, which orders sessions whose files
+        are not known (because their filestore could not be searched) first,
+        since their builds fail straight away.
+
+    Returns
+    -------
+    sessions : typing.List[~nexusLIMS.db.session_handler.Session]
+        The sessions in the order they should be built
+    """
+    if policy == "oldest_first":
+        return sorted(sessions, key=lambda s: s.dt_from)
+    if policy == "smallest_first":
+        session_files = session_files or {}
+        return sorted(
+            sessions, key=lambda s: len(session_files.get(s.session_identifier, []))
+        )
+    if policy == "instrument_fair":
+        by_instrument: Dict[str, List[Session]] = defaultdict(list)
+        for s in sorted(sessions, key=lambda s: s.dt_from):
+            by_instrument[s.instrument.name].append(s)
+        rounds = zip_longest(*by_instrument.values())
+        return [s for s in chain.from_iterable(rounds) if s is not None]
+    return list(sessions)
+
+
+class BuildSchedule:
+    """
+    The sessions of a build that remain to be started, and the build's deadline.
+
+    Parameters
+    ----------
+    sessions
+        The sessions to build, in the order they should be started
+    deadline
+        The :py:func:`time.monotonic` time by which the build should be finished,
+        or ``None`` to build every session
+    session_files
+        The files already found for the sessions, keyed by session identifier,
+        used to estimate how long each session will take to build
+    """
+
+    def __init__(
+        self,
+        sessions: List[Session],
+        deadline: float | None = None,
+        session_files: Dict[str, List[FileEntry]] | None = None,
+    ):
+        self.deadline = deadline
+        self._pending = deque(sessions)
+        self._session_files = session_files or {}
+        self._seconds = 0.0
+        self._files = 0
+        self._builds = 0
+        self.deferred: List[Session] = []
+        """The sessions that were not started because of the deadline"""
+
+    def __len__(self):
+        """Get the number of sessions that remain to be started."""
+        return len(self._pending)
+
+    def estimate(self, session: Session) -> float:
+        """
+        Estimate how long a session will take to build, in seconds.
+
+        The estimate is based on the sessions built so far (see :py:meth:`record`):
+        the average build time per file if the session's files are known, or else
+        the average build time per session. It is 0 until a session has been built.
+        """
+        if self._builds == 0:
+            return 0.0
+        files = self._session_files.get(session.session_identifier)
+        if files is not None and self._files > 0:
+            return len(files) * self._seconds / self._files
+        return self._seconds / self._builds
+
+    def next_session(self) -> Session | None:
+        """
+        Get the next session to build.
+
+        Returns
+        -------
+        session : ~nexusLIMS.db.session_handler.Session or None
+            The next session, or ``None`` if every session has been started, or
+            the next one is not expected to be built before the deadline (in
+            which case it and every session after it are moved to
+            :py:attr:`deferred`)
+        """
+        if not self._pending:
+            return None
+        if self.deadline is not None:
+            session = self._pending[0]
+            remaining = self.deadline - time.monotonic()
+            estimate = self.estimate(session)
+            if remaining <= estimate:
+                self.deferred.extend(self._pending)
+                self._pending.clear()
+                _logger.warning(
+                    "%.0f seconds of the time budget remain, but the next session "
+                    "(%s) is expected to take %.0f seconds; leaving %i sessions "
+                    "'TO_BE_BUILT' for the next run",
+                    max(remaining, 0),
+                    session.session_identifier,
+                    estimate,
+                    len(self.deferred),
+                )
+                return None
+        return self._pending.popleft()
+
+    def record(self, n_files: int, seconds: float) -> None:
+        """
+        Record how long a session took to build, to estimate the next sessions.
+
+        Parameters
+        ----------
+        n_files
+            The number of files in the session's record
+        seconds
+            The time it took to build the session's record
+        """
+        self._files += n_files
+        self._seconds += seconds
+        self._builds += 1
@@ -0,0 +1,195 @@
+"""Validate XML records against the Nexus Experiment schema.
+
+The schema is compiled once per process by :py:func:`get_record_validator`, and
+the resulting :py:class:`RecordValidator` can validate records either as
+in-memory ``lxml`` elements or incrementally from files. Rather than a bare
+boolean, validation returns a :py:class:`ValidationResult` listing each
+problem found along with its location in the record.
+
+Attributes
+----------
+XSD_PATH
+    The path to the Nexus Experiment schema file
+NX_NAMESPACE
+    The XML namespace of the Nexus Experiment schema
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from functools import cache
+from io import BytesIO, StringIO
+from pathlib import Path
+from typing import IO, List
+
+from lxml import etree
+
+_logger = logging.getLogger(__name__)
+
+XSD_PATH: Path = Path(__file__).parents[1] / "schemas" / "nexus-experiment.xsd"
+NX_NAMESPACE = "https://data.nist.gov/od/dm/nexus/experiment/v1.0"
+
+__all__ = [
+    "NX_NAMESPACE",
+    "XSD_PATH",
+    "RecordValidator",
+    "SchemaError",
+    "ValidationResult",
+    "get_record_validator",
+]
+
+
+@dataclass(frozen=True)
+class SchemaError:
+    """A problem found while validating a record.
+
+    Parameters
+    ----------
+    line
+        The line of the record the problem was found on (0 if unknown, e.g.
+        for elements that were never serialized)
+    path
+        The XPath of the offending element within the record, if known
+    message
+        The description of the problem reported by libxml2
+    """
+
+    line: int
+    path: str | None
+    message: str
+
+    def __str__(self) -> str:
+        """Format the error as ``line <n> (<path>): <message>``."""
+        location = f"line {self.line}"
+        if self.path:
+            location += f" ({self.path})"
+        return f"{location}: {self.message}"
+
+
+@dataclass
+class ValidationResult:
+    """The outcome of validating a record.
+
+    Instances are truthy if the record is valid, so they can be used wherever
+    the boolean returned by
+    :py:func:`~nexusLIMS.builder.record_builder.validate_record` was.
+
+    Parameters
+    ----------
+    errors
+        The problems found in the record (empty if it is valid)
+    """
+
+    errors: List[SchemaError] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        """Whether the record validates against the schema."""
+        return not self.errors
+
+    def __bool__(self) -> bool:
+        """Return whether the record validates against the schema."""
+        return self.valid
+
+
+class RecordValidator:
+    """
+    Validates records against a compiled copy of the Nexus Experiment schema.
+
+    Compiling the schema takes far longer than validating a typical record, so
+    a single instance (see :py:func:`get_record_validator`) should be reused
+    for every record a process validates.
+
+    Parameters
+    ----------
+    xsd_path
+        The schema to validate against
+    """
+
+    def __init__(self, xsd_path: Path = XSD_PATH):
+        self.xsd_path = xsd_path
+        self.schema = etree.XMLSchema(etree.parse(str(xsd_path)))
+
+    def validate(self, record: etree._Element | etree._ElementTree) -> ValidationResult:
+        """
+        Validate an in-memory record.
+
+        Parameters
+        ----------
+        record
+            The record's ``Experiment`` element (or its element tree)
+
+        Returns
+        -------
+        ValidationResult
+            Every problem found in the record
+        """
+        if self.schema.validate(record):
+            return ValidationResult()
+        return ValidationResult(
+            [SchemaError(e.line, e.path, e.message) for e in self.schema.error_log]
+        )
+
+    def validate_file(self, source: str | Path | IO) -> ValidationResult:
+        """
+        Validate a serialized record, parsing it incrementally.
+
+        Each acquisition activity is discarded as soon as it has been parsed, so
+        a valid record is never held in memory in full. libxml2 stops at the
+        first problem when validating while parsing, so an invalid record is
+        then parsed in full to report all of its problems and their locations.
+
+        Parameters
+        ----------
+        source
+            The path of the record, or a file-like object (e.g.
+            :py:class:`io.BytesIO` or :py:class:`io.StringIO`) containing it
+
+        Returns
+        -------
+        ValidationResult
+            Every problem found in the record
+        """
+        if isinstance(source, StringIO):
+            source = BytesIO(source.getvalue().encode())
+        elif isinstance(source, Path):
+            source = str(source)
+
+        try:
+            for _, element in etree.iterparse(
+                source,
+                tag=f"{{{NX_NAMESPACE}}}acquisitionActivity",
+                schema=self.schema,
+            ):
+                element.clear(keep_tail=True)
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+        except etree.XMLSyntaxError:
+            pass
+        else:
+            return ValidationResult()
+
+        if hasattr(source, "seek"):
+            source.seek(0)
+        try:
+            record = etree.parse(source)
+        except etree.XMLSyntaxError as e:
+            return ValidationResult([SchemaError(e.lineno, None, e.msg)])
+        return self.validate(record)
+
+
+@cache
+def get_record_validator() -> RecordValidator:
+    """
+    Get this process's validator for the Nexus Experiment schema.
+
+    The schema is compiled on the first call only.
+
+    Returns
+    -------
+    RecordValidator
+        The shared validator
+    """
+    _logger.debug("Compiling record schema %s", XSD_PATH)
+    return RecordValidator()
@@ -0,0 +1,39 @@
+"""
+CLI commands for managing the caches NexusLIMS keeps in ``NX_DATA_PATH``.
+
+Usage
+-----
+
+.. code-block:: bash
+
+    # Remove all cached extracted metadata
+    nexuslims cache purge
+"""
+
+from __future__ import annotations
+
+import click
+
+from nexusLIMS.cli import _format_version
+
+
+@click.group()
+@click.version_option(version=None, message=_format_version("nexuslims cache"))
+def main() -> None:
+    """Manage NexusLIMS caches."""
+
+
+@main.command()
+def purge() -> None:
+    """Remove all entries from the extracted metadata cache.
+
+    Files are extracted again the next time they are included in a record.
+    """
+    from nexusLIMS.cli import handle_config_error  # noqa: PLC0415
+
+    with handle_config_error():
+        from nexusLIMS.config import settings  # noqa: PLC0415
+        from nexusLIMS.extractors.cache import ExtractionCache  # noqa: PLC0415
+
+        count = ExtractionCache(settings.extraction_cache_path).purge()
+    click.echo(f"Removed {count} cached metadata entries")
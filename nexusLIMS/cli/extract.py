@@ -21,6 +21,9 @@ Usage
     # Write metadata JSON alongside the file (or to NX_DATA_PATH if the file
     # is under NX_INSTRUMENT_DATA_PATH)
     nexuslims extract --write /path/to/file.dm4
+
+    # Regenerate the preview even if it is up to date
+    nexuslims extract --force-preview /path/to/file.dm4
 """
 
 from __future__ import annotations
@@ -76,7 +79,17 @@ _logger = logging.getLogger(__name__)
     "--overwrite",
     is_flag=True,
     default=False,
-    help="Overwrite existing metadata JSON and preview files.",
+    help=(
+        "Overwrite existing metadata JSON and preview files. Previews are only "
+        "regenerated if the file or its preview generator changed since they "
+        "were generated."
+    ),
+)
+@click.option(
+    "--force-preview",
+    is_flag=True,
+    default=False,
+    help="Regenerate the preview even if it exists and is up to date.",
 )
 @click.option(
     "--verbose",
@@ -92,6 +105,7 @@ def main(  # noqa: PLR0913
     preview_path: Path | None,
     write: bool,  # noqa: FBT001
     overwrite: bool,  # noqa: FBT001
+    force_preview: bool,  # noqa: FBT001
     verbose: bool,  # noqa: FBT001
 ) -> None:
     """Extract metadata and/or generate a preview for a single FILE.
@@ -105,6 +119,7 @@ def main(  # noqa: PLR0913
         nexuslims extract --no-preview spectrum.msa
         nexuslims extract --no-metadata --preview-path /tmp/thumb.png image.tif
         nexuslims extract --write --overwrite image.dm4
+        nexuslims extract --force-preview image.dm4
     """  # noqa: D301
     logging.basicConfig(
         level=logging.DEBUG if verbose else logging.WARNING,
@@ -122,18 +137,25 @@ def main(  # noqa: PLR0913
             generate_preview=not no_preview,
             preview_path=preview_path,
             overwrite=overwrite,
+            force_preview=force_preview,
         )
     elif not no_preview:
-        _run_preview_only(file, preview_path=preview_path, overwrite=overwrite)
+        _run_preview_only(
+            file,
+            preview_path=preview_path,
+            overwrite=overwrite,
+            force_preview=force_preview,
+        )
 
 
-def _run_metadata(
+def _run_metadata(  # noqa: PLR0913
     file: Path,
     *,
     write: bool,
     generate_preview: bool,
     preview_path: Path | None,
     overwrite: bool,
+    force_preview: bool = False,
 ) -> None:
     """Extract metadata and optionally generate a preview."""
     from nexusLIMS.extractors import parse_metadata  # noqa: PLC0415
@@ -158,7 +180,12 @@ def _run_metadata(
     click.echo(json.dumps(_make_serializable(meta), indent=2))
 
     if generate_preview:
-        _generate_preview(file, preview_path=preview_path, overwrite=overwrite)
+        _generate_preview(
+            file,
+            preview_path=preview_path,
+            overwrite=overwrite,
+            force_preview=force_preview,
+        )
 
 
 def _generate_preview(
@@ -166,16 +193,22 @@ def _generate_preview(
     *,
     preview_path: Path | None,
     overwrite: bool,
+    force_preview: bool = False,
 ) -> None:
     """Generate a preview using the plugin registry directly (no config needed)."""
     from nexusLIMS.extractors.base import ExtractionContext  # noqa: PLC0415
+    from nexusLIMS.extractors.preview_stamps import (  # noqa: PLC0415
+        make_preview_stamp,
+        preview_is_current,
+        write_preview_stamp,
+    )
     from nexusLIMS.extractors.registry import get_registry  # noqa: PLC0415
     from nexusLIMS.instruments import get_instr_from_filepath  # noqa: PLC0415
 
     if preview_path is None:
         preview_path = Path(str(file) + ".json").with_suffix(".thumb.png")
 
-    if preview_path.exists() and not overwrite:
+    if preview_path.exists() and not (overwrite or force_preview):
         click.echo(str(preview_path), err=True)
         return
 
@@ -188,8 +221,14 @@ def _generate_preview(
         click.echo(f"No preview generator found for {file.name}.", err=True)
         return
 
+    stamp = make_preview_stamp(file, generator)
+    if not force_preview and preview_is_current(preview_path, stamp):
+        click.echo(f"Preview is up to date: {preview_path}", err=True)
+        return
+
     preview_path.parent.mkdir(parents=True, exist_ok=True)
     success = generator.generate(ctx, preview_path)
+    write_preview_stamp(preview_path, stamp if success else None)
     if success:
         click.echo(f"Preview: {preview_path}", err=True)
     else:
@@ -201,9 +240,15 @@ def _run_preview_only(
     *,
     preview_path: Path | None,
     overwrite: bool,
+    force_preview: bool = False,
 ) -> None:
     """Generate a preview without running metadata extraction."""
-    _generate_preview(file, preview_path=preview_path, overwrite=overwrite)
+    _generate_preview(
+        file,
+        preview_path=preview_path,
+        overwrite=overwrite,
+        force_preview=force_preview,
+    )
 
 
 def _make_serializable(obj: Any) -> Any:
@@ -12,6 +12,7 @@ Usage
     nexuslims --help
     nexuslims --version
     nexuslims build-records [OPTIONS]
+    nexuslims cache purge
     nexuslims config [dump|load|edit]
     nexuslims db [init|upgrade|view|...]
     nexuslims instruments manage
@@ -27,6 +28,7 @@ import click
 # Maps command name -> (module_path, attr_name)
 _LAZY_COMMANDS: dict[str, tuple[str, str]] = {
     "build-records": ("nexusLIMS.cli.process_records", "main"),
+    "cache": ("nexusLIMS.cli.cache", "main"),
     "config": ("nexusLIMS.cli.config", "main"),
     "extract": ("nexusLIMS.cli.extract", "main"),
 }
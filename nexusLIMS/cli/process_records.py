@@ -23,6 +23,11 @@ Options
     --from <date>   : Start date for filtering (ISO format). Defaults to 1 week ago.
                       Use "none" to disable lower bound.
     --to <date>     : End date for filtering (ISO format). Omit to disable upper bound.
+    --workers <N>   : Number of sessions to build in parallel (default: 1)
+    --daemon        : Keep running, building records every --interval
+    --interval <T>  : Time between daemon runs, e.g. "900", "15m", "1h" (default: 15m)
+    --time-budget <T> : Stop starting sessions that would not finish within T
+                        (e.g. "50m"); they are left for the next run
     --version       : Show version and exit
     --help          : Show help message and exit
 """
@@ -30,18 +35,20 @@ Options
 import json
 import logging
 import re
+import signal
 import smtplib
 import sys
+import threading
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from pathlib import Path
+from typing import Callable
 
 import click
 from filelock import FileLock, Timeout
 from rich.console import Console
 from rich.logging import RichHandler
 
-from nexusLIMS.builder.preflight import PreflightError
 from nexusLIMS.cli import _format_version
 
 # Heavy NexusLIMS imports are lazy-loaded inside functions to speed up --help/--version
@@ -58,6 +65,10 @@ ERROR_PATTERNS = [
     re.compile(r"\bfatal\b", re.IGNORECASE),
 ]
 
+# Units accepted by --interval and --time-budget, in seconds
+INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+DEFAULT_DAEMON_INTERVAL = "15m"
+
 # Patterns to exclude from error detection (known non-critical errors)
 EXCLUDE_PATTERNS = [
     "Temporary failure in name resolution",
@@ -333,8 +344,13 @@ def _setup_logging(log_level: int, dry_run: bool) -> tuple[Path, logging.FileHan
         sys.exit(1)
 
 
-def _run_with_lock(
-    dry_run: bool, dt_from: datetime | None, dt_to: datetime | None
+def _run_with_lock(  # noqa: PLR0913
+    dry_run: bool,
+    dt_from: datetime | None,
+    dt_to: datetime | None,
+    workers: int | None = None,
+    force_previews: bool = False,  # noqa: FBT002
+    time_budget: float | None = None,
 ) -> None:
     """
     Run the record builder with file locking.
@@ -347,6 +363,14 @@ def _run_with_lock(
         The point in time after which sessions will be fetched
     dt_to : datetime | None
         The point in time before which sessions will be fetched
+    workers : int | None
+        The number of sessions to build in parallel. If None, the
+        ``NX_BUILD_WORKERS`` setting is used
+    force_previews : bool
+        Whether to regenerate preview thumbnails even if they are up to date
+    time_budget : float | None
+        The number of seconds the run should take at most, or None for no limit
+        (see :py:func:`~nexusLIMS.builder.record_builder.process_new_records`)
 
     Returns
     -------
@@ -358,6 +382,7 @@ def _run_with_lock(
         If lock cannot be acquired (another instance is running)
     """
     from nexusLIMS.builder import record_builder  # noqa: PLC0415
+    from nexusLIMS.builder.preflight import PreflightError  # noqa: PLC0415
     from nexusLIMS.config import settings  # noqa: PLC0415
 
     lock_file = settings.lock_file_path
@@ -369,7 +394,12 @@ def _run_with_lock(
             logger.info("Lock acquired successfully")
             try:
                 record_builder.process_new_records(
-                    dry_run=dry_run, dt_from=dt_from, dt_to=dt_to
+                    dry_run=dry_run,
+                    dt_from=dt_from,
+                    dt_to=dt_to,
+                    workers=workers,
+                    force_previews=force_previews,
+                    time_budget=time_budget,
                 )
                 logger.info("Record processing completed")
             except PreflightError as e:
@@ -494,6 +524,147 @@ def _handle_error_notification(
         file_handler.close()
 
 
+def _parse_interval(interval: str, option: str = "--interval") -> float:
+    """
+    Parse a daemon interval (or time budget) argument into a number of seconds.
+
+    Parameters
+    ----------
+    interval : str
+        A positive number of seconds (e.g. ``"900"``), optionally followed
+        by a unit of ``s``, ``m``, ``h``, or ``d`` (e.g. ``"15m"``)
+    option : str
+        The option the argument was given for, to name in the error message
+
+    Returns
+    -------
+    float
+        The interval in seconds
+
+    Raises
+    ------
+    click.BadParameter
+        If the interval cannot be parsed or is not positive
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d*)?|\.\d+)\s*([smhd]?)\s*", interval.lower())
+    seconds = (
+        float(match.group(1)) * INTERVAL_UNITS[match.group(2) or "s"] if match else 0
+    )
+    if seconds <= 0:
+        msg = (
+            f"Invalid interval: {interval}. Use a positive number of seconds, "
+            'optionally followed by a unit of s, m, h, or d (e.g. "15m").'
+        )
+        raise click.BadParameter(msg, param_hint=f"'{option}'")
+    return seconds
+
+
+def _reload_configuration() -> None:
+    """
+    Reload the configuration of a running daemon.
+
+    Settings are re-read from the environment and ``.env`` file, and the
+    database engine and cached instruments are dropped, so the next run
+    uses the new configuration and picks up any instrument changes.
+    """
+    from nexusLIMS.config import refresh_settings  # noqa: PLC0415
+    from nexusLIMS.db.engine import dispose_engine  # noqa: PLC0415
+    from nexusLIMS.instruments import reload_instrument_db  # noqa: PLC0415
+
+    logger.info("Reloading configuration")
+    try:
+        refresh_settings()
+    except Exception:
+        logger.exception("Could not reload configuration; keeping the current one")
+        return
+    try:
+        dispose_engine()
+    except Exception:
+        logger.exception("Could not close the database connections")
+    reload_instrument_db()
+
+
+def _run_daemon(
+    run: Callable[[Path, logging.FileHandler], None],
+    interval: float,
+    *,
+    dry_run: bool,
+    log_file: Path | None,
+    file_handler: logging.FileHandler | None,
+) -> None:
+    """
+    Run the record builder repeatedly until the process is told to stop.
+
+    Each run takes the builder lock and writes its own log file, exactly like
+    a separate ``nexuslims build-records`` invocation would, but keeps the
+    process (and so its loaded extractor plugins, compiled schema, database
+    engine, and HTTP connections) alive between runs. A run skipped because
+    another instance holds the lock is retried after the next interval, and
+    a run that fails is logged without stopping the daemon.
+
+    ``SIGHUP`` makes the daemon reload its configuration before its next run
+    (see :py:func:`_reload_configuration`), and ``SIGTERM`` makes it exit once
+    the current run (if any) has finished.
+
+    Parameters
+    ----------
+    run : Callable[[Path, logging.FileHandler], None]
+        Runs the record builder once, logging to the given log file
+    interval : float
+        Seconds to wait between the end of one run and the start of the next
+    dry_run : bool
+        If True, append '_dryrun' to the log filenames
+    log_file : Path | None
+        The log file of the first run (if None, one is created)
+    file_handler : logging.FileHandler | None
+        The file handler writing to ``log_file``
+    """
+    stop = threading.Event()
+    reload_requested = threading.Event()
+
+    def _request_stop(signum, _frame):
+        logger.info("Received %s, stopping", signal.Signals(signum).name)
+        stop.set()
+
+    def _request_reload(_signum, _frame):
+        logger.info("Received SIGHUP, will reload configuration before next run")
+        reload_requested.set()
+
+    handlers = {signal.SIGTERM: _request_stop}
+    if hasattr(signal, "SIGHUP"):  # not available on Windows
+        handlers[signal.SIGHUP] = _request_reload
+    previous_handlers = {sig: signal.signal(sig, h) for sig, h in handlers.items()}
+
+    logger.info("Running as a daemon, building records every %ss", interval)
+    try:
+        while True:
+            try:
+                if reload_requested.is_set():
+                    reload_requested.clear()
+                    _reload_configuration()
+                if file_handler is None:
+                    log_file, file_handler = setup_file_logging(dry_run)
+                run(log_file, file_handler)
+            except SystemExit:
+                # another instance holds the lock, or there was nothing to
+                # build; try again after the interval
+                pass
+            except Exception:
+                # a failed run must not stop the daemon
+                logger.exception("Record builder daemon run failed")
+            finally:
+                if file_handler is not None:
+                    logging.root.removeHandler(file_handler)
+                    file_handler.close()
+                    file_handler = None
+            if stop.wait(interval):
+                break
+    finally:
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
+    logger.info("NexusLIMS record builder daemon stopped")
+
+
 @click.command(
     epilog="""
 Examples:
@@ -518,6 +689,22 @@ Examples:
   # Dry run (find files only)
   $ nexuslims build-records -n
 
+  \b
+  # Build up to four sessions in parallel
+  $ nexuslims build-records --workers 4
+
+  \b
+  # Regenerate all preview images
+  $ nexuslims build-records --force-previews
+
+  \b
+  # Keep running, building new records every 15 minutes
+  $ nexuslims build-records --daemon --interval 15m
+
+  \b
+  # Leave sessions that would not be built within 50 minutes for the next run
+  $ nexuslims build-records --time-budget 50m
+
   \b
   # Verbose output
   $ nexuslims build-records -vv
@@ -551,9 +738,54 @@ Examples:
     help="End date for session filtering (ISO format: YYYY-MM-DD). "
     "Omit to disable upper bound.",
 )
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of sessions to build in parallel worker processes. "
+    "Defaults to the NX_BUILD_WORKERS setting (1 unless configured).",
+)
+@click.option(
+    "--force-previews",
+    is_flag=True,
+    help="Regenerate all preview images, even those that are up to date "
+    "(by default, only previews whose file or preview generator changed "
+    "since they were generated are regenerated).",
+)
+@click.option(
+    "--daemon",
+    is_flag=True,
+    help="Keep running, building records every --interval until stopped with "
+    "SIGTERM. Send SIGHUP to reload the configuration.",
+)
+@click.option(
+    "--interval",
+    type=str,
+    default=None,
+    help="Time to wait between daemon runs, in seconds or with a unit of "
+    f's, m, h, or d (e.g. "15m"). Defaults to {DEFAULT_DAEMON_INTERVAL}.',
+)
+@click.option(
+    "--time-budget",
+    type=str,
+    default=None,
+    help="Maximum time a run should take, in seconds or with a unit of s, m, h, "
+    'or d (e.g. "50m"). Sessions that are not expected to be built in time are '
+    "left TO_BE_BUILT for the next run. The order sessions are built in is set "
+    "by NX_BUILD_SCHEDULING_POLICY.",
+)
 @click.version_option(version=None, message=_format_version("nexuslims build-records"))
-def main(
-    *, dry_run: bool, verbose: int, from_arg: str | None, to_arg: str | None
+def main(  # noqa: PLR0913
+    *,
+    dry_run: bool,
+    verbose: int,
+    from_arg: str | None,
+    to_arg: str | None,
+    workers: int | None,
+    force_previews: bool,
+    daemon: bool,
+    interval: str | None,
+    time_budget: str | None,
 ) -> None:
     """
     Process new NexusLIMS records with logging and email notifications.
@@ -564,15 +796,27 @@ def main(
 
     By default, only sessions from the last week are processed. Use --from=none
     to process all sessions, or specify custom date ranges with --from and --to.
+
+    With --daemon, the command keeps running and builds records every
+    --interval, reloading its configuration on SIGHUP and exiting on SIGTERM.
+
+    With --time-budget, each run stops starting new sessions when they are not
+    expected to be built within the budget (e.g. before the next run of a cron
+    job), leaving them to be built by the next run.
     """
     from nexusLIMS.cli import handle_config_error  # noqa: PLC0415
 
-    with handle_config_error():
-        # Setup logging (accesses settings for log directory path)
-        log_level = _get_log_level(verbose)
-        log_file, file_handler = _setup_logging(log_level, dry_run)
+    if interval is not None and not daemon:
+        msg = "--interval can only be used with --daemon"
+        raise click.UsageError(msg)
+    interval_seconds = _parse_interval(interval or DEFAULT_DAEMON_INTERVAL)
+    time_budget_seconds = (
+        None if time_budget is None else _parse_interval(time_budget, "--time-budget")
+    )
 
-        # Parse date arguments from raw string parameters
+    def _run(log_file: Path, file_handler: logging.FileHandler) -> None:
+        # Parse date arguments from raw string parameters (for each run, so
+        # the default lower bound moves along with a daemon's runs)
         dt_from = _parse_date_argument(from_arg)
         dt_to = _parse_date_argument(to_arg, inclusive_end=True)
 
@@ -613,11 +857,29 @@ def main(
             )
 
         # Run record builder with file locking
-        _run_with_lock(dry_run, dt_from, dt_to)
+        _run_with_lock(
+            dry_run, dt_from, dt_to, workers, force_previews, time_budget_seconds
+        )
 
         # Handle error notifications and cleanup
         _handle_error_notification(log_file, file_handler)
 
+    with handle_config_error():
+        # Setup logging (accesses settings for log directory path)
+        log_level = _get_log_level(verbose)
+        log_file, file_handler = _setup_logging(log_level, dry_run)
+
+        if daemon:
+            _run_daemon(
+                _run,
+                interval_seconds,
+                dry_run=dry_run,
+                log_file=log_file,
+                file_handler=file_handler,
+            )
+        else:
+            _run(log_file, file_handler)
+
 
 if __name__ == "__main__":  # pragma: no cover
     main()
@@ -14,13 +14,15 @@ environment variables.
 import logging
 import os
 import re
+from collections.abc import Mapping
 from pathlib import Path
-from typing import TYPE_CHECKING, Literal
+from typing import TYPE_CHECKING, Any, Literal
 
 from dotenv import dotenv_values
 from pydantic import (
     AnyHttpUrl,
     BaseModel,
+    ByteSize,
     DirectoryPath,
     EmailStr,
     Field,
@@ -330,6 +332,60 @@ class Settings(BaseSettings):
             )
         },
     )
+    NX_FILE_INDEX_ENABLED: bool = Field(
+        default=False,
+        description=(
+            "Whether to find session files using a persistent index of each "
+            "instrument's filestore (stored in NX_DATA_PATH) instead of walking "
+            "the whole filestore with GNU find for every session. Default is false."
+        ),
+        json_schema_extra={
+            "detail": (
+                "When enabled, the record builder keeps a SQLite index of the files "
+                "in each instrument's filestore (path, modification time, size, and "
+                "extension) at `NX_DATA_PATH/file_index.sqlite`, and answers each "
+                "session's file search with a query on that index rather than a "
+                "`find` over the entire filestore.\n\n"
+                "Before each search the index is refreshed incrementally: only "
+                "directories whose modification time has changed (or that "
+                "contained recently modified files) are listed again. This makes "
+                "file finding much faster for filestores with many historical "
+                "files, after a first search that indexes the whole filestore.\n\n"
+                "Since rewriting a file in place does not change its directory's "
+                "modification time, a directory listed before the end of a "
+                "session is also listed again when that session's files are "
+                "searched, and the files found are checked against the "
+                "filesystem before they are used, so files rewritten in place "
+                "are found with their current modification time and size. If "
+                "the index cannot be used, the builder falls back to GNU find. "
+                "The index file can be deleted at any time."
+            )
+        },
+    )
+    NX_BATCH_FILE_DISCOVERY: bool = Field(
+        default=False,
+        description=(
+            "Whether to find the files of all sessions being built on an "
+            "instrument with a single search of its filestore, rather than one "
+            "search per session. Default is false."
+        ),
+        json_schema_extra={
+            "detail": (
+                "When enabled, `nexuslims build-records` groups the sessions it is "
+                "about to build by instrument filestore and searches each filestore "
+                "once, over the span from the earliest session start to the latest "
+                "session end. Each session's files are then selected from those "
+                "results in memory.\n\n"
+                "The files found for each session are exactly those a separate "
+                "search would find (respecting `NX_FILE_STRATEGY` and "
+                "`NX_IGNORE_PATTERNS`), but each filestore is walked only once per "
+                "run instead of once per session. This helps most when many "
+                "sessions on the same instrument are built together, e.g. after a "
+                "backlog. Since all files modified between the sessions are found "
+                "as well, sessions that are far apart in time cost more memory."
+            )
+        },
+    )
     # Use TestAware types which are strict in production, lenient in test mode
     NX_INSTRUMENT_DATA_PATH: TestAwareDirectoryPath = Field(  # type: ignore[valid-type]
         Path("/tmp") / "test_instrument_data" if TEST_MODE else ...,  # noqa: S108
@@ -712,6 +768,237 @@ class Settings(BaseSettings):
             )
         },
     )
+    NX_CLUSTERING_METHOD: Literal["exact", "binned"] = Field(
+        "exact",
+        description=(
+            "KDE engine used to cluster files into Acquisition Activities: 'exact' "
+            "(scikit-learn grid search) or 'binned' (binned FFT KDE that scales to "
+            "very large sessions). Default is 'exact'."
+        ),
+        json_schema_extra={
+            "detail": (
+                "Selects how the kernel density estimate of file modification times "
+                "is computed when clustering files into Acquisition Activities.\n\n"
+                "`exact` (default): scikit-learn grid search with Leave One Out "
+                "cross-validation. The cost grows with the square of the number of "
+                "files, so sessions with many thousands of files can spend minutes "
+                "in this step while using every CPU core.\n\n"
+                "`binned`: the same Leave One Out bandwidth selection and KDE, "
+                "computed on a binned grid with FFT convolution (and directly in the "
+                "sparse gaps between files). It chooses the same bandwidth and "
+                "activity boundaries as `exact`, scales to hundreds of thousands of "
+                "files, and runs in a single process.\n\n"
+                "`NX_CLUSTERING_SENSITIVITY` applies to both methods in the same way."
+            )
+        },
+    )
+    NX_BUILD_WORKERS: int = Field(
+        1,
+        description=(
+            "Number of worker processes used to build session records in parallel. "
+            "The default of 1 builds sessions one at a time in the main process."
+        ),
+        ge=1,
+        json_schema_extra={
+            "detail": (
+                "The number of sessions the record builder will build at the same "
+                "time, each in its own worker process.\n\n"
+                "The default of `1` builds sessions serially in the main process. "
+                "Higher values help when many sessions are queued at once (for "
+                "example after a long weekend or an outage) and are spread across "
+                "several instruments.\n\n"
+                "Each worker extracts metadata and generates previews independently, "
+                "so memory use grows roughly linearly with this value. Session "
+                "status updates and exports are always performed by the main "
+                "process, in the same order as a serial build.\n\n"
+                "Can be overridden for a single run with "
+                "`nexuslims build-records --workers N`."
+            )
+        },
+    )
+    NX_BUILD_SCHEDULING_POLICY: Literal[
+        "database", "oldest_first", "smallest_first", "instrument_fair"
+    ] = Field(
+        "database",
+        description=(
+            "The order in which the record builder builds the 'TO_BE_BUILT' "
+            "sessions: 'database', 'oldest_first', 'smallest_first', or "
+            "'instrument_fair'. Default is 'database'."
+        ),
+        json_schema_extra={
+            "detail": (
+                "Controls which sessions are built first when several are waiting "
+                "to be built.\n\n"
+                "`database` (default): in the order they are returned from the "
+                "database.\n\n"
+                "`oldest_first`: by session start time.\n\n"
+                "`smallest_first`: by the number of files in each session, so "
+                "that one very large session does not hold up many small ones. The "
+                "files of every session are found before building starts (as with "
+                "`NX_BATCH_FILE_DISCOVERY`).\n\n"
+                "`instrument_fair`: the oldest remaining session of each "
+                "instrument in turn, so that a backlog on one instrument does not "
+                "hold up the others.\n\n"
+                "The order matters most for runs given a time budget with "
+                "`nexuslims build-records --time-budget`, which leave the sessions "
+                "they do not have time for `TO_BE_BUILT` for the next run."
+            )
+        },
+    )
+    NX_EXTRACTION_WORKERS: int = Field(
+        1,
+        description=(
+            "Number of worker processes used to extract metadata and generate "
+            "previews for the files of a single session. The default of 1 "
+            "processes files one at a time."
+        ),
+        ge=1,
+        json_schema_extra={
+            "detail": (
+                "The number of files within a session whose metadata extraction "
+                "and preview generation run at the same time, each in a worker "
+                "process.\n\n"
+                "Sessions with hundreds or thousands of files on a network share "
+                "spend most of their build time waiting on file reads; values "
+                "above `1` overlap those reads. Results are always added to "
+                "acquisition activities in file modification time order, so the "
+                "generated records are identical to a serial build.\n\n"
+                "This pool is created per session, so when combined with "
+                "`NX_BUILD_WORKERS` the total number of worker processes can be "
+                "up to the product of the two values."
+            )
+        },
+    )
+    NX_PREVIEW_WORKERS: int = Field(
+        0,
+        description=(
+            "Number of worker processes in a separate preview generation stage. "
+            "The default of 0 generates each file's previews while its record is "
+            "being built."
+        ),
+        ge=0,
+        json_schema_extra={
+            "detail": (
+                "When set above `0`, `nexuslims build-records` no longer waits for "
+                "a session's preview images before producing its record. Records "
+                "are built and validated with only the paths of their previews, "
+                "and the previews themselves are generated by a separate pool of "
+                "this many worker processes while later sessions are built.\n\n"
+                "Records are only exported once all of the previews of the run "
+                "have been generated, so exported records never link to missing "
+                "images. If a preview cannot be generated, a placeholder image is "
+                "written in its place.\n\n"
+                "Preview rendering is usually much slower than metadata "
+                "extraction, so this lets preview throughput be scaled "
+                "independently of `NX_BUILD_WORKERS` and `NX_EXTRACTION_WORKERS`."
+            )
+        },
+    )
+    NX_EXTRACTION_MEMORY_BUDGET: ByteSize | None = Field(
+        None,
+        description=(
+            "If set, the most memory (e.g. '8GiB') that the files being processed "
+            "at the same time by the extraction and preview worker processes are "
+            "estimated to need. Leave blank to not limit them."
+        ),
+        json_schema_extra={
+            "detail": (
+                "Extracting the metadata of a large file (a multi-GB spectrum "
+                "image, a long image stack, or a Tofwerk HDF5 event list) and "
+                "generating its preview loads the whole dataset into memory, so a "
+                "few such files processed at once by the `NX_EXTRACTION_WORKERS` "
+                "and `NX_PREVIEW_WORKERS` pools can run the host out of memory.\n\n"
+                "When set, the memory each file will need is estimated from its "
+                "size and type before it is handed to a worker, and the file is "
+                "held back until the files already being processed leave enough "
+                "of this budget free. A file estimated to need more than the whole "
+                "budget is processed on its own. Waiting files are logged, as is "
+                "the peak memory use of the worker processes once their files are "
+                "done (whether or not a budget is set), to help choose a budget."
+                "\n\n"
+                "Accepts a number of bytes or a size with a unit (e.g. `16GB` or "
+                "`8GiB`). The budget is for the whole build: with "
+                "`NX_BUILD_WORKERS` above `1`, it is split equally between the "
+                "processes building sessions (and the process running the "
+                "`NX_PREVIEW_WORKERS` pool). Leave blank to not limit the memory "
+                "use."
+            )
+        },
+    )
+    NX_EXTRACTION_CACHE_ENABLED: bool = Field(
+        default=False,
+        description=(
+            "Whether to cache the metadata extracted from each file (in "
+            "NX_DATA_PATH), so unchanged files are not parsed again when they are "
+            "included in a later record build. Default is false."
+        ),
+        json_schema_extra={
+            "detail": (
+                "When enabled, the metadata extracted from each file is stored in "
+                "a SQLite database at `NX_DATA_PATH/extraction_cache.sqlite`. When "
+                "the same file is processed again (e.g. a session rebuilt after an "
+                "error, a dry run followed by a real run, or overlapping sessions), "
+                "the stored metadata is used without opening the file.\n\n"
+                "A cached entry is used only if the file's size and modification "
+                "time, the extractors available for its type, the NexusLIMS "
+                "version, and the file's instrument and instrument profile are "
+                "all unchanged; otherwise the file is extracted again.\n\n"
+                "The cache can be emptied at any time with "
+                "`nexuslims cache purge`."
+            )
+        },
+    )
+    NX_BUILD_CHECKPOINTS_ENABLED: bool = Field(
+        default=False,
+        description=(
+            "Whether to checkpoint the progress of each session build (in "
+            "NX_DATA_PATH), so an interrupted build resumes from the last "
+            "completed file. Default is false."
+        ),
+        json_schema_extra={
+            "detail": (
+                "When enabled, the record builder stores the acquisition activity "
+                "boundaries of each session, and the extracted metadata of each "
+                "file as soon as it has been added to an activity, in a SQLite "
+                "database at `NX_DATA_PATH/build_checkpoints.sqlite`.\n\n"
+                "If a build is interrupted (e.g. the process runs out of memory, "
+                "crashes on a corrupt file, or is killed by a timeout), the next "
+                "build of the session skips clustering and the extraction and "
+                "preview generation of every completed file.\n\n"
+                "A checkpoint is only resumed if the session's files (paths, "
+                "sizes, and modification times), its instrument and instrument "
+                "profile, the NexusLIMS version, the preview options, and the "
+                "file clustering settings are all unchanged; otherwise the "
+                "session is built from scratch. A session's checkpoint is "
+                "removed once its record has been validated."
+            )
+        },
+    )
+    NX_METRICS_FILE: Path | None = Field(
+        None,
+        description=(
+            "If set, the path of a file to which each run of the record builder "
+            "writes its metrics (sessions processed, files extracted, stage and "
+            "export latencies, NEMO API calls, etc.) in the Prometheus text format."
+        ),
+        json_schema_extra={
+            "detail": (
+                "When set, `nexuslims build-records` replaces this file at the end "
+                "of every (non-dry) run with the metrics of that run, in the "
+                "Prometheus text exposition format: the number of sessions by their "
+                "final record status, files extracted, previews generated, bytes "
+                "of data included in records, latency histograms of each build "
+                "stage, export successes and latencies per destination, and the "
+                "number and latency of NEMO API requests.\n\n"
+                "Point it at a `.prom` file in the directory read by the node "
+                "exporter's textfile collector (e.g. "
+                "`/var/lib/node_exporter/textfile_collector/nexuslims.prom`) to "
+                "monitor record building in Prometheus. The file is written "
+                "atomically, so a partially written file is never collected. "
+                "Leave blank to not write metrics."
+            )
+        },
+    )
     NX_LOG_PATH: TestAwareDirectoryPath | None = Field(  # type: ignore[valid-type]
         None,
         description=(
@@ -858,6 +1145,21 @@ class Settings(BaseSettings):
         """Path to the record builder lock file."""
         return self.NX_DATA_PATH / ".builder.lock"
 
+    @property
+    def file_index_path(self) -> Path:
+        """Path to the filestore file index database."""
+        return self.NX_DATA_PATH / "file_index.sqlite"
+
+    @property
+    def extraction_cache_path(self) -> Path:
+        """Path to the extracted metadata cache database."""
+        return self.NX_DATA_PATH / "extraction_cache.sqlite"
+
+    @property
+    def build_checkpoint_path(self) -> Path:
+        """Path to the session build checkpoint database."""
+        return self.NX_DATA_PATH / "build_checkpoints.sqlite"
+
     @property
     def log_dir_path(self) -> Path:
         """Base directory for timestamped log files."""
@@ -1118,6 +1420,28 @@ class _SettingsManager:
         self._settings = self._create()
         return self._settings
 
+    def load(self, values: Mapping[str, Any]) -> Settings:
+        """
+        Validate the given setting values, and replace the cached singleton.
+
+        Parameters
+        ----------
+        values
+            The value of each setting, keyed by name
+
+        Returns
+        -------
+        Settings
+            The new settings instance
+
+        Raises
+        ------
+        pydantic.ValidationError
+            If any of the values is invalid (the current settings are kept)
+        """
+        self._settings = Settings.model_validate(dict(values))
+        return self._settings
+
     def clear(self) -> None:
         """
         Clear the settings cache.
@@ -1198,6 +1522,34 @@ def refresh_settings() -> Settings:
     return _manager.refresh()
 
 
+def load_settings(values: Mapping[str, Any]) -> Settings:
+    """
+    Replace the settings singleton with settings of the given values.
+
+    The values are validated like those read from the environment, but the
+    environment and ``.env`` file are not read. This gives a worker process
+    that is not forked the exact settings of the process that started it (even
+    after that process reloaded its configuration).
+
+    Parameters
+    ----------
+    values
+        The value of each setting, keyed by name (e.g. the current value of each
+        field of :py:class:`Settings`)
+
+    Returns
+    -------
+    Settings
+        The new settings instance
+
+    Raises
+    ------
+    pydantic.ValidationError
+        If any of the values is invalid (the current settings are kept)
+    """
+    return _manager.load(values)
+
+
 def clear_settings() -> None:
     """
     Clear the settings cache without immediately creating a new instance.
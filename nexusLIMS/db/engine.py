@@ -79,3 +79,16 @@ def get_engine() -> "Engine":
             echo=False,
         )
     return _engine
+
+
+def dispose_engine() -> None:
+    """
+    Close the database engine's connections and forget the engine.
+
+    The next call to :py:func:`get_engine` creates a new engine, using the
+    current value of ``NX_DB_PATH``.
+    """
+    global _engine  # noqa: PLW0603
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
@@ -0,0 +1,70 @@
+"""Add build_stage_timing table.
+
+Adds a table recording the wall time, CPU time, peak RSS increase, and item
+count of each stage of a record build, per session, so slow stages and
+instruments can be found with plain SQL.
+
+Revision ID: v2_7_5a
+Revises: v2_5_0b
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "v2_7_5a"
+down_revision: Union[str, Sequence[str], None] = "v2_5_0b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "build_stage_timing",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("run_id", sa.String(length=36), nullable=False),
+        sa.Column("session_identifier", sa.String(length=36), nullable=True),
+        sa.Column("stage", sa.String(length=100), nullable=False),
+        sa.Column("wall_time", sa.Float(), nullable=False),
+        sa.Column("cpu_time", sa.Float(), nullable=False),
+        sa.Column("peak_rss_delta", sa.Integer(), nullable=False),
+        sa.Column("items", sa.Integer(), nullable=False),
+        sa.Column("calls", sa.Integer(), nullable=False),
+        sa.Column("timestamp", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_index(
+        op.f("ix_build_stage_timing_run_id"),
+        "build_stage_timing",
+        ["run_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_build_stage_timing_session_identifier"),
+        "build_stage_timing",
+        ["session_identifier"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_build_stage_timing_stage"),
+        "build_stage_timing",
+        ["stage"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_build_stage_timing_stage"), table_name="build_stage_timing")
+    op.drop_index(
+        op.f("ix_build_stage_timing_session_identifier"),
+        table_name="build_stage_timing",
+    )
+    op.drop_index(op.f("ix_build_stage_timing_run_id"), table_name="build_stage_timing")
+    op.drop_table("build_stage_timing")
@@ -416,6 +416,68 @@ class UploadLog(SQLModel, table=True):
         )
 
 
+class BuildStageTiming(SQLModel, table=True):
+    """
+    Timing of a stage of a record build.
+
+    Each record build stores one row per session and stage (e.g. finding the
+    session's files, or extracting metadata from them), plus rows for the
+    stages of the build as a whole (with no session), so slow stages and
+    instruments can be found with plain SQL. See
+    :py:mod:`nexusLIMS.utils.stage_timing`.
+
+    Parameters
+    ----------
+    id
+        Auto-incrementing primary key
+    run_id
+        Identifier shared by all rows of the same build
+    session_identifier
+        Reference to session_log.session_identifier (None for stages of the
+        whole build, e.g. preflight checks or harvesting)
+    stage
+        Name of the stage (e.g. "get_files", "extraction", or "export:cdcs")
+    wall_time
+        Total wall time of the stage, in seconds
+    cpu_time
+        Total CPU time used by the stage, in seconds
+    peak_rss_delta
+        Largest increase in the peak resident set size of the process running
+        the stage during a single run of it, in KiB
+    items
+        Number of items (e.g. files) processed by the stage
+    calls
+        Number of times the stage ran
+    timestamp
+        When the build's timings were stored
+    """
+
+    __tablename__ = "build_stage_timing"
+
+    # Primary key
+    id: int | None = Field(default=None, primary_key=True)
+
+    # Required fields
+    run_id: str = Field(index=True, max_length=36)
+    session_identifier: str | None = Field(default=None, index=True, max_length=36)
+    stage: str = Field(index=True, max_length=100)
+    wall_time: float
+    cpu_time: float
+    peak_rss_delta: int
+    items: int
+    calls: int
+    timestamp: datetime.datetime = Field(sa_column=Column(TZDateTime))
+
+    def __repr__(self):
+        """Return custom representation of a BuildStageTiming."""
+        return (
+            f"BuildStageTiming (session={self.session_identifier}, "
+            f"stage={self.stage}, "
+            f"wall_time={self.wall_time:.3f}s, "
+            f"items={self.items})"
+        )
+
+
 class ExternalUserIdentifier(SQLModel, table=True):
     """
     Maps NexusLIMS usernames to external system user IDs.
@@ -11,6 +11,7 @@ from sqlmodel import select
 from nexusLIMS.db.engine import get_engine
 from nexusLIMS.db.enums import EventType, RecordStatus
 from nexusLIMS.db.models import Instrument, SessionLog
+from nexusLIMS.utils.build_metrics import record_session_status
 from nexusLIMS.utils.time import current_system_tz
 
 _logger = logging.getLogger(__name__)
@@ -82,7 +83,8 @@ class Session:
             for log in logs:
                 log.record_status = status
             session.commit()
-            return True
+        record_session_status(self.session_identifier, status)
+        return True
 
     def insert_record_generation_event(self) -> dict:
         """
@@ -12,6 +12,8 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
+from nexusLIMS.utils.stage_timing import timed_stage
+
 if TYPE_CHECKING:
     from nexusLIMS.exporters.base import ExportContext, ExportDestination, ExportResult
     from nexusLIMS.exporters.registry import ExportStrategy
@@ -54,6 +56,12 @@ def execute_strategy(
     raise ValueError(msg)
 
 
+def _timed_export(dest: ExportDestination, context: ExportContext) -> ExportResult:
+    """Export to a destination, timing it as the ``export:<name>`` build stage."""
+    with timed_stage(f"export:{dest.name}", context.session_identifier, items=1):
+        return dest.export(context)
+
+
 def _strategy_all(
     destinations: list[ExportDestination],
     context: ExportContext,
@@ -80,7 +88,7 @@ def _strategy_all(
 
     for dest in destinations:
         _logger.info("Exporting to %s (priority=%d)...", dest.name, dest.priority)
-        result = dest.export(context)
+        result = _timed_export(dest, context)
         results.append(result)
 
         # Add result to context for subsequent destinations
@@ -134,7 +142,7 @@ def _strategy_first_success(
 
     for dest in destinations:
         _logger.info("Exporting to %s (priority=%d)...", dest.name, dest.priority)
-        result = dest.export(context)
+        result = _timed_export(dest, context)
         results.append(result)
 
         # Add result to context for subsequent destinations
@@ -183,7 +191,7 @@ def _strategy_best_effort(
 
     for dest in destinations:
         _logger.info("Exporting to %s (priority=%d)...", dest.name, dest.priority)
-        result = dest.export(context)
+        result = _timed_export(dest, context)
         results.append(result)
 
         # Add result to context for subsequent destinations
@@ -44,17 +44,26 @@ import logging
 import shutil
 from datetime import datetime as dt
 from decimal import Decimal
+from importlib import import_module
 from pathlib import Path
-from typing import Any, Callable, Dict, Tuple
+from typing import Any, Callable, Dict, NamedTuple, Tuple
 
-import hyperspy.api as hs
 import numpy as np
-from benedict import benedict
 from pydantic import ValidationError
 
-from nexusLIMS.extractors.base import ExtractionContext
+from nexusLIMS.extractors.base import (
+    ExtractionContext,
+    ExtractionSession,
+    PreviewGenerator,
+)
+from nexusLIMS.extractors.cache import extraction_cache_key, get_extraction_cache
+from nexusLIMS.extractors.preview_stamps import (
+    make_preview_stamp,
+    preview_is_current,
+    write_preview_stamp,
+)
 from nexusLIMS.extractors.registry import get_registry
-from nexusLIMS.instruments import get_instr_from_filepath
+from nexusLIMS.instruments import Instrument, get_instr_from_filepath
 from nexusLIMS.schemas.metadata import (
     DiffractionMetadata,
     ImageMetadata,
@@ -64,19 +73,66 @@ from nexusLIMS.schemas.metadata import (
 )
 from nexusLIMS.schemas.units import ureg
 from nexusLIMS.utils.paths import replace_instrument_data_path
+from nexusLIMS.utils.stage_timing import timed_stage
 from nexusLIMS.utils.time import current_system_tz
 from nexusLIMS.version import __version__
 
-from . import utils
-from .plugins.preview_generators.hyperspy_preview import sig_to_thumbnail
-from .plugins.preview_generators.image_preview import (
-    down_sample_image,
-    image_to_square_thumbnail,
-)
-from .plugins.preview_generators.text_preview import text_to_thumbnail
-
 _logger = logging.getLogger(__name__)
 
+_PREVIEW_GENERATORS = "nexusLIMS.extractors.plugins.preview_generators"
+
+# HyperSpy, matplotlib and scikit-image take seconds to import, so these modules
+# and preview functions are only imported the first time they are used
+_LAZY_MODULES = {
+    "hs": "hyperspy.api",
+    "utils": "nexusLIMS.extractors.utils",
+}
+_LAZY_FUNCTIONS = {
+    "sig_to_thumbnail": f"{_PREVIEW_GENERATORS}.hyperspy_preview",
+    "down_sample_image": f"{_PREVIEW_GENERATORS}.image_preview",
+    "image_to_square_thumbnail": f"{_PREVIEW_GENERATORS}.image_preview",
+    "text_to_thumbnail": f"{_PREVIEW_GENERATORS}.text_preview",
+}
+
+_UNEXTRACTED_PREVIEW_FUNCTIONS = {
+    "txt": "text_to_thumbnail",
+    "png": "image_to_square_thumbnail",
+    "tiff": "image_to_square_thumbnail",
+    "bmp": "image_to_square_thumbnail",
+    "gif": "image_to_square_thumbnail",
+    "jpg": "image_to_square_thumbnail",
+    "jpeg": "image_to_square_thumbnail",
+}
+
+
+def _lazy_attribute(name: str) -> Any:
+    """
+    Return a lazily imported attribute of this module, importing it on first use.
+
+    The value is cached in the module namespace, so later lookups (and patches of
+    e.g. ``nexusLIMS.extractors.sig_to_thumbnail``) see an ordinary attribute.
+    """
+    namespace = globals()
+    if name not in namespace:
+        if name in _LAZY_MODULES:
+            namespace[name] = import_module(_LAZY_MODULES[name])
+        elif name in _LAZY_FUNCTIONS:
+            namespace[name] = getattr(import_module(_LAZY_FUNCTIONS[name]), name)
+        else:
+            namespace[name] = {
+                extension: _lazy_attribute(function)
+                for extension, function in _UNEXTRACTED_PREVIEW_FUNCTIONS.items()
+            }
+    return namespace[name]
+
+
+def __getattr__(name: str) -> Any:
+    """Import HyperSpy and the preview helpers on first attribute access."""
+    if name in {*_LAZY_MODULES, *_LAZY_FUNCTIONS, "unextracted_preview_map"}:
+        return _lazy_attribute(name)
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
 
 def _config_available() -> bool:
     """Return True if NexusLIMS settings can be loaded without error."""
@@ -95,11 +151,14 @@ PLACEHOLDER_PREVIEW = Path(__file__).parent / "assets" / "extractor_error.png"
 
 __all__ = [
     "PLACEHOLDER_PREVIEW",
+    "PreviewJob",
     "_logger",
     "create_preview",
     "down_sample_image",
     "flatten_dict",
+    "generate_deferred_preview",
     "get_instr_from_filepath",
+    "get_preview_path",
     "get_registry",
     "image_to_square_thumbnail",
     "parse_metadata",
@@ -110,17 +169,25 @@ __all__ = [
     "validate_nx_meta",
 ]
 
-unextracted_preview_map = {
-    "txt": text_to_thumbnail,
-    "png": image_to_square_thumbnail,
-    "tiff": image_to_square_thumbnail,
-    "bmp": image_to_square_thumbnail,
-    "gif": image_to_square_thumbnail,
-    "jpg": image_to_square_thumbnail,
-    "jpeg": image_to_square_thumbnail,
-}
-"""Filetypes that will only have basic metadata extracted but will nonetheless
-have a custom preview image generated"""
+
+class PreviewJob(NamedTuple):
+    """
+    A preview image whose generation was deferred by :py:func:`parse_metadata`.
+
+    Parameters
+    ----------
+    fname
+        The file to generate the preview of
+    preview_fname
+        The path the preview will be written to (as returned by
+        :py:func:`get_preview_path`)
+    signal_index
+        The index of the signal to preview for multi-signal files, or None
+    """
+
+    fname: Path
+    preview_fname: Path
+    signal_index: int | None
 
 
 def _add_extraction_details(
@@ -369,12 +436,14 @@ def validate_nx_meta(
     return metadata_dict
 
 
-def parse_metadata(  # noqa: PLR0912, PLR0915
+def parse_metadata(  # noqa: PLR0912, PLR0913, PLR0915
     fname: Path,
     *,
     write_output: bool = True,
     generate_preview: bool = True,
     overwrite: bool = True,
+    force_preview: bool = False,
+    defer_preview: bool = False,
 ) -> Tuple[Dict[str, Any] | None, Path | list[Path] | None]:
     """
     Parse metadata from a file and optionaly generate a preview image.
@@ -388,6 +457,10 @@ def parse_metadata(  # noqa: PLR0912, PLR0915
     For files containing multiple signals (e.g., multi-signal DM3/DM4 files),
     generates one preview per signal and returns a list of preview paths.
 
+    The extractor and the preview generators of the file share an
+    :py:class:`~nexusLIMS.extractors.base.ExtractionSession`, so a file whose
+    signals they load (e.g. with HyperSpy) is only loaded once.
+
     Parameters
     ----------
     fname
@@ -401,7 +474,15 @@ def parse_metadata(  # noqa: PLR0912, PLR0915
         it can be done at the same time)
     overwrite
         Whether to overwrite the .json metadata file and thumbnail
-        image if either exists
+        image if either exists (thumbnails are only regenerated if they are out
+        of date; see :py:func:`create_preview`)
+    force_preview
+        Whether to regenerate thumbnails even if they are up to date
+    defer_preview
+        Whether to only determine the paths of the thumbnails, without
+        generating them. The returned paths can be passed to
+        :py:func:`generate_deferred_preview` (as :py:class:`PreviewJob`) to
+        generate them later
 
     Returns
     -------
@@ -415,42 +496,32 @@ def parse_metadata(  # noqa: PLR0912, PLR0915
         if preview generation was not requested.
     """
     extension = fname.suffix[1:]
-
-    # Create extraction context
     instrument = get_instr_from_filepath(fname)
-    context = ExtractionContext(file_path=fname, instrument=instrument)
-
-    # Get extractor from registry
-    registry = get_registry()
-    extractor = registry.get_extractor(context)
-
-    # Extract metadata using the selected extractor
-    # All extractors now return a list of dicts (one per signal)
-    nx_meta_list = extractor.extract(context)
-
-    # Create a pseudo-module for extraction details tracking
-    class ExtractorMethod:
-        """Pseudo-module for extraction details tracking."""
-
-        def __init__(self, extractor_name: str):
-            # Use the plugin module path for all extractors
-            self.__module__ = f"nexusLIMS.extractors.plugins.{extractor_name}"
-            self.__name__ = self.__module__
-
-        def __call__(self, f: Path) -> dict:  # noqa: ARG002
-            return nx_meta_list  # pragma: no cover
-
-    # Defensive check: extractors should always return a list but handle None gracefully
-    if nx_meta_list is None:
-        return None, None
-
-    extractor_method = ExtractorMethod(extractor.name)
+    session = ExtractionSession(fname)
+
+    # Use previously extracted metadata if the file (and everything else the
+    # metadata depends on) is unchanged
+    with timed_stage("extraction", items=1):
+        cache = get_extraction_cache() if _config_available() else None
+        cache_key = extraction_cache_key(fname, instrument) if cache else None
+        cached = cache.get(fname, cache_key) if cache else None
+        if cached is not None:
+            _logger.debug("Using cached metadata for %s", fname)
+            extractor_name, nx_meta_list = cached
+        else:
+            extractor_name, nx_meta_list = _extract_nx_meta(fname, instrument, session)
+            # Defensive check: extractors should always return a list but handle
+            # None gracefully
+            if nx_meta_list is None:
+                return None, None
+            if cache:
+                cache.put(fname, cache_key, extractor_name, nx_meta_list)
 
     # Handle preview generation logic if the extractor is
     # the basic fallback and extension is not in unextracted_preview_map,
     # don't generate a preview
-    if extractor.name == "basic_file_info_extractor":
-        if extension not in unextracted_preview_map:
+    if extractor_name == "basic_file_info_extractor":
+        if extension not in _UNEXTRACTED_PREVIEW_FUNCTIONS:
             generate_preview = False
             _logger.info(
                 "No specialized extractor found for file extension; "
@@ -464,23 +535,9 @@ def parse_metadata(  # noqa: PLR0912, PLR0915
                 "setting generate_preview to True",
             )
 
-    # Add extraction details to metadata
-    nx_meta_list = [_add_extraction_details(m, extractor_method) for m in nx_meta_list]
-
     signal_count = len(nx_meta_list)
     preview_fnames = []
 
-    # Set the dataset type to Misc if it was not set by the file reader
-    for nx_meta in nx_meta_list:
-        if "DatasetType" not in nx_meta["nx_meta"]:
-            nx_meta["nx_meta"]["DatasetType"] = "Misc"
-            nx_meta["nx_meta"]["Data Type"] = "Miscellaneous"
-
-    # Validate each metadata dict against the schema (strict mode)
-    # This happens AFTER setting defaults to allow extractors to omit optional fields
-    for nx_meta in nx_meta_list:
-        validate_nx_meta(nx_meta, filename=fname)
-
     # Write output for each signal (single and multi-signal files)
     _can_write = write_output and _config_available()
     if write_output and not _can_write:
@@ -499,7 +556,8 @@ def parse_metadata(  # noqa: PLR0912, PLR0915
                 base_path = replace_instrument_data_path(fname, "")
                 out_fname = Path(f"{base_path}_signal{i}.json")
 
-            if not out_fname.exists() or overwrite:
+            # Metadata from the cache was written when it was first extracted
+            if not out_fname.exists() or (overwrite and cached is None):
                 # Create the directory for the metadata file, if needed
                 out_fname.parent.mkdir(parents=True, exist_ok=True)
                 # Make sure that the nx_meta dict comes first in the json output
@@ -531,11 +589,17 @@ def parse_metadata(  # noqa: PLR0912, PLR0915
         for i in range(signal_count):
             # For single-signal files, omit suffix for backward compatibility
             signal_idx = i if signal_count > 1 else None
-            preview = create_preview(
-                fname=fname,
-                overwrite=overwrite,
-                signal_index=signal_idx,
-            )
+            if defer_preview:
+                preview_fnames.append(get_preview_path(fname, signal_idx))
+                continue
+            with timed_stage("preview", items=1):
+                preview = create_preview(
+                    fname=fname,
+                    overwrite=overwrite,
+                    signal_index=signal_idx,
+                    force=force_preview,
+                    session=session,
+                )
             preview_fnames.append(preview)
     else:
         preview_fnames = [None] * signal_count
@@ -543,8 +607,85 @@ def parse_metadata(  # noqa: PLR0912, PLR0915
     return nx_meta_list, preview_fnames
 
 
-def create_preview(  # noqa: PLR0911, PLR0912, PLR0915
-    fname: Path, *, overwrite: bool, signal_index: int | None = None
+def _extract_nx_meta(
+    fname: Path,
+    instrument: Instrument | None,
+    session: ExtractionSession | None = None,
+) -> Tuple[str, list[Dict[str, Any]] | None]:
+    """
+    Extract and validate the metadata of a file with the best extractor for it.
+
+    Parameters
+    ----------
+    fname
+        The filename from which to read data
+    instrument
+        The instrument the file belongs to, if known
+    session
+        The session holding the file's loaded signals, to share them with its
+        preview generation
+
+    Returns
+    -------
+    extractor_name : str
+        The name of the extractor that was used
+    nx_meta_list : list[dict] or None
+        A list of metadata dicts, one per signal in the file, including
+        extraction details and default dataset types, or None if the extractor
+        returned nothing
+    """
+    # Create extraction context
+    context = ExtractionContext(file_path=fname, instrument=instrument, session=session)
+
+    # Get extractor from registry
+    registry = get_registry()
+    extractor = registry.get_extractor(context)
+
+    # Extract metadata using the selected extractor
+    # All extractors now return a list of dicts (one per signal)
+    nx_meta_list = extractor.extract(context)
+
+    # Create a pseudo-module for extraction details tracking
+    class ExtractorMethod:
+        """Pseudo-module for extraction details tracking."""
+
+        def __init__(self, extractor_name: str):
+            # Use the plugin module path for all extractors
+            self.__module__ = f"nexusLIMS.extractors.plugins.{extractor_name}"
+            self.__name__ = self.__module__
+
+        def __call__(self, f: Path) -> dict:  # noqa: ARG002
+            return nx_meta_list  # pragma: no cover
+
+    if nx_meta_list is None:
+        return extractor.name, None
+
+    extractor_method = ExtractorMethod(extractor.name)
+
+    # Add extraction details to metadata
+    nx_meta_list = [_add_extraction_details(m, extractor_method) for m in nx_meta_list]
+
+    # Set the dataset type to Misc if it was not set by the file reader
+    for nx_meta in nx_meta_list:
+        if "DatasetType" not in nx_meta["nx_meta"]:
+            nx_meta["nx_meta"]["DatasetType"] = "Misc"
+            nx_meta["nx_meta"]["Data Type"] = "Miscellaneous"
+
+    # Validate each metadata dict against the schema (strict mode)
+    # This happens AFTER setting defaults to allow extractors to omit optional fields
+    for nx_meta in nx_meta_list:
+        validate_nx_meta(nx_meta, filename=fname)
+
+    return extractor.name, nx_meta_list
+
+
+def create_preview(
+    fname: Path,
+    *,
+    overwrite: bool,
+    signal_index: int | None = None,
+    force: bool = False,
+    session: ExtractionSession | None = None,
 ) -> Path | None:
     """
     Generate a preview image for a given file using the plugin system.
@@ -553,17 +694,29 @@ def create_preview(  # noqa: PLR0911, PLR0912, PLR0915
     previews. It first tries to find a suitable preview generator plugin, and
     falls back to legacy methods if no plugin is found.
 
+    Previews are generated incrementally: an existing preview is only
+    regenerated if the source file or the preview generator changed since it
+    was generated (see :py:mod:`nexusLIMS.extractors.preview_stamps`), unless
+    ``force`` is given.
+
     Parameters
     ----------
     fname
         The filename from which to read data
     overwrite
-        Whether to overwrite the .json metadata file and thumbnail
-        image if either exists
+        Whether to overwrite the thumbnail image if it exists and is out of
+        date. If False, an existing thumbnail is always kept
     signal_index
         For files with multiple signals, the index of the signal to preview.
         If None, generates a single preview (legacy behavior). If an int,
         generates preview with _signalN suffix in filename.
+    force
+        Whether to regenerate the thumbnail even if it is up to date (has no
+        effect unless ``overwrite`` is True)
+    session
+        The session holding the file's loaded signals, shared with its
+        metadata extraction and its other previews (a new one is created if
+        not given)
 
     Returns
     -------
@@ -571,13 +724,7 @@ def create_preview(  # noqa: PLR0911, PLR0912, PLR0915
         The filename of the generated preview image; if None, a preview could not be
         successfully generated.
     """
-    # Generate preview filename with signal index suffix if provided
-    if signal_index is None:
-        preview_fname = replace_instrument_data_path(fname, ".thumb.png")
-    else:
-        preview_fname = replace_instrument_data_path(
-            fname, f"_signal{signal_index}.thumb.png"
-        )
+    preview_fname = get_preview_path(fname, signal_index)
 
     # Skip if preview exists and overwrite is False
     if preview_fname.is_file() and not overwrite:
@@ -587,13 +734,138 @@ def create_preview(  # noqa: PLR0911, PLR0912, PLR0915
     # Create context for preview generation
     instrument = get_instr_from_filepath(fname)
     context = ExtractionContext(
-        file_path=fname, instrument=instrument, signal_index=signal_index
+        file_path=fname,
+        instrument=instrument,
+        signal_index=signal_index,
+        session=session,
     )
 
     # Try to get a preview generator from the registry
     registry = get_registry()
     generator = registry.get_preview_generator(context)
 
+    # Skip if the preview was generated from the same file by the same generator
+    try:
+        stamp = make_preview_stamp(fname, generator or _legacy_preview_method(fname))
+    except OSError:
+        stamp = None
+    if stamp is not None and not force and preview_is_current(preview_fname, stamp):
+        _logger.info("Preview is up to date: %s", preview_fname)
+        return preview_fname
+
+    result = _generate_preview(
+        fname, preview_fname, context=context, generator=generator
+    )
+    write_preview_stamp(preview_fname, stamp if result is not None else None)
+    return result
+
+
+def get_preview_path(fname: Path, signal_index: int | None = None) -> Path:
+    """
+    Get the path the preview image of a file is written to.
+
+    Parameters
+    ----------
+    fname
+        The file to preview
+    signal_index
+        For files with multiple signals, the index of the signal to preview
+        (adds a ``_signalN`` suffix to the filename)
+
+    Returns
+    -------
+    pathlib.Path
+        The path of the preview image in the NexusLIMS data directory
+    """
+    if signal_index is None:
+        return replace_instrument_data_path(fname, ".thumb.png")
+    return replace_instrument_data_path(fname, f"_signal{signal_index}.thumb.png")
+
+
+def generate_deferred_preview(
+    job: PreviewJob,
+    *,
+    force: bool = False,
+    session: ExtractionSession | None = None,
+) -> Path:
+    """
+    Generate a preview whose generation was deferred by :py:func:`parse_metadata`.
+
+    Since the preview's path is already part of a record, a placeholder image
+    is written to it if the preview cannot be generated.
+
+    Parameters
+    ----------
+    job
+        The preview to generate
+    force
+        Whether to regenerate the preview even if it is up to date
+    session
+        The session holding the file's loaded signals, to share them with the
+        other previews of the file
+
+    Returns
+    -------
+    pathlib.Path
+        The path of the preview image
+    """
+    try:
+        with timed_stage("preview", items=1):
+            preview = create_preview(
+                job.fname,
+                overwrite=True,
+                signal_index=job.signal_index,
+                force=force,
+                session=session,
+            )
+    except Exception:  # pylint: disable=broad-exception-caught
+        _logger.exception("Preview generation failed for %s", job.fname)
+        preview = None
+    if preview is None:
+        _logger.warning("Using placeholder image for preview of %s", job.fname)
+        job.preview_fname.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(PLACEHOLDER_PREVIEW, job.preview_fname)
+    return job.preview_fname
+
+
+def _legacy_preview_method(fname: Path) -> str:
+    """Name the legacy method used to preview a file no plugin supports."""
+    extension = fname.suffix[1:]
+    if extension == "tif":
+        return "legacy_tif_downsample"
+    if extension in _UNEXTRACTED_PREVIEW_FUNCTIONS:
+        return "legacy_preview_map"
+    return "legacy_hyperspy"
+
+
+def _generate_preview(
+    fname: Path,
+    preview_fname: Path,
+    *,
+    context: ExtractionContext,
+    generator: PreviewGenerator | None,
+) -> Path | None:
+    """
+    Generate a preview image with a plugin, or else a legacy method.
+
+    Parameters
+    ----------
+    fname
+        The filename from which to read data
+    preview_fname
+        The path to write the preview image to
+    context
+        The extraction context of the file (including the signal index)
+    generator
+        The preview generator plugin for the file, if there is one
+
+    Returns
+    -------
+    preview_fname : Optional[pathlib.Path]
+        The filename of the generated preview image; if None, a preview could not be
+        successfully generated.
+    """
+    signal_index = context.signal_index
     if generator:
         # Use plugin-based preview generation
         _logger.info("Generating preview using %s: %s", generator.name, preview_fname)
@@ -617,10 +889,13 @@ def create_preview(  # noqa: PLR0911, PLR0912, PLR0915
         _logger.info("Using legacy downsampling for .tif: %s", preview_fname)
         preview_fname.parent.mkdir(parents=True, exist_ok=True)
         factor = 2
-        down_sample_image(fname, out_path=preview_fname, factor=factor)
+        _lazy_attribute("down_sample_image")(
+            fname, out_path=preview_fname, factor=factor
+        )
         return preview_fname
 
     # Legacy fallback for files in unextracted_preview_map
+    unextracted_preview_map = _lazy_attribute("unextracted_preview_map")
     if extension in unextracted_preview_map:
         _logger.info("Using legacy preview map for %s: %s", extension, preview_fname)
         preview_fname.parent.mkdir(parents=True, exist_ok=True)
@@ -644,7 +919,9 @@ def create_preview(  # noqa: PLR0911, PLR0912, PLR0915
 
     # noinspection PyBroadException
     try:
-        s = hs.load(fname, **load_options)
+        signals = context.session.get_signals(
+            lambda f: _lazy_attribute("hs").load(f, **load_options)
+        )
     except Exception:  # pylint: disable=broad-exception-caught
         _logger.warning(
             "Signal could not be loaded by HyperSpy. "
@@ -654,13 +931,17 @@ def create_preview(  # noqa: PLR0911, PLR0912, PLR0915
         shutil.copyfile(PLACEHOLDER_PREVIEW, preview_fname)
         return preview_fname
 
-    # If s is a list of signals, select the appropriate one
-    if isinstance(s, list):
-        num_sigs = len(s)
-        original_fname = s[0].metadata.General.original_filename
+    # If the file has several signals, select the appropriate one; it is
+    # shared with the file's extraction and other previews, so a copy (whose
+    # data is dropped once the preview is saved) is retitled and computed
+    multi_signal = len(signals) > 1
+    s = signals[signal_index if multi_signal and signal_index is not None else 0]
+    s = s.deepcopy()
+    if multi_signal:
+        num_sigs = len(signals)
+        original_fname = s.metadata.General.original_filename
         if signal_index is not None:
             # Use specified signal index
-            s = s[signal_index]
             s.metadata.General.title = (
                 s.metadata.General.title
                 + f" (signal {signal_index + 1} of "
@@ -668,7 +949,6 @@ def create_preview(  # noqa: PLR0911, PLR0912, PLR0915
             )
         else:
             # Legacy: use first signal only
-            s = s[0]
             s.metadata.General.title = (
                 s.metadata.General.title
                 + f' (1 of {num_sigs} total signals in file "{original_fname}")'
@@ -684,7 +964,7 @@ def create_preview(  # noqa: PLR0911, PLR0912, PLR0915
     preview_fname.parent.mkdir(parents=True, exist_ok=True)
     s.compute(show_progressbar=False)
     try:
-        sig_to_thumbnail(s, out_path=preview_fname)
+        _lazy_attribute("sig_to_thumbnail")(s, out_path=preview_fname)
     except Exception:  # pylint: disable=broad-exception-caught
         _logger.warning(
             "Legacy HyperSpy preview generation failed for %s. "
@@ -722,6 +1002,8 @@ def flatten_dict(_dict, parent_key="", separator=" "):  # noqa: ARG001
         The dictionary with depth one, with nested dictionaries flattened
         into root-level keys
     """
+    from benedict import benedict  # noqa: PLC0415
+
     # Disable keypath_separator to avoid conflicts with keys containing
     # dots or other special chars
     return benedict(_dict, keypath_separator=None).flatten(separator=separator)
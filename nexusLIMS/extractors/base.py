@@ -10,8 +10,9 @@ inheritance, allowing flexibility in implementation while maintaining type safet
 from __future__ import annotations
 
 import logging
+import os
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Protocol
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, NamedTuple, Protocol
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -23,7 +24,9 @@ _logger = logging.getLogger(__name__)
 __all__ = [
     "BaseExtractor",
     "ExtractionContext",
+    "ExtractionSession",
     "FieldDefinition",
+    "FileProbe",
     "PreviewGenerator",
 ]
 
@@ -90,6 +93,149 @@ class FieldDefinition(NamedTuple):
     target_unit: str | None = None  # Pint unit string (e.g., "kilovolt", "millimeter")
 
 
+class FileProbe:
+    """
+    The header of a file, read the first time it is needed and then kept.
+
+    Several extractors can be registered for the same extension (e.g. the FEI,
+    Tescan, and Zeiss Orion extractors for ``.tif`` files), and each of their
+    ``supports()`` methods sniffs the same things from the file: its first bytes
+    and, for TIFF files, its tags. The probe reads all of them with a single open
+    of the file, so selecting an extractor opens a file (which is often on a
+    network share) only once, and the selected extractor can use them in its
+    ``extract()`` method as well.
+
+    Parameters
+    ----------
+    file_path
+        The file to probe
+    """
+
+    HEADER_SIZE = 8192
+    """The number of bytes kept from the start of the file"""
+
+    def __init__(self, file_path: Path):
+        self.file_path = file_path
+        self._header: bytes | None = None
+        self._size: int | None = None
+        self._tiff_tags: dict[int, Any] = {}
+
+    @property
+    def header(self) -> bytes:
+        """The first :py:attr:`HEADER_SIZE` bytes of the file (empty if unreadable)."""
+        self._read()
+        return self._header
+
+    @property
+    def size(self) -> int | None:
+        """The size of the file in bytes (None if it cannot be read)."""
+        self._read()
+        return self._size
+
+    @property
+    def tiff_tags(self) -> dict[int, Any]:
+        """
+        The tags of the first image of a TIFF file, by tag ID.
+
+        The values are as given by Pillow's
+        :py:attr:`~PIL.TiffImagePlugin.TiffImageFile.tag_v2`. The dictionary is
+        empty if the file is not a TIFF file (or cannot be read).
+        """
+        self._read()
+        return self._tiff_tags
+
+    def _read(self) -> None:
+        if self._header is not None:
+            return
+        self._header = b""
+        try:
+            with self.file_path.open(mode="rb") as f:
+                self._header = f.read(self.HEADER_SIZE)
+                self._size = os.fstat(f.fileno()).st_size
+                f.seek(0)
+                self._tiff_tags = self._read_tiff_tags(f)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            _logger.debug("Could not read %s: %s", self.file_path, e)
+
+    def _read_tiff_tags(self, f: BinaryIO) -> dict[int, Any]:
+        from PIL import Image  # noqa: PLC0415
+
+        try:
+            with Image.open(f) as img:
+                return dict(img.tag_v2)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            _logger.debug("Could not read TIFF tags from %s: %s", self.file_path, e)
+            return {}
+
+
+class ExtractionSession:
+    """
+    The signals of a file, loaded the first time they are needed and then kept.
+
+    Extracting a file's metadata and generating its previews (one per signal
+    for multi-signal files) each need the file's signals, usually loaded
+    (lazily) with HyperSpy. A file's session is shared by the contexts given to
+    its extractor and to its preview generators (see
+    :py:func:`~nexusLIMS.extractors.parse_metadata`), so the file is opened and
+    parsed once, however many of them need it.
+
+    Parameters
+    ----------
+    file_path
+        The file the session is for
+    """
+
+    def __init__(self, file_path: Path):
+        self.file_path = file_path
+        self._signals: list[Any] | None = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the file's signals have been loaded."""
+        return self._signals is not None
+
+    def get_signals(self, loader: Callable[[Path], Any]) -> list[Any]:
+        """
+        Get the file's signals, loading them the first time.
+
+        Parameters
+        ----------
+        loader
+            The function that loads the file, given its path, if its signals
+            have not been loaded yet. It returns a signal or a list of signals
+
+        Returns
+        -------
+        list
+            The signals of the file. They are shared by everything using the
+            session, so they must not be changed or computed: work on a copy
+            (``signal.deepcopy()``) instead, which for a lazy signal shares the
+            data that has not been loaded yet, and whose loaded data is dropped
+            along with the copy
+
+        Raises
+        ------
+        Exception
+            Any exception raised by ``loader``; since nothing is kept, the file
+            is loaded again the next time
+        """
+        if self._signals is None:
+            signals = loader(self.file_path)
+            self._signals = signals if isinstance(signals, list) else [signals]
+        return self._signals
+
+    def set_signals(self, signals: Any) -> None:
+        """
+        Keep the file's signals, if they have been loaded by other means.
+
+        Parameters
+        ----------
+        signals
+            A signal or a list of signals, e.g. as loaded by an extractor
+        """
+        self._signals = signals if isinstance(signals, list) else [signals]
+
+
 @dataclass
 class ExtractionContext:
     """
@@ -109,6 +255,13 @@ class ExtractionContext:
     signal_index
         For files with multiple signals, the index of the signal to process.
         If None, processes all signals or defaults to the first signal.
+    probe
+        The file's header (see :py:class:`FileProbe`), read on first use and
+        shared by all the extractors given this context
+    session
+        The file's loaded signals (see :py:class:`ExtractionSession`), shared
+        by the extractor and preview generators of the file. A new session is
+        created if none is given
 
     Examples
     --------
@@ -122,6 +275,22 @@ class ExtractionContext:
     file_path: Path
     instrument: Instrument | None = None
     signal_index: int | None = None
+    session: ExtractionSession | None = field(default=None, repr=False, compare=False)
+    _probe: FileProbe | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        """Create a session for the file, if none was given."""
+        if self.session is None:
+            self.session = ExtractionSession(self.file_path)
+
+    @property
+    def probe(self) -> FileProbe:
+        """The file's header, read when first used (see :py:class:`FileProbe`)."""
+        if self._probe is None:
+            self._probe = FileProbe(self.file_path)
+        return self._probe
 
 
 class BaseExtractor(Protocol):
@@ -354,6 +523,11 @@ class PreviewGenerator(Protocol):
         Set to None for wildcard generators that support all files.
         Empty set means no extensions are directly supported (content sniffing only).
 
+    A generator may also define an optional ``version`` attribute. It is recorded
+    with each preview it generates, and changing it causes existing previews to
+    be regenerated (see :py:mod:`nexusLIMS.extractors.preview_stamps`). If it is
+    not defined, the NexusLIMS version is used.
+
     Examples
     --------
     >>> class HyperSpyPreview:
@@ -0,0 +1,295 @@
+"""Persistent cache of extracted file metadata.
+
+When :ref:`NX_EXTRACTION_CACHE_ENABLED <config-extraction-cache-enabled>` is set,
+:py:func:`~nexusLIMS.extractors.parse_metadata` stores the metadata extracted from
+each file in a SQLite database (``NX_DATA_PATH/extraction_cache.sqlite``), and
+returns the stored metadata on later calls for the same file without opening it.
+This avoids re-parsing files when a session is rebuilt after an error, when a
+dry run is followed by a real run, or when sessions overlap.
+
+A cached entry is only used if its key matches the file's current key, which
+combines everything the extracted metadata depends on:
+
+* the file's path, size, and modification time
+* the extractors registered for the file's extension (which determine the
+  extractor that is selected for it)
+* the NexusLIMS version
+* the instrument the file belongs to, and the code and settings of that
+  instrument's :py:class:`~nexusLIMS.extractors.base.InstrumentProfile`
+
+Changing any of these invalidates the entry, and the file is extracted again.
+The cache can be emptied with ``nexuslims cache purge``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import logging
+import pickle
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from nexusLIMS.config import settings
+from nexusLIMS.extractors.profiles import get_profile_registry
+from nexusLIMS.extractors.registry import get_registry
+from nexusLIMS.version import __version__
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from nexusLIMS.db.models import Instrument
+    from nexusLIMS.extractors.base import InstrumentProfile
+
+_logger = logging.getLogger(__name__)
+
+__all__ = [
+    "ExtractionCache",
+    "extraction_cache_key",
+    "get_extraction_cache",
+    "profile_fingerprint",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    path TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    nx_meta BLOB NOT NULL
+);
+"""
+
+# the fingerprint of each instrument's profile, along with the profile and the
+# state (of it and the profile registry) it was computed for; reading and hashing
+# the source code of its callables is too slow to repeat for every file
+_profile_fingerprints: dict[str, tuple[InstrumentProfile, tuple, dict[str, Any]]] = {}
+
+
+def _callable_fingerprint(func: Callable) -> str:
+    """Identify a profile callable by its qualified name and source code."""
+    name = f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', func)}"
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = ""
+    return f"{name}:{hashlib.sha256(source.encode()).hexdigest()}"
+
+
+def profile_fingerprint(profile: InstrumentProfile | None) -> dict[str, Any] | None:
+    """
+    Describe everything about an instrument profile that affects extraction.
+
+    Parameters
+    ----------
+    profile
+        The instrument profile (or None if the instrument has no profile)
+
+    Returns
+    -------
+    dict or None
+        The profile's instrument, and the names and source code hashes of its
+        parsers and transformations, along with its extension fields. It is
+        computed once for each profile until the profile registry or the
+        profile's callables or extension fields change, so must not be modified
+    """
+    if profile is None:
+        return None
+    extension_fields = repr(sorted(profile.extension_fields.items()))
+    state = (
+        get_profile_registry().generation,
+        tuple(sorted(profile.parsers.items())),
+        tuple(sorted(profile.transformations.items())),
+        extension_fields,
+    )
+    cached = _profile_fingerprints.get(profile.instrument_id)
+    if cached is not None and cached[0] is profile and cached[1] == state:
+        return cached[2]
+    fingerprint = {
+        "instrument_id": profile.instrument_id,
+        "parsers": {
+            k: _callable_fingerprint(v) for k, v in sorted(profile.parsers.items())
+        },
+        "transformations": {
+            k: _callable_fingerprint(v)
+            for k, v in sorted(profile.transformations.items())
+        },
+        "extension_fields": extension_fields,
+    }
+    _profile_fingerprints[profile.instrument_id] = (profile, state, fingerprint)
+    return fingerprint
+
+
+def extraction_cache_key(fname: Path, instrument: Instrument | None) -> str:
+    """
+    Compute the cache key for the metadata extracted from a file.
+
+    Only the file's ``stat`` information is used; the file is not opened.
+
+    Parameters
+    ----------
+    fname
+        The file from which metadata is extracted
+    instrument
+        The instrument the file belongs to (as returned by
+        :py:func:`~nexusLIMS.instruments.get_instr_from_filepath`)
+
+    Returns
+    -------
+    str
+        A hash of all the components the extracted metadata depends on
+    """
+    stat = fname.stat()
+    extension = fname.suffix.lstrip(".").lower()
+    extractors = [
+        e.name for e in get_registry().get_extractors_for_extension(extension)
+    ]
+    components = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "extractors": extractors,
+        "version": __version__,
+        "instrument": None
+        if instrument is None
+        else [instrument.name, str(instrument.timezone)],
+        "profile": profile_fingerprint(get_profile_registry().get_profile(instrument)),
+    }
+    return hashlib.sha256(json.dumps(components).encode()).hexdigest()
+
+
+class ExtractionCache:
+    """
+    A persistent store of the metadata extracted from files.
+
+    Holds at most one entry per file path; storing a new entry for a path
+    replaces the previous one. Database errors are logged and treated as cache
+    misses, so a broken cache never prevents extraction.
+
+    Parameters
+    ----------
+    db_path
+        The path to the SQLite database file holding the cache (created if it
+        does not exist)
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=60)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def get(self, fname: Path, key: str) -> tuple[str, list[dict]] | None:
+        """
+        Get the cached metadata of a file, if its key is unchanged.
+
+        Parameters
+        ----------
+        fname
+            The file whose metadata to look up
+        key
+            The file's current key (see :py:func:`extraction_cache_key`)
+
+        Returns
+        -------
+        tuple[str, list[dict]] or None
+            The name of the extractor that was used and the list of metadata
+            dictionaries (one per signal) as returned by
+            :py:func:`~nexusLIMS.extractors.parse_metadata`, or None if there
+            is no valid entry for the file
+        """
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT key, extractor, nx_meta FROM extractions WHERE path = ?",
+                    (str(fname),),
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            _logger.warning("Could not read extraction cache %s: %s", self.db_path, e)
+            return None
+        if row is None or row[0] != key:
+            return None
+        try:
+            # the cache is written only by NexusLIMS, in its own data directory
+            return row[1], pickle.loads(row[2])  # noqa: S301
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            _logger.warning("Could not load cached metadata of %s: %s", fname, e)
+            return None
+
+    def put(
+        self, fname: Path, key: str, extractor_name: str, nx_meta_list: list[dict]
+    ) -> None:
+        """
+        Store the metadata extracted from a file.
+
+        Parameters
+        ----------
+        fname
+            The file the metadata was extracted from
+        key
+            The file's key at the time of extraction (see
+            :py:func:`extraction_cache_key`)
+        extractor_name
+            The name of the extractor that was used
+        nx_meta_list
+            The list of metadata dictionaries (one per signal)
+        """
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?)",
+                        (
+                            str(fname),
+                            key,
+                            extractor_name,
+                            pickle.dumps(nx_meta_list, pickle.HIGHEST_PROTOCOL),
+                        ),
+                    )
+            finally:
+                conn.close()
+        except (sqlite3.Error, pickle.PicklingError, TypeError) as e:
+            _logger.warning("Could not write extraction cache %s: %s", self.db_path, e)
+
+    def purge(self) -> int:
+        """
+        Remove all entries from the cache.
+
+        Returns
+        -------
+        int
+            The number of entries that were removed
+        """
+        if not self.db_path.exists():
+            return 0
+        conn = self._connect()
+        try:
+            with conn:
+                count = conn.execute("DELETE FROM extractions").rowcount
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+        return count
+
+
+def get_extraction_cache() -> ExtractionCache | None:
+    """
+    Get the extraction cache, if it is enabled.
+
+    Returns
+    -------
+    ExtractionCache or None
+        The cache stored at ``NX_DATA_PATH/extraction_cache.sqlite``, or None if
+        :ref:`NX_EXTRACTION_CACHE_ENABLED <config-extraction-cache-enabled>` is
+        not set
+    """
+    if not settings.NX_EXTRACTION_CACHE_ENABLED:
+        return None
+    return ExtractionCache(settings.extraction_cache_path)
@@ -2,14 +2,14 @@
 
 import contextlib
 import logging
+from copy import deepcopy
 from datetime import UTC
 from datetime import datetime as dt
 from pathlib import Path
 from struct import error
-from typing import Any, ClassVar, Dict, List
+from typing import Any, ClassVar, Dict, List, Tuple
 
 import numpy as np
-from hyperspy.io import load as hs_load
 from rsciio.utils.exceptions import (
     DM3DataTypeError,
     DM3FileVersionError,
@@ -18,7 +18,7 @@ from rsciio.utils.exceptions import (
     DM3TagTypeError,
 )
 
-from nexusLIMS.extractors.base import ExtractionContext
+from nexusLIMS.extractors.base import ExtractionContext, ExtractionSession
 from nexusLIMS.extractors.plugins.basic_metadata import BasicFileInfoExtractor
 from nexusLIMS.extractors.plugins.profiles import register_all_profiles
 from nexusLIMS.extractors.profiles import get_profile_registry
@@ -43,13 +43,18 @@ from nexusLIMS.instruments import get_instr_from_filepath
 from nexusLIMS.schemas.units import ureg
 from nexusLIMS.utils.dicts import (
     remove_dict_nones,
-    remove_dtb_element,
     set_nested_dict_value,
     sort_dict,
     try_getting_dict_value,
 )
 from nexusLIMS.utils.time import current_system_tz
 
+try:
+    from rsciio.digitalmicrograph._api import DigitalMicrographReader
+except ImportError:  # pragma: no cover
+    # a private API of RosettaSciIO; without it, files are loaded with HyperSpy
+    DigitalMicrographReader = None
+
 _logger = logging.getLogger(__name__)
 
 
@@ -104,7 +109,9 @@ class DM3Extractor:
         """
         _logger.debug("Extracting metadata from DM3/DM4 file: %s", context.file_path)
         # get_dm3_metadata() handles profile application internally
-        metadata_list = get_dm3_metadata(context.file_path, context.instrument)
+        metadata_list = get_dm3_metadata(
+            context.file_path, context.instrument, session=context.session
+        )
 
         # If extraction failed, return minimal metadata with a warning
         if metadata_list is None:
@@ -129,32 +136,145 @@ class DM3Extractor:
         return metadata_list
 
 
-def get_dm3_metadata(filename: Path, instrument=None):  # noqa: PLR0912
+_UNUSED_DM3_TAGS = (
+    "ApplicationBounds",
+    "LayoutType",
+    "DocumentTags",
+    "HasWindowPosition",
+    "ImageSourceList",
+    "Image Behavior",
+    "InImageMode",
+    "MinVersionList",
+    "NextDocumentObjectID",
+    "PageSetup",
+    "Page Behavior",
+    "SentinelList",
+    "Thumbnails",
+    "WindowPosition",
+    "root",
+)
+"""Top-level tag groups of a DM file that are not of interest for the metadata"""
+
+
+def read_dm3_tags(filename: Path) -> List[Tuple[Dict, Tuple[int, ...]]]:
     """
-    Get metadata from a dm3 or dm4 file.
+    Read the tags of each image in a dm3 or dm4 file, without reading its data.
 
-    Returns the metadata from a .dm3 file saved by Digital Micrograph, with some
-    non-relevant information stripped out. Instrument-specific metadata parsing is
-    handled by instrument profiles (see nexusLIMS.extractors.plugins.profiles).
+    Only the tag tree of the file is parsed (the ``ImageData`` arrays are
+    seeked past), and no HyperSpy signals are created, which is much faster
+    than loading the file with HyperSpy, even lazily. The tags of each image
+    are the same as the ``original_metadata`` of the signal HyperSpy would
+    load for it (all the file's tags, with ``ImageList`` holding only that
+    image as ``TagGroup0``).
 
     Parameters
     ----------
-    filename : str
-        path to a .dm3 file saved by Gatan's Digital Micrograph
-    instrument : Instrument, optional
-        The instrument object (used for timezone info). Instrument-specific parsing
-        is now handled via profiles, not this parameter.
+    filename
+        path to a .dm3 or .dm4 file saved by Gatan's Digital Micrograph
 
     Returns
     -------
-    metadata : list[dict] or None
-        List of extracted metadata dicts, one per signal. If None, the file could
-        not be opened.
+    list[tuple[dict, tuple[int, ...]]]
+        For each image in the file (except thumbnails), its tags and the shape
+        of the data of the signal HyperSpy would load for it
+
+    Raises
+    ------
+    ImportError
+        If the DM reader of the installed RosettaSciIO version is not available
+    Exception
+        Any error raised while parsing the file; such files can still be tried
+        with HyperSpy (see :py:func:`get_dm3_metadata`)
+    """
+    if DigitalMicrographReader is None:
+        msg = "rsciio.digitalmicrograph._api.DigitalMicrographReader is unavailable"
+        raise ImportError(msg)
+    with filename.open("rb") as f:
+        reader = DigitalMicrographReader(f)
+        reader.parse_file()
+    tags = reader.tags_dict
+    images = reader.get_image_dictionaries()
+    del tags["ImageList"]
+    return [
+        ({**tags, "ImageList": {"TagGroup0": imdict}}, _dm3_data_shape(imdict))
+        for imdict in images
+    ]
+
+
+def _dm3_data_shape(imdict: Dict) -> Tuple[int, ...]:
+    """Get the data shape of the signal HyperSpy would load for a DM image."""
+    # DM lists the dimensions in X, Y, Z... order
+    shape = tuple(imdict["ImageData"]["Dimensions"].values())[::-1]
+    image_tags = imdict.get("ImageTags", {})
+    meta_data = image_tags.get("Meta Data", {})
+    is_spectrum_image = (
+        isinstance(meta_data, dict) and meta_data.get("Format") == "Spectrum image"
+    ) or "spim" in image_tags
+    if is_spectrum_image and len(shape) > 2:  # noqa: PLR2004
+        # spectrum images are loaded with the spectral axis last
+        shape = shape[1:] + shape[:1]
+    # and loaded signals are squeezed
+    return tuple(n for n in shape if n != 1)
+
+
+def _load_dm3_tags(
+    filename: Path, session: ExtractionSession | None = None
+) -> List[Tuple[Dict, Tuple[int, ...]]] | None:
+    """
+    Read the tags of each image in a DM file, falling back to HyperSpy.
+
+    See :py:func:`read_dm3_tags`; files it cannot parse are loaded with
+    :py:func:`load_dm3_tags_with_hyperspy` instead (through ``session``, if
+    given).
+
+    Returns
+    -------
+    list[tuple[dict, tuple[int, ...]]] or None
+        The tags and data shape of each signal, or None if the file could not be
+        opened
+    """
+    try:
+        return read_dm3_tags(filename)
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        _logger.debug(
+            "Could not read the tags of %s (%r), loading it with HyperSpy",
+            filename,
+            exc,
+        )
+    return load_dm3_tags_with_hyperspy(filename, session)
+
+
+def load_dm3_tags_with_hyperspy(
+    filename: Path, session: ExtractionSession | None = None
+) -> List[Tuple[Dict, Tuple[int, ...]]] | None:
+    """
+    Get the tags of each image in a DM file by loading it lazily with HyperSpy.
+
+    This gives the same result as :py:func:`read_dm3_tags`, but creates a
+    (lazy) signal for each image, so it is only used for files that cannot be
+    read otherwise.
+
+    Parameters
+    ----------
+    filename
+        path to a .dm3 or .dm4 file saved by Gatan's Digital Micrograph
+    session
+        The session to load the file's signals through, so they are shared with
+        its preview generation
+
+    Returns
+    -------
+    list[tuple[dict, tuple[int, ...]]] or None
+        The ``original_metadata`` and data shape of each signal, or None if the
+        file could not be opened
     """
     # We do lazy loading so we don't actually read the data from the disk to
     # save time and memory.
+    from hyperspy.io import load as hs_load  # noqa: PLC0415
+
+    session = session or ExtractionSession(filename)
     try:
-        s = hs_load(filename, lazy=True)
+        signals = session.get_signals(lambda f: hs_load(f, lazy=True))
     except (
         DM3DataTypeError,
         DM3FileVersionError,
@@ -170,80 +290,93 @@ def get_dm3_metadata(filename: Path, instrument=None):  # noqa: PLR0912
         )
         return None
 
-    if isinstance(s, list):
-        # s is a list, rather than a single signal
-        m_list = [{}] * len(s)
-        for i, _ in enumerate(s):
-            m_list[i] = s[i].original_metadata
-    else:
-        s = [s]
-        m_list = [s[0].original_metadata]
-
-    for i, m_tree in enumerate(m_list):
-        # Important trees:
-        #   DocumentObjectList
-        #     Contains information about the display of the information, including bits
-        #     about annotations that are included on top of the image data, the CLUT
-        #     (color look-up table), data min/max.
-        #
-        #   ImageList
-        #     Contains the actual image information
-
-        # Remove the trees that are not of interest:
-        for tag in [
-            "ApplicationBounds",
-            "LayoutType",
-            "DocumentTags",
-            "HasWindowPosition",
-            "ImageSourceList",
-            "Image_Behavior",
-            "InImageMode",
-            "MinVersionList",
-            "NextDocumentObjectID",
-            "PageSetup",
-            "Page_Behavior",
-            "SentinelList",
-            "Thumbnails",
-            "WindowPosition",
-            "root",
-        ]:
-            m_tree = remove_dtb_element(m_tree, tag)  # noqa: PLW2901
-
-        # Within the DocumentObjectList tree, we really only care about the
-        # AnnotationGroupList for each TagGroup, so go into each TagGroup and
-        # delete everything but that...
-        # NB: the hyperspy DictionaryTreeBrowser __iter__ function returns each
-        #   tree element as a tuple containing the tree name and the actual
-        #   tree, so we loop through the tag names by taking the first part
-        #   of the tuple:
-        for tg_name, tag in m_tree.DocumentObjectList:
-            # tg_name should be 'TagGroup0', 'TagGroup1', etc.
-            keys = tag.keys()
-            # we want to keep this, so remove from the list to loop through
-            if "AnnotationGroupList" in keys:
-                keys.remove("AnnotationGroupList")
-            for k in keys:
-                m_tree = remove_dtb_element(  # noqa: PLW2901
-                    m_tree,
-                    f"DocumentObjectList.{tg_name}.{k}",
-                )
+    return [
+        (signal.original_metadata.as_dictionary(), signal.data.shape)
+        for signal in signals
+    ]
 
-        for tg_name, tag in m_tree.ImageList:
-            # tg_name should be 'TagGroup0', 'TagGroup1', etc.
-            keys = tag.keys()
-            # We want to keep 'ImageTags' and 'Name', so remove from list
-            # (not all dm3/dm4 files have a 'Name' key)
-            for keep in ("ImageTags", "Name"):
-                if keep in keys:
-                    keys.remove(keep)
-            for k in keys:
-                # k should be in ['ImageData', 'UniqueID']
-                m_tree = remove_dtb_element(  # noqa: PLW2901
-                    m_tree,
-                    f"ImageList.{tg_name}.{k}",
-                )
 
-        m_list[i] = m_tree.as_dictionary()
+def _prune_dm3_tags(tags: Dict) -> Dict:
+    """
+    Remove the tags of a DM image that are not of interest for its metadata.
+
+    Parameters
+    ----------
+    tags
+        The tags of one image, as returned by :py:func:`read_dm3_tags`
+
+    Returns
+    -------
+    dict
+        A copy of ``tags``, without the tag groups listed in ``_UNUSED_DM3_TAGS``
+        and with only the tags of interest in ``DocumentObjectList`` and
+        ``ImageList``
+    """
+    # Important trees:
+    #   DocumentObjectList
+    #     Contains information about the display of the information, including bits
+    #     about annotations that are included on top of the image data, the CLUT
+    #     (color look-up table), data min/max.
+    #
+    #   ImageList
+    #     Contains the actual image information
+    pruned = {k: v for k, v in tags.items() if k not in _UNUSED_DM3_TAGS}
+
+    # Within the DocumentObjectList tree, we really only care about the
+    # AnnotationGroupList for each TagGroup ('TagGroup0', 'TagGroup1', etc.)
+    # and in the ImageList tree, about 'ImageTags' and 'Name' (not all dm3/dm4
+    # files have a 'Name' key)
+    for tree, keep in (
+        ("DocumentObjectList", ("AnnotationGroupList",)),
+        ("ImageList", ("ImageTags", "Name")),
+    ):
+        if tree in pruned:
+            pruned[tree] = {
+                tg_name: {k: v for k, v in tag.items() if k in keep}
+                for tg_name, tag in pruned[tree].items()
+            }
+
+    # the tags of several images in a file share their sub-trees, so copy them
+    # before they are changed while parsing
+    return deepcopy(pruned)
+
+
+def get_dm3_metadata(
+    filename: Path, instrument=None, session: ExtractionSession | None = None
+):
+    """
+    Get metadata from a dm3 or dm4 file.
+
+    Returns the metadata from a .dm3 file saved by Digital Micrograph, with some
+    non-relevant information stripped out. Instrument-specific metadata parsing is
+    handled by instrument profiles (see nexusLIMS.extractors.plugins.profiles).
+    The file's tags are read without its data by :py:func:`read_dm3_tags`, or
+    loaded lazily with HyperSpy if they cannot be read that way.
+
+    Parameters
+    ----------
+    filename : str
+        path to a .dm3 file saved by Gatan's Digital Micrograph
+    instrument : Instrument, optional
+        The instrument object (used for timezone info). Instrument-specific parsing
+        is now handled via profiles, not this parameter.
+    session : ExtractionSession, optional
+        The session of the file, which keeps its signals if they are loaded
+        with HyperSpy, to share them with its preview generation
+
+    Returns
+    -------
+    metadata : list[dict] or None
+        List of extracted metadata dicts, one per signal. If None, the file could
+        not be opened.
+    """
+    signals = _load_dm3_tags(filename, session)
+    if signals is None:
+        return None
+
+    m_list = [None] * len(signals)
+    for i, (tags, shape) in enumerate(signals):
+        m_list[i] = _prune_dm3_tags(tags)
 
         # Get the instrument object associated with this file
         # Use provided instrument if available, otherwise look it up
@@ -263,7 +396,7 @@ def get_dm3_metadata(filename: Path, instrument=None):  # noqa: PLR0912
         m_list[i]["nx_meta"]["DatasetType"] = "Image"
         m_list[i]["nx_meta"]["Data Type"] = "TEM_Imaging"
         m_list[i]["nx_meta"]["Creation Time"] = mtime_iso
-        m_list[i]["nx_meta"]["Data Dimensions"] = str(s[i].data.shape)
+        m_list[i]["nx_meta"]["Data Dimensions"] = str(shape)
         m_list[i]["nx_meta"]["Instrument ID"] = instr_name
         m_list[i]["nx_meta"]["warnings"] = []
         m_list[i] = parse_dm3_microscope_info(m_list[i])
@@ -4,8 +4,6 @@ import contextlib
 import logging
 from typing import Any, ClassVar
 
-from hyperspy.io import load
-
 from nexusLIMS.extractors.base import ExtractionContext
 from nexusLIMS.extractors.utils import _set_instr_name_and_time, add_to_extensions
 from nexusLIMS.instruments import get_instr_from_filepath
@@ -74,6 +72,8 @@ class SpcExtractor:
 
         _set_instr_name_and_time(mdict, filename)
 
+        from hyperspy.io import load  # noqa: PLC0415
+
         s = load(filename, lazy=True)
 
         # original_metadata puts the entire xml under the root node "spc_header",
@@ -229,6 +229,8 @@ class MsaExtractor:
         filename = context.file_path
         _logger.debug("Extracting metadata from MSA file: %s", filename)
 
+        from hyperspy.io import load  # noqa: PLC0415
+
         s = load(filename, lazy=False)
         mdict = {"nx_meta": {}}
         mdict["original_metadata"] = s.original_metadata.as_dictionary()
@@ -3,12 +3,11 @@
 import contextlib
 import logging
 from datetime import datetime as dt
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, ClassVar, List, Tuple
 
 import numpy as np
-from hyperspy.io import load as hs_load
-from hyperspy.signal import BaseSignal
 
 from nexusLIMS.db.models import Instrument
 from nexusLIMS.extractors.base import ExtractionContext
@@ -24,6 +23,9 @@ from nexusLIMS.utils.time import current_system_tz
 
 _logger = logging.getLogger(__name__)
 
+_EMI_CACHE_SIZE = 1
+"""The number of .emi files whose loaded signals are kept by load_emi_signals"""
+
 
 class SerEmiExtractor:
     """
@@ -115,6 +117,9 @@ class SerEmiExtractor:
 
             # if we couldn't load the emi, lets at least open the .ser to pull
             # out the ser_header_info
+            from hyperspy.io import load as hs_load  # noqa: PLC0415
+            from hyperspy.signal import BaseSignal  # noqa: PLC0415
+
             try:
                 s = hs_load(filename, only_valid_data=True, lazy=True)
             except Exception:
@@ -128,6 +133,10 @@ class SerEmiExtractor:
                 s = BaseSignal(np.zeros(1))
                 ser_error = True
 
+        if not ser_error:
+            # share the loaded signal with the file's preview generation
+            context.session.set_signals(s)
+
         metadata = s.original_metadata.as_dictionary()
         metadata["nx_meta"] = {}
 
@@ -339,28 +348,72 @@ def _load_ser(emi_filename: Path, ser_index: int):
     Returns
     -------
     hyperspy.signal.BaseSignal
-        The signal loaded by HyperSpy
+        A copy of the signal loaded by HyperSpy, which can be changed (or
+        computed) without affecting the cached signal
     bool
         Whether the emi file was successfully loaded (should be true if no Exceptions)
     """
     # approach here is for every .ser we want to examine, load the
     # metadata from the corresponding .emi file. If multiple .ser files
-    # are related to this emi, HyperSpy returns a list, so we select out
-    # the right signal from that list if that's what is returned
+    # are related to this emi, select out the right signal from the list
+    # (the "index" from the filename minus 1); otherwise use the signal as-is
+    signals = load_emi_signals(emi_filename)
+    s = signals[ser_index - 1] if len(signals) > 1 else signals[0]
+
+    # the copy of a lazy signal shares its (not yet loaded) dask array, so this
+    # is cheap, and only the copy's data is loaded if it is computed
+    return s.deepcopy(), True
+
+
+def load_emi_signals(emi_filename: Path) -> Tuple[Any, ...]:
+    """
+    Load the signals of all the .ser files belonging to an .emi file.
+
+    Loading an .emi file with HyperSpy also loads every one of its .ser files, so
+    the (lazy) signals of the most recently loaded .emi file are cached, by path
+    and modification time. The extraction and preview of each of an .emi file's
+    .ser files (which are written, and so read, one after the other) then share
+    a single load, rather than loading all the .ser files again for each one.
+    Only one .emi file is kept, so its signals are dropped as soon as the next
+    .emi file is loaded, and the cache is emptied with :py:func:`clear_emi_cache`
+    once the files of each session have been read.
+
+    The returned signals are shared by every caller, so they must not be
+    changed or computed; :py:func:`_load_ser` gives a copy of one of them.
 
+    Parameters
+    ----------
+    emi_filename
+        The path to an .emi file
+
+    Returns
+    -------
+    tuple of hyperspy.signal.BaseSignal
+        The signal of each of the .emi file's .ser files, in order
+
+    Raises
+    ------
+    Exception
+        Any exception raised by HyperSpy if the .emi file (or one of its .ser
+        files) cannot be loaded; failed loads are not cached
+    """
+    return _load_emi(emi_filename, emi_filename.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=_EMI_CACHE_SIZE)
+def _load_emi(emi_filename: Path, mtime_ns: int) -> Tuple[Any, ...]:  # noqa: ARG001
     # make sure to load with "only_valid_data" so data shape is correct
     # loading the emi with HS will try loading the .ser too, so this will
     # fail if there's an issue with the .ser file
+    from hyperspy.io import load as hs_load  # noqa: PLC0415
+
     emi_s = hs_load(emi_filename, lazy=True, only_valid_data=True)
+    return tuple(emi_s) if isinstance(emi_s, list) else (emi_s,)
 
-    # if there is more than one dataset, emi_s will be a list, so pick
-    # out the matching signal from the list, which will be the "index"
-    # from the filename minus 1:
-    # if there is more than one dataset, emi_s will be a list, so pick
-    # out the matching signal, otherwise use the signal as-is
-    s = emi_s[ser_index - 1] if isinstance(emi_s, list) else emi_s
 
-    return s, True
+def clear_emi_cache() -> None:
+    """Drop the signals cached by :py:func:`load_emi_signals`."""
+    _load_emi.cache_clear()
 
 
 def parse_basic_info(metadata, shape, instrument: Instrument):
@@ -5,11 +5,12 @@ import configparser
 import contextlib
 import io
 import logging
+import mmap
 import re
 from decimal import Decimal, InvalidOperation
 from math import degrees
 from pathlib import Path
-from typing import Any, ClassVar, Tuple
+from typing import Any, ClassVar, Iterator, Tuple
 
 from lxml import etree
 from PIL import Image
@@ -38,6 +39,13 @@ This tag contains supplementary XML metadata that may be embedded after
 the standard INI metadata.
 """
 
+BINARY_METADATA_WINDOW = 1 << 20
+"""
+The number of bytes searched for FEI/Thermo metadata (and the most returned) at
+the start and end of each part of a TIFF file outside its image data, when the
+file has no tag 34682 (see :py:meth:`FeiTiffExtractor._find_binary_metadata`).
+"""
+
 _logger = logging.getLogger(__name__)
 
 
@@ -78,43 +86,25 @@ class FeiTiffExtractor:
             return False
 
         # Strategy 1: Check for FEI metadata signature using TIFF tag 34682
-        try:
-            with Image.open(context.file_path) as img:
-                # Check for FEI custom tag
-                fei_metadata = img.tag_v2.get(FEI_TIFF_TAG)
-                if fei_metadata is not None:
-                    # Verify the metadata contains FEI-style markers:
-                    # either INI-style sections ([User]/[Beam]) or
-                    # the flat XML format used by FEI TEM software (<Root>)
-                    metadata_str = str(fei_metadata)
-                    if (
-                        "[User]" in metadata_str
-                        or "[Beam]" in metadata_str
-                        or "<Root>" in metadata_str
-                    ):
-                        return True
-        except Exception as e:
-            _logger.debug(
-                "Could not read TIFF tags from %s: %s",
-                context.file_path,
-                e,
-            )
+        # (the file's header and tags are read once, and shared with the other
+        # extractors' supports() and with extract())
+        fei_metadata = context.probe.tiff_tags.get(FEI_TIFF_TAG)
+        if fei_metadata is not None:
+            # Verify the metadata contains FEI-style markers:
+            # either INI-style sections ([User]/[Beam]) or
+            # the flat XML format used by FEI TEM software (<Root>)
+            metadata_str = str(fei_metadata)
+            if (
+                "[User]" in metadata_str
+                or "[Beam]" in metadata_str
+                or "<Root>" in metadata_str
+            ):
+                return True
 
         # Strategy 2: Fallback to binary content sniffing for files that may not be
         # proper TIFF files or use different metadata storage
-        try:
-            with context.file_path.open(mode="rb") as f:
-                content = f.read(5000)  # Read first 5KB to check for metadata markers
-        except Exception as e:
-            _logger.debug(
-                "Could not read binary content from %s: %s",
-                context.file_path,
-                e,
-            )
-            return False
-        else:
-            # Check for FEI metadata markers in file
-            return b"[User]" in content or b"[Beam]" in content
+        content = context.probe.header
+        return b"[User]" in content or b"[Beam]" in content
 
     def extract(self, context: ExtractionContext) -> list[dict[str, Any]]:
         """
@@ -147,9 +137,8 @@ class FeiTiffExtractor:
         try:
             # Check for flat <Root> XML format (FEI TEM software) before
             # attempting INI-style extraction
-            raw_tag = None
-            with contextlib.suppress(Exception), Image.open(filename) as img:
-                raw_tag = img.tag_v2.get(FEI_TIFF_TAG)
+            tiff_tags = context.probe.tiff_tags
+            raw_tag = tiff_tags.get(FEI_TIFF_TAG)
 
             if raw_tag is not None and "<Root>" in str(raw_tag):
                 _logger.debug("Detected FEI <Root> XML format in %s", filename)
@@ -161,7 +150,9 @@ class FeiTiffExtractor:
                 return [mdict]
 
             # Extract metadata from TIFF tags/binary (INI format)
-            metadata_str, xml_metadata = self._extract_metadata_from_tiff_tag(filename)
+            metadata_str, xml_metadata = self._extract_metadata_from_tiff_tag(
+                filename, tiff_tags
+            )
 
             if not metadata_str:
                 _logger.warning(
@@ -200,7 +191,9 @@ class FeiTiffExtractor:
 
         return [mdict]
 
-    def _extract_metadata_from_tiff_tag(self, tiff_path: Path) -> Tuple[str, dict]:
+    def _extract_metadata_from_tiff_tag(
+        self, tiff_path: Path, tiff_tags: dict[int, Any] | None = None
+    ) -> Tuple[str, dict]:
         """
         Extract metadata string from FEI TIFF tags 34682 and 34683.
 
@@ -211,6 +204,10 @@ class FeiTiffExtractor:
         ----------
         tiff_path
             Path to the TIFF file
+        tiff_tags
+            The file's TIFF tags, if already read (e.g. from
+            :py:attr:`ExtractionContext.probe <nexusLIMS.extractors.base.FileProbe>`);
+            otherwise they are read from the file
 
         Returns
         -------
@@ -224,37 +221,33 @@ class FeiTiffExtractor:
 
         # Strategy 1: Try to extract from TIFF tags 34682 and 34683
         try:
-            with Image.open(tiff_path) as img:
-                # Extract standard metadata from tag 34682
-                fei_metadata = img.tag_v2.get(FEI_TIFF_TAG)
-                if fei_metadata is not None:
-                    # Convert tag to string
-                    metadata_str_val = (
-                        fei_metadata
-                        if isinstance(fei_metadata, str)
-                        else str(fei_metadata)
-                    )
-                    metadata_str = self._extract_metadata_string(
-                        metadata_str_val.encode()
-                    )
-
-                # Extract XML metadata from tag 34683 if present
-                xml_metadata_tag = img.tag_v2.get(FEI_XML_TIFF_TAG)
-                if xml_metadata_tag is not None:
-                    xml_metadata_str = (
-                        xml_metadata_tag
-                        if isinstance(xml_metadata_tag, str)
-                        else str(xml_metadata_tag)
-                    )
-                    # Check if this is XML
-                    if "<?xml" in xml_metadata_str:
-                        try:
-                            root = etree.fromstring(xml_metadata_str)
-                            xml_metadata = self._xml_el_to_dict(root)
-                        except Exception as e:
-                            _logger.debug(
-                                "Failed to parse XML from TIFF tag 34683: %s", e
-                            )
+            if tiff_tags is None:
+                with Image.open(tiff_path) as img:
+                    tiff_tags = dict(img.tag_v2)
+            # Extract standard metadata from tag 34682
+            fei_metadata = tiff_tags.get(FEI_TIFF_TAG)
+            if fei_metadata is not None:
+                # Convert tag to string
+                metadata_str_val = (
+                    fei_metadata if isinstance(fei_metadata, str) else str(fei_metadata)
+                )
+                metadata_str = self._extract_metadata_string(metadata_str_val.encode())
+
+            # Extract XML metadata from tag 34683 if present
+            xml_metadata_tag = tiff_tags.get(FEI_XML_TIFF_TAG)
+            if xml_metadata_tag is not None:
+                xml_metadata_str = (
+                    xml_metadata_tag
+                    if isinstance(xml_metadata_tag, str)
+                    else str(xml_metadata_tag)
+                )
+                # Check if this is XML
+                if "<?xml" in xml_metadata_str:
+                    try:
+                        root = etree.fromstring(xml_metadata_str)
+                        xml_metadata = self._xml_el_to_dict(root)
+                    except Exception as e:
+                        _logger.debug("Failed to parse XML from TIFF tag 34683: %s", e)
         except Exception as e:
             _logger.debug("Failed to extract FEI metadata from TIFF tags: %s", e)
 
@@ -265,12 +258,10 @@ class FeiTiffExtractor:
         # Strategy 2: Fallback to binary content extraction for files where
         # metadata might not be in a standard TIFF tag
         try:
-            with tiff_path.open(mode="rb") as f:
-                content = f.read()
-            user_idx = content.find(b"[User]")
-            if user_idx != -1:
+            metadata_bytes = self._find_binary_metadata(tiff_path, tiff_tags or {})
+            if metadata_bytes is not None:
                 # Extract metadata string from binary
-                metadata_str_raw = self._extract_metadata_string(content[user_idx:])
+                metadata_str_raw = self._extract_metadata_string(metadata_bytes)
                 # Check for XML in the binary content
                 metadata_str_clean, xml_meta = self._detect_and_process_xml_metadata(
                     metadata_str_raw
@@ -281,6 +272,48 @@ class FeiTiffExtractor:
 
         return "", {}
 
+    def _find_binary_metadata(
+        self, tiff_path: Path, tiff_tags: dict[int, Any]
+    ) -> bytes | None:
+        """
+        Find the FEI metadata in the bytes of a TIFF file without tag 34682.
+
+        The file is memory-mapped rather than read, and only the parts of it
+        outside the image data (as located by the TIFF strip or tile offsets, when
+        the tags give them) are searched for the ``[User]`` section, where the
+        metadata begins. At most :py:data:`BINARY_METADATA_WINDOW` bytes are
+        searched at the start and end of each such part, and returned.
+
+        Parameters
+        ----------
+        tiff_path
+            Path to the TIFF file
+        tiff_tags
+            The file's TIFF tags, by tag ID (empty if they could not be read)
+
+        Returns
+        -------
+        bytes or None
+            The file's bytes from the start of the ``[User]`` section to the end of
+            the part of the file it is in, or None if it was not found
+        """
+        with (
+            tiff_path.open(mode="rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content,
+        ):
+            for start, end, part_end in _metadata_search_windows(
+                len(content), tiff_tags
+            ):
+                # let the marker run past the end of the window, within its part
+                user_idx = content.find(
+                    b"[User]", start, min(end + len(b"[User]") - 1, part_end)
+                )
+                if user_idx != -1:
+                    return content[
+                        user_idx : min(part_end, user_idx + BINARY_METADATA_WINDOW)
+                    ]
+        return None
+
     def _extract_metadata_string(self, metadata_bytes: bytes) -> str:
         """
         Extract metadata string from binary data.
@@ -1324,6 +1357,61 @@ class FeiTiffExtractor:
 
 
 # Backward compatibility function for tests
+def _image_data_ranges(tiff_tags: dict[int, Any]) -> list[Tuple[int, int]]:
+    """Get the (start, end) byte ranges of the strips or tiles of a TIFF image."""
+    ranges = []
+    # StripOffsets/StripByteCounts and TileOffsets/TileByteCounts
+    for offsets_tag, counts_tag in ((273, 279), (324, 325)):
+        offsets, counts = tiff_tags.get(offsets_tag), tiff_tags.get(counts_tag)
+        if offsets is None or counts is None:
+            continue
+        if isinstance(offsets, int):
+            offsets, counts = (offsets,), (counts,)
+        ranges.extend(
+            (offset, offset + count) for offset, count in zip(offsets, counts)
+        )
+    return ranges
+
+
+def _metadata_search_windows(
+    size: int, tiff_tags: dict[int, Any]
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    Get the parts of a TIFF file to search for FEI metadata, in file order.
+
+    The parts of the file outside its image data (all of it, if the image data
+    cannot be located) are searched, up to :py:data:`BINARY_METADATA_WINDOW`
+    bytes from their start and from their end.
+
+    Parameters
+    ----------
+    size
+        The size of the file, in bytes
+    tiff_tags
+        The file's TIFF tags, by tag ID
+
+    Yields
+    ------
+    tuple of int
+        The start and end of a window to search, and the end of the part of the
+        file it is in
+    """
+    parts, pos = [], 0
+    for data_start, data_end in sorted(_image_data_ranges(tiff_tags)):
+        if min(data_start, size) > pos:
+            parts.append((pos, min(data_start, size)))
+        pos = max(pos, min(data_end, size))
+    if pos < size:
+        parts.append((pos, size))
+
+    for start, end in parts:
+        if end - start <= 2 * BINARY_METADATA_WINDOW:
+            yield start, end, end
+        else:
+            yield start, start + BINARY_METADATA_WINDOW, end
+            yield end - BINARY_METADATA_WINDOW, end, end
+
+
 def get_fei_metadata(filename):
     """
     Get metadata from a FEI/Thermo Fisher TIF file.
@@ -5,7 +5,7 @@ import logging
 import xml.etree.ElementTree as ET
 from decimal import Decimal
 from pathlib import Path
-from typing import Any, ClassVar
+from typing import Any, ClassVar, Mapping
 
 from PIL import Image
 
@@ -71,17 +71,13 @@ class OrionTiffExtractor:
             True if file is a Zeiss Orion or Fibics TIFF file
         """
         # File must exist to check TIFF tags
-        if not context.file_path.exists():
-            _logger.warning("File does not exist: %s", context.file_path)
+        if context.probe.size is None:
+            _logger.warning(
+                "File does not exist or cannot be read: %s", context.file_path
+            )
             return False
 
-        try:
-            with Image.open(context.file_path) as img:
-                variant = self._detect_variant(img)
-                return variant is not None
-        except Exception as e:
-            _logger.warning("Error checking TIFF tags for %s: %s", context.file_path, e)
-            return False
+        return self._detect_variant_from_tags(context.probe.tiff_tags) is not None
 
     def extract(self, context: ExtractionContext) -> list[dict[str, Any]]:
         """
@@ -153,8 +149,24 @@ class OrionTiffExtractor:
         str | None
             "zeiss", "fibics", or None if neither detected
         """
-        if ZEISS_TIFF_TAG in img.tag_v2:
-            xml_data = img.tag_v2[ZEISS_TIFF_TAG]
+        return self._detect_variant_from_tags(img.tag_v2)
+
+    def _detect_variant_from_tags(self, tiff_tags: Mapping[int, Any]) -> str | None:
+        """
+        Detect whether TIFF tags are those of a Zeiss or Fibics TIFF file.
+
+        Parameters
+        ----------
+        tiff_tags
+            The file's TIFF tags, by tag ID
+
+        Returns
+        -------
+        str | None
+            "zeiss", "fibics", or None if neither detected
+        """
+        if ZEISS_TIFF_TAG in tiff_tags:
+            xml_data = tiff_tags[ZEISS_TIFF_TAG]
             try:
                 root = ET.fromstring(xml_data)
                 if root.tag == "ImageTags" or "ImageTags" in root.tag:
@@ -162,8 +174,8 @@ class OrionTiffExtractor:
             except ET.ParseError as e:
                 _logger.warning("Failed to parse Zeiss XML from TIFF tag: %s", e)
 
-        if FIBICS_TIFF_TAG in img.tag_v2:
-            xml_data = img.tag_v2[FIBICS_TIFF_TAG]
+        if FIBICS_TIFF_TAG in tiff_tags:
+            xml_data = tiff_tags[FIBICS_TIFF_TAG]
             try:
                 root = ET.fromstring(xml_data)
                 if root.tag == "Fibics" or "Fibics" in root.tag:
@@ -7,16 +7,8 @@ import textwrap
 from pathlib import Path
 from typing import ClassVar
 
-import hyperspy.api as hs_api
-import matplotlib as mpl
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.offsetbox import AnchoredOffsetbox, OffsetImage
-from matplotlib.transforms import Bbox
 from PIL import Image
-from skimage import transform
-from skimage.io import imread
-from skimage.transform import resize  # pylint: disable=no-name-in-module
 
 import nexusLIMS.extractors
 from nexusLIMS.extractors.base import ExtractionContext
@@ -43,6 +35,8 @@ def _full_extent(axis, items, pad=0.0):
 
     Adapted from https://stackoverflow.com/a/26432947/1435788.
     """
+    from matplotlib.transforms import Bbox  # noqa: PLC0415
+
     # For text objects, we need to draw the figure first, otherwise the extents
     # are undefined.
     axis.figure.canvas.draw()
@@ -87,6 +81,8 @@ def _get_visible_labels(axis):
     vis_labels_x, vis_labels_y : tuple of lists
         lists of only the label objects that are visible on the current axis
     """
+    import matplotlib as mpl  # noqa: PLC0415
+
     vis_labels_x = mpl.cbook.silent_list("Text xticklabel")
     vis_labels_y = mpl.cbook.silent_list("Text yticklabel")
 
@@ -133,6 +129,10 @@ def _project_image_stack(s, num=5, dpi=92, v_shear=0.3, h_scale=0.3):
     output : :py:class:`numpy.ndarray`
         The `num` frames loaded into a single NumPy array for plotting
     """
+    import hyperspy.api as hs_api  # noqa: PLC0415
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+    from skimage import transform  # noqa: PLC0415
+
     tmps = []
     for i in np.linspace(0, s.axes_manager.navigation_size - 1, num=num, dtype=int):
         hs_api.plot.plot_images(
@@ -352,6 +352,8 @@ def _get_markers_list(s, tags_dict):
         List of HyperSpy 2.0+ marker objects that correspond to the
         annotations found in `s`
     """
+    import hyperspy.api as hs_api  # noqa: PLC0415
+
     scale = {"x": s.axes_manager["x"].scale, "y": s.axes_manager["y"].scale}
     offset = {"x": s.axes_manager["x"].offset, "y": s.axes_manager["y"].offset}
 
@@ -494,6 +496,8 @@ def _set_extent_and_save(mpl_axis, s, f, out_path, dpi):
 
 def _plot_spectrum(s, out_path, dpi):
     # pylint: disable=protected-access
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+
     s.plot()
     # get signal plot figure
     f = s._plot.signal_plot.figure  # noqa: SLF001
@@ -521,6 +525,12 @@ def _plot_linescan(s, out_path, dpi):
 
 
 def _plot_si(s, out_path, dpi):
+    import hyperspy.api as hs_api  # noqa: PLC0415
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+    from matplotlib.offsetbox import AnchoredOffsetbox, OffsetImage  # noqa: PLC0415
+    from skimage.io import imread  # noqa: PLC0415
+    from skimage.transform import resize  # noqa: PLC0415
+
     nav_size = s.axes_manager.navigation_size
     max_nav_size = 9
 
@@ -570,6 +580,9 @@ def _plot_si(s, out_path, dpi):
 
 
 def _plot_single_image(s, out_path, dpi):
+    import hyperspy.api as hs_api  # noqa: PLC0415
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+
     # check to see if this is a dm3/dm4; if so try to plot with
     # annotations
     orig_fname = s.metadata.General.original_filename
@@ -596,6 +609,8 @@ def _plot_single_image(s, out_path, dpi):
 
 
 def _plot_image_stack(s, out_path, dpi):
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+
     plt.figure()
     plt.imshow(
         _project_image_stack(s, num=min(5, s.axes_manager.navigation_size), dpi=dpi),
@@ -623,6 +638,9 @@ def _plot_image_stack(s, out_path, dpi):
 
 
 def _plot_tableau(s, out_path, dpi):
+    import hyperspy.api as hs_api  # noqa: PLC0415
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+
     tableau_3x3_limit = 9
     tableau_2x2_limit = 4
     asp_ratio = s.axes_manager.signal_shape[1] / s.axes_manager.signal_shape[0]
@@ -688,6 +706,8 @@ def _plot_tableau(s, out_path, dpi):
 
 
 def _plot_complex_signal(s, out_path, dpi):
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+
     # in tests, setting minimum to a percentile around 66% looks good
     s.amplitude.plot(
         interpolation="bilinear",
@@ -708,6 +728,8 @@ def _plot_complex_signal(s, out_path, dpi):
 
 
 def _plot_axes_manager(s, out_path, dpi):
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+
     f, mpl_axis = plt.subplots()
     mpl_axis.set_position([0, 0, 1, 1])
     mpl_axis.set_axis_off()
@@ -792,6 +814,10 @@ def sig_to_thumbnail(s, out_path: Path, dpi: int = 92):
     This method heavily utilizes HyperSpy's existing plotting functions to
     figure out how to best display the image
     """
+    import hyperspy.api as hs_api  # noqa: PLC0415
+    import matplotlib as mpl  # noqa: PLC0415
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+
     # close all currently open plots to ensure we don't leave a mess behind
     # in memory
     plt.close("all")
@@ -817,6 +843,71 @@ def sig_to_thumbnail(s, out_path: Path, dpi: int = 92):
     return _plot_axes_manager(s, out_path, dpi)
 
 
+def _load_ser_from_emi(ser_fname: Path):
+    """
+    Get the signal of a .ser file from the signals loaded for its .emi file.
+
+    The signals of an .emi file's .ser files are cached (see
+    :py:func:`~nexusLIMS.extractors.plugins.fei_emi.load_emi_signals`), so the
+    .emi file is loaded once for the metadata extraction and the previews of all
+    of its .ser files. The signal returned is a copy of the cached one, so
+    plotting it (which may unfold or compute it) leaves the cached signal as is.
+
+    Parameters
+    ----------
+    ser_fname
+        The path to an FEI TIA .ser file
+
+    Returns
+    -------
+    hyperspy.signal.BaseSignal or None
+        The .ser file's signal, or None if its .emi file cannot be found or
+        loaded (in which case the .ser file should be loaded on its own)
+    """
+    from nexusLIMS.extractors.plugins.fei_emi import (  # noqa: PLC0415
+        _load_ser,
+        get_emi_from_ser,
+    )
+
+    try:
+        emi_fname, ser_index = get_emi_from_ser(ser_fname)
+        s, _ = _load_ser(emi_fname, ser_index)
+    except Exception:  # pylint: disable=broad-exception-caught
+        return None
+    return s
+
+
+def _load_signals(fname: Path):
+    """
+    Load a file with HyperSpy to generate its preview.
+
+    Parameters
+    ----------
+    fname
+        The file to load
+
+    Returns
+    -------
+    hyperspy.signal.BaseSignal or list of hyperspy.signal.BaseSignal
+        The file's signal(s), loaded lazily if the format supports it
+    """
+    from hyperspy.io import load  # noqa: PLC0415
+
+    if fname.suffix.lower() == ".ser":
+        s = _load_ser_from_emi(fname)
+        if s is not None:
+            return s
+
+    # Some formats (e.g. msa) don't support lazy loading.
+    # Use glob.escape() so bracket characters in filenames (e.g. "[3][4]")
+    # are not misinterpreted as glob character classes by HyperSpy's loader.
+    escaped = _glob.escape(str(fname))
+    try:
+        return load(escaped, lazy=True)
+    except Exception:  # pylint: disable=broad-exception-caught
+        return load(escaped, lazy=False)
+
+
 class HyperSpyPreviewGenerator:
     """
     Preview generator for files that can be loaded with HyperSpy.
@@ -858,6 +949,11 @@ class HyperSpyPreviewGenerator:
         """
         Generate a thumbnail preview using HyperSpy.
 
+        The file's signals are loaded through ``context.session``, so they are
+        shared with the file's metadata extraction and its other previews. The
+        preview is plotted from a copy of the signal, so the shared signal is
+        never changed or computed.
+
         Parameters
         ----------
         context
@@ -871,30 +967,20 @@ class HyperSpyPreviewGenerator:
             True if preview was successfully generated, False otherwise
         """
         try:
-            from hyperspy.io import load  # noqa: PLC0415
-
             _logger.debug("Generating HyperSpy preview for: %s", context.file_path)
 
-            # Load the signal; some formats (e.g. msa) don't support lazy loading.
-            # Use glob.escape() so bracket characters in filenames (e.g. "[3][4]")
-            # are not misinterpreted as glob character classes by HyperSpy's loader.
-            escaped = _glob.escape(str(context.file_path))
-            try:
-                s = load(escaped, lazy=True)
-            except Exception:
-                s = load(escaped, lazy=False)
+            # The file is only loaded once for its metadata and all its previews
+            signals = context.session.get_signals(_load_signals)
 
             # Handle multi-signal files
-            if isinstance(s, list):
-                if context.signal_index is not None:
-                    # Use specified signal index
-                    s = s[context.signal_index]
-                else:
-                    # Legacy: use first signal only
-                    s = s[0]
-
-            # Generate the thumbnail using the local function
-            sig_to_thumbnail(s, output_path, dpi=92)
+            s = signals[0]  # Legacy: use first signal only
+            if len(signals) > 1 and context.signal_index is not None:
+                # Use specified signal index
+                s = signals[context.signal_index]
+
+            # Generate the thumbnail using the local function, from a copy that
+            # is dropped (with any data loaded to plot it) once it is saved
+            sig_to_thumbnail(s.deepcopy(), output_path, dpi=92)
 
             return output_path.exists()
         except Exception as e:
@@ -4,7 +4,6 @@ import logging
 from pathlib import Path
 from typing import ClassVar, Tuple
 
-import matplotlib.pyplot as plt
 import numpy as np
 from PIL import Image, UnidentifiedImageError
 
@@ -127,6 +126,8 @@ def down_sample_image(
         results in an image that is 50% of each original dimension). Either
         this argument or ``output_size`` should be provided (not both).
     """
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+
     if output_size is None and factor is None:
         msg = "One of output_size or factor must be provided"
         raise ValueError(msg)
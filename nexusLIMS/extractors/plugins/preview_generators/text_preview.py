@@ -3,14 +3,15 @@
 import logging
 import textwrap
 from pathlib import Path
-from typing import ClassVar, Union
+from typing import TYPE_CHECKING, ClassVar, Union
 
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
 from PIL import Image
 
 from nexusLIMS.extractors.base import ExtractionContext
 
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
 _logger = logging.getLogger(__name__)
 
 _LANCZOS = Image.Resampling.LANCZOS
@@ -59,7 +60,7 @@ def text_to_thumbnail(
     f: Path,
     out_path: Path,
     output_size: int = 500,
-) -> Union[Figure, bool]:
+) -> Union["Figure", bool]:
     """
     Generate a preview thumbnail from a text file.
 
@@ -91,6 +92,8 @@ def text_to_thumbnail(
         Handle to a matplotlib Figure, or the value False if a preview could not be
         generated
     """
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+
     plt.close("all")
     plt.rcParams["image.cmap"] = "gray"
 
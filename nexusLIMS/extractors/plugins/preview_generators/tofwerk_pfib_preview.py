@@ -6,15 +6,8 @@ import logging
 from typing import TYPE_CHECKING, ClassVar
 
 import h5py
-import matplotlib as mpl
 import numpy as np
 
-mpl.use("Agg")
-import matplotlib.pyplot as plt
-from matplotlib import gridspec
-from matplotlib.patches import Patch
-from mpl_toolkits.axes_grid1 import make_axes_locatable
-
 from nexusLIMS.extractors.plugins.preview_generators.image_preview import _pad_to_square
 
 if TYPE_CHECKING:
@@ -220,6 +213,8 @@ def _tic_display_limits(
 
 
 def _add_colorbar(fig, ax, im, label: str, extend: str = "neither"):
+    from mpl_toolkits.axes_grid1 import make_axes_locatable  # noqa: PLC0415
+
     div = make_axes_locatable(ax)
     cax = div.append_axes("right", size="5%", pad=0.05)
     cb = fig.colorbar(im, cax=cax, extend=extend)
@@ -388,6 +383,13 @@ def _generate_preview(  # noqa: PLR0912, PLR0915
     min_mass
         Minimum m/z threshold; peaks/spectrum below this mass are ignored
     """
+    import matplotlib as mpl  # noqa: PLC0415
+
+    mpl.use("Agg")
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+    from matplotlib import gridspec  # noqa: PLC0415
+    from matplotlib.patches import Patch  # noqa: PLC0415
+
     with h5py.File(h5_path, "r") as f:
         has_peaks = "PeakData/PeakData" in f
 
@@ -77,26 +77,15 @@ class TescanTiffExtractor:
             return True
 
         # Fallback: check TIFF tags for Tescan signature
-        try:
-            with Image.open(context.file_path) as img:
-                # Check for TESCAN in Make tag (271) or Software tag (305)
-                make = img.tag_v2.get(271, "")
-                software = img.tag_v2.get(305, "")
-                if "TESCAN" in str(make).upper() or "TESCAN" in str(software).upper():
-                    return True
-                # check for custom Tescan metadata tag
-                tescan_metadata = img.tag_v2.get(TESCAN_TIFF_TAG, "")
-                if tescan_metadata != "":
-                    return True
-        except Exception as e:
-            _logger.debug(
-                "Could not read TIFF tags from %s: %s",
-                context.file_path,
-                e,
-            )
-            return False
-
-        return False
+        tiff_tags = context.probe.tiff_tags
+        # Check for TESCAN in Make tag (271) or Software tag (305)
+        make = tiff_tags.get(271, "")
+        software = tiff_tags.get(305, "")
+        if "TESCAN" in str(make).upper() or "TESCAN" in str(software).upper():
+            return True
+        # check for custom Tescan metadata tag
+        tescan_metadata = tiff_tags.get(TESCAN_TIFF_TAG, "")
+        return tescan_metadata != ""
 
     def extract(self, context: ExtractionContext) -> list[dict[str, Any]]:
         """
@@ -0,0 +1,136 @@
+"""Records of the inputs each preview thumbnail was generated from.
+
+Every preview written by :py:func:`~nexusLIMS.extractors.create_preview` gets a
+small JSON "stamp" file next to it (``<name>.thumb.png.stamp`` for
+``<name>.thumb.png``) recording the source file's size and modification time
+and the name and version of the preview generator that was used. When a preview
+is requested again and its stamp still matches, the existing thumbnail is kept
+rather than being regenerated, which avoids repeating the most expensive step
+of processing a file (loading and plotting its data) for every record build.
+
+Previews without a stamp (e.g. those generated by earlier NexusLIMS versions)
+are regenerated once, after which they are stamped.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import TYPE_CHECKING, Any
+
+from nexusLIMS.version import __version__
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from nexusLIMS.extractors.base import PreviewGenerator
+
+_logger = logging.getLogger(__name__)
+
+__all__ = [
+    "make_preview_stamp",
+    "preview_is_current",
+    "preview_stamp_path",
+    "write_preview_stamp",
+]
+
+
+def preview_stamp_path(preview_fname: Path) -> Path:
+    """
+    Get the path of the stamp file for a preview image.
+
+    Parameters
+    ----------
+    preview_fname
+        The path of the preview image (e.g. ``file.dm3.thumb.png``)
+
+    Returns
+    -------
+    pathlib.Path
+        The path of its stamp file (e.g. ``file.dm3.thumb.png.stamp``)
+    """
+    return preview_fname.with_name(f"{preview_fname.name}.stamp")
+
+
+def make_preview_stamp(
+    fname: Path, generator: PreviewGenerator | str
+) -> dict[str, Any]:
+    """
+    Describe the inputs a preview of a file is generated from.
+
+    Parameters
+    ----------
+    fname
+        The file the preview is generated from
+    generator
+        The preview generator plugin that is used, or the name of the legacy
+        preview method if no plugin supports the file. Plugins may define a
+        ``version`` attribute; otherwise (and for legacy methods) the NexusLIMS
+        version is used
+
+    Returns
+    -------
+    dict
+        The stamp, to be compared with :py:func:`preview_is_current` or stored
+        with :py:func:`write_preview_stamp`
+    """
+    stat = fname.stat()
+    if isinstance(generator, str):
+        name, version = generator, __version__
+    else:
+        name, version = generator.name, getattr(generator, "version", __version__)
+    return {
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_size": stat.st_size,
+        "generator": str(name),
+        "generator_version": str(version),
+    }
+
+
+def preview_is_current(preview_fname: Path, stamp: dict[str, Any]) -> bool:
+    """
+    Check whether a preview image was generated from the given inputs.
+
+    Parameters
+    ----------
+    preview_fname
+        The path of the preview image
+    stamp
+        The preview's current stamp (from :py:func:`make_preview_stamp`)
+
+    Returns
+    -------
+    bool
+        Whether the preview exists and its stored stamp matches ``stamp``
+    """
+    if not preview_fname.is_file():
+        return False
+    try:
+        with preview_stamp_path(preview_fname).open(encoding="utf-8") as f:
+            return json.load(f) == stamp
+    except (OSError, ValueError):
+        return False
+
+
+def write_preview_stamp(preview_fname: Path, stamp: dict[str, Any] | None) -> None:
+    """
+    Store (or remove) the stamp of a preview image.
+
+    Parameters
+    ----------
+    preview_fname
+        The path of the preview image
+    stamp
+        The inputs the preview was generated from (from
+        :py:func:`make_preview_stamp`), or None to remove any stored stamp (e.g.
+        if generating the preview failed)
+    """
+    stamp_fname = preview_stamp_path(preview_fname)
+    try:
+        if stamp is None:
+            stamp_fname.unlink(missing_ok=True)
+            return
+        with stamp_fname.open(mode="w", encoding="utf-8") as f:
+            json.dump(stamp, f)
+    except OSError as e:
+        _logger.warning("Could not write preview stamp %s: %s", stamp_fname, e)
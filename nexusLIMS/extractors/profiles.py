@@ -11,6 +11,7 @@ instrument-specific behavior.
 
 from __future__ import annotations
 
+import itertools
 import logging
 from typing import TYPE_CHECKING
 
@@ -25,6 +26,10 @@ __all__ = [
     "get_profile_registry",
 ]
 
+# each state of each registry is numbered uniquely (see
+# InstrumentProfileRegistry.generation)
+_generations = itertools.count()
+
 
 class InstrumentProfileRegistry:
     """
@@ -65,8 +70,20 @@ class InstrumentProfileRegistry:
     def __init__(self):
         """Initialize the profile registry."""
         self._profiles: dict[str, InstrumentProfile] = {}
+        self._generation = next(_generations)
         _logger.debug("Initialized InstrumentProfileRegistry")
 
+    @property
+    def generation(self) -> int:
+        """
+        A number that changes whenever a profile is registered or cleared.
+
+        Anything computed from the registered profiles (such as the profile
+        fingerprints of :py:mod:`nexusLIMS.extractors.cache`) can be kept for as
+        long as this stays the same.
+        """
+        return self._generation
+
     def register(self, profile: InstrumentProfile) -> None:
         """
         Register an instrument profile.
@@ -95,6 +112,7 @@ class InstrumentProfileRegistry:
             )
 
         self._profiles[profile.instrument_id] = profile
+        self._generation = next(_generations)
         _logger.debug("Registered profile for: %s", profile.instrument_id)
 
     def get_profile(self, instrument: Instrument | None) -> InstrumentProfile | None:
@@ -160,6 +178,7 @@ class InstrumentProfileRegistry:
         >>> registry.clear()
         """
         self._profiles.clear()
+        self._generation = next(_generations)
         _logger.debug("Cleared all instrument profiles")
 
 
@@ -16,6 +16,7 @@ from nexusLIMS.instruments import (
     instrument_db,
 )
 from nexusLIMS.utils.network import nexus_req
+from nexusLIMS.utils.stage_timing import timed_stage
 
 _logger = logging.getLogger(__name__)
 
@@ -894,13 +895,14 @@ class NemoConnector:
         # Build complete URL with custom encoding for __in filters
         url = self._build_url_with_params(base_url, params)
         _logger.info("getting data from %s", url)
-        response = nexus_req(
-            url,
-            verb,
-            token_auth=self.config["token"],
-            params=None,  # Already included in URL
-            retries=self.config["retries"],
-        )
+        with timed_stage("nemo_api", items=1):
+            response = nexus_req(
+                url,
+                verb,
+                token_auth=self.config["token"],
+                params=None,  # Already included in URL
+                retries=self.config["retries"],
+            )
         response.raise_for_status()
 
         return response.json()
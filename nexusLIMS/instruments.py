@@ -41,6 +41,19 @@ def _ensure_instrument_db_loaded():
         instrument_db.update(_get_instrument_db())
 
 
+def reload_instrument_db() -> None:
+    """
+    Forget the cached instruments, so they are read again on next access.
+
+    Used by long-running processes (such as ``nexuslims build-records
+    --daemon``) to pick up instruments added to or changed in the database
+    since they were first loaded.
+    """
+    global _instrument_db_initialized  # noqa: PLW0603
+    instrument_db.clear()
+    _instrument_db_initialized = False
+
+
 def _get_instrument_db(db_path: Path | str | None = None):
     """
     Get dictionary of instruments from the NexusLIMS database.
@@ -8,6 +8,8 @@ filenames by the files' modification times.
 
 import logging
 import math
+import sys
+from collections.abc import Iterator, Mapping, MutableMapping
 from dataclasses import dataclass, field
 from datetime import datetime as dt
 from pathlib import Path
@@ -19,20 +21,247 @@ from xml.sax.saxutils import escape
 import numpy as np
 from lxml import etree
 from pint import Quantity
-from scipy.signal import argrelextrema
-from sklearn.model_selection import GridSearchCV, LeaveOneOut
-from sklearn.neighbors import KernelDensity
 
 from nexusLIMS.config import settings
-from nexusLIMS.extractors import flatten_dict, parse_metadata
+from nexusLIMS.extractors import PreviewJob, flatten_dict, parse_metadata
 from nexusLIMS.extractors.xml_serialization import serialize_quantity_to_xml
 from nexusLIMS.schemas import em_glossary
+from nexusLIMS.utils.files import FileEntry
 from nexusLIMS.utils.time import current_system_tz
 
 _logger = logging.getLogger(__name__)
 
+_KDE_TRUNCATION = 8.0
+"""Distance (in bandwidths) beyond which kernel contributions are neglected"""
+_KDE_BIN_RESOLUTION = 256
+"""Number of bins per bandwidth used by the binned KDE"""
+_KDE_MAX_BINS = 2**22
+"""Largest binned KDE grid; smaller bandwidths are evaluated directly"""
+_KDE_RELIABLE_DENSITY = 1e-3
+"""Relative density below which binned KDE values are recomputed directly"""
+_KDE_CHUNK_SIZE = 2**22
+"""Maximum number of kernel evaluations held in memory at once"""
 
-def cluster_filelist_mtimes(filelist: List[str]) -> List[float]:
+
+class _Missing:
+    """Type of the sentinel for metadata keys that are not present in a file."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<missing>"
+
+    def __reduce__(self):
+        # unpickle as the module-level singleton, so identity checks keep
+        # working on activities returned from worker processes
+        return "_MISSING"
+
+
+_MISSING = _Missing()
+"""Sentinel for metadata keys that are not present in a file"""
+
+
+class MetadataKeyTable:
+    """
+    The metadata keys of the datasets in an acquisition activity.
+
+    Each key is (interned and) stored once, and assigned the position at which
+    its values are kept by every :py:class:`DatasetMetadata` sharing the table.
+    """
+
+    __slots__ = ("index", "keys")
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.keys: List[str] = []
+
+    def __len__(self):
+        """Return the number of keys in the table."""
+        return len(self.keys)
+
+    def position(self, key: str) -> int:
+        """
+        Get the position of a key, adding it to the table if it is new.
+
+        Parameters
+        ----------
+        key
+            The metadata key
+
+        Returns
+        -------
+        int
+            The index of ``key``'s value in each dataset's values
+        """
+        pos = self.index.get(key)
+        if pos is None:
+            if type(key) is str:
+                key = sys.intern(key)
+            pos = self.index[key] = len(self.keys)
+            self.keys.append(key)
+        return pos
+
+
+class DatasetMetadata(Mapping):
+    """
+    The flattened metadata of a single dataset, stored against a key table.
+
+    Behaves as a read-only dictionary, but only holds a tuple of values (with
+    :py:data:`_MISSING` for the table's keys the dataset does not have), so
+    the keys are not repeated for every dataset of an activity. Keys iterate in
+    the order they were added to the table.
+
+    Parameters
+    ----------
+    table
+        The key table shared by the datasets of an activity
+    meta
+        The metadata to store
+    """
+
+    __slots__ = ("_table", "_values")
+
+    def __init__(self, table: MetadataKeyTable, meta: Mapping[str, Any]):
+        values = []
+        for key, value in meta.items():
+            pos = table.position(key)
+            if pos >= len(values):
+                values.extend([_MISSING] * (pos + 1 - len(values)))
+            values[pos] = value
+        self._table = table
+        self._values = tuple(values)
+
+    def __getitem__(self, key):
+        """Get the value of a metadata key."""
+        pos = self._table.index.get(key)
+        if pos is not None and pos < len(self._values):
+            value = self._values[pos]
+            if value is not _MISSING:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the metadata keys present in this dataset."""
+        for key, value in zip(self._table.keys, self._values):
+            if value is not _MISSING:
+                yield key
+
+    def __len__(self):
+        """Return the number of metadata keys present in this dataset."""
+        return len(self._values) - self._values.count(_MISSING)
+
+    def __repr__(self):
+        """Return the metadata formatted as a dictionary."""
+        return repr(dict(self.items()))
+
+    def items(self):
+        """Return the (key, value) pairs present in this dataset."""
+        return [
+            (key, value)
+            for key, value in zip(self._table.keys, self._values)
+            if value is not _MISSING
+        ]
+
+
+class UniqueMetadataView(MutableMapping):
+    """
+    The metadata of a dataset that is not shared by its whole activity.
+
+    A view of a dataset's metadata that hides the activity's setup parameter
+    keys, rather than a copy of the remaining metadata. Values that are set
+    (or deleted) are kept in the view, without changing the underlying
+    metadata.
+
+    Parameters
+    ----------
+    meta
+        The dataset's metadata
+    exclude
+        The keys to hide (shared by the views of every dataset in an activity)
+    """
+
+    __slots__ = ("_changes", "_exclude", "_meta")
+
+    def __init__(self, meta: Mapping[str, Any], exclude: frozenset):
+        self._meta = meta
+        self._exclude = exclude
+        self._changes: Dict[str, Any] | None = None
+
+    def __getitem__(self, key):
+        """Get the value of a metadata key that is unique to this dataset."""
+        if self._changes is not None and key in self._changes:
+            value = self._changes[key]
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        if key in self._exclude:
+            raise KeyError(key)
+        return self._meta[key]
+
+    def __setitem__(self, key, value):
+        """Set the value of a metadata key in this view."""
+        if self._changes is None:
+            self._changes = {}
+        self._changes[key] = value
+
+    def __delitem__(self, key):
+        """Remove a metadata key from this view."""
+        if key not in self:
+            raise KeyError(key)
+        self[key] = _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the metadata keys unique to this dataset."""
+        changes = self._changes or {}
+        for key in self._meta:
+            if key not in self._exclude and key not in changes:
+                yield key
+        for key, value in changes.items():
+            if value is not _MISSING:
+                yield key
+
+    def __len__(self):
+        """Return the number of metadata keys unique to this dataset."""
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        """Return the metadata formatted as a dictionary."""
+        return repr(dict(self.items()))
+
+
+def _metadata_columns(
+    meta: List[Dict[str, Any]], keys: set | None = None
+) -> Dict[str, list]:
+    """
+    Transpose per-file metadata dictionaries into columns.
+
+    Parameters
+    ----------
+    meta
+        One metadata dictionary per file
+    keys
+        If given, only these keys are included in the columns
+
+    Returns
+    -------
+    dict
+        A list of values for each metadata key, indexed in the same order as
+        ``meta``, with ``_MISSING`` for files that do not contain the key
+    """
+    n_files = len(meta)
+    columns: Dict[str, list] = {}
+    for i, file_meta in enumerate(meta):
+        for key, value in file_meta.items():
+            column = columns.get(key)
+            if column is None:
+                if keys is not None and key not in keys:
+                    continue
+                column = columns[key] = [_MISSING] * n_files
+            column[i] = value
+    return columns
+
+
+def cluster_filelist_mtimes(filelist: List[FileEntry]) -> List[float]:
     """
     Cluster a list of files by modification time.
 
@@ -56,6 +285,16 @@ def cluster_filelist_mtimes(filelist: List[str]) -> List[float]:
     the distribution of the data itself, rather than a pre-supposed optimum.
     The KDE minima approach was suggested [here](https://stackoverflow.com/a/35151947/1435788).
 
+    The KDE engine is selected by the ``NX_CLUSTERING_METHOD`` environment
+    variable. ``"exact"`` (the default) uses scikit-learn's
+    :py:class:`~sklearn.model_selection.GridSearchCV` with Leave One Out
+    cross-validation, which scales quadratically with the number of files.
+    ``"binned"`` computes the same Leave One Out likelihood and KDE using
+    linearly binned, FFT-convolved densities (falling back to direct, truncated
+    kernel sums where the binned values are not accurate enough), which scales
+    to hundreds of thousands of files while choosing the same bandwidth and
+    boundaries.
+
     The sensitivity of the clustering can be controlled via the
     ``NX_CLUSTERING_SENSITIVITY`` environment variable:
 
@@ -66,7 +305,7 @@ def cluster_filelist_mtimes(filelist: List[str]) -> List[float]:
 
     Parameters
     ----------
-    filelist : List[str]
+    filelist : List[~nexusLIMS.utils.files.FileEntry]
         The files (as a list) whose timestamps will be interrogated to find
         "relatively" large gaps in acquisition time (as a means to find the
         breaks between discrete Acquisition Activities)
@@ -86,7 +325,7 @@ def cluster_filelist_mtimes(filelist: List[str]) -> List[float]:
 
     _logger.info("Starting clustering of file mtimes")
     start_timer = default_timer()
-    mtimes = sorted([f.stat().st_mtime for f in filelist])
+    mtimes = sorted([f.mtime for f in filelist])
 
     # remove duplicate file mtimes (since they cause errors below):
     mtimes = sorted(set(mtimes))
@@ -112,15 +351,27 @@ def cluster_filelist_mtimes(filelist: List[str]) -> List[float]:
         35,
         base=math.e,
     )
-    _logger.info("KDE bandwidth grid search")
-    grid = GridSearchCV(
-        KernelDensity(kernel="gaussian"),
-        {"bandwidth": bandwidths},
-        cv=LeaveOneOut(),
-        n_jobs=-1,
-    )
-    grid.fit(m_array)
-    bandwidth = grid.best_params_["bandwidth"]
+    binned = settings.NX_CLUSTERING_METHOD == "binned"
+    _logger.info("KDE bandwidth grid search (%s)", settings.NX_CLUSTERING_METHOD)
+    if binned:
+        loo_scores = [
+            _log_kde(m_array.ravel(), m_array.ravel(), bw, leave_one_out=True).mean()
+            for bw in bandwidths
+        ]
+        bandwidth = bandwidths[int(np.argmax(loo_scores))]
+    else:
+        # scikit-learn is slow to import, so only load it for the exact engine
+        from sklearn.model_selection import GridSearchCV, LeaveOneOut  # noqa: PLC0415
+        from sklearn.neighbors import KernelDensity  # noqa: PLC0415
+
+        grid = GridSearchCV(
+            KernelDensity(kernel="gaussian"),
+            {"bandwidth": bandwidths},
+            cv=LeaveOneOut(),
+            n_jobs=-1,
+        )
+        grid.fit(m_array)
+        bandwidth = grid.best_params_["bandwidth"]
 
     # Apply sensitivity adjustment: higher sensitivity = smaller bandwidth = more
     # activity boundaries detected. We divide by sensitivity so that values > 1
@@ -140,10 +391,15 @@ def cluster_filelist_mtimes(filelist: List[str]) -> List[float]:
     # Calculate AcquisitionActivity boundaries by "clustering" the timestamps
     # using KDE using KDTree nearest neighbor estimates, and the previously
     # identified "optimal" bandwidth
-    kde = KernelDensity(kernel="gaussian", bandwidth=bandwidth)
-    kde: KernelDensity = kde.fit(m_array)
     s = np.linspace(m_array.min(), m_array.max(), num=len(mtimes) * 10)
-    scores = kde.score_samples(s.reshape(-1, 1))
+    if binned:
+        scores = _log_kde(m_array.ravel(), s, bandwidth)
+    else:
+        kde = KernelDensity(kernel="gaussian", bandwidth=bandwidth)
+        kde: KernelDensity = kde.fit(m_array)
+        scores = kde.score_samples(s.reshape(-1, 1))
+
+    from scipy.signal import argrelextrema  # noqa: PLC0415
 
     mins = argrelextrema(scores, np.less)[0]  # the minima indices
     aa_boundaries = [s[m] for m in mins]  # the minima mtime values
@@ -157,6 +413,166 @@ def cluster_filelist_mtimes(filelist: List[str]) -> List[float]:
     return aa_boundaries
 
 
+def _log_kde(
+    data: np.ndarray,
+    points: np.ndarray,
+    bandwidth: float,
+    *,
+    leave_one_out: bool = False,
+) -> np.ndarray:
+    """
+    Evaluate the log-density of a Gaussian KDE of ``data`` at ``points``.
+
+    Gives the same values as :py:meth:`sklearn.neighbors.KernelDensity.score_samples`
+    (to within floating point precision), but scales to very large inputs. Kernel
+    sums are computed on a linearly binned grid using an FFT convolution, and any
+    values that are too small relative to the peak density to be computed
+    accurately this way (e.g. in the gaps between clusters of files) are
+    recomputed directly from the nearby data points in log space.
+
+    Parameters
+    ----------
+    data
+        The (sorted and unique) values the KDE is built from
+    points
+        The values (within the range of ``data``) at which to evaluate the KDE
+    bandwidth
+        The bandwidth of the Gaussian kernel
+    leave_one_out
+        If ``True``, ``points`` must be ``data`` itself, and the density at each
+        point is computed from all *other* data points (as in Leave One Out
+        cross-validation)
+
+    Returns
+    -------
+    numpy.ndarray
+        The log-density of the KDE at each of ``points``
+    """
+    n_fit = len(data) - 1 if leave_one_out else len(data)
+    log_sums = np.empty(len(points))
+    direct = np.ones(len(points), dtype=bool)
+
+    sums = _binned_kernel_sums(data, points, bandwidth, leave_one_out=leave_one_out)
+    if sums is not None:
+        direct = sums <= _KDE_RELIABLE_DENSITY * max(sums.max(), 0)
+        log_sums[~direct] = np.log(sums[~direct])
+    if direct.any():
+        log_sums[direct] = _direct_log_kernel_sums(
+            data,
+            points[direct],
+            bandwidth,
+            self_index=np.flatnonzero(direct) if leave_one_out else None,
+        )
+
+    return log_sums - math.log(n_fit * bandwidth * math.sqrt(2 * math.pi))
+
+
+def _binned_kernel_sums(
+    data: np.ndarray,
+    points: np.ndarray,
+    bandwidth: float,
+    *,
+    leave_one_out: bool,
+) -> np.ndarray | None:
+    """
+    Compute (unnormalized) Gaussian kernel sums using a linearly binned grid.
+
+    Returns ``None`` if the grid needed for this bandwidth would be too large,
+    in which case kernel sums should be computed directly instead.
+    """
+    delta = bandwidth / _KDE_BIN_RESOLUTION
+    n_bins = math.ceil((data[-1] - data[0]) / delta) + 2
+    if n_bins > _KDE_MAX_BINS:
+        return None
+
+    # spread each data point over its two neighbouring bins
+    pos = (data - data[0]) / delta
+    left = np.floor(pos).astype(int)
+    frac = pos - left
+    counts = np.bincount(left, weights=1 - frac, minlength=n_bins)
+    counts += np.bincount(left + 1, weights=frac, minlength=n_bins)
+
+    from scipy.signal import fftconvolve  # noqa: PLC0415
+
+    half_width = math.ceil(_KDE_TRUNCATION * _KDE_BIN_RESOLUTION)
+    kernel = np.exp(
+        -0.5 * (np.arange(-half_width, half_width + 1) * delta / bandwidth) ** 2
+    )
+    grid_sums = fftconvolve(counts, kernel, mode="same")
+
+    # linearly interpolate the kernel sums at the requested points
+    pos = (points - data[0]) / delta
+    idx = np.clip(np.floor(pos).astype(int), 0, n_bins - 2)
+    t = pos - idx
+    sums = (1 - t) * grid_sums[idx] + t * grid_sums[idx + 1]
+
+    if leave_one_out:
+        # remove each point's own (binned and interpolated) contribution
+        k_1 = math.exp(-0.5 / _KDE_BIN_RESOLUTION**2)
+        sums -= (1 - t) * ((1 - t) + t * k_1) + t * ((1 - t) * k_1 + t)
+
+    return sums
+
+
+def _direct_log_kernel_sums(
+    data: np.ndarray,
+    points: np.ndarray,
+    bandwidth: float,
+    self_index: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Compute the log of (unnormalized) Gaussian kernel sums directly.
+
+    Only data points within :py:data:`_KDE_TRUNCATION` bandwidths of the nearest
+    data point are summed for each point, which makes this fast for points in
+    sparse regions. If ``self_index`` is given, ``points`` are
+    ``data[self_index]`` and each point's own contribution is excluded.
+    """
+    if self_index is None:
+        right = np.searchsorted(data, points).clip(max=len(data) - 1)
+        left = (right - 1).clip(min=0)
+        nearest = np.minimum(np.abs(points - data[left]), np.abs(data[right] - points))
+    else:
+        gaps = np.diff(data)
+        nearest = np.minimum(
+            np.concatenate(([np.inf], gaps))[self_index],
+            np.concatenate((gaps, [np.inf]))[self_index],
+        )
+    radius = nearest + _KDE_TRUNCATION * bandwidth
+    lo = np.searchsorted(data, points - radius, side="left")
+    counts = np.searchsorted(data, points + radius, side="right") - lo
+    cumulative = np.cumsum(counts)
+
+    log_sums = np.empty(len(points))
+    start = 0
+    while start < len(points):
+        done = cumulative[start - 1] if start else 0
+        end = max(
+            start + 1,
+            int(np.searchsorted(cumulative, done + _KDE_CHUNK_SIZE, side="right")),
+        )
+        chunk_counts = counts[start:end]
+        seg_starts = np.concatenate(([0], np.cumsum(chunk_counts)[:-1]))
+        j = np.repeat(lo[start:end] - seg_starts, chunk_counts) + np.arange(
+            chunk_counts.sum()
+        )
+        exponents = (
+            -0.5
+            * ((np.repeat(points[start:end], chunk_counts) - data[j]) / bandwidth) ** 2
+        )
+        if self_index is not None:
+            exponents[j == np.repeat(self_index[start:end], chunk_counts)] = -np.inf
+        peaks = np.maximum.reduceat(exponents, seg_starts)
+        log_sums[start:end] = peaks + np.log(
+            np.add.reduceat(
+                np.exp(exponents - np.repeat(peaks, chunk_counts)), seg_starts
+            )
+        )
+        start = end
+
+    return log_sums
+
+
 def _escape(val: Any) -> Any:
     """
     Check to see if a value needs to be escaped and escape it or just return it as is.
@@ -185,6 +601,8 @@ def _add_dataset_element(  # noqa: PLR0913
     preview_path: Path | None = None,
     signal_index: int | None = None,
     total_signals: int | None = None,
+    *,
+    preview_pending: bool = False,
 ):
     # escape any bad characters in the filename
     file = _escape(file)
@@ -221,14 +639,15 @@ def _add_dataset_element(  # noqa: PLR0913
     dset_loc_el = etree.SubElement(dset_el, "location")
     dset_loc_el.text = rel_fname
 
-    # check if preview image exists before adding it XML structure
+    # check if preview image exists (or will be generated once the record is
+    # built) before adding it XML structure
     if rel_thumb_name[0] == "/":
         test_path = Path(settings.NX_DATA_PATH) / unquote(rel_thumb_name)[1:]
     else:  # pragma: no cover
         # this shouldn't happen, but just in case...
         test_path = Path(settings.NX_DATA_PATH) / unquote(rel_thumb_name)
 
-    if test_path.exists():
+    if preview_pending or test_path.exists():
         dset_prev_el = etree.SubElement(dset_el, "preview")
         dset_prev_el.text = rel_thumb_name
 
@@ -279,7 +698,8 @@ class AcquisitionActivity:
         A list of dictionaries (one for each file in this
         AcquisitionActivity) containing metadata key-value pairs that are
         unique to each file in ``files`` (i.e. those that could not be moved
-        into ``setup_params``)
+        into ``setup_params``). :py:meth:`store_unique_metadata` stores these
+        as :py:class:`UniqueMetadataView` instances rather than copies
     files : list
         A list of filenames belonging to this AcquisitionActivity
     previews : list
@@ -287,10 +707,21 @@ class AcquisitionActivity:
         ``files``
     meta : list
         A list of dictionaries containing the "important" metadata for each
-        file in ``files``
+        file in ``files``. Files added with :py:meth:`add_file` or
+        :py:meth:`add_parsed_file` store these as :py:class:`DatasetMetadata`
+        instances sharing ``metadata_keys``
     warnings : list
         A list of metadata values that may be untrustworthy because of the
         software
+    pending_previews : list
+        A list of :py:class:`~nexusLIMS.extractors.PreviewJob` for the previews
+        of files in ``files`` that have not been generated yet (see the
+        ``defer_preview`` argument of :py:meth:`add_file`)
+    metadata_keys : MetadataKeyTable
+        The metadata keys of every file added to this AcquisitionActivity
+    file_sizes : dict
+        The size in bytes of each file in ``files`` whose size was given to
+        :py:meth:`add_parsed_file` (keyed by filename)
     """
 
     start: dt | None = None
@@ -303,6 +734,11 @@ class AcquisitionActivity:
     previews: list = field(default_factory=list)
     meta: list = field(default_factory=list)
     warnings: list = field(default_factory=list)
+    pending_previews: list = field(default_factory=list)
+    metadata_keys: MetadataKeyTable = field(
+        default_factory=MetadataKeyTable, repr=False, compare=False
+    )
+    file_sizes: dict = field(default_factory=dict, repr=False, compare=False)
 
     def __post_init__(self):
         """Post-initialization to set defaults for start/end times."""
@@ -325,7 +761,14 @@ class AcquisitionActivity:
         """Return custom string representation of AcquisitionActivity."""
         return f"{self.start.isoformat()} AcquisitionActivity {self.mode}"
 
-    def add_file(self, fname: Path, *, generate_preview=True):
+    def add_file(
+        self,
+        fname: Path,
+        *,
+        generate_preview=True,
+        force_preview=False,
+        defer_preview=False,
+    ):
         """
         Add file to AcquisitionActivity.
 
@@ -344,64 +787,123 @@ class AcquisitionActivity:
             The file to be added to the file list
         generate_preview : bool
             Whether or not to create the preview thumbnail images
+        force_preview : bool
+            Whether to regenerate preview thumbnails even if they are up to date
+        defer_preview : bool
+            Whether to only record the previews that need to be generated (in
+            ``pending_previews``) rather than generating them now
         """
         if fname.exists():
-            gen_prev = generate_preview
-            meta_list, preview_fnames = parse_metadata(fname, generate_preview=gen_prev)
-
-            if meta_list is None:
-                # Something bad happened, so we need to alert the user
-                _logger.warning("Could not parse metadata of %s", fname)
-                # Still add the file to maintain original behavior
-                self.files.append(str(fname))
-                self.previews.append(None)
-                self.meta.append({})
-                self.warnings.append([])
-            else:
-                # meta_list is always a list of dicts, one per signal
-                for i, signal_meta in enumerate(meta_list):
-                    self.files.append(
-                        str(fname)
-                    )  # Same file, repeated for multi-signal
-
-                    # Merge extensions into root level before flattening
-                    # This ensures vendor-specific fields appear at root in XML
-                    nx_meta = signal_meta["nx_meta"].copy()
-                    if "extensions" in nx_meta:
-                        extensions = nx_meta.pop("extensions")
-                        nx_meta.update(extensions)
-
-                    # Convert EM Glossary snake_case fields to display names for XML
-                    # Only convert fields that are in snake_case (contain underscores)
-
-                    nx_meta_for_xml = {}
-                    for field_name, value in nx_meta.items():
-                        # Only convert snake_case EM Glossary field names
-                        if "_" in field_name and field_name.islower():
-                            display_name = em_glossary.get_display_name(field_name)
-                            nx_meta_for_xml[display_name] = value
-                        else:
-                            # Keep original name (DatasetType, Data Type, etc.)
-                            nx_meta_for_xml[field_name] = value
-
-                    self.meta.append(
-                        flatten_dict(nx_meta_for_xml, separator=" – ")  # noqa: RUF001
-                    )
-
-                    # Handle previews (always a list)
-                    if preview_fnames and i < len(preview_fnames):
-                        self.previews.append(preview_fnames[i])
-
-                    # Handle warnings
-                    if "warnings" in signal_meta["nx_meta"]:
-                        self.warnings.append(
-                            [" ".join(w) for w in signal_meta["nx_meta"]["warnings"]],
-                        )
-                    else:
-                        self.warnings.append([])
+            meta_list, preview_fnames = parse_metadata(
+                fname,
+                generate_preview=generate_preview,
+                force_preview=force_preview,
+                defer_preview=defer_preview,
+            )
+            self.add_parsed_file(
+                fname, meta_list, preview_fnames, previews_deferred=defer_preview
+            )
         else:
             msg = f"{fname} was not found"
             raise FileNotFoundError(msg)
+
+    def add_parsed_file(
+        self,
+        fname: Path,
+        meta_list: List[Dict[str, Any]] | None,
+        preview_fnames: List[Path] | None,
+        *,
+        previews_deferred: bool = False,
+        size: int | None = None,
+    ):
+        """
+        Add an already-parsed file to AcquisitionActivity.
+
+        Store the output of :py:func:`~nexusLIMS.extractors.parse_metadata` for
+        ``fname`` exactly as :py:meth:`add_file` would. This allows metadata
+        extraction and preview generation to happen elsewhere (e.g. in a worker
+        pool) while files are still added to the activity in order.
+
+        Parameters
+        ----------
+        fname : str
+            The file to be added to the file list
+        meta_list : list[dict] or None
+            The list of metadata dicts (one per signal) returned by
+            :py:func:`~nexusLIMS.extractors.parse_metadata`, or ``None`` if the
+            file's metadata could not be parsed
+        preview_fnames : list[pathlib.Path] or None
+            The preview image paths returned by
+            :py:func:`~nexusLIMS.extractors.parse_metadata`
+        previews_deferred : bool
+            Whether ``parse_metadata`` was called with ``defer_preview=True``,
+            in which case the previews are added to ``pending_previews``
+        size : int or None
+            The file's size in bytes, if already known (e.g. from a
+            :py:class:`~nexusLIMS.utils.files.FileEntry`); stored in
+            ``file_sizes``
+        """
+        if size is not None:
+            self.file_sizes[str(fname)] = size
+        if meta_list is None:
+            # Something bad happened, so we need to alert the user
+            _logger.warning("Could not parse metadata of %s", fname)
+            # Still add the file to maintain original behavior
+            self.files.append(str(fname))
+            self.previews.append(None)
+            self.meta.append(DatasetMetadata(self.metadata_keys, {}))
+            self.warnings.append([])
+        else:
+            # meta_list is always a list of dicts, one per signal
+            for i, signal_meta in enumerate(meta_list):
+                self.files.append(str(fname))  # Same file, repeated for multi-signal
+
+                # Merge extensions into root level before flattening
+                # This ensures vendor-specific fields appear at root in XML
+                nx_meta = signal_meta["nx_meta"].copy()
+                if "extensions" in nx_meta:
+                    extensions = nx_meta.pop("extensions")
+                    nx_meta.update(extensions)
+
+                # Convert EM Glossary snake_case fields to display names for XML
+                # Only convert fields that are in snake_case (contain underscores)
+
+                nx_meta_for_xml = {}
+                for field_name, value in nx_meta.items():
+                    # Only convert snake_case EM Glossary field names
+                    if "_" in field_name and field_name.islower():
+                        display_name = em_glossary.get_display_name(field_name)
+                        nx_meta_for_xml[display_name] = value
+                    else:
+                        # Keep original name (DatasetType, Data Type, etc.)
+                        nx_meta_for_xml[field_name] = value
+
+                self.meta.append(
+                    DatasetMetadata(
+                        self.metadata_keys,
+                        flatten_dict(nx_meta_for_xml, separator=" – "),  # noqa: RUF001
+                    )
+                )
+
+                # Handle previews (always a list)
+                if preview_fnames and i < len(preview_fnames):
+                    self.previews.append(preview_fnames[i])
+                    if previews_deferred and preview_fnames[i] is not None:
+                        self.pending_previews.append(
+                            PreviewJob(
+                                fname,
+                                preview_fnames[i],
+                                i if len(meta_list) > 1 else None,
+                            )
+                        )
+
+                # Handle warnings
+                if "warnings" in signal_meta["nx_meta"]:
+                    self.warnings.append(
+                        [" ".join(w) for w in signal_meta["nx_meta"]["warnings"]],
+                    )
+                else:
+                    self.warnings.append([])
         _logger.debug("appended %s to files", fname)
         _logger.debug("self.files is now %s", self.files)
 
@@ -453,72 +955,21 @@ class AcquisitionActivity:
         if values_to_search is None:
             values_to_search = self.unique_params
 
-        # meta will be individual dictionaries, since self.meta is list of dicts
+        # a key is a setup parameter only if it is present in every file with
+        # a value equal to that of the first file
         setup_params = {}
-        for i, (meta, _file) in enumerate(zip(self.meta, self.files)):
-            # loop through the values_to_search
-            # using .copy() on the set allows us to remove values during each
-            # iteration, as described in:
-            # https://stackoverflow.com/a/22847851/1435788
-            for vts in values_to_search.copy():
-                # for the first iteration through the list of dictionaries,
-                # store any value found for a parameter
-                # as a "setup parameter". if it is not found, do not store it
-                # and remove from values_to_search to prevent it being searched
-                # on subsequent iterations.
-                if i == 0:
-                    if vts in meta:
-                        # this value was found in meta, so store it
-                        setup_params[vts] = meta[vts]
-                        _logger.debug(
-                            "iter: %i; adding %s = %s to setup_params",
-                            i,
-                            vts,
-                            meta[vts],
-                        )
-                    else:
-                        # this value wasn't present in meta, so it can't be
-                        # common to all, so remove it:
-                        _logger.debug("iter: %i; removing %s", i, vts)
-                        values_to_search.remove(vts)
-                # On the subsequent iterations test if values are same/different
-                # If different, then remove the key from setup_params and
-                # values_to_search, so at the end only identical values remain
-                # and duplicate value checks are minimized
-                else:
-                    if vts not in setup_params:
-                        # this condition should probably not be reached,
-                        # but if it is, it means this value, which should
-                        # have already been added to setup_params is somehow
-                        # new, so delete vts from values to search
-                        _logger.debug(
-                            "iter: %i; removing %s",
-                            i,
-                            vts,
-                        )  # pragma: no cover
-                        values_to_search.remove(vts)  # pragma: no cover
-                    # Check if the parameter is missing in this file OR
-                    # has a different value
-                    if vts not in meta or setup_params[vts] != meta[vts]:
-                        # Parameter is either missing or has different value,
-                        # so this must be individual dataset metadata.
-                        # Remove it from setup_params and values_to_search
-                        _logger.debug(
-                            "iter: %i; vts=%s - "
-                            "%s; "
-                            "removing %s from setup_params and values to search",
-                            i,
-                            vts,
-                            "not in meta"
-                            if vts not in meta
-                            else (
-                                f"meta[vts]={meta[vts]} != "
-                                f"setup_params[vts]={setup_params[vts]}"
-                            ),
-                            vts,
-                        )
-                        del setup_params[vts]
-                        values_to_search.remove(vts)
+        columns = _metadata_columns(self.meta, set(values_to_search))
+        for key, column in columns.items():
+            first = column[0]
+            if first is _MISSING:
+                continue
+            if all(value is not _MISSING and first == value for value in column[1:]):
+                setup_params[key] = first
+        _logger.debug(
+            "Found %i setup parameters among %i metadata keys",
+            len(setup_params),
+            len(values_to_search),
+        )
 
         self.setup_params = setup_params
 
@@ -538,21 +989,10 @@ class AcquisitionActivity:
             )
             return
 
-        unique_meta = []
-        for meta in self.meta:
-            tmp_unique = {}
-            # loop through each metadata dict, and if a given key k in meta is
-            # not present in self.setup_params, add it to the
-            # current dictionary (u_m) of unique_meta
-            for k, v in meta.items():
-                if k not in self.setup_params:
-                    # this means k is unique to this file, so add it to
-                    # unique_meta
-                    tmp_unique[k] = v
-            unique_meta.append(tmp_unique)
-
-        # store what we calculated as unique metadata into the attribute
-        self.unique_meta = unique_meta
+        # views of each file's metadata that hide the setup parameters, so the
+        # metadata is not copied
+        setup_keys = frozenset(self.setup_params)
+        self.unique_meta = [UniqueMetadataView(meta, setup_keys) for meta in self.meta]
 
     def as_xml(self, seqno, sample_id):
         """
@@ -620,6 +1060,7 @@ class AcquisitionActivity:
 
         # Reset counters for actual iteration
         file_signal_indices = dict.fromkeys(file_signal_counts, 0)
+        pending = {str(job.preview_fname) for job in self.pending_previews}
 
         for _file, meta, unique_meta, warning, preview in zip(
             self.files,
@@ -641,6 +1082,7 @@ class AcquisitionActivity:
                 preview_path=preview,
                 signal_index=signal_index,
                 total_signals=total_signals,
+                preview_pending=str(preview) in pending,
             )
 
             # Increment the signal index for this file
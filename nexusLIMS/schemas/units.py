@@ -43,7 +43,7 @@ from pathlib import Path
 from typing import Any
 
 import numpy as np
-from pint import UnitRegistry
+from pint import UnitRegistry, set_application_registry
 from rdflib import RDFS, Graph, Namespace
 
 logger = logging.getLogger(__name__)
@@ -91,6 +91,10 @@ QUDT_UNIT = Namespace("http://qudt.org/vocab/unit/")
 # Define custom microscopy units
 ureg.define("kiloX = 1000 = kX")  # Magnification in thousands (e.g., 160 kX = 160000x)
 
+# Register as the application registry so that pickled Quantities (e.g. metadata
+# returned from builder worker processes) are restored against this registry
+set_application_registry(ureg)
+
 # Magic values for scientific notation formatting
 _MIN_MAGNITUDE_FOR_NORMAL_NOTATION = 1e-3
 _MAX_MAGNITUDE_FOR_NORMAL_NOTATION = 1e6
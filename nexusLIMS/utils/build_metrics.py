@@ -0,0 +1,269 @@
+"""Prometheus metrics of record builder runs.
+
+At the end of each run of the record builder,
+:py:func:`~nexusLIMS.builder.record_builder.process_new_records` writes the
+metrics of the run to :ref:`NX_METRICS_FILE <config-metrics-file>` in the
+Prometheus text exposition format, so they can be collected by the
+`textfile collector <https://github.com/prometheus/node_exporter#textfile-collector>`_
+of the Prometheus node exporter.
+
+The metrics are computed from the stage measurements of the run (see
+:py:mod:`nexusLIMS.utils.stage_timing`), the export results, and the status
+each session was given, which :py:meth:`Session.update_session_status
+<nexusLIMS.db.session_handler.Session.update_session_status>` reports with
+:py:func:`record_session_status`. Every metric describes the latest run only
+(the file is replaced by each run), so all of them are gauges or histograms of
+that run.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+from nexusLIMS.db.enums import RecordStatus
+from nexusLIMS.utils.stage_timing import LATENCY_BUCKETS, StageTiming
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from nexusLIMS.exporters.base import ExportResult
+
+_logger = logging.getLogger(__name__)
+
+__all__ = [
+    "format_build_metrics",
+    "record_session_status",
+    "reset_build_metrics",
+    "write_build_metrics",
+]
+
+_EXPORT_STAGE_PREFIX = "export:"
+_NEMO_API_STAGE = "nemo_api"
+
+_session_statuses: Dict[str, RecordStatus] = {}
+
+
+def record_session_status(session_identifier: str, status: RecordStatus) -> None:
+    """
+    Note the status a session was given during this run.
+
+    Parameters
+    ----------
+    session_identifier
+        The session whose status was updated
+    status
+        The new status of the session (a later status replaces an earlier one)
+    """
+    _session_statuses[session_identifier] = status
+
+
+def reset_build_metrics() -> None:
+    """Forget the session statuses noted before the start of a run."""
+    _session_statuses.clear()
+
+
+def _labels(**labels: str) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels.items()
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _header(name: str, kind: str, description: str) -> List[str]:
+    return [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+
+
+def _histogram(
+    name: str, series: Iterable[tuple[Dict[str, str], StageTiming]]
+) -> List[str]:
+    lines = []
+    for labels, timing in series:
+        cumulative = 0
+        for bound, count in zip(
+            (*LATENCY_BUCKETS, "+Inf"), timing.latency_counts, strict=True
+        ):
+            cumulative += count
+            lines.append(
+                f"{name}_bucket{_labels(**labels, le=str(bound))} {cumulative}"
+            )
+        lines.append(f"{name}_sum{_labels(**labels)} {timing.wall_time}")
+        lines.append(f"{name}_count{_labels(**labels)} {timing.calls}")
+    return lines
+
+
+def format_build_metrics(
+    timings: Iterable[StageTiming],
+    export_results: Dict[Path, List[ExportResult]],
+    *,
+    bytes_read: int,
+    duration: float,
+    timestamp: float | None = None,
+) -> str:
+    """
+    Format the metrics of a record builder run.
+
+    Parameters
+    ----------
+    timings
+        The stage measurements of the run
+    export_results
+        The results of exporting the run's records (as returned by
+        :py:func:`~nexusLIMS.exporters.export_records`)
+    bytes_read
+        The total size of the files included in the run's records, in bytes
+    duration
+        The wall time of the whole run, in seconds
+    timestamp
+        When the run finished, as a Unix timestamp (by default, now)
+
+    Returns
+    -------
+    str
+        The metrics, in the Prometheus text exposition format
+    """
+    # add up each stage's measurements over all sessions
+    by_stage: Dict[str, StageTiming] = {}
+    for timing in timings:
+        total = by_stage.setdefault(timing.stage, StageTiming(timing.stage))
+        total.merge(timing)
+
+    lines = _header(
+        "nexuslims_build_last_run_timestamp_seconds",
+        "gauge",
+        "When the last record builder run finished.",
+    )
+    lines.append(
+        "nexuslims_build_last_run_timestamp_seconds "
+        f"{time.time() if timestamp is None else timestamp}"
+    )
+    lines += _header(
+        "nexuslims_build_run_duration_seconds",
+        "gauge",
+        "Wall time of the last record builder run.",
+    )
+    lines.append(f"nexuslims_build_run_duration_seconds {duration}")
+
+    statuses = defaultdict(int)
+    for status in _session_statuses.values():
+        statuses[status] += 1
+    lines += _header(
+        "nexuslims_build_sessions",
+        "gauge",
+        "Sessions processed by the last run, by their final record status.",
+    )
+    lines += [
+        f"nexuslims_build_sessions{_labels(status=status.value)} {statuses[status]}"
+        for status in RecordStatus
+    ]
+
+    for name, stage, description in (
+        ("files_extracted", "extraction", "Files whose metadata was extracted."),
+        ("previews_generated", "preview", "Preview images generated."),
+    ):
+        lines += _header(f"nexuslims_build_{name}", "gauge", description)
+        items = by_stage[stage].items if stage in by_stage else 0
+        lines.append(f"nexuslims_build_{name} {items}")
+    lines += _header(
+        "nexuslims_build_bytes_read",
+        "gauge",
+        "Total size of the files included in the records built.",
+    )
+    lines.append(f"nexuslims_build_bytes_read {bytes_read}")
+
+    exports = defaultdict(int)
+    for results in export_results.values():
+        for result in results:
+            exports[result.destination_name, result.success] += 1
+    lines += _header(
+        "nexuslims_build_exports",
+        "gauge",
+        "Record exports attempted, by destination and result.",
+    )
+    lines += [
+        "nexuslims_build_exports"
+        f"{_labels(destination=dest, result='success' if ok else 'failure')} {n}"
+        for (dest, ok), n in sorted(exports.items())
+    ]
+
+    stages = {
+        s: t
+        for s, t in by_stage.items()
+        if s != _NEMO_API_STAGE and not s.startswith(_EXPORT_STAGE_PREFIX)
+    }
+    lines += _header(
+        "nexuslims_build_stage_duration_seconds",
+        "histogram",
+        "Wall time of each run of a record builder stage.",
+    )
+    lines += _histogram(
+        "nexuslims_build_stage_duration_seconds",
+        (({"stage": s}, t) for s, t in sorted(stages.items())),
+    )
+    lines += _header(
+        "nexuslims_build_stage_cpu_seconds",
+        "gauge",
+        "Total CPU time used by each record builder stage.",
+    )
+    lines += [
+        f"nexuslims_build_stage_cpu_seconds{_labels(stage=s)} {t.cpu_time}"
+        for s, t in sorted(stages.items())
+    ]
+
+    lines += _header(
+        "nexuslims_build_export_duration_seconds",
+        "histogram",
+        "Wall time of each record export, by destination.",
+    )
+    lines += _histogram(
+        "nexuslims_build_export_duration_seconds",
+        (
+            ({"destination": s.removeprefix(_EXPORT_STAGE_PREFIX)}, t)
+            for s, t in sorted(by_stage.items())
+            if s.startswith(_EXPORT_STAGE_PREFIX)
+        ),
+    )
+
+    nemo = by_stage.get(_NEMO_API_STAGE, StageTiming(_NEMO_API_STAGE))
+    lines += _header(
+        "nexuslims_build_nemo_api_request_duration_seconds",
+        "histogram",
+        "Wall time of each NEMO API request.",
+    )
+    lines += _histogram(
+        "nexuslims_build_nemo_api_request_duration_seconds", [({}, nemo)]
+    )
+    return "\n".join(lines) + "\n"
+
+
+def write_build_metrics(path: Path, metrics: str) -> None:
+    """
+    Write the metrics of a record builder run to a file.
+
+    The file is replaced atomically, so a metrics collector never reads a
+    partially written file. Errors are logged rather than raised, so a run
+    never fails because its metrics could not be written.
+
+    Parameters
+    ----------
+    path
+        The file to write
+    metrics
+        The metrics of the run (see :py:func:`format_build_metrics`)
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(metrics, encoding="utf-8")
+        tmp_path.replace(path)
+    except OSError as e:
+        _logger.warning("Could not write build metrics to %s: %s", path, e)
+        tmp_path.unlink(missing_ok=True)
+    else:
+        _logger.info("Wrote build metrics to %s", path)
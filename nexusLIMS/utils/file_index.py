@@ -0,0 +1,434 @@
+"""Persistent index of the files in instrument filestores.
+
+Finding the files for a session with GNU ``find`` walks an instrument's entire
+``filestore_path`` every time, which dominates build time for filestores with
+millions of historical files. When :ref:`NX_FILE_INDEX_ENABLED
+<config-file-index-enabled>` is set, the record builder instead answers file
+searches from a SQLite index of each filestore's files (path, modification
+time, size, and extension), stored at ``NX_DATA_PATH/file_index.sqlite``.
+
+Before every search, the index is refreshed incrementally: each directory of
+the filestore is ``stat``-ed, but only the directories whose modification time
+changed since they were last indexed (i.e. files were added, removed, or
+renamed in them) are listed again. Since writing to an existing file does not
+change its directory's modification time, directories that contained recently
+modified files when they were indexed are listed again on every refresh until
+they have been quiet for :py:data:`_SETTLE_SECONDS`. A settled directory is
+also listed again by a search whose time window ends after the directory was
+last listed, since one of its files may have been rewritten in place within the
+window since then. The first search of a recent session lists the whole
+filestore again, but the later searches of a build (whose windows end before
+that) do not. The files a search finds are ``stat``-ed again before they are
+returned, so a file rewritten in place after its directory was listed is
+reported with its current modification time and size (or left out if it is no
+longer in the search window), and its directory is listed again by the next
+refresh.
+
+The index is a disposable cache; deleting the file is always safe, and it will
+be rebuilt by the next search.
+"""
+
+import fnmatch
+import logging
+import os
+import sqlite3
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from nexusLIMS.config import settings
+from nexusLIMS.utils.files import FileEntry, _tz_offset
+
+_logger = logging.getLogger(__name__)
+
+# a directory is only trusted to be unchanged if its modification time matches
+# the indexed one and nothing in it had been modified for this many seconds when
+# it was indexed (files still being written do not update their directory's
+# modification time)
+_SETTLE_SECONDS = 3600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    tree TEXT NOT NULL,
+    path TEXT NOT NULL,
+    parent TEXT,
+    mtime REAL NOT NULL,
+    newest REAL NOT NULL,
+    scanned REAL NOT NULL,
+    PRIMARY KEY (tree, path)
+);
+CREATE TABLE IF NOT EXISTS links (
+    tree TEXT NOT NULL,
+    directory TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (tree, path)
+);
+CREATE TABLE IF NOT EXISTS files (
+    tree TEXT NOT NULL,
+    directory TEXT NOT NULL,
+    name TEXT NOT NULL,
+    extension TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (tree, directory, name)
+);
+CREATE INDEX IF NOT EXISTS files_by_mtime ON files (tree, mtime);
+CREATE INDEX IF NOT EXISTS links_by_directory ON links (tree, directory);
+"""
+
+
+def _extension(name: str) -> str:
+    """Get the lower-cased last extension of a file name (without the dot)."""
+    return name.rpartition(".")[2].lower() if "." in name else ""
+
+
+class FileIndex:
+    """
+    A persistent, incrementally refreshed index of instrument filestore files.
+
+    Each indexed directory tree is keyed by its absolute path (an instrument's
+    filestore path, or a symbolic link to a directory within it). Searches
+    return the same files as
+    :py:func:`~nexusLIMS.utils.files.gnu_find_files_by_mtime` (with
+    ``followlinks=True``), including its handling of symbolic links and of
+    :ref:`NX_IGNORE_PATTERNS <config-ignore-patterns>`.
+
+    Parameters
+    ----------
+    db_path
+        The path to the SQLite database file holding the index (created if it
+        does not exist)
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the index database, creating its tables if needed."""
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def refresh(self, path: Path) -> List[str]:
+        """
+        Bring the index of a filestore up to date with the filesystem.
+
+        Parameters
+        ----------
+        path
+            The filestore path to refresh, relative to the
+            :ref:`NX_INSTRUMENT_DATA_PATH <config-instrument-data-path>`
+
+        Returns
+        -------
+        List[str]
+            The indexed trees that a search of ``path`` covers: the symbolic
+            links to directories within ``path`` if there are any (mirroring
+            :py:func:`~nexusLIMS.utils.files.gnu_find_files_by_mtime`), or else
+            ``path`` itself
+        """
+        conn = self._connect()
+        try:
+            return self._refresh(conn, self._base_path(path))
+        finally:
+            conn.close()
+
+    def find_files_by_mtime(
+        self,
+        path: Path,
+        dt_from: datetime,
+        dt_to: datetime,
+        extensions: List[str] | None = None,
+    ) -> List[FileEntry]:
+        """
+        Find files modified between two times using the index.
+
+        The index of ``path`` is refreshed first, so the results are the same as
+        those of :py:func:`~nexusLIMS.utils.files.gnu_find_files_by_mtime`.
+
+        Parameters
+        ----------
+        path
+            The root path from which to start the search, relative to
+            the :ref:`NX_INSTRUMENT_DATA_PATH <config-instrument-data-path>`
+        dt_from
+            The "starting" point of the search timeframe (exclusive)
+        dt_to
+            The "ending" point of the search timeframe (inclusive)
+        extensions
+            A list of strings representing the extensions to find. If None,
+            all files between are found between the two times.
+
+        Returns
+        -------
+        List[FileEntry]
+            A list of the files that have modification times within the
+            time range provided (sorted by modification time)
+
+        Raises
+        ------
+        OSError
+            If the filestore could not be listed
+        sqlite3.Error
+            If the index database could not be read or updated
+        """
+        dt_from += _tz_offset if dt_from.tzinfo is None else timedelta(0)
+        dt_to += _tz_offset if dt_to.tzinfo is None else timedelta(0)
+
+        base_path = self._base_path(path)
+        if not base_path.exists():
+            _logger.info("Path %s does not exist, returning empty file list", base_path)
+            return []
+
+        conn = self._connect()
+        try:
+            trees = self._refresh(conn, base_path, dt_to.timestamp())
+            query = (
+                "SELECT directory, name, mtime, size FROM files "  # noqa: S608
+                f"WHERE tree IN ({', '.join('?' * len(trees))}) "
+                "AND mtime > ? AND mtime <= ?"
+            )
+            params = [*trees, dt_from.timestamp(), dt_to.timestamp()]
+            patterns = None
+            if extensions is not None:
+                patterns = [f"*.{ext}".lower() for ext in extensions]
+                # narrow the query with the indexed extensions when each pattern
+                # is a plain extension (the patterns are always checked below)
+                if not any(set(ext) & set(".*?[") for ext in extensions):
+                    query += f" AND extension IN ({', '.join('?' * len(extensions))})"
+                    params += [ext.lower() for ext in extensions]
+            rows = conn.execute(query, params).fetchall()
+
+            ignore_patterns = [p.lower() for p in settings.NX_IGNORE_PATTERNS]
+            files = []
+            for directory, name, mtime, size in rows:
+                lower_name = name.lower()
+                if patterns is not None and not any(
+                    fnmatch.fnmatchcase(lower_name, p) for p in patterns
+                ):
+                    continue
+                if any(fnmatch.fnmatchcase(lower_name, p) for p in ignore_patterns):
+                    continue
+                files.append(FileEntry(Path(directory) / name, mtime, size))
+            files = self._restat(
+                conn, trees, files, dt_from.timestamp(), dt_to.timestamp()
+            )
+        finally:
+            conn.close()
+        files.sort(key=lambda f: f.mtime)
+        _logger.info("Found %i files in the file index", len(files))
+        return files
+
+    @staticmethod
+    def _restat(
+        conn: sqlite3.Connection,
+        trees: List[str],
+        files: List[FileEntry],
+        start: float,
+        end: float,
+    ) -> List[FileEntry]:
+        """
+        Check found files against the filesystem, updating any that changed.
+
+        Files rewritten in place after their directory was last listed keep
+        their indexed modification time and size until it is listed again, so
+        the files found are ``stat``-ed again. Changed files are updated in the
+        index (their directory is marked as recently modified, so the next
+        refresh lists it again), and only the files still within the search
+        window are returned.
+        """
+        current = []
+        changed = []
+        for file in files:
+            try:
+                stat = file.path.stat()
+            except FileNotFoundError:
+                # removed since the refresh; the next one will drop it
+                continue
+            if stat.st_mtime == file.mtime and stat.st_size == file.size:
+                current.append(file)
+                continue
+            changed.append((stat.st_mtime, stat.st_size, file))
+            if start < stat.st_mtime <= end:
+                current.append(FileEntry(file.path, stat.st_mtime, stat.st_size))
+
+        if changed:
+            _logger.debug(
+                "%i indexed files were modified in place; updating the index",
+                len(changed),
+            )
+            in_trees = f"tree IN ({', '.join('?' * len(trees))})"
+            conn.executemany(
+                f"UPDATE files SET mtime = ?, size = ? WHERE {in_trees} "  # noqa: S608
+                "AND directory = ? AND name = ?",
+                [
+                    (mtime, size, *trees, str(f.path.parent), f.path.name)
+                    for mtime, size, f in changed
+                ],
+            )
+            now = time.time()
+            conn.executemany(
+                f"UPDATE directories SET newest = ? WHERE {in_trees} AND path = ?",  # noqa: S608
+                [(now, *trees, str(f.path.parent)) for _, _, f in changed],
+            )
+        return current
+
+    @staticmethod
+    def _base_path(path: Path) -> Path:
+        return Path(str(settings.NX_INSTRUMENT_DATA_PATH)) / path
+
+    def _refresh(
+        self,
+        conn: sqlite3.Connection,
+        base_path: Path,
+        window_end: float | None = None,
+    ) -> List[str]:
+        """
+        Refresh a filestore's tree and those of the symlinks within it.
+
+        If the end of a search's time window (``window_end``) is given, the
+        settled directories last listed before it are listed again (see
+        :py:meth:`_refresh_tree`).
+        """
+        # take the write lock for the whole refresh, so concurrent builders
+        # wait for (and then reuse) this refresh rather than repeating it
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._refresh_tree(conn, str(base_path), window_end)
+            # links whose target has since been removed are skipped, like the
+            # "-xtype d" test used to find them
+            links = [
+                link
+                for (link,) in conn.execute(
+                    "SELECT path FROM links WHERE tree = ? ORDER BY path",
+                    (str(base_path),),
+                )
+                if Path(link).is_dir()
+            ]
+            for link in links:
+                self._refresh_tree(conn, link, window_end)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return links or [str(base_path)]
+
+    def _refresh_tree(
+        self, conn: sqlite3.Connection, tree: str, window_end: float | None = None
+    ) -> None:
+        """
+        Incrementally refresh the index of one directory tree.
+
+        Like ``find -H``, the root of the tree is dereferenced if it is a
+        symbolic link, but no other symbolic links are followed. A settled
+        directory is only trusted for a search window ending at ``window_end``
+        if it was listed after that: a file rewritten in place since then would
+        not have changed the directory's modification time.
+        """
+        known: Dict[str, Tuple[float, float, float]] = {}
+        children: Dict[str, List[str]] = defaultdict(list)
+        for path, parent, mtime, newest, scanned in conn.execute(
+            "SELECT path, parent, mtime, newest, scanned FROM directories "
+            "WHERE tree = ?",
+            (tree,),
+        ):
+            known[path] = (mtime, newest, scanned)
+            children[parent].append(path)
+
+        now = time.time()
+        seen = set()
+        n_scanned = 0
+        stack: List[Tuple[str, str | None]] = [(tree, None)]
+        while stack:
+            directory, parent = stack.pop()
+            try:
+                mtime = Path(directory).stat().st_mtime
+            except FileNotFoundError:
+                # removed since its parent was listed
+                if parent is None:
+                    raise
+                continue
+            seen.add(directory)
+            previous = known.get(directory)
+            if (
+                previous is not None
+                and previous[0] == mtime
+                and previous[2] - max(mtime, previous[1]) >= _SETTLE_SECONDS
+                and (window_end is None or previous[2] >= window_end)
+            ):
+                stack.extend((child, directory) for child in children[directory])
+                continue
+            subdirs = self._scan_directory(conn, tree, directory, parent, mtime, now)
+            stack.extend((subdir, directory) for subdir in subdirs)
+            n_scanned += 1
+
+        removed = [(tree, path) for path in known.keys() - seen]
+        if removed:
+            conn.executemany(
+                "DELETE FROM files WHERE tree = ? AND directory = ?", removed
+            )
+            conn.executemany(
+                "DELETE FROM links WHERE tree = ? AND directory = ?", removed
+            )
+            conn.executemany(
+                "DELETE FROM directories WHERE tree = ? AND path = ?", removed
+            )
+        _logger.debug(
+            "Refreshed file index of %s: listed %i of %i directories, "
+            "removed %i directories",
+            tree,
+            n_scanned,
+            len(seen),
+            len(removed),
+        )
+
+    @staticmethod
+    def _scan_directory(  # noqa: PLR0913
+        conn: sqlite3.Connection,
+        tree: str,
+        directory: str,
+        parent: str | None,
+        mtime: float,
+        now: float,
+    ) -> List[str]:
+        """List a directory, replace its index entries, and return its subdirs."""
+        files = []
+        links = []
+        subdirs = []
+        newest = 0.0
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    files.append(
+                        (
+                            tree,
+                            directory,
+                            entry.name,
+                            _extension(entry.name),
+                            stat.st_mtime,
+                            stat.st_size,
+                        )
+                    )
+                    newest = max(newest, stat.st_mtime)
+                elif entry.is_symlink() and entry.is_dir():
+                    links.append((tree, directory, entry.path))
+
+        conn.execute(
+            "DELETE FROM files WHERE tree = ? AND directory = ?", (tree, directory)
+        )
+        conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)", files)
+        conn.execute(
+            "DELETE FROM links WHERE tree = ? AND directory = ?", (tree, directory)
+        )
+        conn.executemany("INSERT INTO links VALUES (?, ?, ?)", links)
+        conn.execute(
+            "INSERT OR REPLACE INTO directories VALUES (?, ?, ?, ?, ?, ?)",
+            (tree, directory, parent, mtime, newest, now),
+        )
+        return subdirs
@@ -4,10 +4,12 @@ import logging
 import os
 import subprocess
 import warnings
+from bisect import bisect_right
 from datetime import datetime, timedelta
+from operator import attrgetter
 from pathlib import Path
 from shutil import copyfile
-from typing import List
+from typing import List, NamedTuple
 
 from nexusLIMS.config import settings
 
@@ -17,6 +19,52 @@ _logger = logging.getLogger(__name__)
 # running tests from Mountain Time on files in Eastern Time)
 _tz_offset = timedelta(hours=0)
 
+# output format for GNU find's -printf: modification time (seconds since the
+# epoch), size in bytes, and path, separated by tabs and terminated by a NUL
+_FIND_PRINTF_FORMAT = "%T@\\t%s\\t%p\\0"
+
+
+class FileEntry(NamedTuple):
+    """
+    A file found for a record, along with the results of a single ``stat``.
+
+    File finding populates these once (directly from the output of GNU ``find``
+    when possible), so that sorting, clustering, and assigning files to
+    acquisition activities do not need to ``stat`` each file again, which is
+    expensive on network-mounted filestores.
+
+    Attributes
+    ----------
+    path : pathlib.Path
+        The path to the file
+    mtime : float
+        The file's modification time (seconds since the epoch)
+    size : int
+        The file's size in bytes
+    """
+
+    path: Path
+    mtime: float
+    size: int
+
+    @classmethod
+    def from_path(cls, path: Path) -> "FileEntry":
+        """
+        Create an entry for a file by running ``stat`` on it.
+
+        Parameters
+        ----------
+        path
+            The path to the file
+
+        Returns
+        -------
+        FileEntry
+            The entry for the file
+        """
+        stat = Path(path).stat()
+        return cls(Path(path), stat.st_mtime, stat.st_size)
+
 
 def find_dirs_by_mtime(
     path: str,
@@ -299,7 +347,7 @@ def _build_find_command(  # noqa: PLR0913
         cmd.pop()
         cmd += [")"]
 
-    cmd += ["-print0"]
+    cmd += ["-printf", _FIND_PRINTF_FORMAT]
     return cmd
 
 
@@ -310,15 +358,16 @@ def gnu_find_files_by_mtime(
     extensions: List[str] | None = None,
     *,
     followlinks: bool = True,
-) -> List[Path]:
+) -> List[FileEntry]:
     """
     Find files modified between two times.
 
     Given two timestamps, find files under a path that were
     last modified between the two. Uses the system-provided GNU ``find``
-    command. In basic testing, this method was found to be approximately 3 times
-    faster than using :py:meth:`find_files_by_mtime` (which is implemented in
-    pure Python).
+    command, which also reports each file's modification time and size, so
+    the files do not need to be ``stat``-ed again afterwards. In basic testing,
+    this method was found to be approximately 3 times faster than using
+    :py:meth:`find_files_by_mtime` (which is implemented in pure Python).
 
     Parameters
     ----------
@@ -346,7 +395,7 @@ def gnu_find_files_by_mtime(
 
     Returns
     -------
-    List[str]
+    List[FileEntry]
         A list of the files that have modification times within the
         time range provided (sorted by modification time)
 
@@ -391,16 +440,55 @@ def gnu_find_files_by_mtime(
     _logger.info('Running via subprocess.run (as string): "%s"', " ".join(cmd))
     out = subprocess.run(cmd, capture_output=True, check=True)
 
-    # Process results
-    files = out.stdout.split(b"\x00")
-    files = [Path(f.decode()) for f in files if len(f) > 0]
-    files = list(set(files))
-    files.sort(key=lambda f: f.stat().st_mtime)
+    # Process results (the same file may be found via more than one symlink)
+    entries = {}
+    for line in out.stdout.split(b"\x00"):
+        if len(line) > 0:
+            mtime, size, fname = line.decode().split("\t", 2)
+            entries[Path(fname)] = FileEntry(Path(fname), float(mtime), int(size))
+    files = sorted(entries.values(), key=lambda f: f.mtime)
     _logger.info("Found %i files", len(files))
 
     return files
 
 
+def select_files_by_mtime(
+    files: List[FileEntry],
+    dt_from: datetime,
+    dt_to: datetime,
+) -> List[FileEntry]:
+    """
+    Select the files modified between two times from an already-found list.
+
+    Uses the same bounds as :py:func:`gnu_find_files_by_mtime` (modified after
+    ``dt_from``, up to and including ``dt_to``), so selecting from the files found
+    for a wider timeframe gives the same files as searching for this timeframe
+    directly.
+
+    Parameters
+    ----------
+    files
+        A list of files sorted by modification time, as returned by
+        :py:func:`gnu_find_files_by_mtime`
+    dt_from
+        The "starting" point of the timeframe
+    dt_to
+        The "ending" point of the timeframe
+
+    Returns
+    -------
+    List[FileEntry]
+        The files of ``files`` that have modification times within the time range
+        provided (sorted by modification time)
+    """
+    dt_from += _tz_offset if dt_from.tzinfo is None else timedelta(0)
+    dt_to += _tz_offset if dt_to.tzinfo is None else timedelta(0)
+    mtime = attrgetter("mtime")
+    start = bisect_right(files, dt_from.timestamp(), key=mtime)
+    end = bisect_right(files, dt_to.timestamp(), lo=start, key=mtime)
+    return files[start:end]
+
+
 def _zero_bytes(fname: Path, bytes_from, bytes_to) -> Path:
     """
     Set certain byte locations within a file to zero.
@@ -1,6 +1,8 @@
 """Network and HTTP utilities for NexusLIMS."""
 
+import atexit
 import logging
+import os
 import tempfile
 import time
 from pathlib import Path
@@ -15,6 +17,77 @@ from nexusLIMS.harvesters import get_ca_bundle_content
 _logger = logging.getLogger(__name__)
 _ssl_warning_logged = False
 
+# One session (and so one pool of keep-alive connections) per process, created
+# on first use. A worker process forked from a parent that already made
+# requests must not share the parent's sockets, so it starts its own session.
+_session: Session | None = None
+
+# The custom CA bundle combined with the system certificates, written to a file
+# once per process (and used by its forked children) for the session to verify
+# servers with
+_ca_bundle: str | None = None
+
+
+def _get_session() -> Session:
+    """Get this process's HTTP session, creating it on first access."""
+    global _session  # noqa: PLW0603
+    if _session is None:
+        # no urllib3 retry logic - nexus_req handles retries itself
+        _session = Session()
+        _session.mount("https://", HTTPAdapter())
+        _session.mount("http://", HTTPAdapter())
+        # set once for the session, rather than per request, since urllib3
+        # keeps a separate pool of connections for each set of TLS settings
+        _session.verify = _get_verify()
+    return _session
+
+
+def _get_verify() -> bool | str:
+    """
+    Get how the servers' certificates are verified, for the ``verify`` option.
+
+    Returns
+    -------
+    bool or str
+        ``False`` if ``NX_DISABLE_SSL_VERIFY`` is set (which is warned about once
+        per process), the path to the combined CA bundle if a custom CA bundle
+        is configured, or else ``True`` (the system certificates are used)
+    """
+    global _ssl_warning_logged, _ca_bundle  # noqa: PLW0603
+    if settings.NX_DISABLE_SSL_VERIFY:
+        if not _ssl_warning_logged:
+            _logger.warning(
+                "NX_DISABLE_SSL_VERIFY is enabled — SSL certificate "
+                "verification is disabled for all requests. This should "
+                "only be used during local development or testing."
+            )
+            _ssl_warning_logged = True
+        return False
+
+    if _ca_bundle is None and (ca_bundle_content := get_ca_bundle_content()):
+        with tempfile.NamedTemporaryFile(suffix=".pem", delete=False) as tmp:
+            with Path(certifi.where()).open(mode="rb") as sys_cert:
+                tmp.writelines(sys_cert.readlines())
+            tmp.writelines(ca_bundle_content)
+        _ca_bundle = tmp.name
+        atexit.register(_remove_ca_bundle, tmp.name, os.getpid())
+    return _ca_bundle or True
+
+
+def _remove_ca_bundle(path: str, pid: int) -> None:
+    # only the process that wrote the bundle removes it, not its forked children
+    if os.getpid() == pid:
+        Path(path).unlink(missing_ok=True)
+
+
+def _forget_session() -> None:
+    global _session  # noqa: PLW0603
+    _session = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_session)
+
 
 def nexus_req(
     url: str,
@@ -30,7 +103,10 @@ def nexus_req(
     A helper method that wraps a function from :py:mod:`requests`, but adds a
     local certificate authority chain to validate any custom certificates.
     Will automatically retry on transient server errors (502, 503, 504) with
-    exponential backoff.
+    exponential backoff. Requests made by the same process share one
+    :py:class:`requests.Session`, so connections to a server are kept alive
+    and reused between requests. Cookies are not shared, though: each request
+    starts without any, as it would with a session of its own.
 
     Parameters
     ----------
@@ -62,64 +138,41 @@ def nexus_req(
     # Status codes that should trigger a retry (transient server errors)
     retry_status_codes = {502, 503, 504}
 
-    # Set up a session (without urllib3 retry logic - we'll handle it ourselves)
-    s = Session()
-    s.mount("https://", HTTPAdapter())
-    s.mount("http://", HTTPAdapter())
-
-    verify_arg = True
+    s = _get_session()
     response = None
 
-    # honour NX_DISABLE_SSL_VERIFY (warn once per process)
-    global _ssl_warning_logged  # noqa: PLW0603
-    if settings.NX_DISABLE_SSL_VERIFY:
-        verify_arg = False
-        if not _ssl_warning_logged:
-            _logger.warning(
-                "NX_DISABLE_SSL_VERIFY is enabled — SSL certificate "
-                "verification is disabled for all requests. This should "
-                "only be used during local development or testing."
-            )
-            _ssl_warning_logged = True
+    # Retry loop with exponential backoff
+    for attempt in range(retries + 1):
+        # cookies set by earlier responses (e.g. from another server's API)
+        # are not sent along
+        s.cookies.clear()
+        response = s.request(function, url, **kwargs)
 
-    with tempfile.NamedTemporaryFile() as tmp:
-        if verify_arg is not False and (ca_bundle_content := get_ca_bundle_content()):
-            with Path(certifi.where()).open(mode="rb") as sys_cert:
-                lines = sys_cert.readlines()
-            tmp.writelines(lines)
-            tmp.writelines(ca_bundle_content)
-            tmp.seek(0)
-            verify_arg = tmp.name
-
-        # Retry loop with exponential backoff
-        for attempt in range(retries + 1):
-            response = s.request(function, url, verify=verify_arg, **kwargs)
-
-            # If we got a successful response or non-retryable error, return it
-            if response.status_code not in retry_status_codes:
-                return response
-
-            # If this is our last attempt, return the failed response
-            if attempt == retries:
-                _logger.warning(
-                    "Request to %s failed with %s after %s attempts",
-                    url,
-                    response.status_code,
-                    retries + 1,
-                )
-                return response
-
-            # Calculate backoff delay: 1s, 2s, 4s, 8s, etc.
-            delay = 2**attempt
-            _logger.debug(
-                "Request to %s returned %s, retrying in %ss (attempt %s/%s)",
+        # If we got a successful response or non-retryable error, return it
+        if response.status_code not in retry_status_codes:
+            return response
+
+        # If this is our last attempt, return the failed response
+        if attempt == retries:
+            _logger.warning(
+                "Request to %s failed with %s after %s attempts",
                 url,
                 response.status_code,
-                delay,
-                attempt + 1,
                 retries + 1,
             )
-            time.sleep(delay)
+            return response
+
+        # Calculate backoff delay: 1s, 2s, 4s, 8s, etc.
+        delay = 2**attempt
+        _logger.debug(
+            "Request to %s returned %s, retrying in %ss (attempt %s/%s)",
+            url,
+            response.status_code,
+            delay,
+            attempt + 1,
+            retries + 1,
+        )
+        time.sleep(delay)
 
     # This should never be reached in normal execution, but provides a fallback
     # if the retry loop somehow doesn't execute (e.g., invalid retries parameter)
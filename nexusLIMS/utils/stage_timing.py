@@ -0,0 +1,280 @@
+"""Timing of the stages of record builds.
+
+:py:func:`timed_stage` measures a stage of a build (e.g. finding a session's
+files, extracting a file's metadata, or exporting a record to a destination):
+its wall time, CPU time, the increase in the process's peak resident set size,
+and the number of items it processed. Measurements of the same stage for the
+same session are added together in memory, so a stage that runs once per file
+costs one row per session rather than one per file.
+
+Stages measured in worker processes are collected with :py:func:`drain_timings`
+and sent back to the parent process along with the worker's result, where
+:py:func:`add_timings` merges them. At the end of a build,
+:py:func:`save_stage_timings` stores everything measured in the
+``build_stage_timing`` table (see
+:py:class:`~nexusLIMS.db.models.BuildStageTiming`), one row per session and
+stage.
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime as dt
+from timeit import default_timer
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session as DBSession
+
+from nexusLIMS.db.engine import get_engine
+from nexusLIMS.db.models import BuildStageTiming
+from nexusLIMS.utils.time import current_system_tz
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # not available on Windows; peak RSS deltas are recorded as 0
+    resource = None
+
+_logger = logging.getLogger(__name__)
+
+__all__ = [
+    "LATENCY_BUCKETS",
+    "StageTiming",
+    "add_timings",
+    "drain_timings",
+    "peak_rss",
+    "reset_timings",
+    "save_stage_timings",
+    "session_timing",
+    "timed_stage",
+]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+"""Upper bounds (in seconds) of the buckets of :py:attr:`StageTiming.latency_counts`"""
+
+
+@dataclass
+class StageTiming:
+    """
+    The measurements of a build stage for a session.
+
+    Parameters
+    ----------
+    stage
+        The name of the stage (e.g. ``"extraction"`` or ``"export:cdcs"``)
+    session_identifier
+        The session the stage ran for, or None for stages of the whole build
+        (e.g. ``"preflight"``)
+    wall_time
+        The total wall time of the stage, in seconds
+    cpu_time
+        The total CPU time used by the stage's process, in seconds
+    peak_rss_delta
+        The largest increase in the peak resident set size of the stage's
+        process during a single run of the stage, in KiB
+    items
+        The total number of items (e.g. files or sessions) the stage processed
+    calls
+        The number of times the stage ran
+    latency_counts
+        The number of runs of the stage whose wall time fell in each of the
+        :py:data:`LATENCY_BUCKETS` (the last count is of runs that took longer
+        than the largest bucket)
+    """
+
+    stage: str
+    session_identifier: str | None = None
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    peak_rss_delta: int = 0
+    items: int = 0
+    calls: int = 0
+    latency_counts: List[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1), repr=False
+    )
+
+    def merge(self, other: StageTiming) -> None:
+        """Add the measurements of another run of the same stage to these."""
+        self.wall_time += other.wall_time
+        self.cpu_time += other.cpu_time
+        self.peak_rss_delta = max(self.peak_rss_delta, other.peak_rss_delta)
+        self.items += other.items
+        self.calls += other.calls
+        self.latency_counts = [
+            a + b
+            for a, b in zip(self.latency_counts, other.latency_counts, strict=True)
+        ]
+
+
+_timings: Dict[Tuple[str | None, str], StageTiming] = {}
+_current_session: List[str | None] = [None]
+
+
+def peak_rss() -> int:
+    """Get the peak resident set size of this process, in KiB."""
+    if resource is None:  # pragma: no cover
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, and in KiB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _record(timing: StageTiming) -> None:
+    key = (timing.session_identifier, timing.stage)
+    if key in _timings:
+        _timings[key].merge(timing)
+    else:
+        _timings[key] = timing
+
+
+@contextmanager
+def session_timing(session_identifier: str) -> Iterator[None]:
+    """
+    Attribute the stages measured in this context to a session.
+
+    Parameters
+    ----------
+    session_identifier
+        The session being built
+    """
+    _current_session.append(session_identifier)
+    try:
+        yield
+    finally:
+        _current_session.pop()
+
+
+@contextmanager
+def timed_stage(
+    stage: str, session_identifier: str | None = None, items: int = 0
+) -> Iterator[StageTiming]:
+    """
+    Measure a build stage.
+
+    The measurements are recorded even if the stage raises an exception.
+
+    Parameters
+    ----------
+    stage
+        The name of the stage
+    session_identifier
+        The session the stage runs for (by default, the session of the
+        enclosing :py:func:`session_timing`, if any)
+    items
+        The number of items the stage processes (can also be set on the
+        yielded :py:class:`StageTiming` once known)
+
+    Yields
+    ------
+    StageTiming
+        The measurements of this run of the stage
+    """
+    timing = StageTiming(
+        stage,
+        session_identifier or _current_session[-1],
+        items=items,
+        calls=1,
+    )
+    wall, cpu, rss = default_timer(), time.process_time(), peak_rss()
+    try:
+        yield timing
+    finally:
+        timing.wall_time = default_timer() - wall
+        timing.cpu_time = time.process_time() - cpu
+        timing.peak_rss_delta = peak_rss() - rss
+        timing.latency_counts[bisect_left(LATENCY_BUCKETS, timing.wall_time)] += 1
+        _record(timing)
+
+
+def add_timings(timings: List[StageTiming]) -> None:
+    """
+    Merge stage measurements returned by a worker process into this process's.
+
+    Parameters
+    ----------
+    timings
+        The measurements (as returned by :py:func:`drain_timings` in the
+        worker); those without a session are attributed to the session of the
+        enclosing :py:func:`session_timing`, if any
+    """
+    for timing in timings:
+        if timing.session_identifier is None:
+            timing.session_identifier = _current_session[-1]
+        _record(timing)
+
+
+def drain_timings() -> List[StageTiming]:
+    """
+    Remove and return the stage measurements recorded in this process.
+
+    Returns
+    -------
+    list[StageTiming]
+        One entry per session and stage
+    """
+    timings = list(_timings.values())
+    _timings.clear()
+    return timings
+
+
+def reset_timings() -> None:
+    """Discard the stage measurements (e.g. those inherited by a forked worker)."""
+    _timings.clear()
+    del _current_session[1:]
+
+
+def save_stage_timings(run_id: str, timings: List[StageTiming] | None = None) -> int:
+    """
+    Store the stage measurements of a build in the database.
+
+    Database errors are logged rather than raised, so a build never fails
+    because its timings could not be stored.
+
+    Parameters
+    ----------
+    run_id
+        An identifier of the build, shared by all of its rows
+    timings
+        The measurements to store (by default, those drained with
+        :py:func:`drain_timings`)
+
+    Returns
+    -------
+    int
+        The number of rows stored
+    """
+    if timings is None:
+        timings = drain_timings()
+    if not timings:
+        return 0
+    now = dt.now(tz=current_system_tz())
+    try:
+        with DBSession(get_engine()) as db:
+            db.add_all(
+                BuildStageTiming(
+                    run_id=run_id,
+                    session_identifier=t.session_identifier,
+                    stage=t.stage,
+                    wall_time=t.wall_time,
+                    cpu_time=t.cpu_time,
+                    peak_rss_delta=t.peak_rss_delta,
+                    items=t.items,
+                    calls=t.calls,
+                    timestamp=now,
+                )
+                for t in timings
+            )
+            db.commit()
+    except SQLAlchemyError as e:
+        _logger.warning("Could not store build stage timings: %s", e)
+        return 0
+    return len(timings)
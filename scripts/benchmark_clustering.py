@@ -0,0 +1,85 @@
+"""Benchmark the file clustering engines used to separate Acquisition Activities.
+
+Times :py:func:`nexusLIMS.schemas.activity.cluster_filelist_mtimes` on
+synthetic sessions of increasing size for each ``NX_CLUSTERING_METHOD``. The
+``exact`` engine scales quadratically, so it is only run up to
+``--exact-max-files`` timestamps; where both engines run, the script also checks
+that they split the files into the same activities.
+
+Requires a configured NexusLIMS environment (``.env`` file or ``NX_*``
+environment variables).
+"""
+
+import argparse
+import os
+from pathlib import Path
+from timeit import default_timer
+
+import numpy as np
+
+from nexusLIMS.config import refresh_settings
+from nexusLIMS.schemas.activity import cluster_filelist_mtimes
+from nexusLIMS.utils.files import FileEntry
+
+
+def _synthetic_session(n_files: int, seed: int = 0) -> list[FileEntry]:
+    """Make a session of bursts of files separated by breaks of 5-60 minutes."""
+    rng = np.random.default_rng(seed)
+    n_bursts = max(1, n_files // 500)
+    sizes = np.full(n_bursts, n_files // n_bursts)
+    sizes[: n_files - sizes.sum()] += 1
+    mtimes = []
+    start = 1.6e9
+    for size in sizes:
+        burst = start + rng.exponential(rng.uniform(0.5, 30), size=size).cumsum()
+        mtimes.extend(burst)
+        start = burst[-1] + rng.uniform(300, 3600)
+    return [FileEntry(Path(f"file_{i}.dm3"), t, 0) for i, t in enumerate(mtimes)]
+
+
+def _run(files: list[FileEntry], method: str) -> tuple[list[float], float]:
+    os.environ["NX_CLUSTERING_METHOD"] = method
+    refresh_settings()
+    start = default_timer()
+    boundaries = cluster_filelist_mtimes(files)
+    return boundaries, default_timer() - start
+
+
+def main() -> None:
+    """Run the clustering benchmark and print a table of timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 5_000, 10_000, 100_000],
+        help="Numbers of files (timestamps) to benchmark",
+    )
+    parser.add_argument(
+        "--exact-max-files",
+        type=int,
+        default=5_000,
+        help="Largest session to run with the (quadratic) exact engine",
+    )
+    args = parser.parse_args()
+
+    print(f"{'files':>8} {'exact (s)':>10} {'binned (s)':>11} {'activities':>11}")
+    for n_files in args.sizes:
+        files = _synthetic_session(n_files)
+        mtimes = np.array(sorted(f.mtime for f in files))
+        binned, binned_time = _run(files, "binned")
+        exact_time = "-"
+        if n_files <= args.exact_max_files:
+            exact, elapsed = _run(files, "exact")
+            exact_time = f"{elapsed:.2f}"
+            if not np.array_equal(
+                np.searchsorted(exact, mtimes), np.searchsorted(binned, mtimes)
+            ):
+                print(f"  warning: engines disagree for {n_files} files")
+        print(
+            f"{n_files:>8} {exact_time:>10} {binned_time:>11.2f} {len(binned) + 1:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
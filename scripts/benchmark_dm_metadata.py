@@ -0,0 +1,114 @@
+"""Benchmark reading the tags of Digital Micrograph files.
+
+Times, per file, the two ways
+:py:func:`nexusLIMS.extractors.plugins.digital_micrograph.get_dm3_metadata` can
+get the tags of a .dm3/.dm4 file:
+
+* ``hyperspy``: loading the file lazily with HyperSpy
+  (:py:func:`~nexusLIMS.extractors.plugins.digital_micrograph.load_dm3_tags_with_hyperspy`),
+  which creates a signal for each image
+* ``native``: parsing only the file's tag tree
+  (:py:func:`~nexusLIMS.extractors.plugins.digital_micrograph.read_dm3_tags`)
+
+and warns if they give different tags or data shapes. By default, the DM files
+of the unit test fixtures are benchmarked.
+
+Requires a configured NexusLIMS environment (``.env`` file or ``NX_*``
+environment variables).
+"""
+
+import argparse
+import tarfile
+import tempfile
+from pathlib import Path
+from timeit import default_timer
+
+from nexusLIMS.extractors.plugins.digital_micrograph import (
+    _prune_dm3_tags,
+    load_dm3_tags_with_hyperspy,
+    read_dm3_tags,
+)
+
+_FIXTURES = Path(__file__).parents[1] / "tests" / "unit" / "files"
+
+
+def _extract_fixtures(dest: Path) -> list[Path]:
+    for archive in sorted(_FIXTURES.glob("*.dm[34].tar.gz")):
+        with tarfile.open(archive) as tar:
+            tar.extractall(dest, filter="data")
+    return sorted(dest.glob("*.dm[34]"))
+
+
+def _time(func, fname: Path, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = default_timer()
+        result = func(fname)
+        best = min(best, default_timer() - start)
+    return result, best
+
+
+def _same(native, hyperspy) -> bool:
+    return len(native) == len(hyperspy) and all(
+        shape == hs_shape and _prune_dm3_tags(tags) == _prune_dm3_tags(hs_tags)
+        for (tags, shape), (hs_tags, hs_shape) in zip(native, hyperspy)
+    )
+
+
+def main() -> None:
+    """Run the DM tag reading benchmark and print a table of timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "files",
+        type=Path,
+        nargs="*",
+        help="DM files to benchmark (default: the unit test fixtures)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of times to read each file (the fastest time is reported)",
+    )
+    args = parser.parse_args()
+
+    # import HyperSpy (and its file readers) before timing anything
+    start = default_timer()
+    from hyperspy.io import load  # noqa: F401, PLC0415
+
+    print(f"Imported HyperSpy in {default_timer() - start:.3f} s (once per process)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = args.files or _extract_fixtures(Path(tmp))
+        width = max(len(f.name) for f in files)
+        print(
+            f"{'file':<{width}} {'size (MB)':>10} {'signals':>8} "
+            f"{'hyperspy (s)':>13} {'native (s)':>11} {'speedup':>8}"
+        )
+        total_hyperspy = total_native = 0.0
+        for fname in files:
+            try:
+                native, native_time = _time(read_dm3_tags, fname, args.repeat)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                print(f"{fname.name:<{width}} could not be read natively: {exc!r}")
+                continue
+            hyperspy, hyperspy_time = _time(
+                load_dm3_tags_with_hyperspy, fname, args.repeat
+            )
+            total_hyperspy += hyperspy_time
+            total_native += native_time
+            print(
+                f"{fname.name:<{width}} {fname.stat().st_size / 1e6:>10.1f} "
+                f"{len(native):>8} {hyperspy_time:>13.4f} {native_time:>11.4f} "
+                f"{hyperspy_time / native_time:>7.1f}x"
+            )
+            if hyperspy is None or not _same(native, hyperspy):
+                print(f"WARNING: the tags of {fname.name} differ from HyperSpy's")
+        print(
+            f"{'total':<{width}} {'':>10} {'':>8} {total_hyperspy:>13.4f} "
+            f"{total_native:>11.4f} {total_hyperspy / total_native:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark validating records against the Nexus Experiment schema.
+
+Writes synthetic records of increasing size (in activities of 1,000 datasets,
+each with a few unique metadata values) with
+:py:func:`nexusLIMS.builder.record_builder.write_record_xml`, then times, per
+record:
+
+* ``per-call``: parsing and compiling the schema, parsing the record, and
+  validating it (what every validation used to cost)
+* ``tree``: validating the already-parsed record with the compiled schema
+  (:py:meth:`~nexusLIMS.builder.validation.RecordValidator.validate`)
+* ``file``: validating the record incrementally from disk with the compiled
+  schema (:py:meth:`~nexusLIMS.builder.validation.RecordValidator.validate_file`)
+
+Requires a configured NexusLIMS environment (``.env`` file or ``NX_*``
+environment variables).
+"""
+
+import argparse
+import tempfile
+from datetime import UTC
+from datetime import datetime as dt
+from datetime import timedelta as td
+from pathlib import Path
+from timeit import default_timer
+
+from lxml import etree
+
+from nexusLIMS.builder.record_builder import write_record_xml
+from nexusLIMS.builder.validation import XSD_PATH, get_record_validator
+from nexusLIMS.schemas.activity import AcquisitionActivity
+
+_DATASETS_PER_ACTIVITY = 1_000
+
+
+def _synthetic_activity(seqno: int, n_datasets: int) -> AcquisitionActivity:
+    start = dt(2024, 5, 1, 9, tzinfo=UTC) + td(hours=seqno)
+    return AcquisitionActivity(
+        start=start,
+        end=start + td(minutes=30),
+        mode="IMAGING",
+        files=[f"/instrument/session/file_{seqno}_{i}.dm3" for i in range(n_datasets)],
+        previews=[None] * n_datasets,
+        meta=[{"DatasetType": "Image"}] * n_datasets,
+        warnings=[[] for _ in range(n_datasets)],
+        setup_params={"DatasetType": "Image", "Microscope": "Test TEM"},
+        unique_meta=[
+            {"Exposure Time": 0.1 * i, "Stage X": i, "Acquisition Time": str(start)}
+            for i in range(n_datasets)
+        ],
+    )
+
+
+def _write_record(fname: Path, n_datasets: int) -> None:
+    header = etree.Element("root")
+    etree.SubElement(header, "title").text = "Validation benchmark"
+    summary = etree.SubElement(header, "summary")
+    etree.SubElement(summary, "experimenter").text = "benchmark"
+    etree.SubElement(header, "sample", id="sample")
+    n_activities = -(-n_datasets // _DATASETS_PER_ACTIVITY)
+    activities = [
+        _synthetic_activity(
+            i, min(_DATASETS_PER_ACTIVITY, n_datasets - i * _DATASETS_PER_ACTIVITY)
+        )
+        for i in range(n_activities)
+    ]
+    with fname.open(mode="wb") as f:
+        write_record_xml(f, header, activities, "sample")
+
+
+def _per_call(fname: Path) -> bool:
+    schema = etree.XMLSchema(etree.parse(XSD_PATH))
+    return schema.validate(etree.parse(fname))
+
+
+def _time(func, *args) -> float:
+    start = default_timer()
+    if not func(*args):
+        msg = f"{func.__name__} reported an invalid record"
+        raise RuntimeError(msg)
+    return default_timer() - start
+
+
+def main() -> None:
+    """Run the validation benchmark and print a table of timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="Numbers of datasets per record to benchmark",
+    )
+    args = parser.parse_args()
+
+    start = default_timer()
+    validator = get_record_validator()
+    print(f"Compiled the schema in {default_timer() - start:.3f} s (once per process)")
+
+    print(
+        f"{'datasets':>9} {'size (MB)':>10} {'per-call (s)':>13} "
+        f"{'tree (s)':>9} {'file (s)':>9}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_datasets in args.sizes:
+            fname = Path(tmp) / f"record_{n_datasets}.xml"
+            _write_record(fname, n_datasets)
+            per_call = _time(_per_call, fname)
+            tree = etree.parse(fname)
+            in_memory = _time(validator.validate, tree)
+            del tree
+            from_file = _time(validator.validate_file, fname)
+            print(
+                f"{n_datasets:>9} {fname.stat().st_size / 1e6:>10.1f} "
+                f"{per_call:>13.3f} {in_memory:>9.3f} {from_file:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
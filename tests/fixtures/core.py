@@ -7,6 +7,7 @@ in the NexusLIMS test suite.
 
 import contextlib
 import logging
+import os
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
@@ -45,6 +46,7 @@ class SingletonResetter:
         cls.reset_pint_registry()
         cls.reset_hyperspy()
         cls.reset_logger_levels()
+        cls.reset_network_session()
 
     @classmethod
     def reset_db_engine(cls):
@@ -189,6 +191,26 @@ class SingletonResetter:
                 handler.close()
         logger.debug("Reset nexusLIMS logger levels")
 
+    @classmethod
+    def reset_network_session(cls):
+        """
+        Drop the HTTP session of ``nexus_req`` and its combined CA bundle.
+
+        The session's certificate verification is set from the settings when it
+        is created, so it is created again for each test's settings.
+        """
+        try:
+            from nexusLIMS.utils import network
+
+            network._forget_session()
+            if network._ca_bundle is not None:
+                network._remove_ca_bundle(network._ca_bundle, os.getpid())
+                network._ca_bundle = None
+            logger.debug("Reset network session")
+        except ImportError:
+            # Module not imported yet, nothing to reset
+            pass
+
 
 @contextmanager
 def isolated_environment():
@@ -1407,3 +1407,42 @@ class TestMigrationV250b:
             "timezone",
         }
         assert instruments_cols == expected_cols
+
+
+class TestMigrationV275a:
+    """Test v2_7_5a migration (add build_stage_timing table)."""
+
+    def test_upgrade_adds_build_stage_timing_table(self, alembic_config, engine):
+        """Test that upgrading to v2_7_5a adds the build_stage_timing table."""
+        config, _ = alembic_config
+
+        command.upgrade(config, "v2_5_0b")
+        assert "build_stage_timing" not in get_table_names(engine)
+
+        command.upgrade(config, "v2_7_5a")
+        assert "build_stage_timing" in get_table_names(engine)
+        assert get_column_names(engine, "build_stage_timing") == {
+            "id",
+            "run_id",
+            "session_identifier",
+            "stage",
+            "wall_time",
+            "cpu_time",
+            "peak_rss_delta",
+            "items",
+            "calls",
+            "timestamp",
+        }
+        indexes = get_indexes(engine, "build_stage_timing")
+        assert "ix_build_stage_timing_run_id" in indexes
+        assert "ix_build_stage_timing_session_identifier" in indexes
+        assert "ix_build_stage_timing_stage" in indexes
+
+    def test_downgrade_removes_build_stage_timing_table(self, alembic_config, engine):
+        """Test that downgrading from v2_7_5a removes the build_stage_timing table."""
+        config, _ = alembic_config
+
+        command.upgrade(config, "v2_7_5a")
+        command.downgrade(config, "v2_5_0b")
+
+        assert "build_stage_timing" not in get_table_names(engine)
@@ -1,16 +1,22 @@
 """Tests for the process_records CLI module."""
 
 import logging
+import os
+import signal
 import smtplib
+import sys
 from pathlib import Path
 from unittest.mock import MagicMock, Mock, patch
 
+import click
+import pytest
 from click.testing import CliRunner
 from filelock import Timeout
 
 from nexusLIMS.builder.preflight import CheckResult, PreflightError
 from nexusLIMS.cli.process_records import (
     _format_version,
+    _parse_interval,
     check_log_for_errors,
     main,
     send_error_notification,
@@ -442,6 +448,73 @@ class TestMainCLI:
         time_diff = abs((dt_from - expected_from).total_seconds())
         assert time_diff < 60, f"dt_from is {time_diff}s off from expected"
 
+    @pytest.mark.parametrize(
+        ("args", "force_previews"), [([], False), (["--force-previews"], True)]
+    )
+    @patch("nexusLIMS.builder.record_builder.process_new_records")
+    @patch("nexusLIMS.cli.process_records.send_error_notification")
+    @patch("nexusLIMS.utils.logging.setup_loggers")
+    def test_force_previews(  # noqa: PLR0913
+        self,
+        mock_setup_loggers,
+        mock_send_email,
+        mock_process_records,
+        tmp_path,
+        monkeypatch,
+        args,
+        force_previews,
+    ):
+        """Test that --force-previews is passed to the record builder."""
+        mock_settings = Mock()
+        mock_settings.log_dir_path = tmp_path / "logs"
+        mock_settings.lock_file_path = tmp_path / ".builder.lock"
+        mock_settings.email_config = None
+
+        monkeypatch.setattr("nexusLIMS.config.settings", mock_settings)
+
+        result = CliRunner().invoke(main, args)
+
+        assert result.exit_code == 0
+        mock_process_records.assert_called_once()
+        assert mock_process_records.call_args.kwargs["force_previews"] is force_previews
+
+    @pytest.mark.parametrize(
+        ("args", "time_budget"), [([], None), (["--time-budget", "50m"], 3000)]
+    )
+    @patch("nexusLIMS.builder.record_builder.process_new_records")
+    @patch("nexusLIMS.cli.process_records.send_error_notification")
+    @patch("nexusLIMS.utils.logging.setup_loggers")
+    def test_time_budget(  # noqa: PLR0913
+        self,
+        mock_setup_loggers,
+        mock_send_email,
+        mock_process_records,
+        tmp_path,
+        monkeypatch,
+        args,
+        time_budget,
+    ):
+        """Test that --time-budget is passed to the record builder in seconds."""
+        mock_settings = Mock()
+        mock_settings.log_dir_path = tmp_path / "logs"
+        mock_settings.lock_file_path = tmp_path / ".builder.lock"
+        mock_settings.email_config = None
+
+        monkeypatch.setattr("nexusLIMS.config.settings", mock_settings)
+
+        result = CliRunner().invoke(main, args)
+
+        assert result.exit_code == 0
+        mock_process_records.assert_called_once()
+        assert mock_process_records.call_args.kwargs["time_budget"] == time_budget
+
+    def test_invalid_time_budget(self):
+        """Test that a time budget that is not a positive duration is rejected."""
+        result = CliRunner().invoke(main, ["--time-budget", "0"])
+
+        assert result.exit_code != 0
+        assert "Invalid value for '--time-budget'" in result.output
+
     @patch("nexusLIMS.builder.record_builder.process_new_records")
     @patch("nexusLIMS.utils.logging.setup_loggers")
     def test_lock_file_prevents_concurrent_run(
@@ -1035,6 +1108,130 @@ class TestDateFiltering:
         assert "Invalid date format" in result.output
 
 
+class TestDaemon:
+    """Test running build-records as a daemon."""
+
+    @pytest.mark.parametrize(
+        ("interval", "seconds"),
+        [("900", 900), ("15m", 900), ("1.5h", 5400), (" 2D ", 172800), (".5s", 0.5)],
+    )
+    def test_parse_interval(self, interval, seconds):
+        """Intervals are given in seconds or with a unit."""
+        assert _parse_interval(interval) == seconds
+
+    @pytest.mark.parametrize("interval", ["", "0", "-5m", "15 minutes", "m"])
+    def test_parse_invalid_interval(self, interval):
+        """Intervals that are not a positive duration are rejected."""
+        with pytest.raises(click.BadParameter, match="Invalid interval"):
+            _parse_interval(interval)
+
+    def test_interval_requires_daemon(self):
+        """--interval cannot be used without --daemon."""
+        result = CliRunner().invoke(main, ["--interval", "15m"])
+
+        assert result.exit_code != 0
+        assert "--interval can only be used with --daemon" in result.output
+
+    @patch("nexusLIMS.instruments.reload_instrument_db")
+    @patch("nexusLIMS.db.engine.dispose_engine")
+    @patch("nexusLIMS.config.refresh_settings")
+    @patch("nexusLIMS.builder.record_builder.process_new_records")
+    @patch("nexusLIMS.utils.logging.setup_loggers")
+    def test_daemon_runs_until_sigterm(  # noqa: PLR0913
+        self,
+        mock_setup_loggers,
+        mock_process_records,
+        mock_refresh_settings,
+        mock_dispose_engine,
+        mock_reload_instruments,
+        tmp_path,
+        monkeypatch,
+    ):
+        """The daemon builds repeatedly, reloads on SIGHUP, and stops on SIGTERM."""
+        mock_settings = Mock()
+        mock_settings.log_dir_path = tmp_path / "logs"
+        mock_settings.lock_file_path = tmp_path / ".builder.lock"
+        mock_settings.email_config = None
+        monkeypatch.setattr("nexusLIMS.config.settings", mock_settings)
+
+        reloads_before_run = []
+
+        def _process_new_records(**_kwargs):
+            reloads_before_run.append(mock_refresh_settings.call_count)
+            run = len(reloads_before_run)
+            if run == 1:
+                os.kill(os.getpid(), signal.SIGHUP)
+            elif run == 2:
+                sys.exit("No 'TO_BE_BUILT' sessions were found. Exiting.")
+            else:
+                os.kill(os.getpid(), signal.SIGTERM)
+
+        mock_process_records.side_effect = _process_new_records
+        previous_handler = signal.getsignal(signal.SIGTERM)
+
+        result = CliRunner().invoke(main, ["--daemon", "--interval", "0.01"])
+
+        assert result.exit_code == 0
+        # the configuration was reloaded between the first and second runs, and
+        # the daemon kept running after a run exited
+        assert reloads_before_run == [0, 1, 1]
+        mock_dispose_engine.assert_called_once()
+        mock_reload_instruments.assert_called_once()
+        assert signal.getsignal(signal.SIGTERM) is previous_handler
+        assert not any(
+            isinstance(h, logging.FileHandler) for h in logging.root.handlers
+        )
+
+    @patch("nexusLIMS.builder.record_builder.process_new_records")
+    @patch("nexusLIMS.utils.logging.setup_loggers")
+    def test_daemon_survives_failed_runs(
+        self, mock_setup_loggers, mock_process_records, tmp_path, monkeypatch
+    ):
+        """A run that fails outside the record builder does not stop the daemon."""
+        from nexusLIMS.cli import process_records
+
+        mock_settings = Mock()
+        mock_settings.log_dir_path = tmp_path / "logs"
+        mock_settings.lock_file_path = tmp_path / ".builder.lock"
+        mock_settings.email_config = None
+        monkeypatch.setattr("nexusLIMS.config.settings", mock_settings)
+
+        # the first run fails while sending its error notification, and the
+        # second cannot set up its log file
+        setup_file_logging_calls = []
+
+        def _setup_file_logging(dry_run):
+            setup_file_logging_calls.append(dry_run)
+            if len(setup_file_logging_calls) == 2:
+                msg = "disk full"
+                raise OSError(msg)
+            return setup_file_logging(dry_run)
+
+        monkeypatch.setattr(process_records, "setup_file_logging", _setup_file_logging)
+        monkeypatch.setattr(
+            process_records,
+            "_handle_error_notification",
+            Mock(side_effect=[RuntimeError("SMTP server down"), None]),
+        )
+        calls = []
+
+        def _process_new_records(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 2:
+                os.kill(os.getpid(), signal.SIGTERM)
+
+        mock_process_records.side_effect = _process_new_records
+
+        result = CliRunner().invoke(main, ["--daemon", "--interval", "0.01"])
+
+        assert result.exit_code == 0
+        assert len(setup_file_logging_calls) == 3
+        assert len(calls) == 2
+        assert not any(
+            isinstance(h, logging.FileHandler) for h in logging.root.handlers
+        )
+
+
 def test_main_entry_point():
     """Test that the module can be run as __main__."""
     import subprocess
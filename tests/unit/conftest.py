@@ -627,17 +627,29 @@ def list_signal():
 @pytest.fixture(scope="module")
 def fei_ser_files():
     """FEI .ser/.emi test files."""
+    from nexusLIMS.extractors.plugins.fei_emi import (  # pylint: disable=import-outside-toplevel
+        clear_emi_cache,
+    )
+
     files = extract_files("FEI_SER")
     yield files
     delete_files("FEI_SER")
+    # the files are extracted again (with the same mtimes) for the next test
+    clear_emi_cache()
 
 
 @pytest.fixture
 def fei_ser_files_function_scope():
     """FEI .ser/.emi test files."""
+    from nexusLIMS.extractors.plugins.fei_emi import (  # pylint: disable=import-outside-toplevel
+        clear_emi_cache,
+    )
+
     files = extract_files("FEI_SER")
     yield files
     delete_files("FEI_SER")
+    # the files are extracted again (with the same mtimes) for the next test
+    clear_emi_cache()
 
 
 # plain test files (not in .tar.gz archives, so do not need to delete at end)
@@ -0,0 +1,20 @@
+"""Tests for nexusLIMS.cli.cache."""
+
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from nexusLIMS.cli.cache import main
+from nexusLIMS.extractors.cache import ExtractionCache
+
+
+def test_purge(tmp_path, monkeypatch):
+    """`nexuslims cache purge` empties the extracted metadata cache."""
+    db_path = tmp_path / "extraction_cache.sqlite"
+    monkeypatch.setattr("nexusLIMS.config.settings.extraction_cache_path", db_path)
+    ExtractionCache(db_path).put(Path("a.dm3"), "key", "dm3_extractor", [{}])
+
+    result = CliRunner().invoke(main, ["purge"])
+    assert result.exit_code == 0
+    assert "Removed 1 cached metadata entries" in result.output
+    assert ExtractionCache(db_path).get(Path("a.dm3"), "key") is None
@@ -86,6 +86,7 @@ class TestMainCommandFlags:
             generate_preview=True,
             preview_path=None,
             overwrite=False,
+            force_preview=False,
         )
 
     def test_no_preview_flag_sets_generate_preview_false(self, runner, test_file):
@@ -160,7 +161,9 @@ class TestRunMetadata:
         ):
             result = runner.invoke(main, [str(test_file)])
         assert result.exit_code == 0
-        mock_gen.assert_called_once_with(test_file, preview_path=None, overwrite=False)
+        mock_gen.assert_called_once_with(
+            test_file, preview_path=None, overwrite=False, force_preview=False
+        )
 
     def test_no_preview_when_no_preview_flag_set(self, runner, test_file):
         meta = [{"nx_meta": {"key": "val"}}]
@@ -329,5 +332,32 @@ class TestGeneratePreview:
         assert "Preview generation failed" in result.output
         assert test_file.name in result.output
 
+    @pytest.mark.parametrize(
+        ("args", "regenerated"),
+        [(["--overwrite"], False), (["--force-preview"], True)],
+    )
+    def test_up_to_date_preview(self, runner, test_file, tmp_path, args, regenerated):
+        preview = tmp_path / "preview.png"
+        mock_gen = MagicMock()
+        mock_gen.name = "mock_preview"
+        mock_gen.version = "1.0"
+        mock_gen.generate.side_effect = lambda _ctx, path: path.write_text("png")
+
+        with (
+            patch("nexusLIMS.instruments.get_instr_from_filepath", return_value=None),
+            patch(
+                "nexusLIMS.extractors.registry.get_registry",
+                return_value=_mock_registry(mock_gen),
+            ),
+            patch("nexusLIMS.extractors.base.ExtractionContext"),
+        ):
+            invoke_args = ["--no-metadata", "--preview-path", str(preview)]
+            runner.invoke(main, [*invoke_args, str(test_file)])
+            result = runner.invoke(main, [*invoke_args, *args, str(test_file)])
+
+        assert result.exit_code == 0
+        assert mock_gen.generate.call_count == (2 if regenerated else 1)
+        assert ("Preview is up to date" in result.output) is not regenerated
+
 
 pytestmark = pytest.mark.unit
@@ -7,6 +7,15 @@ from click.testing import CliRunner
 
 from nexusLIMS.cli.main import LazyGroup, main
 
+# packages that should only be imported when they are actually used
+_HEAVY_PACKAGES = frozenset({"hyperspy", "matplotlib", "skimage", "sklearn"})
+
+# packages that no subcommand's ``--help`` should need to import
+_CLI_HEAVY_PACKAGES = _HEAVY_PACKAGES | {"alembic", "sqlmodel"}
+
+# maximum total import time (in seconds) of a subcommand's ``--help``
+_IMPORT_TIME_BUDGET = 1.0
+
 
 class TestUnifiedCLI:
     """Tests for the unified ``nexuslims`` command."""
@@ -198,6 +207,87 @@ class TestLazyLoading:
             f"Heavy modules imported during --help: {new_hyperspy}"
         )
 
+    @staticmethod
+    def _import_times(code: str) -> tuple[dict[str, float], set[str]]:
+        """
+        Run ``code`` under ``python -X importtime``.
+
+        Returns the cumulative import time (in seconds) of each top-level import,
+        and the names of all imported modules.
+        """
+        import re
+        import subprocess
+        import sys
+
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        # lines look like "import time:  <self us> | <cumulative us> | <name>",
+        # with the name indented by two spaces per level of nesting
+        pattern = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)$")
+        top_level, imported = {}, set()
+        for match in map(pattern.match, result.stderr.splitlines()):
+            if match:
+                imported.add(match.group(3))
+                if len(match.group(2)) == 2:
+                    top_level[match.group(3)] = int(match.group(1)) / 1e6
+        return top_level, imported
+
+    @staticmethod
+    def _heavy(imported: set[str], packages: frozenset[str]) -> list[str]:
+        return sorted(name for name in imported if name.split(".")[0] in packages)
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            [],
+            ["build-records"],
+            ["cache"],
+            ["config"],
+            ["db"],
+            ["extract"],
+            ["instruments"],
+        ],
+    )
+    def test_subcommand_import_time(self, args):
+        """Every subcommand's ``--help`` imports within the import-time budget."""
+        code = (
+            "from nexusLIMS.cli.main import main; "
+            f"main({[*args, '--help']!r}, standalone_mode=False)"
+        )
+        import_times, imported = self._import_times(code)
+
+        assert self._heavy(imported, _CLI_HEAVY_PACKAGES) == []
+        total = sum(import_times.values())
+        slowest = sorted(import_times, key=import_times.get, reverse=True)[:5]
+        assert total < _IMPORT_TIME_BUDGET, (
+            f"Imports for {args} took {total:.2f}s "
+            f"(budget {_IMPORT_TIME_BUDGET}s); slowest: {slowest}"
+        )
+
+    @pytest.mark.parametrize(
+        "module",
+        [
+            "nexusLIMS.extractors",
+            "nexusLIMS.schemas.activity",
+            "nexusLIMS.builder.record_builder",
+        ],
+    )
+    def test_scientific_stack_imported_on_first_use(self, module):
+        """Importing the extraction and clustering code defers the heavy imports."""
+        code = (
+            f"import {module}; "
+            "from nexusLIMS.extractors import get_registry; "
+            "get_registry().discover_plugins()"
+        )
+        _, imported = self._import_times(code)
+
+        assert self._heavy(imported, _HEAVY_PACKAGES) == []
+
 
 class TestCompletionCommand:
     """Tests for the ``nexuslims completion`` command."""
@@ -743,3 +743,21 @@ def test_cdcs_assign_to_public_workspace_can_be_disabled(monkeypatch):
     refresh_settings()
 
     assert settings.NX_CDCS_ASSIGN_TO_PUBLIC_WORKSPACE is False
+
+
+def test_load_settings(monkeypatch):
+    """Settings can be given as values, which are validated but not re-read."""
+    from pydantic import ValidationError
+
+    from nexusLIMS.config import Settings, load_settings, settings
+
+    values = {name: getattr(settings, name) for name in Settings.model_fields}
+    monkeypatch.setenv("NX_FILE_STRATEGY", "exclusive")
+    load_settings({**values, "NX_FILE_STRATEGY": "inclusive"})
+    assert settings.NX_FILE_STRATEGY == "inclusive"
+    assert values["NX_DATA_PATH"] == settings.NX_DATA_PATH
+
+    # invalid values are rejected, and the current settings kept
+    with pytest.raises(ValidationError):
+        load_settings({**values, "NX_FILE_STRATEGY": "everything"})
+    assert settings.NX_FILE_STRATEGY == "inclusive"
@@ -740,6 +740,53 @@ class TestDigitalMicrographExtractor:
         assert "Cs(mm)" in result["nx_meta"]
         assert result["nx_meta"]["Cs(mm)"] == invalid_value
 
+    @pytest.mark.parametrize(
+        "files",
+        ["list_signal", "eels_si_titan", "eds_si_titan", "neoarm_gatan_si_file"],
+    )
+    def test_read_dm3_tags_matches_hyperspy(self, request, files):
+        """Test the tags and shapes read without HyperSpy are the same as its own."""
+        files = request.getfixturevalue(files)
+        fname = files if isinstance(files, Path) else files[0]
+
+        native = digital_micrograph.read_dm3_tags(fname)
+        hyperspy = digital_micrograph.load_dm3_tags_with_hyperspy(fname)
+
+        prune = digital_micrograph._prune_dm3_tags
+        assert len(native) == len(hyperspy)
+        for (tags, shape), (hs_tags, hs_shape) in zip(native, hyperspy):
+            assert shape == hs_shape
+            assert prune(tags) == prune(hs_tags)
+
+    def test_hyperspy_fallback(
+        self, list_signal, monkeypatch, caplog, mock_instrument_from_filepath
+    ):
+        """Test files whose tags cannot be read natively are loaded by HyperSpy."""
+        mock_instrument_from_filepath(make_test_tool())
+        expected = digital_micrograph.get_dm3_metadata(list_signal[0])
+
+        def _unreadable(fname):
+            msg = f"cannot read {fname.name}"
+            raise ValueError(msg)
+
+        monkeypatch.setattr(digital_micrograph, "read_dm3_tags", _unreadable)
+        caplog.set_level("DEBUG", logger=digital_micrograph.__name__)
+
+        assert digital_micrograph.get_dm3_metadata(list_signal[0]) == expected
+        assert "loading it with HyperSpy" in caplog.text
+
+    def test_hyperspy_fallback_without_reader(
+        self, list_signal, monkeypatch, mock_instrument_from_filepath
+    ):
+        """Test files are loaded by HyperSpy if RosettaSciIO's DM reader is gone."""
+        mock_instrument_from_filepath(make_test_tool())
+        expected = digital_micrograph.get_dm3_metadata(list_signal[0])
+
+        monkeypatch.setattr(digital_micrograph, "DigitalMicrographReader", None)
+        with pytest.raises(ImportError):
+            digital_micrograph.read_dm3_tags(list_signal[0])
+        assert digital_micrograph.get_dm3_metadata(list_signal[0]) == expected
+
 
 class TestDigitalMicrographSchemaValidation:
     """Tests for schema validation and metadata migration in digital_micrograph."""
@@ -0,0 +1,162 @@
+# pylint: disable=C0116
+
+"""Tests for nexusLIMS.extractors.cache."""
+
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+import nexusLIMS.extractors
+from nexusLIMS.extractors import cache, parse_metadata
+from nexusLIMS.extractors.base import InstrumentProfile
+from nexusLIMS.extractors.cache import ExtractionCache, extraction_cache_key
+from nexusLIMS.extractors.profiles import InstrumentProfileRegistry
+
+
+@pytest.fixture
+def cache_settings(tmp_path, monkeypatch):
+    """Enable the extraction cache in a temporary directory."""
+    monkeypatch.setattr(cache.settings, "NX_EXTRACTION_CACHE_ENABLED", True)
+    monkeypatch.setattr(
+        cache.settings, "extraction_cache_path", tmp_path / "extraction_cache.sqlite"
+    )
+    return cache.settings
+
+
+@pytest.fixture
+def text_file(tmp_path, basic_txt_file):
+    """Copy a plain text file to a temporary directory."""
+    return shutil.copy(basic_txt_file, tmp_path / "basic_test.txt")
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    """Record the files that are actually extracted by parse_metadata."""
+    extracted = []
+    extract_nx_meta = nexusLIMS.extractors._extract_nx_meta
+
+    def spy(fname, instrument, session=None):
+        extracted.append(fname)
+        return extract_nx_meta(fname, instrument, session)
+
+    monkeypatch.setattr(nexusLIMS.extractors, "_extract_nx_meta", spy)
+    return extracted
+
+
+def _parse(fname):
+    meta, _ = parse_metadata(fname, write_output=False, generate_preview=False)
+    return meta
+
+
+class TestExtractionCache:
+    """Tests the extraction cache and its use by parse_metadata."""
+
+    def test_disabled_by_default(self, text_file, extractions):
+        _parse(text_file)
+        _parse(text_file)
+        assert len(extractions) == 2
+
+    def test_unchanged_file_is_not_extracted_again(
+        self, cache_settings, text_file, extractions
+    ):
+        first = _parse(text_file)
+        second = _parse(text_file)
+        assert extractions == [text_file]
+        assert second == first
+        assert cache_settings.extraction_cache_path.exists()
+
+    def test_modified_file_is_extracted_again(
+        self, cache_settings, text_file, extractions
+    ):
+        _parse(text_file)
+        stat = text_file.stat()
+        os.utime(text_file, (stat.st_atime, stat.st_mtime + 10))
+        _parse(text_file)
+        assert extractions == [text_file, text_file]
+
+    def test_new_version_invalidates_entries(
+        self, cache_settings, text_file, extractions, monkeypatch
+    ):
+        _parse(text_file)
+        monkeypatch.setattr(cache, "__version__", "0.0.0-other")
+        _parse(text_file)
+        assert extractions == [text_file, text_file]
+
+    def test_profile_changes_invalidate_entries(self, text_file, monkeypatch):
+        profile = InstrumentProfile(instrument_id="test-instrument")
+
+        class _Registry:
+            generation = 0
+
+            def get_profile(self, _instrument):
+                return profile
+
+        monkeypatch.setattr(cache, "get_profile_registry", _Registry)
+        no_profile = extraction_cache_key(text_file, None)
+
+        def add_facility(metadata, _context):
+            metadata["facility"] = "Test"
+            return metadata
+
+        profile.parsers["facility"] = add_facility
+        with_parser = extraction_cache_key(text_file, None)
+        profile.extension_fields["building"] = "Bldg 1"
+        with_fields = extraction_cache_key(text_file, None)
+
+        assert len({no_profile, with_parser, with_fields}) == 3
+        assert extraction_cache_key(text_file, None) == with_fields
+
+    def test_profile_fingerprint_is_memoized(self, monkeypatch):
+        """Profile source code is only read again when the registry changes."""
+        registry = InstrumentProfileRegistry()
+        monkeypatch.setattr(cache, "get_profile_registry", lambda: registry)
+        profile = InstrumentProfile(
+            instrument_id="test-instrument", parsers={"parse": _parse}
+        )
+        registry.register(profile)
+        sources = []
+        getsource = cache.inspect.getsource
+
+        def spy(func):
+            sources.append(func)
+            return getsource(func)
+
+        monkeypatch.setattr(cache.inspect, "getsource", spy)
+        fingerprint = cache.profile_fingerprint(profile)
+        assert cache.profile_fingerprint(profile) == fingerprint
+        assert sources == [_parse]
+
+        registry.register(InstrumentProfile(instrument_id="other-instrument"))
+        assert cache.profile_fingerprint(profile) == fingerprint
+        assert sources == [_parse, _parse]
+
+        registry.clear()
+        registry.register(profile)
+        cache.profile_fingerprint(profile)
+        assert sources == [_parse, _parse, _parse]
+
+    def test_purge(self, cache_settings, text_file, extractions):
+        _parse(text_file)
+        db = ExtractionCache(cache_settings.extraction_cache_path)
+        assert db.purge() == 1
+        assert db.purge() == 0
+        _parse(text_file)
+        assert extractions == [text_file, text_file]
+
+    def test_purge_missing_database(self, tmp_path):
+        db = ExtractionCache(tmp_path / "missing.sqlite")
+        assert db.purge() == 0
+        assert not db.db_path.exists()
+
+    def test_unreadable_cache_is_a_miss(
+        self, cache_settings, text_file, extractions, caplog
+    ):
+        _parse(text_file)
+        with sqlite3.connect(cache_settings.extraction_cache_path) as conn:
+            conn.execute("UPDATE extractions SET nx_meta = x'00'")
+        meta = _parse(text_file)
+        assert meta[0]["nx_meta"]["DatasetType"] == "Unknown"
+        assert extractions == [text_file, text_file]
+        assert "Could not load cached metadata" in caplog.text
@@ -38,9 +38,11 @@ class TestExtractorModule:
                 if f is not None:
                     f.unlink(missing_ok=True)
                     Path(str(f).replace("thumb.png", "json")).unlink(missing_ok=True)
+                    Path(f"{f}.stamp").unlink(missing_ok=True)
         elif fname is not None:
             fname.unlink(missing_ok=True)
             Path(str(fname).replace("thumb.png", "json")).unlink(missing_ok=True)
+            Path(f"{fname}.stamp").unlink(missing_ok=True)
 
     def test_parse_metadata_titan(self, parse_meta_titan):
         meta_list, thumb_fnames = parse_metadata(fname=parse_meta_titan[0])
@@ -1016,10 +1018,8 @@ class TestExtractorModule:
 
         # Mock hs.load to return a list of signals
         def mock_hs_load(fname, **kwargs):
-            # Mock the compute method on each signal
-            signal1.compute = unittest.mock.Mock()
-            signal2.compute = unittest.mock.Mock()
-            return [signal1, signal2]
+            # the file is loaded lazily
+            return [signal1.as_lazy(), signal2.as_lazy()]
 
         # Mock registry to return None for preview generator
         mock_reg_instance = unittest.mock.Mock()
@@ -1103,10 +1103,8 @@ class TestExtractorModule:
 
         # Mock hs.load to return a list of signals
         def mock_hs_load(fname, **kwargs):
-            # Mock the compute method on each signal
-            signal1.compute = unittest.mock.Mock()
-            signal2.compute = unittest.mock.Mock()
-            return [signal1, signal2]
+            # the file is loaded lazily
+            return [signal1.as_lazy(), signal2.as_lazy()]
 
         # Mock registry to return None (legacy fallback)
         mock_reg_instance = unittest.mock.Mock()
@@ -1182,9 +1180,8 @@ class TestExtractorModule:
 
         # Mock hs.load to return a single signal (not a list)
         def mock_hs_load(fname, **kwargs):
-            # Mock the compute method on the signal
-            signal.compute = unittest.mock.Mock()
-            return signal
+            # the file is loaded lazily
+            return signal.as_lazy()
 
         # Mock registry to return None (legacy fallback)
         mock_reg_instance = unittest.mock.Mock()
@@ -1245,8 +1242,7 @@ class TestExtractorModule:
         signal.metadata.General.original_filename = "test.dm3"
 
         def mock_hs_load(fname, **kwargs):
-            signal.compute = unittest.mock.Mock()
-            return signal
+            return signal.as_lazy()
 
         mock_reg_instance = unittest.mock.Mock()
         mock_reg_instance.get_preview_generator.return_value = None
@@ -1360,6 +1356,87 @@ class TestExtractorModule:
         # Clean up generated files
         self.remove_thumb_and_json(thumb_fnames)
 
+    @pytest.mark.filterwarnings(
+        "ignore:invalid value encountered in divide:RuntimeWarning"
+    )
+    def test_parse_metadata_multi_signal_loaded_once(
+        self, neoarm_gatan_si_file, monkeypatch
+    ):
+        """Test the file is loaded once for its metadata and all its previews."""
+        from hyperspy import io as hs_io
+
+        loaded = []
+        hs_load = hs_io.load
+
+        def counting_load(filename, **kwargs):
+            loaded.append(Path(filename).name)
+            return hs_load(filename, **kwargs)
+
+        monkeypatch.setattr(hs_io, "load", counting_load)
+
+        meta_list, thumb_fnames = parse_metadata(
+            fname=neoarm_gatan_si_file, generate_preview=True, force_preview=True
+        )
+
+        assert len(meta_list) == 4
+        assert all(thumb_fname.exists() for thumb_fname in thumb_fnames)
+        assert loaded == [neoarm_gatan_si_file.name]
+
+        self.remove_thumb_and_json(thumb_fnames)
+
+    @pytest.mark.filterwarnings("ignore:invalid value encountered in divide")
+    def test_extraction_unchanged_by_previews_first(
+        self, neoarm_gatan_si_file, monkeypatch
+    ):
+        """Test previews don't change the signals their file is extracted from."""
+        from nexusLIMS.extractors import (
+            _extract_nx_meta,
+            _generate_preview,
+            create_preview,
+        )
+        from nexusLIMS.extractors.base import ExtractionContext, ExtractionSession
+        from nexusLIMS.extractors.plugins import digital_micrograph
+
+        def no_native_tags(filename):
+            msg = "no native tags"
+            raise ValueError(msg)
+
+        # extract the metadata from the signals loaded (and shared) with HyperSpy
+        monkeypatch.setattr(digital_micrograph, "read_dm3_tags", no_native_tags)
+        _, expected = _extract_nx_meta(neoarm_gatan_si_file, None)
+
+        session = ExtractionSession(neoarm_gatan_si_file)
+        thumb_fnames = []
+        for i in range(4):
+            # with a preview generator plugin and with the legacy method
+            thumb_fnames.append(
+                create_preview(
+                    neoarm_gatan_si_file,
+                    overwrite=True,
+                    signal_index=i,
+                    force=True,
+                    session=session,
+                )
+            )
+            _generate_preview(
+                neoarm_gatan_si_file,
+                thumb_fnames[-1],
+                context=ExtractionContext(
+                    neoarm_gatan_si_file, signal_index=i, session=session
+                ),
+                generator=None,
+            )
+        _, nx_meta_list = _extract_nx_meta(neoarm_gatan_si_file, None, session)
+
+        assert all(s._lazy for s in session.get_signals(None))
+        for meta, expected_meta in zip(nx_meta_list, expected, strict=True):
+            # only the time of the extraction differs
+            del meta["nx_meta"]["NexusLIMS Extraction"]["Date"]
+            del expected_meta["nx_meta"]["NexusLIMS Extraction"]["Date"]
+            assert meta == expected_meta
+
+        self.remove_thumb_and_json(thumb_fnames)
+
 
 class TestValidateNxMeta:
     """Tests for the validate_nx_meta function in nexusLIMS.extractors.__init__."""
@@ -2,11 +2,18 @@
 
 """Tests for nexusLIMS.extractors.fei_emi."""
 
+import os
 from datetime import datetime as dt
+from pathlib import Path
 
 import pytest
+from hyperspy import io as hs_io
 
+from nexusLIMS.extractors.base import ExtractionContext
 from nexusLIMS.extractors.plugins import fei_emi
+from nexusLIMS.extractors.plugins.preview_generators.hyperspy_preview import (
+    HyperSpyPreviewGenerator,
+)
 from nexusLIMS.schemas.units import ureg
 from nexusLIMS.utils.time import current_system_tz
 from tests.unit.test_extractors.conftest import get_field
@@ -810,6 +817,44 @@ class TestSerEmiExtractor:  # pylint: disable=too-many-public-methods
         assert float(stem_rotation.magnitude) == -90.0
         assert str(stem_rotation.units) == "degree"
 
+    def test_emi_loaded_once(self, monkeypatch, tmp_path, fei_ser_files):
+        # the .emi's four .ser files share one load for extraction and previews
+        loaded = []
+        hs_load = hs_io.load
+
+        def counting_load(filename, **kwargs):
+            loaded.append(Path(filename).name)
+            return hs_load(filename, **kwargs)
+
+        monkeypatch.setattr(hs_io, "load", counting_load)
+        fei_emi.clear_emi_cache()
+        for i in range(1, 5):
+            test_file = get_full_file_path(
+                f"Titan_TEM_10_emi_list_4_images_dataZeroed_{i}.ser",
+                fei_ser_files,
+            )
+            meta = fei_emi.get_ser_metadata(test_file)
+            assert meta[0]["nx_meta"]["DatasetType"] == "Image"
+            preview = tmp_path / f"{i}.png"
+            assert HyperSpyPreviewGenerator().generate(
+                ExtractionContext(test_file), preview
+            )
+
+        assert loaded == ["Titan_TEM_10_emi_list_4_images_dataZeroed.emi"]
+
+        # the previews were plotted from copies, so the cached signals are
+        # still lazy and unchanged
+        emi = test_file.with_name("Titan_TEM_10_emi_list_4_images_dataZeroed.emi")
+        cached = fei_emi.load_emi_signals(emi)
+        assert all(s._lazy for s in cached)
+        assert fei_emi._load_ser(emi, 1)[0] is not cached[0]
+
+        # a modified .emi is loaded again
+        mtime = emi.stat().st_mtime_ns
+        os.utime(emi, ns=(mtime, mtime + 10**9))
+        fei_emi.get_ser_metadata(test_file)
+        assert len(loaded) == 2
+
     def test_no_emi_error(self, caplog, fei_ser_files):
         test_file = get_full_file_path(
             "Titan_TEM_12_no_accompanying_emi_dataZeroed_1.ser",
@@ -319,6 +319,64 @@ class TestFeiExtractor:
             result = extractor.supports(ExtractionContext(tiff_for_error, None))
             assert result is False
 
+    def test_file_opened_once(self, quanta_test_file, monkeypatch):
+        """Selecting an extractor and extracting a TIFF file opens it once."""
+        from pathlib import Path
+
+        from nexusLIMS.extractors.registry import get_registry
+
+        test_file = quanta_test_file[0]
+        context = ExtractionContext(test_file, None)
+        registry = get_registry()
+        registry.get_extractors_for_extension("tif")  # discover the plugins
+
+        opened = []
+        path_open, image_open = Path.open, Image.open
+
+        def counting_path_open(self, *args, **kwargs):
+            opened.append(self)
+            return path_open(self, *args, **kwargs)
+
+        def counting_image_open(fp, *args, **kwargs):
+            opened.append(fp)
+            return image_open(fp, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "open", counting_path_open)
+        monkeypatch.setattr(Image, "open", counting_image_open)
+
+        extractor = registry.get_extractor(context)
+        metadata = extractor.extract(context)
+
+        assert extractor.name == "fei_tif_extractor"
+        assert metadata[0]["Beam"]["HV"] == "30000"
+        # the file is opened for the probe, and its tags read from that handle
+        assert opened[0] == test_file
+        assert all(not isinstance(f, (str, Path)) for f in opened[1:])
+
+    def test_binary_metadata_outside_image_data(self, tmp_path, monkeypatch):
+        """Metadata appended after the image data is found without reading it all."""
+        from nexusLIMS.extractors.plugins import fei_tif
+
+        monkeypatch.setattr(fei_tif, "BINARY_METADATA_WINDOW", 1024)
+        # a "[User]" marker in the image data itself is not mistaken for metadata
+        img_array = np.zeros((100, 100), dtype=np.uint8)
+        img_array[50, :6] = list(b"[User]")
+        tiff_path = tmp_path / "appended_metadata.tif"
+        Image.fromarray(img_array, mode="L").save(tiff_path)
+        with tiff_path.open("ab") as f:
+            f.write(b"\x00" * 5000 + b"[User]\r\nUser=appended\r\n[Beam]\r\nHV=5000")
+
+        metadata_str, xml_metadata = FeiTiffExtractor()._extract_metadata_from_tiff_tag(
+            tiff_path
+        )
+
+        assert metadata_str == "[User]\nUser=appended\n[Beam]\nHV=5000"
+        assert xml_metadata == {}
+
+        # with no image data to skip, the start and end of the file are searched
+        windows = list(fei_tif._metadata_search_windows(5000, {}))
+        assert windows == [(0, 1024, 5000), (3976, 5000, 5000)]
+
     def test_xml_parsing_and_detection(self, tmp_path, mock_instrument_from_filepath):
         """Test XML detection and parsing in metadata."""
         mock_instrument_from_filepath(make_test_tool())
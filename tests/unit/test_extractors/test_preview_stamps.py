@@ -0,0 +1,140 @@
+# pylint: disable=C0116
+
+"""Tests incremental and deferred preview generation."""
+
+import json
+import os
+import shutil
+
+import pytest
+
+import nexusLIMS.extractors
+from nexusLIMS.extractors import (
+    PLACEHOLDER_PREVIEW,
+    PreviewJob,
+    create_preview,
+    generate_deferred_preview,
+    parse_metadata,
+    preview_stamps,
+)
+from nexusLIMS.extractors.preview_stamps import preview_stamp_path
+from nexusLIMS.utils import paths
+
+
+@pytest.fixture
+def data_paths(tmp_path, monkeypatch):
+    """Point the instrument data and NexusLIMS data paths at temporary dirs."""
+    instrument_data = tmp_path / "instrument_data"
+    nexuslims_data = tmp_path / "nexuslims_data"
+    instrument_data.mkdir()
+    monkeypatch.setattr(paths.settings, "NX_INSTRUMENT_DATA_PATH", instrument_data)
+    monkeypatch.setattr(paths.settings, "NX_DATA_PATH", nexuslims_data)
+    return instrument_data, nexuslims_data
+
+
+@pytest.fixture
+def text_file(data_paths, basic_txt_file):
+    """Copy a plain text file into the temporary instrument data path."""
+    return shutil.copy(basic_txt_file, data_paths[0] / "basic_test.txt")
+
+
+@pytest.fixture
+def generated(monkeypatch):
+    """Record the previews that are actually generated by create_preview."""
+    previews = []
+    generate_preview = nexusLIMS.extractors._generate_preview
+
+    def spy(fname, preview_fname, **kwargs):
+        previews.append(preview_fname)
+        return generate_preview(fname, preview_fname, **kwargs)
+
+    monkeypatch.setattr(nexusLIMS.extractors, "_generate_preview", spy)
+    return previews
+
+
+class TestIncrementalPreviews:
+    """Tests that previews are only regenerated when they are out of date."""
+
+    def test_up_to_date_preview_is_kept(self, data_paths, text_file, generated):
+        preview = create_preview(text_file, overwrite=True)
+        assert preview == data_paths[1] / "basic_test.txt.thumb.png"
+        assert preview.is_file()
+        with preview_stamp_path(preview).open(encoding="utf-8") as f:
+            stamp = json.load(f)
+        assert stamp["generator"] == "text_preview"
+        assert stamp["source_size"] == text_file.stat().st_size
+
+        assert create_preview(text_file, overwrite=True) == preview
+        assert generated == [preview]
+
+    def test_force_regenerates(self, text_file, generated):
+        preview = create_preview(text_file, overwrite=True)
+        assert create_preview(text_file, overwrite=True, force=True) == preview
+        assert generated == [preview, preview]
+
+    def test_modified_file_is_regenerated(self, text_file, generated):
+        preview = create_preview(text_file, overwrite=True)
+        stat = text_file.stat()
+        os.utime(text_file, (stat.st_atime, stat.st_mtime + 10))
+        create_preview(text_file, overwrite=True)
+        assert generated == [preview, preview]
+
+    def test_new_generator_version_is_regenerated(
+        self, text_file, generated, monkeypatch
+    ):
+        preview = create_preview(text_file, overwrite=True)
+        monkeypatch.setattr(preview_stamps, "__version__", "0.0.0-other")
+        create_preview(text_file, overwrite=True)
+        assert generated == [preview, preview]
+
+    def test_unstamped_preview_is_regenerated(self, text_file, generated):
+        preview = create_preview(text_file, overwrite=True)
+        preview_stamp_path(preview).unlink()
+        create_preview(text_file, overwrite=True)
+        assert generated == [preview, preview]
+        assert preview_stamp_path(preview).is_file()
+
+    def test_failed_preview_is_not_stamped(self, text_file, monkeypatch):
+        preview = create_preview(text_file, overwrite=True)
+        monkeypatch.setattr(
+            nexusLIMS.extractors, "_generate_preview", lambda *_a, **_kw: None
+        )
+        assert create_preview(text_file, overwrite=True, force=True) is None
+        assert not preview_stamp_path(preview).exists()
+
+
+class TestDeferredPreviews:
+    """Tests generating previews separately from metadata extraction."""
+
+    def test_parse_metadata_defers_preview(self, data_paths, text_file, generated):
+        meta, previews = parse_metadata(
+            text_file, write_output=False, defer_preview=True
+        )
+        assert meta[0]["nx_meta"]["DatasetType"] == "Unknown"
+        assert previews == [data_paths[1] / "basic_test.txt.thumb.png"]
+        assert generated == []
+        assert not previews[0].exists()
+
+    def test_generate_deferred_preview(self, text_file, generated):
+        _, previews = parse_metadata(text_file, write_output=False, defer_preview=True)
+        job = PreviewJob(text_file, previews[0], None)
+        assert generate_deferred_preview(job) == previews[0]
+        assert generate_deferred_preview(job) == previews[0]
+        assert generated == [previews[0]]
+        assert preview_stamp_path(previews[0]).is_file()
+
+    def test_failed_deferred_preview_uses_placeholder(
+        self, text_file, monkeypatch, caplog
+    ):
+        _, previews = parse_metadata(text_file, write_output=False, defer_preview=True)
+
+        def fail(*_args, **_kwargs):
+            msg = "cannot render"
+            raise RuntimeError(msg)
+
+        monkeypatch.setattr(nexusLIMS.extractors, "_generate_preview", fail)
+        job = PreviewJob(text_file, previews[0], None)
+        assert generate_deferred_preview(job) == previews[0]
+        assert previews[0].read_bytes() == PLACEHOLDER_PREVIEW.read_bytes()
+        assert not preview_stamp_path(previews[0]).exists()
+        assert "cannot render" in caplog.text
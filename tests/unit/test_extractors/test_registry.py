@@ -6,6 +6,7 @@ test extractors and clean up afterward, ensuring tests pass regardless of what
 plugins exist in the library.
 """
 
+import dataclasses
 from pathlib import Path
 from typing import ClassVar
 
@@ -408,6 +409,93 @@ class TestExtractorSelection:
         finally:
             registry.clear()
 
+    def test_probe_shared_by_extractors(self, registry, tmp_path, monkeypatch):
+        """A file's header is read once for all the extractors' supports()."""
+        test_file = tmp_path / "test.tif"
+        test_file.write_bytes(b"not a TIFF file")
+        opened = []
+        path_open = Path.open
+
+        def counting_open(self, *args, **kwargs):
+            opened.append(self)
+            return path_open(self, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "open", counting_open)
+
+        class HeaderExtractor:
+            name = "header"
+            priority = 200
+            supported_extensions: ClassVar = {"tif"}
+
+            def supports(self, context):
+                return context.probe.header.startswith(b"HEADER")
+
+            def extract(self, context):
+                return [{"nx_meta": {"size": context.probe.size}}]
+
+        class TagExtractor:
+            name = "tag"
+            priority = 150
+            supported_extensions: ClassVar = {"tif"}
+
+            def supports(self, context):
+                return context.probe.tiff_tags == {}
+
+            def extract(self, context):
+                return [{"nx_meta": {"size": context.probe.size}}]
+
+        try:
+            registry.register_extractor(HeaderExtractor)
+            registry.register_extractor(TagExtractor)
+
+            context = ExtractionContext(test_file, None)
+            extractor = registry.get_extractor(context)
+
+            assert extractor.name == "tag"
+            assert extractor.extract(context) == [{"nx_meta": {"size": 15}}]
+            assert opened == [test_file]
+        finally:
+            registry.clear()
+
+    def test_probe_missing_file(self):
+        """A file that cannot be read has an empty probe."""
+        probe = ExtractionContext(Path("missing.tif"), None).probe
+        assert probe.header == b""
+        assert probe.size is None
+        assert probe.tiff_tags == {}
+
+    def test_session_shared_by_contexts(self):
+        """A file's signals are loaded once for all the contexts of its session."""
+        loaded = []
+
+        def loader(path):
+            loaded.append(path)
+            return ["signal 0", "signal 1"]
+
+        context = ExtractionContext(Path("test.dm4"), None)
+        preview_context = dataclasses.replace(context, signal_index=1)
+
+        assert preview_context.session is context.session
+        assert not context.session.loaded
+        assert context.session.get_signals(loader) == ["signal 0", "signal 1"]
+        assert preview_context.session.get_signals(loader) == ["signal 0", "signal 1"]
+        assert loaded == [Path("test.dm4")]
+
+    def test_session_failed_load_not_kept(self):
+        """A file whose signals could not be loaded is loaded again."""
+
+        def failing_loader(path):
+            msg = f"cannot load {path}"
+            raise OSError(msg)
+
+        session = ExtractionContext(Path("test.dm4"), None).session
+        with pytest.raises(OSError, match="cannot load"):
+            session.get_signals(failing_loader)
+        assert not session.loaded
+
+        session.set_signals("signal")
+        assert session.get_signals(failing_loader) == ["signal"]
+
     def test_fallback_when_none_match(self, registry):
         """Should return fallback when no extractor matches."""
 
@@ -224,14 +224,14 @@ class TestThumbnailGenerator:  # pylint: disable=too-many-public-methods
             }
         }
 
-        # Mock hs_api.plot.markers.Texts to raise exception
-        # Must patch where it's imported in thumbnail_generator
+        # Mock hs_api.plot.markers.Texts to raise exception (hyperspy_preview
+        # imports hyperspy.api when the markers are created)
         def mock_texts_raises(*_args, **_kwargs):
             msg = "Simulated label marker creation failure"
             raise RuntimeError(msg)
 
         monkeypatch.setattr(
-            "nexusLIMS.extractors.plugins.preview_generators.hyperspy_preview.hs_api.plot.markers.Texts",
+            "hyperspy.api.plot.markers.Texts",
             mock_texts_raises,
         )
 
@@ -287,7 +287,7 @@ class TestThumbnailGenerator:  # pylint: disable=too-many-public-methods
             raise RuntimeError(msg)
 
         monkeypatch.setattr(
-            "nexusLIMS.extractors.plugins.preview_generators.hyperspy_preview.hs_api.plot.markers.Rectangles",
+            "hyperspy.api.plot.markers.Rectangles",
             mock_rectangles_raises,
         )
 
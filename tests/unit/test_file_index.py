@@ -0,0 +1,280 @@
+"""Tests the persistent filestore file index."""
+
+import os
+import sqlite3
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from nexusLIMS.builder import record_builder
+from nexusLIMS.utils import file_index
+from nexusLIMS.utils.file_index import FileIndex
+from nexusLIMS.utils.files import gnu_find_files_by_mtime
+
+T0 = 1.6e9
+
+
+def _touch(path: Path, offset: float, size: int = 1) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    os.utime(path, (T0 + offset, T0 + offset))
+    return path
+
+
+def _window(start: float, end: float) -> tuple[datetime, datetime]:
+    return (
+        datetime.fromtimestamp(T0 + start, tz=UTC),
+        datetime.fromtimestamp(T0 + end, tz=UTC),
+    )
+
+
+@pytest.fixture
+def index_settings(tmp_path, monkeypatch):
+    """Point the file finders at a temporary instrument data path."""
+    mock_settings = Mock()
+    mock_settings.NX_INSTRUMENT_DATA_PATH = tmp_path / "instruments"
+    mock_settings.NX_IGNORE_PATTERNS = ["*.mib", "*.DB"]
+    mock_settings.NX_INSTRUMENT_DATA_PATH.mkdir()
+    monkeypatch.setattr("nexusLIMS.utils.files.settings", mock_settings)
+    monkeypatch.setattr("nexusLIMS.utils.file_index.settings", mock_settings)
+    return mock_settings
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Create an empty file index in a temporary directory."""
+    return FileIndex(tmp_path / "file_index.sqlite")
+
+
+class TestFileIndex:
+    """Test the FileIndex against GNU find."""
+
+    @pytest.mark.parametrize("extensions", [None, ["dm3", "tif"], ["DM3"]])
+    @pytest.mark.parametrize(("start", "end"), [(0, 100), (10, 30), (10.5, 30.25)])
+    def test_matches_gnu_find(self, index_settings, index, extensions, start, end):
+        instr = index_settings.NX_INSTRUMENT_DATA_PATH / "titan"
+        _touch(instr / "a.dm3", 10)
+        _touch(instr / "b.DM3", 10.5, size=3)
+        _touch(instr / "sub" / "c.tif", 20)
+        _touch(instr / "sub" / "d.txt", 25)
+        _touch(instr / "sub" / "deeper" / "e.dm3", 30.25)
+        _touch(instr / "sub" / "deeper" / "f.mib", 26)
+        _touch(instr / "g.db", 27)
+        _touch(instr / "h.tif", 200)
+        (instr / "file_link.dm3").symlink_to(instr / "a.dm3")
+
+        dt_from, dt_to = _window(start, end)
+        expected = gnu_find_files_by_mtime(
+            Path("titan"), dt_from, dt_to, extensions=extensions
+        )
+        assert expected
+        assert (
+            index.find_files_by_mtime(
+                Path("titan"), dt_from, dt_to, extensions=extensions
+            )
+            == expected
+        )
+
+    def test_symlinked_directories(self, index_settings, index, tmp_path):
+        """Symlinks to directories are searched instead of the filestore itself."""
+        instr = index_settings.NX_INSTRUMENT_DATA_PATH / "linked"
+        _touch(instr / "not_found.dm3", 10)
+        for name in ["one", "two"]:
+            target = tmp_path / "targets" / name
+            _touch(target / f"{name}.dm3", 20)
+            _touch(target / "nested" / f"{name}_nested.dm3", 30)
+            (target / "loop").symlink_to(target)
+            (instr / "links").mkdir(exist_ok=True)
+            (instr / "links" / name).symlink_to(target)
+
+        dt_from, dt_to = _window(0, 100)
+        expected = gnu_find_files_by_mtime(Path("linked"), dt_from, dt_to)
+        assert len(expected) == 4
+        assert index.find_files_by_mtime(Path("linked"), dt_from, dt_to) == expected
+
+    def test_incremental_refresh(self, index_settings, index, monkeypatch):
+        instr = index_settings.NX_INSTRUMENT_DATA_PATH / "titan"
+        old = _touch(instr / "old" / "a.dm3", 10)
+        _touch(instr / "b.dm3", 20)
+        os.utime(old.parent, (T0, T0))
+        os.utime(instr, (T0, T0))
+        dt_from, dt_to = _window(0, 1000)
+
+        scanned = []
+        scan_directory = FileIndex._scan_directory
+
+        def spy(conn, tree, directory, *args):
+            scanned.append(Path(directory))
+            return scan_directory(conn, tree, directory, *args)
+
+        monkeypatch.setattr(FileIndex, "_scan_directory", staticmethod(spy))
+
+        files = index.find_files_by_mtime(Path("titan"), dt_from, dt_to)
+        assert [f.path for f in files] == [old, instr / "b.dm3"]
+        assert sorted(scanned) == [instr, instr / "old"]
+
+        # nothing changed, so no directory is listed again
+        scanned.clear()
+        index.refresh(Path("titan"))
+        assert scanned == []
+
+        # new, modified, and removed files are picked up from changed directories
+        new = _touch(instr / "new" / "c.dm3", 30)
+        old.unlink()
+        _touch(instr / "b.dm3", 40, size=5)
+        scanned.clear()
+        files = index.find_files_by_mtime(Path("titan"), dt_from, dt_to)
+        assert sorted(scanned) == [instr, instr / "new", instr / "old"]
+        assert [(f.path, f.size) for f in files] == [
+            (new, 1),
+            (instr / "b.dm3", 5),
+        ]
+        assert files == gnu_find_files_by_mtime(Path("titan"), dt_from, dt_to)
+
+        # removed directories are dropped from the index
+        (instr / "old").rmdir()
+        index.refresh(Path("titan"))
+        with sqlite3.connect(index.db_path) as conn:
+            dirs = {p for (p,) in conn.execute("SELECT path FROM directories")}
+        assert dirs == {str(instr), str(instr / "new")}
+
+    def test_recently_modified_directories_are_rescanned(
+        self, index_settings, index, monkeypatch
+    ):
+        """Files modified in place are noticed while their directory is unsettled."""
+        instr = index_settings.NX_INSTRUMENT_DATA_PATH / "titan"
+        growing = _touch(instr / "growing.dm3", 10)
+        index.refresh(Path("titan"))
+
+        # writing to an existing file does not change its directory's mtime
+        dir_mtime = instr.stat().st_mtime
+        _touch(growing, 20, size=10)
+        os.utime(instr, (dir_mtime, dir_mtime))
+
+        def indexed_size():
+            with sqlite3.connect(index.db_path) as conn:
+                return conn.execute("SELECT size FROM files").fetchone()[0]
+
+        # the directory was indexed long after its last change, so is trusted
+        monkeypatch.setattr(file_index, "_SETTLE_SECONDS", -1e12)
+        index.refresh(Path("titan"))
+        assert indexed_size() == 1
+
+        monkeypatch.setattr(file_index, "_SETTLE_SECONDS", 1e12)
+        index.refresh(Path("titan"))
+        assert indexed_size() == 10
+
+    def test_files_rewritten_in_settled_directory(
+        self, index_settings, index, monkeypatch
+    ):
+        """Found files are checked again, even if their directory is settled."""
+        instr = index_settings.NX_INSTRUMENT_DATA_PATH / "titan"
+        rewritten = _touch(instr / "rewritten.dm3", 10)
+        moved_out = _touch(instr / "moved_out.dm3", 15)
+        unchanged = _touch(instr / "unchanged.dm3", 30)
+        monkeypatch.setattr(file_index, "_SETTLE_SECONDS", -1e12)
+        index.refresh(Path("titan"))
+
+        # writing to existing files does not change their directory's mtime
+        dir_mtime = instr.stat().st_mtime
+        _touch(rewritten, 20, size=10)
+        _touch(moved_out, 500)
+        os.utime(instr, (dir_mtime, dir_mtime))
+
+        dt_from, dt_to = _window(0, 100)
+        files = index.find_files_by_mtime(Path("titan"), dt_from, dt_to)
+        assert [(f.path, f.mtime, f.size) for f in files] == [
+            (rewritten, T0 + 20, 10),
+            (unchanged, T0 + 30, 1),
+        ]
+        assert files == gnu_find_files_by_mtime(Path("titan"), dt_from, dt_to)
+
+        # the changes are stored, and the directory is no longer trusted
+        with sqlite3.connect(index.db_path) as conn:
+            assert conn.execute(
+                "SELECT mtime FROM files WHERE name = 'moved_out.dm3'"
+            ).fetchone() == (T0 + 500,)
+        scanned = []
+        scan_directory = FileIndex._scan_directory
+
+        def spy(conn, tree, directory, *args):
+            scanned.append(Path(directory))
+            return scan_directory(conn, tree, directory, *args)
+
+        monkeypatch.setattr(FileIndex, "_scan_directory", staticmethod(spy))
+        monkeypatch.setattr(file_index, "_SETTLE_SECONDS", 3600.0)
+        index.refresh(Path("titan"))
+        assert scanned == [instr]
+
+    def test_files_rewritten_into_window_in_settled_directory(
+        self, index_settings, index, monkeypatch
+    ):
+        """Settled directories listed before a window ends are listed again."""
+        instr = index_settings.NX_INSTRUMENT_DATA_PATH / "titan"
+        now = time.time()
+        old = instr / "old.dm3"
+        _touch(old, now - T0 - 10_000)
+        monkeypatch.setattr(file_index, "_SETTLE_SECONDS", -1e12)
+        index.refresh(Path("titan"))
+
+        # rewritten in place (within the window) after its directory was listed
+        dir_mtime = instr.stat().st_mtime
+        _touch(old, now - T0 + 50, size=5)
+        os.utime(instr, (dir_mtime, dir_mtime))
+
+        scanned = []
+        scan_directory = FileIndex._scan_directory
+
+        def spy(conn, tree, directory, *args):
+            scanned.append(Path(directory))
+            return scan_directory(conn, tree, directory, *args)
+
+        monkeypatch.setattr(FileIndex, "_scan_directory", staticmethod(spy))
+        dt_from = datetime.fromtimestamp(now, tz=UTC)
+        dt_to = datetime.fromtimestamp(now + 100, tz=UTC)
+        files = index.find_files_by_mtime(Path("titan"), dt_from, dt_to)
+        assert [(f.path, f.mtime, f.size) for f in files] == [(old, now + 50, 5)]
+        assert files == gnu_find_files_by_mtime(Path("titan"), dt_from, dt_to)
+        assert scanned == [instr]
+
+        # a window that ended before the directory was listed trusts it
+        scanned.clear()
+        dt_from = datetime.fromtimestamp(now - 20_000, tz=UTC)
+        dt_to = datetime.fromtimestamp(now - 5_000, tz=UTC)
+        assert index.find_files_by_mtime(Path("titan"), dt_from, dt_to) == []
+        assert scanned == []
+
+    def test_missing_path(self, index_settings, index):
+        assert index.find_files_by_mtime(Path("missing"), *_window(0, 100)) == []
+
+
+class TestGetFilesWithIndex:
+    """Test the file index integration in the record builder."""
+
+    @pytest.fixture
+    def builder_settings(self, index_settings, tmp_path, monkeypatch):
+        builder_settings = Mock()
+        builder_settings.NX_FILE_INDEX_ENABLED = True
+        builder_settings.NX_FILE_STRATEGY = "exclusive"
+        builder_settings.file_index_path = tmp_path / "file_index.sqlite"
+        monkeypatch.setattr(record_builder, "settings", builder_settings)
+        _touch(index_settings.NX_INSTRUMENT_DATA_PATH / "titan" / "a.dm3", 10)
+        return builder_settings
+
+    def test_get_files_uses_index(self, builder_settings, monkeypatch):
+        def fail(*_args, **_kwargs):
+            pytest.fail("GNU find should not be used")
+
+        monkeypatch.setattr(record_builder, "gnu_find_files_by_mtime", fail)
+        files = record_builder.get_files(Path("titan"), *_window(0, 100))
+        assert [f.path.name for f in files] == ["a.dm3"]
+        assert builder_settings.file_index_path.exists()
+
+    def test_get_files_falls_back_to_find(self, builder_settings, tmp_path, caplog):
+        builder_settings.file_index_path = tmp_path / "missing" / "index.sqlite"
+        files = record_builder.get_files(Path("titan"), *_window(0, 100))
+        assert [f.path.name for f in files] == ["a.dm3"]
+        assert "Falling back to GNU find" in caplog.text
@@ -479,7 +479,7 @@ class TestNetworkResilience:
 
     def test_ssl_verify_disabled_sets_verify_false(self):
         """
-        Test that setting NX_DISABLE_SSL_VERIFY passes verify=False to requests.
+        Test that setting NX_DISABLE_SSL_VERIFY sets verify=False on the session.
 
         When the setting is enabled, nexus_req should bypass all certificate
         verification regardless of CA_BUNDLE_CONTENT.
@@ -487,6 +487,7 @@ class TestNetworkResilience:
         import nexusLIMS.utils.network as network_mod
 
         network_mod._ssl_warning_logged = False
+        network_mod._forget_session()
 
         response = MagicMock(spec=requests.Response)
         response.status_code = HTTPStatus.OK
@@ -502,8 +503,7 @@ class TestNetworkResilience:
             nexus_req("https://test.example.com/api", "GET", retries=0)
 
             mock_request.assert_called_once()
-            _, call_kwargs = mock_request.call_args
-            assert call_kwargs["verify"] is False
+            assert network_mod._get_session().verify is False
 
     def test_ssl_verify_disabled_logs_warning(self, caplog):
         """
@@ -517,6 +517,7 @@ class TestNetworkResilience:
         import nexusLIMS.utils.network as network_mod
 
         network_mod._ssl_warning_logged = False
+        network_mod._forget_session()
 
         response = MagicMock(spec=requests.Response)
         response.status_code = HTTPStatus.OK
@@ -536,3 +537,28 @@ class TestNetworkResilience:
             ]
             assert len(warning_messages) == 1
             assert "NX_DISABLE_SSL_VERIFY" in warning_messages[0]
+
+    def test_session_reused_between_requests(self):
+        """Requests share one session, until it is forgotten (as in a forked child)."""
+        import nexusLIMS.utils.network as network_mod
+
+        response = MagicMock(spec=requests.Response)
+        response.status_code = HTTPStatus.OK
+        sessions = []
+
+        def _record_session(session, *args, **kwargs):
+            sessions.append(session)
+            return response
+
+        with patch(
+            "nexusLIMS.utils.network.Session.request",
+            autospec=True,
+            side_effect=_record_session,
+        ):
+            nexus_req("https://test.example.com/api", "GET", retries=0)
+            nexus_req("https://test.example.com/api", "GET", retries=0)
+
+        assert sessions[0] is sessions[1]
+
+        network_mod._forget_session()
+        assert network_mod._get_session() is not sessions[0]
@@ -7,6 +7,7 @@ from pathlib import Path
 import pytest
 
 from nexusLIMS.schemas import activity
+from nexusLIMS.utils.files import FileEntry
 
 
 class TestActivity:
@@ -57,7 +58,7 @@ class TestActivity:
         monkeypatch.setattr(
             activity,
             "parse_metadata",
-            lambda fname, generate_preview: (None, ""),  # noqa: ARG005
+            lambda fname, **_kwargs: (None, ""),  # noqa: ARG005
         )
         orig_activity_file_length = len(
             gnu_find_activities["activities_list"][0].files,
@@ -415,6 +416,59 @@ class TestActivity:
         assert "Beam Energy" in activity.unique_meta[0]
         assert "Beam Energy" in activity.unique_meta[1]
 
+    def test_setup_params_columns(self):
+        """Setup params need a key in every file with equal values."""
+        from nexusLIMS.schemas.activity import AcquisitionActivity
+
+        meta = [
+            {"a": 1, "b": 2, "c": 3, "nan": float("nan")},
+            {"a": 1, "b": 5, "c": 3, "d": 4, "nan": float("nan")},
+            {"a": 1, "c": 3, "d": 4, "nan": float("nan")},
+        ]
+        activity = AcquisitionActivity(files=["f0", "f1", "f2"], meta=meta)
+        activity.store_setup_params()
+        activity.store_unique_metadata()
+
+        assert activity.setup_params == {"a": 1, "c": 3}
+        assert [set(m) for m in activity.unique_meta] == [
+            {"b", "nan"},
+            {"b", "d", "nan"},
+            {"d", "nan"},
+        ]
+        assert activity.unique_params == {"a", "b", "c", "d", "nan"}
+
+        activity.store_setup_params(values_to_search=["c", "d"])
+        assert activity.setup_params == {"c": 3}
+
+    def test_pending_previews_in_xml(self, tmp_path, monkeypatch):
+        """Deferred previews are linked in the XML before they are generated."""
+        from nexusLIMS.extractors import PreviewJob
+        from nexusLIMS.schemas.activity import AcquisitionActivity
+
+        monkeypatch.setattr(activity.settings, "NX_INSTRUMENT_DATA_PATH", tmp_path)
+        monkeypatch.setattr(activity.settings, "NX_DATA_PATH", tmp_path / "data")
+        meta = [
+            {"nx_meta": {"DatasetType": "Image", "Data Type": f"Type {i}"}}
+            for i in range(2)
+        ]
+        previews = [tmp_path / "data" / f"a.dm3_signal{i}.thumb.png" for i in range(2)]
+
+        aa = AcquisitionActivity()
+        aa.add_parsed_file(tmp_path / "a.dm3", meta, previews, previews_deferred=True)
+        aa.add_parsed_file(tmp_path / "b.dm3", meta[:1], [tmp_path / "data" / "b.png"])
+        aa.store_setup_params()
+        aa.store_unique_metadata()
+
+        assert aa.pending_previews == [
+            PreviewJob(tmp_path / "a.dm3", previews[0], 0),
+            PreviewJob(tmp_path / "a.dm3", previews[1], 1),
+        ]
+        root = aa.as_xml(seqno=0, sample_id="sample_id")
+        assert [el.text for el in root.iter("preview")] == [
+            "/a.dm3_signal0.thumb.png",
+            "/a.dm3_signal1.thumb.png",
+        ]
+
 
 class TestClusteringSensitivity:
     """Test the NX_CLUSTERING_SENSITIVITY configuration option."""
@@ -438,7 +492,7 @@ class TestClusteringSensitivity:
             import os
 
             os.utime(f, (base_time + i * 10, base_time + i * 10))
-            files.append(f)
+            files.append(FileEntry.from_path(f))
 
         # Set clustering sensitivity to 0 (disabled)
         monkeypatch.setenv("NX_CLUSTERING_SENSITIVITY", "0")
@@ -469,7 +523,7 @@ class TestClusteringSensitivity:
             f = tmp_path / f"file_{i}.txt"
             f.write_text(f"content {i}")
             os.utime(f, (base_time + i, base_time + i))
-            files.append(f)
+            files.append(FileEntry.from_path(f))
 
         # Gap of 100 seconds, then second cluster: 2 files 1 second apart
         for i in range(2):
@@ -477,7 +531,7 @@ class TestClusteringSensitivity:
             f.write_text(f"content {i + 3}")
             t = base_time + 100 + i
             os.utime(f, (t, t))
-            files.append(f)
+            files.append(FileEntry.from_path(f))
 
         # Set default sensitivity
         monkeypatch.setenv("NX_CLUSTERING_SENSITIVITY", "1.0")
@@ -507,7 +561,7 @@ class TestClusteringSensitivity:
             f.write_text(f"content {i}")
             t = base_time + i * 10
             os.utime(f, (t, t))
-            files.append(f)
+            files.append(FileEntry.from_path(f))
 
         # Set high sensitivity
         monkeypatch.setenv("NX_CLUSTERING_SENSITIVITY", "2.0")
@@ -538,7 +592,7 @@ class TestClusteringSensitivity:
             f.write_text(f"content {i}")
             t = base_time + i * 10
             os.utime(f, (t, t))
-            files.append(f)
+            files.append(FileEntry.from_path(f))
 
         # Set low sensitivity
         monkeypatch.setenv("NX_CLUSTERING_SENSITIVITY", "0.5")
@@ -559,7 +613,7 @@ class TestClusteringSensitivity:
         # Create a single test file
         f = tmp_path / "single_file.txt"
         f.write_text("content")
-        files = [f]
+        files = [FileEntry.from_path(f)]
 
         # Even with sensitivity=0, a single file should return its mtime
         # Wait - if sensitivity=0, it returns [] before checking file count.
@@ -600,7 +654,7 @@ class TestClusteringSensitivity:
             f = tmp_path / f"file_{i}.txt"
             f.write_text(f"content {i}")
             os.utime(f, (base_time + t, base_time + t))
-            files.append(f)
+            files.append(FileEntry.from_path(f))
 
         # Test with default sensitivity (to warm up / set baseline)
         monkeypatch.setenv("NX_CLUSTERING_SENSITIVITY", "1.0")
@@ -623,3 +677,186 @@ class TestClusteringSensitivity:
         # Note: The relationship isn't strictly monotonic due to KDE behavior,
         # but these assertions should generally hold
         assert len(boundaries_high) >= len(boundaries_low)
+
+
+class TestClusteringMethod:
+    """Test the scalable ``binned`` NX_CLUSTERING_METHOD engine."""
+
+    @staticmethod
+    def _bursts(seed=0, n_bursts=4, burst_size=60):
+        import numpy as np
+
+        rng = np.random.default_rng(seed)
+        starts = 1.6e9 + np.arange(n_bursts) * 1800
+        return np.unique(
+            np.concatenate(
+                [s + rng.exponential(5, size=burst_size).cumsum() for s in starts]
+            )
+        )
+
+    @staticmethod
+    def _log_kde_reference(data, points, bandwidth):
+        import numpy as np
+        from scipy.special import logsumexp
+
+        log_sums = logsumexp(
+            -0.5 * ((points[:, None] - data[None, :]) / bandwidth) ** 2, axis=1
+        )
+        return log_sums - np.log(len(data) * bandwidth * np.sqrt(2 * np.pi))
+
+    @pytest.mark.parametrize("bandwidth", [0.5, 5.0, 50.0, 500.0])
+    def test_log_kde_matches_reference(self, bandwidth):
+        import numpy as np
+
+        data = self._bursts()
+        points = np.linspace(data.min(), data.max(), len(data) * 10)
+        np.testing.assert_allclose(
+            activity._log_kde(data, points, bandwidth),
+            self._log_kde_reference(data, points, bandwidth),
+            atol=1e-4,
+        )
+
+    @pytest.mark.parametrize("bandwidth", [0.5, 5.0, 50.0, 500.0])
+    def test_log_kde_leave_one_out(self, bandwidth):
+        import numpy as np
+
+        data = self._bursts(burst_size=20)
+        expected = [
+            self._log_kde_reference(np.delete(data, i), data[i : i + 1], bandwidth)[0]
+            for i in range(len(data))
+        ]
+        np.testing.assert_allclose(
+            activity._log_kde(data, data, bandwidth, leave_one_out=True),
+            expected,
+            atol=1e-4,
+        )
+
+    def test_log_kde_direct_sums(self, monkeypatch):
+        """Without a binned grid, kernel sums are computed directly (in chunks)."""
+        import numpy as np
+
+        monkeypatch.setattr(activity, "_KDE_MAX_BINS", 0)
+        monkeypatch.setattr(activity, "_KDE_CHUNK_SIZE", 100)
+        data = self._bursts()
+        points = np.linspace(data.min(), data.max(), len(data) * 10)
+        np.testing.assert_allclose(
+            activity._log_kde(data, points, 20.0),
+            self._log_kde_reference(data, points, 20.0),
+            rtol=1e-10,
+        )
+
+    @pytest.mark.parametrize("sensitivity", ["0.5", "1.0", "3.0"])
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_binned_matches_exact(self, tmp_path, monkeypatch, seed, sensitivity):
+        """Both engines split files into the same activities."""
+        import os
+
+        import numpy as np
+
+        from nexusLIMS.config import refresh_settings
+        from nexusLIMS.schemas.activity import cluster_filelist_mtimes
+
+        mtimes = self._bursts(seed=seed, burst_size=25)
+        files = []
+        for i, t in enumerate(mtimes):
+            f = tmp_path / f"file_{i}.txt"
+            f.write_text(f"content {i}")
+            os.utime(f, (t, t))
+            files.append(FileEntry.from_path(f))
+
+        monkeypatch.setenv("NX_CLUSTERING_SENSITIVITY", sensitivity)
+        partitions = []
+        for method in ("exact", "binned"):
+            monkeypatch.setenv("NX_CLUSTERING_METHOD", method)
+            refresh_settings()
+            boundaries = cluster_filelist_mtimes(files)
+            partitions.append(np.searchsorted(boundaries, mtimes))
+
+        assert np.array_equal(partitions[0], partitions[1])
+        assert partitions[1][-1] >= 3
+
+    def test_binned_method_logged(self, tmp_path, monkeypatch, caplog):
+        import os
+
+        from nexusLIMS.config import refresh_settings
+        from nexusLIMS.schemas.activity import cluster_filelist_mtimes
+
+        files = []
+        for i, t in enumerate([0, 1, 2, 100, 101]):
+            f = tmp_path / f"file_{i}.txt"
+            f.write_text(f"content {i}")
+            os.utime(f, (1.6e9 + t, 1.6e9 + t))
+            files.append(FileEntry.from_path(f))
+
+        monkeypatch.setenv("NX_CLUSTERING_METHOD", "binned")
+        refresh_settings()
+        boundaries = cluster_filelist_mtimes(files)
+
+        assert len(boundaries) == 1
+        assert 1.6e9 + 2 < boundaries[0] < 1.6e9 + 100
+        assert "KDE bandwidth grid search (binned)" in caplog.text
+
+
+class TestCompactMetadata:
+    """Test the compact storage of activity metadata."""
+
+    def test_dataset_metadata_shares_keys(self):
+        table = activity.MetadataKeyTable()
+        first = activity.DatasetMetadata(table, {"a x": 1, "b": "two"})
+        second = activity.DatasetMetadata(table, {"c": 3, "".join(["a ", "x"]): 4})
+
+        assert len(table) == 3
+        assert first == {"a x": 1, "b": "two"}
+        assert second == {"a x": 4, "c": 3}
+        assert len(second) == 2
+        assert "b" not in second
+        with pytest.raises(KeyError):
+            second["b"]
+        assert next(iter(first)) is next(iter(second))
+
+    def test_dataset_metadata_pickle(self):
+        import pickle
+
+        table = activity.MetadataKeyTable()
+        rows = [
+            activity.DatasetMetadata(table, {"a": 1}),
+            activity.DatasetMetadata(table, {"b": 2}),
+        ]
+        rows = pickle.loads(pickle.dumps(rows))
+        assert rows == [{"a": 1}, {"b": 2}]
+        assert rows[0]._table is rows[1]._table
+        assert len(rows[1]) == 1
+
+    def test_unique_metadata_view(self):
+        meta = {"a": 1, "b": 2, "c": 3}
+        view = activity.UniqueMetadataView(meta, frozenset({"a"}))
+
+        assert view == {"b": 2, "c": 3}
+        view["a"] = 10
+        view["d"] = 4
+        del view["b"]
+        assert view == {"a": 10, "c": 3, "d": 4}
+        assert meta == {"a": 1, "b": 2, "c": 3}
+        with pytest.raises(KeyError):
+            del view["b"]
+
+    def test_add_parsed_file_compact(self, tmp_path):
+        from nexusLIMS.schemas.activity import AcquisitionActivity
+
+        aa = AcquisitionActivity()
+        for i in range(3):
+            aa.add_parsed_file(
+                tmp_path / f"{i}.dm3",
+                [{"nx_meta": {"DatasetType": "Image", "Stage": {"X": i}}}],
+                [None],
+            )
+        aa.store_setup_params()
+        aa.store_unique_metadata()
+
+        assert all(isinstance(m, activity.DatasetMetadata) for m in aa.meta)
+        assert aa.metadata_keys.keys == ["DatasetType", "Stage – X"]  # noqa: RUF001
+        assert aa.setup_params == {"DatasetType": "Image"}
+        assert [dict(m) for m in aa.unique_meta] == [
+            {"Stage – X": i}  # noqa: RUF001
+            for i in range(3)
+        ]
@@ -0,0 +1,112 @@
+"""Tests for nexusLIMS.utils.build_metrics."""
+
+# pylint: disable=missing-function-docstring
+
+from pathlib import Path
+
+import pytest
+
+from nexusLIMS.db.enums import RecordStatus
+from nexusLIMS.exporters.base import ExportResult
+from nexusLIMS.utils import build_metrics
+from nexusLIMS.utils.build_metrics import (
+    format_build_metrics,
+    record_session_status,
+    write_build_metrics,
+)
+from nexusLIMS.utils.stage_timing import LATENCY_BUCKETS, StageTiming
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    """Start and end each test without any session statuses."""
+    build_metrics.reset_build_metrics()
+    yield
+    build_metrics.reset_build_metrics()
+
+
+def _timing(stage, session, wall_times, items=0):
+    timing = StageTiming(stage, session, items=items)
+    for wall_time in wall_times:
+        run = StageTiming(stage, session, wall_time=wall_time, calls=1)
+        run.latency_counts[sum(b < wall_time for b in LATENCY_BUCKETS)] += 1
+        timing.merge(run)
+    return timing
+
+
+def _metrics():
+    timings = [
+        _timing("extraction", "a", [0.002, 0.2], items=2),
+        _timing("extraction", "b", [2.0], items=1),
+        _timing("preview", "a", [0.5], items=1),
+        _timing("export:cdcs", "a", [1.5]),
+        _timing("nemo_api", "a", [0.1, 0.1]),
+        _timing("preflight", None, [0.01]),
+    ]
+    export_results = {
+        Path("a.xml"): [
+            ExportResult(success=True, destination_name="cdcs"),
+            ExportResult(success=False, destination_name="elabftw"),
+        ],
+        Path("b.xml"): [ExportResult(success=True, destination_name="cdcs")],
+    }
+    return format_build_metrics(
+        timings,
+        export_results,
+        bytes_read=1024,
+        duration=12.5,
+        timestamp=1.7e9,
+    )
+
+
+class TestBuildMetrics:
+    """Tests formatting and writing build metrics."""
+
+    def test_format_build_metrics(self):
+        record_session_status("a", RecordStatus.ERROR)
+        record_session_status("a", RecordStatus.COMPLETED)
+        record_session_status("b", RecordStatus.NO_FILES_FOUND)
+        lines = _metrics().splitlines()
+        stage_hist = "nexuslims_build_stage_duration_seconds"
+
+        for line in [
+            "nexuslims_build_last_run_timestamp_seconds 1700000000.0",
+            "nexuslims_build_run_duration_seconds 12.5",
+            'nexuslims_build_sessions{status="COMPLETED"} 1',
+            'nexuslims_build_sessions{status="NO_FILES_FOUND"} 1',
+            'nexuslims_build_sessions{status="ERROR"} 0',
+            "nexuslims_build_files_extracted 3",
+            "nexuslims_build_previews_generated 1",
+            "nexuslims_build_bytes_read 1024",
+            'nexuslims_build_exports{destination="cdcs",result="success"} 2',
+            'nexuslims_build_exports{destination="elabftw",result="failure"} 1',
+            f'{stage_hist}_bucket{{stage="extraction",le="0.005"}} 1',
+            f'{stage_hist}_bucket{{stage="extraction",le="1.0"}} 2',
+            f'{stage_hist}_bucket{{stage="extraction",le="+Inf"}} 3',
+            f'{stage_hist}_count{{stage="extraction"}} 3',
+            'nexuslims_build_export_duration_seconds_count{destination="cdcs"} 1',
+            'nexuslims_build_nemo_api_request_duration_seconds_bucket{le="0.1"} 2',
+            "nexuslims_build_nemo_api_request_duration_seconds_count 2",
+        ]:
+            assert line in lines
+        # exports and NEMO requests have their own histograms
+        assert not any('stage="export:cdcs"' in line for line in lines)
+        assert not any('stage="nemo_api"' in line for line in lines)
+
+    def test_label_escaping(self):
+        timings = [_timing('export:a "b"\\c', "a", [1.0])]
+        metrics = format_build_metrics(timings, {}, bytes_read=0, duration=1.0)
+        assert 'destination="a \\"b\\"\\\\c"' in metrics
+
+    def test_write_build_metrics(self, tmp_path, caplog):
+        path = tmp_path / "textfile" / "nexuslims.prom"
+        write_build_metrics(path, "metric 1\n")
+        write_build_metrics(path, "metric 2\n")
+        assert path.read_text() == "metric 2\n"
+        assert list(path.parent.iterdir()) == [path]
+
+        # a directory cannot be replaced by the metrics file
+        write_build_metrics(tmp_path / "textfile", "metric 3\n")
+        assert "Could not write build metrics" in caplog.text
+        assert list(tmp_path.iterdir()) == [tmp_path / "textfile"]
+        assert list(path.parent.iterdir()) == [path]
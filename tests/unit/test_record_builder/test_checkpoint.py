@@ -0,0 +1,205 @@
+"""Tests for nexusLIMS.builder.checkpoint."""
+
+# pylint: disable=missing-function-docstring
+
+from datetime import datetime as dt
+from pathlib import Path
+
+import pytest
+
+from nexusLIMS.builder import checkpoint, record_builder
+from nexusLIMS.builder.checkpoint import SessionCheckpoint, session_checkpoint_key
+from nexusLIMS.schemas import activity
+from nexusLIMS.utils.files import FileEntry
+from nexusLIMS.utils.time import current_system_tz
+from tests.unit.test_instrument_factory import make_titan_tem
+
+_DT_FROM = dt.fromtimestamp(1.6e9 - 1, tz=current_system_tz())
+_DT_TO = dt.fromtimestamp(1.6e9 + 100, tz=current_system_tz())
+
+
+def _key(files, **kwargs):
+    options = {
+        "generate_previews": False,
+        "force_previews": False,
+        "defer_previews": False,
+    }
+    return session_checkpoint_key(make_titan_tem(), files, **(options | kwargs))
+
+
+@pytest.fixture
+def session_files(tmp_path):
+    """Six files in a session."""
+    files = []
+    for i in range(6):
+        fname = tmp_path / f"file_{i}.txt"
+        fname.write_text(str(i))
+        files.append(FileEntry(fname, 1.6e9 + i + (3600 if i >= 3 else 0), 1))
+    return files
+
+
+@pytest.fixture
+def checkpoints_enabled(tmp_path, monkeypatch):
+    """Enable build checkpoints, stored in a temporary directory."""
+    db_path = tmp_path / "build_checkpoints.sqlite"
+    monkeypatch.setattr(checkpoint.settings, "NX_BUILD_CHECKPOINTS_ENABLED", True)
+    monkeypatch.setattr(checkpoint.settings, "build_checkpoint_path", db_path)
+    return db_path
+
+
+class TestSessionCheckpoint:
+    """Tests storing and loading session checkpoints."""
+
+    def test_round_trip(self, tmp_path):
+        cp = SessionCheckpoint(tmp_path / "cp.sqlite", "session")
+        assert cp.load("key") is None
+
+        cp.begin("key", [1.0, 2.0])
+        cp.add_file(0, ([{"nx_meta": {"a": 1}}], [None]))
+        cp.add_file(1, ([{"nx_meta": {"a": 2}}], [Path("b.png")]))
+        cp.add_file(3, (None, None))
+        cp.close()
+
+        cp = SessionCheckpoint(tmp_path / "cp.sqlite", "session")
+        bounds, results = cp.load("key")
+        assert bounds == [1.0, 2.0]
+        # results after a missing file are not used
+        assert results == [
+            ([{"nx_meta": {"a": 1}}], [None]),
+            ([{"nx_meta": {"a": 2}}], [Path("b.png")]),
+        ]
+        assert cp.load("other key") is None
+        assert SessionCheckpoint(cp.db_path, "other session").load("key") is None
+
+        cp.begin("new key", [3.0])
+        assert cp.load("new key") == ([3.0], [])
+        cp.clear()
+        assert cp.load("new key") is None
+
+    def test_unusable_database(self, tmp_path, caplog):
+        cp = SessionCheckpoint(tmp_path, "session")
+        cp.begin("key", [1.0])
+        cp.add_file(0, (None, None))
+        assert cp.load("key") is None
+        assert "Could not use build checkpoint" in caplog.text
+
+    def test_key(self, session_files):
+        key = _key(session_files)
+        assert key == _key(list(session_files))
+        assert key != _key(session_files[:-1])
+        assert key != _key([session_files[0]._replace(size=2), *session_files[1:]])
+        assert key != _key(session_files, defer_previews=True)
+
+    @pytest.mark.parametrize(
+        ("setting", "value"),
+        [("NX_CLUSTERING_METHOD", "binned"), ("NX_CLUSTERING_SENSITIVITY", 2.0)],
+    )
+    def test_key_clustering_settings(self, session_files, monkeypatch, setting, value):
+        monkeypatch.setattr(checkpoint.settings, "NX_CLUSTERING_METHOD", "exact")
+        monkeypatch.setattr(checkpoint.settings, "NX_CLUSTERING_SENSITIVITY", 1.0)
+        key = _key(session_files)
+        monkeypatch.setattr(checkpoint.settings, setting, value)
+        assert key != _key(session_files)
+
+    def test_disabled(self):
+        assert (
+            checkpoint.get_session_checkpoint(make_titan_tem(), _DT_FROM, _DT_TO)
+            is None
+        )
+
+
+class TestResumedBuild:
+    """Tests resuming interrupted session builds."""
+
+    @staticmethod
+    def _build(monkeypatch, session_files, fail_at=None):
+        parsed = []
+
+        def _parse_metadata(fname, **_kwargs):
+            idx = int(fname.stem.split("_")[1])
+            if idx == fail_at:
+                msg = "segfault"
+                raise RuntimeError(msg)
+            parsed.append(idx)
+            return [{"nx_meta": {"DatasetType": "Image", "Index": idx}}], [None]
+
+        monkeypatch.setattr(activity, "parse_metadata", _parse_metadata)
+        activities = record_builder.build_acq_activities(
+            make_titan_tem(),
+            _DT_FROM,
+            _DT_TO,
+            generate_previews=False,
+            files=session_files,
+        )
+        return activities, parsed
+
+    def test_resume_after_interruption(
+        self, monkeypatch, session_files, checkpoints_enabled
+    ):
+        monkeypatch.setattr(checkpoint.settings, "NX_BUILD_CHECKPOINTS_ENABLED", False)
+        expected, _ = self._build(monkeypatch, session_files)
+        monkeypatch.setattr(checkpoint.settings, "NX_BUILD_CHECKPOINTS_ENABLED", True)
+
+        with pytest.raises(RuntimeError, match="segfault"):
+            self._build(monkeypatch, session_files, fail_at=4)
+
+        clustered = []
+        monkeypatch.setattr(
+            record_builder,
+            "cluster_filelist_mtimes",
+            lambda files: clustered.append(files) or [],
+        )
+        activities, parsed = self._build(monkeypatch, session_files)
+
+        assert parsed == [4, 5]
+        assert clustered == []
+        assert [[m["Index"] for m in a.meta] for a in activities] == [
+            [m["Index"] for m in a.meta] for a in expected
+        ]
+        assert [(a.start, a.end) for a in activities] == [
+            (a.start, a.end) for a in expected
+        ]
+
+    def test_changed_files_rebuilt(
+        self, monkeypatch, session_files, checkpoints_enabled
+    ):
+        with pytest.raises(RuntimeError):
+            self._build(monkeypatch, session_files, fail_at=4)
+
+        session_files[0].path.write_text("changed")
+        session_files[0] = FileEntry.from_path(session_files[0].path)
+        session_files[0] = session_files[0]._replace(mtime=1.6e9)
+        _, parsed = self._build(monkeypatch, session_files)
+
+        assert parsed == [0, 1, 2, 3, 4, 5]
+
+    def test_changed_clustering_rebuilt(
+        self, monkeypatch, session_files, checkpoints_enabled
+    ):
+        with pytest.raises(RuntimeError):
+            self._build(monkeypatch, session_files, fail_at=4)
+
+        sensitivity = checkpoint.settings.NX_CLUSTERING_SENSITIVITY
+        monkeypatch.setattr(
+            checkpoint.settings, "NX_CLUSTERING_SENSITIVITY", sensitivity + 1
+        )
+        _, parsed = self._build(monkeypatch, session_files)
+
+        assert parsed == [0, 1, 2, 3, 4, 5]
+
+    def test_cleared_after_validation(
+        self, monkeypatch, session_files, checkpoints_enabled
+    ):
+        with pytest.raises(RuntimeError):
+            self._build(monkeypatch, session_files, fail_at=4)
+        session = record_builder.Session(
+            "session", make_titan_tem(), (_DT_FROM, _DT_TO), "None"
+        )
+        monkeypatch.setattr(
+            record_builder.Session, "update_session_status", lambda *_args: None
+        )
+        result = record_builder.RecordBuildResult(xml_text="<Experiment/>")
+        record_builder._record_validation_flow(result, session, [], [], [], [])
+
+        _, parsed = self._build(monkeypatch, session_files)
+        assert parsed == [0, 1, 2, 3, 4, 5]
@@ -0,0 +1,108 @@
+"""Tests for nexusLIMS.builder.memory_budget."""
+
+# pylint: disable=missing-function-docstring
+
+import threading
+
+import pytest
+
+from nexusLIMS.builder import memory_budget
+from nexusLIMS.builder.memory_budget import (
+    MemoryBudget,
+    estimate_memory,
+    get_memory_budget,
+    reset_memory_budget,
+    worker_peak_rss,
+)
+
+_MiB = 2**20
+
+
+@pytest.fixture
+def fresh_budget():
+    """Create the memory budget again from the settings, before and after a test."""
+    reset_memory_budget()
+    yield
+    reset_memory_budget()
+
+
+@pytest.mark.parametrize(
+    ("name", "expected"),
+    [("a.dm4", 4000), ("b.TIF", 2000), ("c.spc", 1000), ("d", 1000)],
+)
+def test_estimate_memory(tmp_path, name, expected):
+    """Memory use is estimated from the size and extension of a file."""
+    path = tmp_path / name
+    path.write_bytes(b"0" * 1000)
+    assert estimate_memory(path) == expected
+
+
+def test_estimate_memory_missing_file(tmp_path):
+    """Files that cannot be read are not estimated to need any memory."""
+    assert estimate_memory(tmp_path / "missing.dm3") == 0
+
+
+def test_worker_peak_rss():
+    """The peak memory use of this process is given in bytes."""
+    assert worker_peak_rss() > _MiB
+
+
+class TestMemoryBudget:
+    """Tests reserving memory for jobs."""
+
+    def test_acquire_waits_for_release(self, caplog):
+        budget = MemoryBudget(100 * _MiB)
+        budget.acquire(60 * _MiB, "first")
+        admitted = threading.Event()
+
+        def acquire_second():
+            budget.acquire(60 * _MiB, "second")
+            admitted.set()
+
+        thread = threading.Thread(target=acquire_second)
+        thread.start()
+        assert not admitted.wait(0.2)
+        assert budget.in_use == 60 * _MiB
+
+        budget.release(60 * _MiB)
+        thread.join(5)
+        assert admitted.is_set()
+        assert budget.in_use == 60 * _MiB
+        assert (
+            "Waiting to process second (estimated 60 MiB) until 60 MiB of the "
+            "100 MiB memory budget is free (60 MiB in use)"
+        ) in caplog.text
+
+    def test_oversized_job_runs_alone(self):
+        budget = MemoryBudget(100 * _MiB)
+        budget.acquire(500 * _MiB, "huge")
+        assert budget.in_use == 500 * _MiB
+
+        budget.release(500 * _MiB)
+        budget.acquire(10 * _MiB, "small")
+        budget.acquire(90 * _MiB, "medium")
+        assert budget.in_use == 100 * _MiB
+
+
+@pytest.mark.usefixtures("fresh_budget")
+@pytest.mark.parametrize("limit", [None, 8 * 2**30])
+def test_get_memory_budget(monkeypatch, limit):
+    """The budget is created from the settings, and shared until reset."""
+    monkeypatch.setattr(memory_budget.settings, "NX_EXTRACTION_MEMORY_BUDGET", limit)
+    budget = get_memory_budget()
+    if limit is None:
+        assert budget is None
+    else:
+        assert budget.limit == limit
+        assert get_memory_budget() is budget
+
+
+@pytest.mark.usefixtures("fresh_budget")
+def test_memory_budget_shares(monkeypatch):
+    """Processes submitting jobs at the same time each get a share of the budget."""
+    monkeypatch.setattr(memory_budget.settings, "NX_EXTRACTION_MEMORY_BUDGET", 9000)
+    reset_memory_budget(3)
+    assert get_memory_budget().limit == 3000
+
+    reset_memory_budget()
+    assert get_memory_budget().limit == 9000
@@ -1,13 +1,18 @@
 """Tests for the record builder module."""
 
 # pylint: disable=missing-function-docstring,too-many-locals
-# ruff: noqa: ARG005
+# ruff: noqa: ARG005, PLR0913
 
+import logging
+import os
 import re
 import shutil
+import time
 from datetime import datetime as dt
 from datetime import timedelta as td
 from functools import partial
+from io import BytesIO
+from itertools import product
 from pathlib import Path
 
 import pytest
@@ -26,6 +31,9 @@ from nexusLIMS.exporters.base import ExportResult
 from nexusLIMS.harvesters.nemo.exceptions import NoMatchingReservationError
 from nexusLIMS.harvesters.reservation_event import ReservationEvent
 from nexusLIMS.instruments import Instrument
+from nexusLIMS.schemas.activity import AcquisitionActivity
+from nexusLIMS.utils.files import FileEntry
+from nexusLIMS.utils.paths import join_instrument_filestore_path
 from nexusLIMS.utils.time import current_system_tz
 from tests.unit.test_instrument_factory import (
     make_test_tool,
@@ -114,7 +122,9 @@ def skip_preview_generation(monkeypatch):
     monkeypatch.setattr(
         record_builder,
         "build_new_session_records",
-        lambda: original_build_new_session_records(generate_previews=False),
+        lambda **kwargs: original_build_new_session_records(
+            generate_previews=False, **kwargs
+        ),
     )
 
 
@@ -155,7 +165,7 @@ class TestRecordBuilder:
 
         file_list_list = []
         for session, expected_count in zip(sessions, correct_files_per_session):
-            found_files = record_builder.dry_run_file_find(session)
+            found_files = [f.path for f in record_builder.dry_run_file_find(session)]
             file_list_list.append(found_files)
             assert len(found_files) == expected_count
 
@@ -180,6 +190,36 @@ class TestRecordBuilder:
             / "20251203/pfib-tofwerk raw.h5"
         ) in file_list_list[3]
 
+    @pytest.mark.parametrize("sensitivity", [1.0, 3.0])
+    @pytest.mark.parametrize(
+        "session_index",
+        [0, 1, 2, 3],
+        ids=["FEI-Titan-TEM", "JEOL-JEM-TEM", "TEST-TOOL", "Tofwerk-pFIB-TOFSIMS"],
+    )
+    @pytest.mark.usefixtures("mock_nemo_reservation")
+    def test_binned_clustering_matches_exact(
+        self, test_record_files, monkeypatch, session_index, sensitivity
+    ):
+        """The binned KDE splits each fixture session exactly like the exact KDE."""
+        import numpy as np
+
+        from nexusLIMS.schemas import activity
+        from nexusLIMS.schemas.activity import cluster_filelist_mtimes
+
+        session = session_handler.get_sessions_to_build()[session_index]
+        files = record_builder.dry_run_file_find(session)
+        mtimes = np.sort([f.mtime for f in files])
+
+        monkeypatch.setattr(activity.settings, "NX_CLUSTERING_SENSITIVITY", sensitivity)
+        partitions = {}
+        for method in ("exact", "binned"):
+            monkeypatch.setattr(activity.settings, "NX_CLUSTERING_METHOD", method)
+            boundaries = cluster_filelist_mtimes(files)
+            partitions[method] = np.searchsorted(boundaries, mtimes)
+
+        # every file falls in the same activity, whichever engine is used
+        np.testing.assert_array_equal(partitions["binned"], partitions["exact"])
+
     @pytest.mark.usefixtures("mock_nemo_reservation")
     def test_dry_run_file_find_mixed_case_extensions(
         self,
@@ -207,7 +247,9 @@ class TestRecordBuilder:
 
         try:
             # Find files - should now include the uppercase/mixed-case copies
-            found_files = record_builder.dry_run_file_find(titan_session)
+            found_files = [
+                f.path for f in record_builder.dry_run_file_find(titan_session)
+            ]
 
             # Original count: 11 files
             #   (8 .dm3 + 2 .ser, .emi excluded, 1 .tif from Tescan)
@@ -272,7 +314,9 @@ class TestRecordBuilder:
                 shutil.copy2(src_file, test_file)
 
             # Find files - should now include all .tif variations
-            found_files = record_builder.dry_run_file_find(titan_session)
+            found_files = [
+                f.path for f in record_builder.dry_run_file_find(titan_session)
+            ]
 
             # Original count: 11 files
             #   (8 .dm3 + 2 .ser, .emi excluded, 1 .tif from Tescan)
@@ -432,6 +476,57 @@ class TestRecordBuilder:
         )
         assert "No files found in " in caplog.text
 
+    @pytest.mark.usefixtures(
+        "_cleanup_session_log",
+        "mock_nemo_reservation",
+    )
+    def test_process_new_records_metrics_file(self, monkeypatch, tmp_path):
+        metrics_file = tmp_path / "metrics" / "nexuslims.prom"
+        monkeypatch.setattr(record_builder.settings, "NX_METRICS_FILE", metrics_file)
+        monkeypatch.setattr(
+            record_builder,
+            "get_sessions_to_build",
+            lambda: [
+                Session(
+                    session_identifier="test_session",
+                    instrument=make_test_tool(),
+                    dt_range=(
+                        dt.fromisoformat("2019-09-06T17:00:00.000-06:00"),
+                        dt.fromisoformat("2019-09-06T18:00:00.000-06:00"),
+                    ),
+                    user="test",
+                ),
+            ],
+        )
+        record_builder.process_new_records(
+            dry_run=False,
+            dt_to=dt.fromisoformat("2021-07-01T00:00:00-04:00"),
+        )
+
+        metrics = metrics_file.read_text()
+        assert 'nexuslims_build_sessions{status="NO_FILES_FOUND"} 1' in metrics
+        assert 'nexuslims_build_sessions{status="COMPLETED"} 0' in metrics
+        assert "nexuslims_build_files_extracted 0" in metrics
+        assert (
+            'nexuslims_build_stage_duration_seconds_count{stage="get_files"} 1'
+            in metrics
+        )
+        assert list(metrics_file.parent.iterdir()) == [metrics_file]
+
+    def test_store_run_measurements_bytes_read(self, monkeypatch, tmp_path):
+        """The bytes read are the sizes the files were found with, not re-stat'ed."""
+        metrics_file = tmp_path / "nexuslims.prom"
+        monkeypatch.setattr(record_builder.settings, "NX_METRICS_FILE", metrics_file)
+        monkeypatch.setattr(record_builder, "save_stage_timings", lambda *_: 0)
+        first, second = AcquisitionActivity(), AcquisitionActivity()
+        # the files no longer exist, so could not be stat'ed
+        first.add_parsed_file(tmp_path / "a.dm3", None, None, size=1000)
+        first.add_parsed_file(tmp_path / "a.dm3", None, None, size=1000)
+        second.add_parsed_file(tmp_path / "b.ser", None, None, size=24)
+
+        record_builder._store_run_measurements("run", [[first], [second]], {}, 1.0)
+        assert "nexuslims_build_bytes_read 1024" in metrics_file.read_text()
+
     @pytest.fixture(name="_add_recent_test_session")
     def _add_recent_test_session(self, request, monkeypatch, db_context):
         # insert a dummy session to DB that was within past day so it gets
@@ -501,6 +596,26 @@ class TestRecordBuilder:
     # then False to the add_recent_test_session fixture, which is used to
     # test both timezone-aware and timezone-naive delay implementations
     # (see https://stackoverflow.com/a/36087408)
+    def test_handle_build_exception_within_delay_without_row(self, monkeypatch, caplog):
+        """A session that failed before its RECORD_GENERATION row was inserted."""
+        session = session_handler.Session(
+            session_identifier="no_row_session",
+            instrument=make_titan_tem(),
+            dt_range=(
+                dt.fromisoformat("2020-02-04T09:00:00.000-05:00"),
+                dt.fromisoformat("2020-02-04T12:00:00.000-05:00"),
+            ),
+            user="None",
+        )
+        monkeypatch.setattr(record_builder, "has_delay_passed", lambda _dt: False)
+
+        record_builder._handle_build_exception(
+            session, None, FileNotFoundError("No files found")
+        )
+
+        assert "delay has not passed for no_row_session" in caplog.text
+        assert "Removing previously inserted" not in caplog.text
+
     @pytest.mark.parametrize("_add_recent_test_session", [True, False], indirect=True)
     @pytest.mark.usefixtures(
         "_add_recent_test_session",
@@ -790,7 +905,7 @@ class TestRecordBuilder:
         ],
         ids=["inclusive_strategy", "default_strategy", "unsupported_strategy"],
     )
-    def test_record_builder_file_strategies(  # noqa: PLR0913
+    def test_record_builder_file_strategies(
         self,
         test_record_files,
         monkeypatch,
@@ -859,6 +974,688 @@ class TestRecordBuilder:
         # remove record
         f.unlink()
 
+    @pytest.mark.usefixtures("mock_nemo_reservation", "skip_preview_generation")
+    def test_build_new_session_records_parallel(self, test_record_files):
+        """Parallel session builds return the same records, in the same order."""
+        serial_files, serial_sessions, serial_acts, serial_events = (
+            record_builder.build_new_session_records(workers=1)
+        )
+        serial_datasets = [
+            [
+                el.text
+                for el in etree.parse(f).findall(
+                    f".//{{{NX_NS}}}dataset/{{{NX_NS}}}location"
+                )
+            ]
+            for f in serial_files
+        ]
+        for f in serial_files:
+            f.unlink()
+
+        xml_files, sessions_built, activities_built, res_events_built = (
+            record_builder.build_new_session_records(workers=4)
+        )
+
+        assert len(xml_files) == len(serial_files) == 4
+        assert [f.name for f in xml_files] == [f.name for f in serial_files]
+        assert [s.session_identifier for s in sessions_built] == [
+            s.session_identifier for s in serial_sessions
+        ]
+        assert [len(a) for a in activities_built] == [len(a) for a in serial_acts]
+        assert [e.experiment_title for e in res_events_built] == [
+            e.experiment_title for e in serial_events
+        ]
+        for f, expected in zip(xml_files, serial_datasets):
+            locations = [
+                el.text
+                for el in etree.parse(f).findall(
+                    f".//{{{NX_NS}}}dataset/{{{NX_NS}}}location"
+                )
+            ]
+            assert locations == expected
+            f.unlink()
+
+    def test_build_new_session_records_parallel_errors(self, monkeypatch, caplog):
+        """Build failures in worker processes are classified as in a serial build."""
+        from nexusLIMS.harvesters.nemo.exceptions import NoDataConsentError
+
+        # other tests may reload session_handler; use the class workers can pickle
+        session_cls = session_handler.Session
+        sessions = [
+            session_cls(
+                session_identifier=f"parallel_session_{i}",
+                instrument=make_titan_tem(),
+                dt_range=(
+                    dt.fromisoformat("2020-02-04T09:00:00.000-05:00"),
+                    dt.fromisoformat("2020-02-04T12:00:00.000-05:00"),
+                ),
+                user="None",
+            )
+            for i in range(4)
+        ]
+        exceptions = {
+            "parallel_session_0": NoDataConsentError("no consent given"),
+            "parallel_session_1": NoMatchingReservationError("no reservation"),
+            "parallel_session_2": FileNotFoundError("No files found"),
+            "parallel_session_3": ValueError("something unexpected"),
+        }
+
+        def mock_build_record(
+            session,
+            sample_id=None,
+            *,
+            generate_previews=True,
+            force_previews=False,
+            defer_previews=False,
+            files=None,
+            output_path=None,
+        ):
+            raise exceptions[session.session_identifier]
+
+        statuses = {}
+        monkeypatch.setattr(record_builder, "get_sessions_to_build", lambda: sessions)
+        monkeypatch.setattr(record_builder, "build_record", mock_build_record)
+        monkeypatch.setattr(
+            session_cls,
+            "update_session_status",
+            lambda self, status: statuses.update({self.session_identifier: status}),
+        )
+
+        xml_files, *_ = record_builder.build_new_session_records(workers=2)
+
+        assert xml_files == []
+        assert statuses == {
+            "parallel_session_0": RecordStatus.NO_CONSENT,
+            "parallel_session_1": RecordStatus.NO_RESERVATION,
+            "parallel_session_2": RecordStatus.NO_FILES_FOUND,
+            "parallel_session_3": RecordStatus.ERROR,
+        }
+        assert 'Marking parallel_session_3 as "ERROR"' in caplog.text
+        assert "something unexpected" in caplog.text
+
+    @pytest.mark.usefixtures("mock_nemo_reservation")
+    def test_build_new_session_records_parallel_matches_serial(
+        self,
+        tmp_path,
+        monkeypatch,
+        basic_txt_file,
+        orion_zeiss_zeroed_file,
+        quanta_bad_metadata,
+    ):
+        """Pooled and serial builds, with either KDE engine, give the same records."""
+        from uuid import UUID
+
+        from nexusLIMS.schemas import activity
+        from nexusLIMS.utils import files, paths
+
+        # the config module may have been reloaded by other tests, so patch the
+        # settings proxy held by each module involved in the search
+        for module in (record_builder, files, paths):
+            monkeypatch.setattr(module.settings, "NX_INSTRUMENT_DATA_PATH", tmp_path)
+            monkeypatch.setattr(module.settings, "NX_FILE_STRATEGY", "inclusive")
+        # the records' sample IDs are otherwise random
+        monkeypatch.setattr(record_builder, "uuid4", lambda: UUID(int=0))
+
+        # other tests may reload session_handler; use the class workers can pickle
+        session_cls = session_handler.Session
+        sessions = []
+        sources = [basic_txt_file, orion_zeiss_zeroed_file, quanta_bad_metadata]
+        for i, instrument in enumerate(
+            [make_test_tool(), make_titan_tem(), make_test_tool()]
+        ):
+            dt_from = dt.fromisoformat(f"2021-03-0{i + 1}T09:00:00.000-05:00")
+            sessions.append(
+                session_cls(
+                    session_identifier=f"parallel_session_{i}",
+                    instrument=instrument,
+                    dt_range=(dt_from, dt_from + td(hours=4)),
+                    user="None",
+                )
+            )
+            # two bursts of files, 1.5 hours apart, make two activities
+            directory = tmp_path / instrument.filestore_path / f"session_{i}"
+            directory.mkdir(parents=True)
+            for j in range(8):
+                offset = 600 + (60 * j if j < 4 else 5400 + 45 * j)
+                source = sources[(i + j) % len(sources)]
+                fname = shutil.copy(source, directory / f"{j}_{source.name}")
+                mtime = dt_from.timestamp() + offset
+                os.utime(fname, (mtime, mtime))
+        monkeypatch.setattr(record_builder, "get_sessions_to_build", lambda: sessions)
+
+        records = {}
+        for method, workers in product(["exact", "binned"], [1, 3]):
+            monkeypatch.setattr(activity.settings, "NX_CLUSTERING_METHOD", method)
+            xml_files, _, activities_built, _ = (
+                record_builder.build_new_session_records(
+                    generate_previews=False, workers=workers
+                )
+            )
+            assert [len(a) for a in activities_built] == [2, 2, 2]
+            # only the times the files were extracted at differ
+            records[method, workers] = [
+                re.sub(r"Extraction – Date\">[^<]*<", "", f.read_text())  # noqa: RUF001
+                for f in xml_files
+            ]
+            for f in xml_files:
+                f.unlink()
+
+        assert len(records["exact", 1]) == len(sessions)
+        for built in records.values():
+            assert built == records["exact", 1]
+
+    def test_build_acq_activities_parallel_extraction(
+        self, test_record_files, monkeypatch
+    ):
+        """Extracting files in a worker pool gives the same activities and XML."""
+        from nexusLIMS.config import settings
+
+        monkeypatch.setattr(settings, "NX_FILE_STRATEGY", "inclusive")
+        kwargs = {
+            "instrument": make_titan_tem(),
+            "dt_from": dt.fromisoformat("2018-11-13T13:00:00.000-05:00"),
+            "dt_to": dt.fromisoformat("2018-11-13T16:00:00.000-05:00"),
+            "generate_previews": False,
+        }
+
+        def _activity_xml(activities):
+            return [
+                etree.tostring(a.as_xml(seqno=i, sample_id="sample_id"))
+                for i, a in enumerate(activities)
+            ]
+
+        monkeypatch.setattr(settings, "NX_EXTRACTION_WORKERS", 1)
+        serial = record_builder.build_acq_activities(**kwargs)
+        monkeypatch.setattr(settings, "NX_EXTRACTION_WORKERS", 4)
+        parallel = record_builder.build_acq_activities(**kwargs)
+
+        assert [a.files for a in parallel] == [a.files for a in serial]
+        assert [a.warnings for a in parallel] == [a.warnings for a in serial]
+        assert _activity_xml(parallel) == _activity_xml(serial)
+
+    def test_parse_files_in_pool_missing_file(self, tmp_path):
+        """A missing file raises FileNotFoundError when its result is reached."""
+        files = [tmp_path / "missing_1.dm3", tmp_path / "missing_2.dm3"]
+        parsed = record_builder._parse_files_in_pool(
+            files, generate_previews=False, workers=2
+        )
+        with pytest.raises(FileNotFoundError, match=r"missing_1\.dm3 was not found"):
+            next(parsed)
+        parsed.close()
+
+    def test_parse_files_in_pool_memory_budget(
+        self, tmp_path, monkeypatch, caplog, basic_txt_file
+    ):
+        """Files are only submitted as the memory budget allows, in order."""
+        from nexusLIMS.builder.memory_budget import MemoryBudget
+
+        files = [
+            Path(shutil.copy(basic_txt_file, tmp_path / f"file_{i}.txt"))
+            for i in range(4)
+        ]
+        # every file needs more than the whole budget, so they are parsed one by one
+        budget = MemoryBudget(1)
+        monkeypatch.setattr(record_builder, "get_memory_budget", lambda: budget)
+        caplog.set_level(logging.INFO)
+
+        parsed = list(
+            record_builder._parse_files_in_pool(
+                files, generate_previews=False, workers=2
+            )
+        )
+
+        # results are in file order (identified by the paths of their previews)
+        serial = [
+            record_builder._parse_file_in_worker(f, generate_preview=False)
+            for f in files
+        ]
+        assert [p for _, p in parsed] == [p for _, p in serial]
+        assert budget.in_use == 0
+        assert "Waiting to process" in caplog.text
+        assert "Peak memory use of an extraction worker" in caplog.text
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_build_acq_activities_force_previews(self, tmp_path, monkeypatch, workers):
+        """force_previews reaches parse_metadata for serial and pooled parsing."""
+        from nexusLIMS.schemas import activity
+
+        def mock_parse_metadata(
+            fname, *, generate_preview=True, force_preview=False, defer_preview=False
+        ):
+            nx_meta = {"DatasetType": "Misc", "forced": force_preview}
+            return [{"nx_meta": nx_meta}], [None]
+
+        monkeypatch.setattr(activity, "parse_metadata", mock_parse_metadata)
+        monkeypatch.setattr(record_builder.settings, "NX_EXTRACTION_WORKERS", workers)
+        files = []
+        for i, name in enumerate(["a.dm3", "b.dm3"]):
+            (tmp_path / name).touch()
+            files.append(FileEntry(tmp_path / name, 1.6e9 + i, 0))
+
+        activities = record_builder.build_acq_activities(
+            make_titan_tem(),
+            dt.fromtimestamp(1.6e9 - 1, tz=current_system_tz()),
+            dt.fromtimestamp(1.6e9 + 2, tz=current_system_tz()),
+            generate_previews=True,
+            force_previews=True,
+            files=files,
+        )
+        assert [m["forced"] for a in activities for m in a.meta] == [True, True]
+
+    @pytest.mark.parametrize("strategy", ["exclusive", "inclusive"])
+    def test_get_files_for_sessions(self, tmp_path, monkeypatch, strategy):
+        """One search per filestore gives each session the files get_files would."""
+        import os
+
+        from nexusLIMS.utils import files, paths
+
+        # the config module may have been reloaded by other tests, so patch the
+        # settings proxy held by each module involved in the search
+        for module in (record_builder, files, paths):
+            monkeypatch.setattr(module.settings, "NX_INSTRUMENT_DATA_PATH", tmp_path)
+            monkeypatch.setattr(module.settings, "NX_FILE_STRATEGY", strategy)
+            monkeypatch.setattr(module.settings, "NX_IGNORE_PATTERNS", ["*.mib"])
+        start = dt.fromisoformat("2024-05-01T09:00:00-04:00")
+        for i, name in enumerate(
+            ["a.dm3", "b.txt", "c.DM3", "d.mib", "e.tif", "f.dm3", "g.ser"]
+        ):
+            for filestore in ["Titan_TEM", "Nexus_Test_Instrument"]:
+                f = tmp_path / filestore / "sub" / name
+                f.parent.mkdir(parents=True, exist_ok=True)
+                f.touch()
+                mtime = (start + td(minutes=10 * i)).timestamp()
+                os.utime(f, (mtime, mtime))
+
+        def _session(identifier, instrument, from_minutes, to_minutes):
+            return Session(
+                session_identifier=identifier,
+                instrument=instrument,
+                dt_range=(
+                    start + td(minutes=from_minutes),
+                    start + td(minutes=to_minutes),
+                ),
+                user="None",
+            )
+
+        # session bounds fall exactly on file mtimes to check inclusive/exclusive
+        sessions = [
+            _session("titan_1", make_titan_tem(), 0, 20),
+            _session("titan_2", make_titan_tem(), 20, 45),
+            _session("titan_3", make_titan_tem(), 15, 35),
+            _session("titan_empty", make_titan_tem(), 100, 120),
+            _session("test_tool", make_test_tool(), -5, 30),
+        ]
+        get_files_calls = []
+        get_files = record_builder.get_files
+
+        def spy_get_files(path, dt_from, dt_to):
+            get_files_calls.append(path)
+            return get_files(path, dt_from, dt_to)
+
+        monkeypatch.setattr(record_builder, "get_files", spy_get_files)
+        session_files = record_builder.get_files_for_sessions(sessions)
+
+        assert sorted(get_files_calls) == [
+            tmp_path / "Nexus_Test_Instrument",
+            tmp_path / "Titan_TEM",
+        ]
+        assert session_files["titan_empty"] == []
+        assert [f.path.name for f in session_files["titan_1"]] == (
+            ["c.DM3"] if strategy == "exclusive" else ["b.txt", "c.DM3"]
+        )
+        for s in sessions:
+            path = join_instrument_filestore_path(s.instrument.filestore_path)
+            assert session_files[s.session_identifier] == get_files(
+                path, s.dt_from, s.dt_to
+            )
+
+    def test_get_files_for_sessions_error(self, monkeypatch, caplog):
+        """Sessions on filestores that cannot be searched are left out."""
+
+        def mock_get_files(path, dt_from, dt_to):
+            if path.name == "Titan_TEM":
+                msg = "find failed"
+                raise RuntimeError(msg)
+            return []
+
+        monkeypatch.setattr(record_builder, "get_files", mock_get_files)
+        dt_range = (
+            dt.fromisoformat("2024-05-01T09:00:00-04:00"),
+            dt.fromisoformat("2024-05-01T10:00:00-04:00"),
+        )
+        sessions = [
+            Session("titan", make_titan_tem(), dt_range, "None"),
+            Session("test_tool", make_test_tool(), dt_range, "None"),
+        ]
+        assert record_builder.get_files_for_sessions(sessions) == {"test_tool": []}
+        assert "find failed" in caplog.text
+
+    def test_build_new_session_records_batch_discovery(self, monkeypatch):
+        """Files found up front are passed on to build_record for each session."""
+        from nexusLIMS.config import settings
+
+        session_cls = session_handler.Session
+        dt_range = (
+            dt.fromisoformat("2024-05-01T09:00:00-04:00"),
+            dt.fromisoformat("2024-05-01T10:00:00-04:00"),
+        )
+        sessions = [
+            session_cls(f"batch_session_{i}", make_titan_tem(), dt_range, "None")
+            for i in range(2)
+        ]
+        found = {"batch_session_0": [FileEntry(Path("a.dm3"), 0.0, 1)]}
+        built_with = {}
+
+        def mock_build_record(
+            session,
+            sample_id=None,
+            *,
+            generate_previews=True,
+            force_previews=False,
+            defer_previews=False,
+            files=None,
+            output_path=None,
+        ):
+            built_with[session.session_identifier] = files
+            msg = "not building"
+            raise ValueError(msg)
+
+        monkeypatch.setattr(settings, "NX_BATCH_FILE_DISCOVERY", True)
+        monkeypatch.setattr(record_builder, "get_sessions_to_build", lambda: sessions)
+        monkeypatch.setattr(record_builder, "get_files_for_sessions", lambda _: found)
+        monkeypatch.setattr(record_builder, "build_record", mock_build_record)
+        monkeypatch.setattr(
+            session_cls, "update_session_status", lambda self, status: None
+        )
+        record_builder.build_new_session_records()
+
+        assert built_with == {
+            "batch_session_0": found["batch_session_0"],
+            "batch_session_1": None,
+        }
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    @pytest.mark.parametrize("past_deadline", [False, True])
+    def test_build_new_session_records_schedule(
+        self, monkeypatch, caplog, workers, past_deadline
+    ):
+        """Sessions are built in the scheduled order, and only within the deadline."""
+        session_cls = session_handler.Session
+        sessions = [
+            session_cls(
+                f"scheduled_session_{i}",
+                make_titan_tem(),
+                (
+                    dt.fromisoformat(f"2024-05-0{i + 1}T09:00:00-04:00"),
+                    dt.fromisoformat(f"2024-05-0{i + 1}T10:00:00-04:00"),
+                ),
+                "None",
+            )
+            for i in reversed(range(3))
+        ]
+
+        def mock_build_record(
+            session,
+            sample_id=None,
+            *,
+            generate_previews=True,
+            force_previews=False,
+            defer_previews=False,
+            files=None,
+            output_path=None,
+        ):
+            msg = "not building"
+            raise ValueError(msg)
+
+        started, statuses = [], {}
+        monkeypatch.setattr(
+            record_builder.settings, "NX_BUILD_SCHEDULING_POLICY", "oldest_first"
+        )
+        monkeypatch.setattr(record_builder, "get_sessions_to_build", lambda: sessions)
+        monkeypatch.setattr(record_builder, "build_record", mock_build_record)
+        monkeypatch.setattr(
+            session_cls,
+            "insert_record_generation_event",
+            lambda self: started.append(self.session_identifier) or {},
+        )
+        monkeypatch.setattr(
+            session_cls,
+            "update_session_status",
+            lambda self, status: statuses.update({self.session_identifier: status}),
+        )
+        deadline = time.monotonic() + (-1 if past_deadline else 3600)
+        xml_files, *_ = record_builder.build_new_session_records(
+            workers=workers, deadline=deadline
+        )
+
+        assert xml_files == []
+        if past_deadline:
+            # the sessions are left 'TO_BE_BUILT' for the next run
+            assert started == []
+            assert statuses == {}
+            assert "leaving 3 sessions 'TO_BE_BUILT'" in caplog.text
+        else:
+            assert started == [f"scheduled_session_{i}" for i in range(3)]
+            assert set(statuses.values()) == {RecordStatus.ERROR}
+
+    def test_preview_workers_are_not_forked(self, monkeypatch):
+        """Preview workers are not forked, but get the parent's settings."""
+        from nexusLIMS import config
+
+        assert record_builder._get_preview_mp_context().get_start_method() != "fork"
+
+        monkeypatch.setattr(record_builder.settings, "NX_PREVIEW_WORKERS", 3)
+        values = record_builder._settings_values()
+        monkeypatch.setattr(config._manager, "_settings", None)
+        monkeypatch.setattr(record_builder, "_init_worker_process", lambda: None)
+        record_builder._init_preview_worker(values)
+        assert config._manager.get().NX_PREVIEW_WORKERS == 3
+        assert values["NX_DATA_PATH"] == config._manager.get().NX_DATA_PATH
+
+    @pytest.mark.parametrize("memory_budget", [None, 1])
+    def test_build_new_session_records_preview_workers(
+        self, tmp_path, monkeypatch, basic_txt_file, memory_budget
+    ):
+        """Previews of validated records are generated by the preview pool."""
+        from nexusLIMS.builder.memory_budget import MemoryBudget
+        from nexusLIMS.extractors import PLACEHOLDER_PREVIEW, PreviewJob
+        from nexusLIMS.utils import paths
+
+        # the preview workers are given the settings of the record builder, which
+        # is a separate settings object from that of paths if a test reloaded config
+        for settings in {paths.settings, record_builder.settings}:
+            monkeypatch.setattr(settings, "NX_INSTRUMENT_DATA_PATH", tmp_path)
+            monkeypatch.setattr(settings, "NX_DATA_PATH", tmp_path / "data")
+        monkeypatch.setattr(record_builder.settings, "NX_PREVIEW_WORKERS", 2)
+        # with a budget of 1 byte, the previews are generated one at a time
+        budget = None if memory_budget is None else MemoryBudget(memory_budget)
+        monkeypatch.setattr(record_builder, "get_memory_budget", lambda: budget)
+        text_file = Path(shutil.copy(basic_txt_file, tmp_path / "basic_test.txt"))
+        session_cls = session_handler.Session
+        dt_range = (
+            dt.fromisoformat("2024-05-01T09:00:00-04:00"),
+            dt.fromisoformat("2024-05-01T10:00:00-04:00"),
+        )
+        sessions = [
+            session_cls(name, make_titan_tem(), dt_range, "None")
+            for name in ("valid", "invalid")
+        ]
+        jobs = {
+            "valid": [
+                PreviewJob(
+                    text_file, tmp_path / "data" / "basic_test.txt.thumb.png", None
+                ),
+                PreviewJob(tmp_path / "missing.txt", tmp_path / "data" / "m.png", None),
+            ],
+            "invalid": [
+                PreviewJob(text_file, tmp_path / "data" / "invalid.thumb.png", None)
+            ],
+        }
+        deferred = {}
+
+        def mock_build_record(
+            session,
+            sample_id=None,
+            *,
+            generate_previews=True,
+            force_previews=False,
+            defer_previews=False,
+            files=None,
+            output_path=None,
+        ):
+            deferred[session.session_identifier] = defer_previews
+            aa = AcquisitionActivity(pending_previews=jobs[session.session_identifier])
+            return RecordBuildResult(xml_text="<xml/>", activities=[aa])
+
+        def mock_validation_flow(_result, s, xml_files, sessions_built, *args):
+            if s.session_identifier == "valid":
+                xml_files.append(tmp_path / "valid.xml")
+            return xml_files, sessions_built, *args
+
+        monkeypatch.setattr(record_builder, "get_sessions_to_build", lambda: sessions)
+        monkeypatch.setattr(record_builder, "build_record", mock_build_record)
+        monkeypatch.setattr(
+            record_builder, "_record_validation_flow", mock_validation_flow
+        )
+        xml_files, *_ = record_builder.build_new_session_records()
+
+        assert xml_files == [tmp_path / "valid.xml"]
+        assert deferred == {"valid": True, "invalid": True}
+        assert jobs["valid"][0].preview_fname.is_file()
+        assert (
+            jobs["valid"][1].preview_fname.read_bytes()
+            == PLACEHOLDER_PREVIEW.read_bytes()
+        )
+        assert not jobs["invalid"][0].preview_fname.exists()
+        assert budget is None or budget.in_use == 0
+
+    def test_previews_of_a_file_share_session(self, monkeypatch, tmp_path):
+        """The previews of a file's signals share one extraction session."""
+        from nexusLIMS.extractors import PreviewJob
+
+        generated = []
+        monkeypatch.setattr(
+            record_builder,
+            "generate_deferred_preview",
+            lambda job, *, force, session: generated.append(
+                (job.signal_index, session)
+            ),
+        )
+        fname = tmp_path / "multi_signal.dm4"
+        jobs = [
+            PreviewJob(fname, tmp_path / f"multi_signal_signal{i}.thumb.png", i)
+            for i in range(3)
+        ]
+        record_builder._generate_previews_in_worker(jobs, "session")
+
+        assert [i for i, _ in generated] == [0, 1, 2]
+        sessions = {id(session) for _, session in generated}
+        assert len(sessions) == 1
+        assert generated[0][1].file_path == fname
+
+    def _streamed_record(self, tmp_path, monkeypatch, basic_txt_file, output_path):
+        """Build a record of three text files without a reservation system."""
+        session = Session(
+            "stream_session",
+            make_titan_tem(),
+            (
+                dt.fromtimestamp(1.6e9 - 1, tz=current_system_tz()),
+                dt.fromtimestamp(1.6e9 + 3, tz=current_system_tz()),
+            ),
+            "None",
+        )
+        monkeypatch.setattr(
+            record_builder,
+            "get_reservation_event",
+            lambda s: ReservationEvent(
+                experiment_title="Streamed record",
+                instrument=s.instrument,
+                username="None",
+                start_time=s.dt_from,
+                end_time=s.dt_to,
+            ),
+        )
+        files = []
+        for i in range(3):
+            fname = tmp_path / f"file_{i}.txt"
+            if not fname.exists():
+                shutil.copy(basic_txt_file, fname)
+            files.append(FileEntry(fname, 1.6e9 + i, fname.stat().st_size))
+        return build_record(
+            session=session,
+            sample_id="sample_id",
+            generate_previews=False,
+            files=files,
+            output_path=output_path,
+        )
+
+    def test_build_record_streamed_to_file(self, tmp_path, monkeypatch, basic_txt_file):
+        """A record streamed to disk is the record that would be built in memory."""
+        from freezegun import freeze_time
+
+        # the extraction time is part of each dataset's metadata
+        with freeze_time("2024-05-01 12:00:00"):
+            in_memory = self._streamed_record(
+                tmp_path, monkeypatch, basic_txt_file, output_path=None
+            )
+            streamed = self._streamed_record(
+                tmp_path, monkeypatch, basic_txt_file, output_path=tmp_path / "r.xml"
+            )
+
+        assert streamed.xml_text is None
+        assert streamed.xml_path == tmp_path / "r.xml"
+        assert len(streamed.activities) == len(in_memory.activities)
+        assert streamed.xml_path.read_text(encoding="utf-8") == in_memory.xml_text
+        root = etree.parse(streamed.xml_path).getroot()
+        assert root.tag == f"{{{NX_NS}}}Experiment"
+        assert root.find(f"{{{NX_NS}}}title").text == "Streamed record"
+        assert len(root.findall(f".//{{{NX_NS}}}dataset")) == 3
+        assert record_builder.validate_record(streamed.xml_path)
+        assert record_builder.validate_record(BytesIO(in_memory.xml_text.encode()))
+
+    def test_validate_record_invalid_file(self, tmp_path):
+        """Schema errors anywhere in a record are found when validating from disk."""
+        invalid = tmp_path / "invalid.xml"
+        invalid.write_text(
+            f'<Experiment xmlns="{NX_NS}"><title>t</title><bogus/></Experiment>'
+        )
+        result = record_builder.validate_record(invalid)
+        assert not result
+        assert "bogus" in result.errors[0].message
+
+    @pytest.mark.parametrize("valid", [True, False])
+    def test_record_validation_flow_partial_file(
+        self, tmp_path, monkeypatch, basic_txt_file, valid
+    ):
+        """Streamed records are moved into place only if they validate."""
+        monkeypatch.setattr(record_builder.settings, "records_dir_path", tmp_path)
+        partial = tmp_path / "record.xml.partial"
+        result = self._streamed_record(
+            tmp_path, monkeypatch, basic_txt_file, output_path=partial
+        )
+        if not valid:
+            partial.write_text("<Experiment/>")
+        session = Session(
+            "https://nemo.example.com/api/usage_events/?id=42",
+            make_titan_tem(),
+            (dt.fromisoformat("2024-05-01T09:00:00-04:00"),) * 2,
+            "None",
+        )
+        monkeypatch.setattr(Session, "update_session_status", lambda self, status: None)
+
+        xml_files, *_ = record_builder._record_validation_flow(
+            result, session, [], [], [], []
+        )
+
+        assert not partial.exists()
+        if valid:
+            assert xml_files == [
+                tmp_path / f"2024-05-01_{session.instrument.name}_42.xml"
+            ]
+            assert xml_files[0].is_file()
+        else:
+            assert xml_files == []
+
     @pytest.mark.usefixtures("mock_nemo_reservation")
     def test_new_session_bad_upload(
         self,
@@ -881,7 +1678,7 @@ class TestRecordBuilder:
         monkeypatch.setattr(
             record_builder,
             "build_new_session_records",
-            lambda: (dummy_files, dummy_sessions, [], []),
+            lambda **kwargs: (dummy_files, dummy_sessions, [], []),
         )
         monkeypatch.setattr(record_builder, "export_records", _mock_failed_export)
 
@@ -931,6 +1728,10 @@ class TestRecordBuilder:
             sample_id=None,
             *,
             generate_previews=True,
+            force_previews=False,
+            defer_previews=False,
+            files=None,
+            output_path=None,
         ):
             return RecordBuildResult(
                 xml_text="<xml>Record invalid against NexusLIMS Schema</xml>"
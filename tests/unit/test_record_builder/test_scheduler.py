@@ -0,0 +1,132 @@
+"""Tests for nexusLIMS.builder.scheduler."""
+
+# pylint: disable=missing-function-docstring
+
+import time
+from datetime import datetime as dt
+from datetime import timedelta as td
+from pathlib import Path
+
+import pytest
+
+from nexusLIMS.builder.scheduler import BuildSchedule, order_sessions
+from nexusLIMS.db.session_handler import Session
+from nexusLIMS.utils.files import FileEntry
+from tests.unit.test_instrument_factory import make_quanta_sem, make_titan_tem
+
+_START = dt.fromisoformat("2024-05-01T09:00:00-04:00")
+
+
+def _session(name, instrument, hours):
+    dt_from = _START + td(hours=hours)
+    return Session(name, instrument, (dt_from, dt_from + td(hours=1)), "None")
+
+
+def _files(n):
+    return [FileEntry(Path(f"{i}.dm3"), 0.0, 1) for i in range(n)]
+
+
+@pytest.fixture
+def sessions():
+    """Sessions on two instruments, in the order they come from the database."""
+    titan, quanta = make_titan_tem(), make_quanta_sem()
+    return [
+        _session("titan_2", titan, 2),
+        _session("titan_0", titan, 0),
+        _session("titan_1", titan, 1),
+        _session("quanta_3", quanta, 3),
+        _session("quanta_4", quanta, 4),
+    ]
+
+
+def _names(sessions):
+    return [s.session_identifier for s in sessions]
+
+
+class TestOrderSessions:
+    """Tests ordering sessions by each scheduling policy."""
+
+    def test_database(self, sessions):
+        assert order_sessions(sessions, "database") == sessions
+
+    def test_oldest_first(self, sessions):
+        assert _names(order_sessions(sessions, "oldest_first")) == [
+            "titan_0",
+            "titan_1",
+            "titan_2",
+            "quanta_3",
+            "quanta_4",
+        ]
+
+    def test_smallest_first(self, sessions):
+        session_files = {
+            "titan_2": _files(5),
+            "titan_0": _files(100),
+            "titan_1": _files(2),
+            "quanta_3": _files(50),
+        }
+        # quanta_4's files are not known, so its build fails straight away
+        assert _names(order_sessions(sessions, "smallest_first", session_files)) == [
+            "quanta_4",
+            "titan_1",
+            "titan_2",
+            "quanta_3",
+            "titan_0",
+        ]
+
+    def test_instrument_fair(self, sessions):
+        assert _names(order_sessions(sessions, "instrument_fair")) == [
+            "titan_0",
+            "quanta_3",
+            "titan_1",
+            "quanta_4",
+            "titan_2",
+        ]
+
+
+class TestBuildSchedule:
+    """Tests handing out sessions within a deadline."""
+
+    def test_no_deadline(self, sessions):
+        schedule = BuildSchedule(sessions)
+        started = []
+        while (s := schedule.next_session()) is not None:
+            started.append(s)
+            schedule.record(10, 1e6)
+
+        assert started == sessions
+        assert not schedule.deferred
+        assert len(schedule) == 0
+
+    def test_estimate(self, sessions):
+        schedule = BuildSchedule(sessions, session_files={"titan_2": _files(30)})
+        assert schedule.estimate(sessions[0]) == 0
+
+        schedule.record(10, 20.0)
+        schedule.record(0, 10.0)
+        # 30 s for 10 files, or 15 s per session
+        assert schedule.estimate(sessions[0]) == pytest.approx(90.0)
+        assert schedule.estimate(sessions[1]) == pytest.approx(15.0)
+
+    def test_deadline(self, sessions, caplog):
+        session_files = {s.session_identifier: _files(10) for s in sessions}
+        session_files["quanta_3"] = _files(200)
+        schedule = BuildSchedule(sessions, time.monotonic() + 1000, session_files)
+
+        started = []
+        while (s := schedule.next_session()) is not None:
+            started.append(s)
+            # 10 seconds per file, so quanta_3 will not be built in time
+            schedule.record(10, 100.0)
+
+        assert started == sessions[:3]
+        assert schedule.deferred == sessions[3:]
+        assert len(schedule) == 0
+        assert "(quanta_3) is expected to take 2000 seconds" in caplog.text
+        assert "leaving 2 sessions 'TO_BE_BUILT'" in caplog.text
+
+    def test_deadline_passed(self, sessions):
+        schedule = BuildSchedule(sessions, time.monotonic() - 1)
+
+        assert schedule.next_session() is None
+        assert schedule.deferred == sessions
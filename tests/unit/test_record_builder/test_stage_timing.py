@@ -0,0 +1,149 @@
+"""Tests for nexusLIMS.utils.stage_timing."""
+
+# pylint: disable=missing-function-docstring
+
+from datetime import datetime as dt
+
+import pytest
+from sqlmodel import Session as DBSession
+from sqlmodel import select
+
+from nexusLIMS.builder import record_builder
+from nexusLIMS.db.engine import create_in_memory_engine
+from nexusLIMS.db.models import BuildStageTiming
+from nexusLIMS.utils import stage_timing
+from nexusLIMS.utils.files import FileEntry
+from nexusLIMS.utils.stage_timing import (
+    StageTiming,
+    add_timings,
+    drain_timings,
+    save_stage_timings,
+    session_timing,
+    timed_stage,
+)
+from nexusLIMS.utils.time import current_system_tz
+from tests.unit.test_instrument_factory import make_titan_tem
+
+
+@pytest.fixture(autouse=True)
+def _reset_timings():
+    """Start and end each test without any stage timings."""
+    stage_timing.reset_timings()
+    yield
+    stage_timing.reset_timings()
+
+
+def _by_key(timings):
+    return {(t.session_identifier, t.stage): t for t in timings}
+
+
+class TestTimedStage:
+    """Tests measuring build stages."""
+
+    def test_runs_are_merged_per_session(self):
+        with session_timing("a"):
+            for _ in range(3):
+                with timed_stage("extraction", items=1):
+                    pass
+            with timed_stage("export:cdcs", "b", items=1):
+                pass
+        with timed_stage("preflight") as timing:
+            timing.items = 5
+
+        timings = _by_key(drain_timings())
+        assert set(timings) == {
+            ("a", "extraction"),
+            ("b", "export:cdcs"),
+            (None, "preflight"),
+        }
+        assert timings["a", "extraction"].calls == 3
+        assert timings["a", "extraction"].items == 3
+        assert timings[None, "preflight"].items == 5
+        assert all(t.wall_time >= 0 and t.cpu_time >= 0 for t in timings.values())
+        assert drain_timings() == []
+
+    def test_recorded_on_exception(self):
+        def _extract():
+            with timed_stage("extraction"):
+                msg = "bad file"
+                raise ValueError(msg)
+
+        with pytest.raises(ValueError, match="bad file"):
+            _extract()
+        assert [t.stage for t in drain_timings()] == ["extraction"]
+
+    def test_add_timings(self):
+        with timed_stage("preview", "a", items=1):
+            pass
+        with session_timing("a"):
+            add_timings(
+                [
+                    StageTiming("preview", items=2, calls=2, peak_rss_delta=10),
+                    StageTiming("preview", "b", items=1, calls=1),
+                ]
+            )
+
+        timings = _by_key(drain_timings())
+        assert timings["a", "preview"].items == 3
+        assert timings["a", "preview"].calls == 3
+        assert timings["a", "preview"].peak_rss_delta >= 10
+        assert timings["b", "preview"].items == 1
+
+
+class TestSaveStageTimings:
+    """Tests storing stage timings in the database."""
+
+    def test_save(self, test_db_engine, monkeypatch):
+        monkeypatch.setattr(stage_timing, "get_engine", lambda: test_db_engine)
+        with timed_stage("clustering", "a", items=4):
+            pass
+        with timed_stage("preflight"):
+            pass
+
+        assert save_stage_timings("run") == 2
+        assert save_stage_timings("run") == 0
+
+        with DBSession(test_db_engine) as db:
+            rows = db.exec(
+                select(BuildStageTiming).order_by(BuildStageTiming.stage)
+            ).all()
+        assert [(r.run_id, r.session_identifier, r.stage) for r in rows] == [
+            ("run", "a", "clustering"),
+            ("run", None, "preflight"),
+        ]
+        assert rows[0].items == 4
+        assert rows[0].calls == 1
+
+    def test_database_error(self, monkeypatch, caplog):
+        # no tables are created in this database
+        engine = create_in_memory_engine()
+        monkeypatch.setattr(stage_timing, "get_engine", lambda: engine)
+        with timed_stage("preflight"):
+            pass
+
+        assert save_stage_timings("run") == 0
+        assert "Could not store build stage timings" in caplog.text
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_build_acq_activities_timings(tmp_path, monkeypatch, workers):
+    """Stages timed in extraction workers are attributed to the session."""
+    monkeypatch.setattr(record_builder.settings, "NX_EXTRACTION_WORKERS", workers)
+    files = []
+    for i in range(4):
+        fname = tmp_path / f"file_{i}.txt"
+        fname.write_text(str(i))
+        files.append(FileEntry(fname, 1.6e9 + i, 1))
+
+    with session_timing("session"):
+        record_builder.build_acq_activities(
+            make_titan_tem(),
+            dt.fromtimestamp(1.6e9 - 1, tz=current_system_tz()),
+            dt.fromtimestamp(1.6e9 + 10, tz=current_system_tz()),
+            generate_previews=False,
+            files=files,
+        )
+
+    timings = _by_key(drain_timings())
+    assert timings["session", "clustering"].items == len(files)
+    assert timings["session", "extraction"].items == len(files)
@@ -0,0 +1,117 @@
+"""Tests for nexusLIMS.builder.validation."""
+
+# pylint: disable=missing-function-docstring
+# ruff: noqa: ARG005
+
+from io import BytesIO, StringIO
+
+import pytest
+from lxml import etree
+
+from nexusLIMS.builder import record_builder
+from nexusLIMS.builder.validation import (
+    NX_NAMESPACE,
+    RecordValidator,
+    SchemaError,
+    get_record_validator,
+)
+
+
+def _record(n_datasets: int = 2, dataset_type: str = "Image") -> bytes:
+    """Make a serialized record with one activity of ``n_datasets`` datasets."""
+    datasets = "".join(
+        f'<dataset type="{dataset_type}" role="Experimental">\n'
+        f"<name>file_{i}.dm3</name>\n<location>/file_{i}.dm3</location>\n"
+        "</dataset>\n"
+        for i in range(n_datasets)
+    )
+    return (
+        f'<Experiment xmlns="{NX_NAMESPACE}">\n<title>Test</title>\n'
+        "<summary><experimenter>user</experimenter></summary>\n"
+        '<sample id="sample"/>\n<acquisitionActivity seqno="0">\n'
+        "<startTime>2024-05-01T09:00:00-04:00</startTime>\n"
+        f"<sampleID>sample</sampleID>\n<setup/>\n{datasets}"
+        "</acquisitionActivity>\n</Experiment>\n"
+    ).encode()
+
+
+class TestRecordValidator:
+    """Tests validating records with the compiled schema."""
+
+    def test_schema_compiled_once(self, monkeypatch):
+        get_record_validator.cache_clear()
+        compiled = []
+        monkeypatch.setattr(
+            RecordValidator,
+            "__init__",
+            lambda self: compiled.append(self) or setattr(self, "schema", None),
+        )
+        try:
+            assert get_record_validator() is get_record_validator()
+            assert len(compiled) == 1
+        finally:
+            get_record_validator.cache_clear()
+
+    def test_validate_element(self):
+        result = get_record_validator().validate(etree.fromstring(_record()))
+        assert result.valid
+        assert result
+        assert result.errors == []
+
+    def test_validate_element_errors(self):
+        record = etree.fromstring(_record(dataset_type="Bogus"))
+        result = get_record_validator().validate(record)
+
+        assert not result
+        assert len(result.errors) == 2
+        assert [e.line for e in result.errors] == [9, 13]
+        assert result.errors[0].path == "/*/*[4]/*[4]"
+        assert "'Bogus' is not an element of the set" in result.errors[0].message
+
+    @pytest.mark.parametrize("wrap", [BytesIO, lambda b: StringIO(b.decode())])
+    def test_validate_file(self, wrap):
+        assert get_record_validator().validate_file(wrap(_record()))
+
+    def test_validate_file_errors(self, tmp_path):
+        fname = tmp_path / "record.xml"
+        fname.write_bytes(_record(n_datasets=3, dataset_type="Bogus"))
+        result = get_record_validator().validate_file(fname)
+
+        assert not result
+        assert [e.line for e in result.errors] == [9, 13, 17]
+        assert [e.path for e in result.errors] == [
+            "/*/*[4]/*[4]",
+            "/*/*[4]/*[5]",
+            "/*/*[4]/*[6]",
+        ]
+
+    def test_validate_file_malformed(self):
+        result = get_record_validator().validate_file(BytesIO(b"<Experiment>\n<a>"))
+        assert [(e.line, e.path) for e in result.errors] == [(2, None)]
+        assert "Premature end of data" in result.errors[0].message
+
+    def test_schema_error_str(self):
+        error = SchemaError(3, "/*/*[2]", "Element 'bogus': not expected.")
+        assert str(error) == "line 3 (/*/*[2]): Element 'bogus': not expected."
+        assert str(SchemaError(1, None, "bad")) == "line 1: bad"
+
+    def test_invalid_record_errors_logged(self, monkeypatch, caplog):
+        session = record_builder.Session(
+            "https://nemo.example.com/api/usage_events/?id=1",
+            None,
+            (None, None),
+            "None",
+        )
+        monkeypatch.setattr(
+            record_builder.Session, "update_session_status", lambda self, status: None
+        )
+        result = record_builder.RecordBuildResult(
+            xml_text=_record(dataset_type="Bogus").decode()
+        )
+
+        xml_files, *_ = record_builder._record_validation_flow(
+            result, session, [], [], [], []
+        )
+
+        assert xml_files == []
+        assert "Schema validation error at line 9 (/*/*[4]/*[4])" in caplog.text
@@ -475,7 +475,7 @@ class TestUtils:
         from datetime import datetime, timedelta
         from pathlib import Path
 
-        from nexusLIMS.utils.files import gnu_find_files_by_mtime
+        from nexusLIMS.utils.files import FileEntry, gnu_find_files_by_mtime
 
         # Create test directory structure
         instr_data = tmp_path / "instruments"
@@ -499,10 +499,11 @@ class TestUtils:
             lambda *_: [test_path],
         )
 
-        # Mock subprocess.run to simulate find command results
+        # Mock subprocess.run to simulate find command results (in the
+        # "mtime<TAB>size<TAB>path" -printf format)
         def mock_run(cmd, *args, **kwargs):
             result = Mock()
-            result.stdout = str(test_file).encode() + b"\x00"
+            result.stdout = f"1700000000.5\t4\t{test_file}".encode() + b"\x00"
             return result
 
         monkeypatch.setattr("subprocess.run", mock_run)
@@ -519,7 +520,44 @@ class TestUtils:
         )
 
         assert len(files) == 1
-        assert files[0] == test_file
+        assert files[0] == FileEntry(test_file, 1700000000.5, 4)
+
+    def test_gnu_find_files_by_mtime_entries(self, tmp_path, monkeypatch):
+        """Found files carry the mtime and size that ``stat`` would report."""
+        import os
+        from datetime import UTC, datetime
+
+        from nexusLIMS.utils.files import gnu_find_files_by_mtime
+
+        instr_data = tmp_path / "instruments"
+        test_path = instr_data / "test_instrument" / "with\ttab"
+        test_path.mkdir(parents=True)
+        for i, name in enumerate(["b file.dm3", "a_file.dm3", "c_file.dm3"]):
+            f = test_path / name
+            f.write_bytes(b"x" * (i + 1))
+            mtime = 1.6e9 + [20.25, 10.5, 30.125][i]
+            os.utime(f, (mtime, mtime))
+
+        mock_settings = Mock()
+        mock_settings.NX_INSTRUMENT_DATA_PATH = instr_data
+        mock_settings.NX_IGNORE_PATTERNS = []
+        monkeypatch.setattr("nexusLIMS.utils.files.settings", mock_settings)
+
+        files = gnu_find_files_by_mtime(
+            Path("test_instrument"),
+            datetime.fromtimestamp(1.6e9, tz=UTC),
+            datetime.fromtimestamp(1.6e9 + 60, tz=UTC),
+            extensions=["dm3"],
+        )
+
+        assert [f.path.name for f in files] == [
+            "a_file.dm3",
+            "b file.dm3",
+            "c_file.dm3",
+        ]
+        for f in files:
+            assert f.mtime == f.path.stat().st_mtime
+            assert f.size == f.path.stat().st_size
 
     @responses.activate
     def test_nexus_req_ca_bundle_content_written(self, monkeypatch, tmp_path):
@@ -585,9 +623,9 @@ class TestUtils:
         custom_cert = b"CUSTOM CERTIFICATE\n"
         system_cert = b"SYSTEM CERTIFICATE\n"
 
-        mock_ca_bundle = [custom_cert]
+        mock_get_content = Mock(return_value=[custom_cert])
         monkeypatch.setattr(
-            "nexusLIMS.utils.network.get_ca_bundle_content", lambda: mock_ca_bundle
+            "nexusLIMS.utils.network.get_ca_bundle_content", mock_get_content
         )
 
         # Create fake system cert file
@@ -598,11 +636,35 @@ class TestUtils:
         # Mock response
         responses.add(responses.GET, "https://example.com/secure", status=200)
 
-        # Make request
+        # Make requests
         response = nexus_req("https://example.com/secure", "GET")
+        nexus_req("https://example.com/secure", "GET")
 
         assert response.status_code == 200
-        assert len(responses.calls) == 1
+        assert len(responses.calls) == 2
+
+        # the combined bundle is written once, and set on the shared session
+        from nexusLIMS.utils import network
+
+        ca_bundle = network._get_session().verify
+        assert Path(ca_bundle).read_bytes() == system_cert + custom_cert
+        mock_get_content.assert_called_once()
+
+    @responses.activate
+    def test_nexus_req_cookies_not_shared(self):
+        """Test cookies set by a response are not sent with the next request."""
+        responses.add(
+            responses.GET,
+            "https://example.com/login",
+            status=200,
+            headers={"Set-Cookie": "sessionid=abc; Path=/"},
+        )
+        responses.add(responses.GET, "https://example.com/api", status=200)
+
+        nexus_req("https://example.com/login", "GET")
+        nexus_req("https://example.com/api", "GET")
+
+        assert "Cookie" not in responses.calls[1].request.headers
 
     def test_join_instrument_filestore_path_relative_dotslash(self):
         """Test join_instrument_filestore_path with ./relative/path format."""